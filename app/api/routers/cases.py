@@ -11,6 +11,8 @@ from app.models_api import cases as api_models
 from app.api.deps import get_db, get_write_api_key, get_read_api_key, get_current_settings
 from app.core.config import AppSettings
 from app.utils.common import sanitize_filename
+from app.workers.pool_controller import WorkerPoolSnapshot, estimate_completion_seconds
+from app.workers.runtime import worker_pool_snapshot
 from app.db import crud
 
 logger = logging.getLogger(__name__)
@@ -29,7 +31,8 @@ def _db_case_to_response(db_case: db_models.Case) -> api_models.CaseDetailRespon
                         document_name=summary_item_db.get("document_name", "N/A"),
                         unicourt_doc_key=summary_item_db.get("unicourt_doc_key"),
                         status=summary_item_db.get("status", "Unknown"),
-                        notes=summary_item_db.get("notes", "") # Optional, may not exist
+                        notes=summary_item_db.get("notes", ""), # Optional, may not exist
+                        llm_usage=summary_item_db.get("llm_usage")
                     )
                 )
     
@@ -57,6 +60,8 @@ def _db_case_to_response(db_case: db_models.Case) -> api_models.CaseDetailRespon
         case_url_on_unicourt=db_case.case_url_on_unicourt,
         status=db_case.status,
         last_submitted_at=db_case.last_submitted_at.isoformat() if db_case.last_submitted_at else None,
+        priority=db_case.priority or 0,
+        deadline=db_case.deadline.isoformat() if db_case.deadline else None,
         original_creditor_name_from_doc=db_case.original_creditor_name_from_doc,
         original_creditor_name_source_doc_title=db_case.original_creditor_name_source_doc_title,
         creditor_address_from_doc=db_case.creditor_address_from_doc,
@@ -68,7 +73,8 @@ def _db_case_to_response(db_case: db_models.Case) -> api_models.CaseDetailRespon
         final_judgment_awarded_to_creditor = db_case.final_judgment_awarded_to_creditor,
         final_judgment_awarded_source_doc_title = db_case.final_judgment_awarded_source_doc_title,
         final_judgment_awarded_to_creditor_context = db_case.final_judgment_awarded_to_creditor_context,
-        processed_documents_summary=processed_docs_summary_resp
+        processed_documents_summary=processed_docs_summary_resp,
+        llm_usage_totals=db_case.llm_usage_totals
     )
 
 
@@ -88,13 +94,11 @@ async def submit_cases_for_processing(
     newly_submitted_count = 0
     deleted_and_resubmitted_count = 0
     skipped_active_count = 0
+    updated_queued_count = 0
 
-    # Get case numbers currently in queue by fetching case IDs and querying the database
-    queue_case_ids = [item[0] for item in list(request.app.state.case_processing_queue._queue)]
-    current_queue_case_numbers = []
-    if queue_case_ids:
-        queue_cases = crud.get_cases_by_ids(db, queue_case_ids)
-        current_queue_case_numbers = [case.case_number for case in queue_cases]
+    # Case numbers with an entry in the persistent queue (pending or leased)
+    current_queue_case_numbers = set(await request.app.state.case_processing_queue.queued_case_numbers())
+    current_leased_case_numbers = set(await request.app.state.case_processing_queue.leased_case_numbers())
     
     async with request.app.state.active_cases_lock:
         current_active_case_numbers = set(request.app.state.actively_processing_cases)
@@ -111,7 +115,18 @@ async def submit_cases_for_processing(
             continue
         submitted_in_this_call.add(case_num_for_db)
 
-        if case_num_for_db in current_queue_case_numbers or case_num_for_db in current_active_case_numbers:
+        is_running = case_num_for_db in current_leased_case_numbers or case_num_for_db in current_active_case_numbers
+        if case_num_for_db in current_queue_case_numbers and not is_running:
+            # Still waiting: re-enqueue so the queue coalesces it (higher priority and earlier deadline win)
+            existing_db_case = crud.get_case_by_case_number(db, case_num_for_db)
+            if existing_db_case:
+                await request.app.state.case_processing_queue.put(existing_db_case.id, case_num_for_db,
+                                                                  priority=case_detail.priority, deadline=case_detail.deadline)
+                logger.info(f"Case {case_num_for_db} is already queued. Updated its priority/deadline from the re-submission.")
+                updated_queued_count += 1
+                continue
+
+        if case_num_for_db in current_queue_case_numbers or is_running:
             logger.info(f"Case {case_num_for_db} is already in queue or actively processing. Skipping submission.")
             skipped_active_count += 1
             continue
@@ -141,38 +156,47 @@ async def submit_cases_for_processing(
         logger.info(f"New case record for {case_num_for_db} (ID: {db_case.id}) created and submitted to queue.")
         newly_submitted_count +=1 # Count as newly submitted even if an old one was deleted
 
-        # Queue item is now (case_id, case_db_object)
-        await request.app.state.case_processing_queue.put((db_case.id, db_case))
-        current_queue_case_numbers.append(case_num_for_db) # Update local snapshot
+        await request.app.state.case_processing_queue.put(db_case.id, db_case.case_number,
+                                                          priority=case_detail.priority, deadline=case_detail.deadline)
+        current_queue_case_numbers.add(case_num_for_db) # Update local snapshot
 
     return api_models.CaseSubmitResponse(
-        message=f"Processed submission: {newly_submitted_count} case(s) newly added. {deleted_and_resubmitted_count} case(s) replaced (old deleted). {skipped_active_count} case(s) skipped (already active/queued).",
+        message=f"Processed submission: {newly_submitted_count} case(s) newly added. {deleted_and_resubmitted_count} case(s) replaced (old deleted). {updated_queued_count} queued case(s) updated. {skipped_active_count} case(s) skipped (already active/queued).",
         submitted_cases=newly_submitted_count,
         deleted_and_resubmitted_cases=deleted_and_resubmitted_count,
         already_queued_or_processing=skipped_active_count,
-        current_queue_size=request.app.state.case_processing_queue.qsize()
+        updated_queued_cases=updated_queued_count,
+        current_queue_size=await request.app.state.case_processing_queue.qsize()
     )
 
 
-def _get_case_status_or_data_internal(
+async def _get_case_status_or_data_internal(
     case_number_for_db_id: str,
     db: Session,
-    request: Request 
+    request: Request,
+    settings: AppSettings,
+    queue_positions: Optional[Dict[str, int]] = None,
+    pool_snapshot: Optional[WorkerPoolSnapshot] = None
 ) -> api_models.CaseStatusResponseItem:  
+    """
+    `queue_positions` and `pool_snapshot` are precomputed for a whole batch (see get_batch_case_statuses);
+    without them they are looked up for this case.
+    """
     from app.db import crud  
     db_case = crud.get_case_by_case_number(db, case_number_for_db_id)
 
     if db_case:
         if db_case.status == db_models.CaseStatusEnum.QUEUED:
-             # Get case numbers currently in queue by fetching case IDs and querying the database
-             queue_case_ids = [item[0] for item in list(request.app.state.case_processing_queue._queue)]
-             current_queue_case_numbers = []
-             if queue_case_ids:
-                
-                queue_cases = crud.get_cases_by_ids(db, queue_case_ids)
-                current_queue_case_numbers = [case.case_number for case in queue_cases]
-             if case_number_for_db_id in current_queue_case_numbers:
-                 return api_models.CaseStatusResponseItem(case_number_for_db_id=case_number_for_db_id, status="Queued", message="Case is in the processing queue.")
+             if queue_positions is not None:
+                 queue_position = queue_positions.get(case_number_for_db_id)
+             else:
+                 queue_position = await request.app.state.case_processing_queue.queue_position(case_number_for_db_id)
+             if queue_position is not None:
+                 if pool_snapshot is None:
+                     pool_snapshot = worker_pool_snapshot(request.app, settings)
+                 eta_seconds = estimate_completion_seconds(pool_snapshot, queue_position) if pool_snapshot else None
+                 return api_models.CaseStatusResponseItem(case_number_for_db_id=case_number_for_db_id, status="Queued", message="Case is in the processing queue.",
+                                                          queue_position=queue_position, eta_seconds=eta_seconds)
         
         if db_case.status == db_models.CaseStatusEnum.PROCESSING:
             if case_number_for_db_id in request.app.state.actively_processing_cases:
@@ -186,14 +210,7 @@ def _get_case_status_or_data_internal(
         )
     else:
         # Check queue/active even if not in DB (e.g. race condition on submit)
-        # Get case numbers currently in queue by fetching case IDs and querying the database
-        queue_case_ids = [item[0] for item in list(request.app.state.case_processing_queue._queue)]
-        current_queue_case_numbers = []
-        if queue_case_ids:
-            from app.db import crud
-            queue_cases = crud.get_cases_by_ids(db, queue_case_ids)
-            current_queue_case_numbers = [case.case_number for case in queue_cases]
-        if case_number_for_db_id in current_queue_case_numbers:
+        if await request.app.state.case_processing_queue.is_pending(case_number_for_db_id):
             return api_models.CaseStatusResponseItem(case_number_for_db_id=case_number_for_db_id, status="Queued", message="Case is in processing queue (DB entry may be pending full processing).")
         if case_number_for_db_id in request.app.state.actively_processing_cases:
             return api_models.CaseStatusResponseItem(case_number_for_db_id=case_number_for_db_id, status="Processing", message="Case is actively processing (DB entry may be pending full processing).")
@@ -206,16 +223,22 @@ async def get_batch_case_statuses(
     payload: api_models.BatchCaseRequest,
     request: Request, 
     db: Session = Depends(get_db),
-    api_key: str = Depends(get_read_api_key)
+    api_key: str = Depends(get_read_api_key),
+    settings: AppSettings = Depends(get_current_settings)
 ):
     response_results: Dict[str, Optional[api_models.CaseStatusResponseItem]] = {}
     response_errors: Dict[str, str] = {}
+    # One query for every queued case's position instead of one per case
+    queue_positions = await request.app.state.case_processing_queue.queue_positions(
+        [case_num.strip() for case_num in payload.case_numbers_for_db_id if case_num.strip()]
+    )
+    pool_snapshot = worker_pool_snapshot(request.app, settings) if queue_positions else None
 
     for case_num_raw in payload.case_numbers_for_db_id:
         case_num = case_num_raw.strip()
         if not case_num: continue
         try:
-            status_item = _get_case_status_or_data_internal(case_num, db, request)
+            status_item = await _get_case_status_or_data_internal(case_num, db, request, settings, queue_positions, pool_snapshot)
             response_results[case_num] = status_item
         except HTTPException as e:
             response_errors[case_num] = str(e.detail)
@@ -271,6 +294,7 @@ async def get_case_status_and_data(
     case_number_for_db_id: str,
     request: Request,
     db: Session = Depends(get_db),
-    api_key: str = Depends(get_read_api_key)
+    api_key: str = Depends(get_read_api_key),
+    settings: AppSettings = Depends(get_current_settings)
 ):
-    return _get_case_status_or_data_internal(case_number_for_db_id, db, request)
\ No newline at end of file
+    return await _get_case_status_or_data_internal(case_number_for_db_id, db, request, settings)
\ No newline at end of file
@@ -9,6 +9,9 @@ router = APIRouter()
 async def health_check(request: Request):
     service_is_ready = getattr(request.app.state, "service_ready", False)
     playwright_ok = hasattr(request.app.state, 'playwright_instance') and request.app.state.playwright_instance is not None
+    supervisor = getattr(request.app.state, 'worker_process_supervisor', None)
+    if supervisor is not None: # Multi-process mode: Playwright lives in the worker processes
+        playwright_ok = supervisor.alive_count() > 0
     
     if service_is_ready and playwright_ok:
         return {"status": "healthy", "message": "Service is ready, Unicourt session active, and Playwright is initialized."}
@@ -5,10 +5,14 @@ import asyncio
 import logging
 from typing import Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
 from app.core.config import AppSettings
-from app.api.deps import get_write_api_key, get_current_settings
+from app.api.deps import get_db, get_write_api_key, get_current_settings
+from app.db import crud
 from app.models_api import service as api_models
 from app.services.config_manager import ConfigManager
+from app.workers.runtime import collect_worker_metrics, worker_pool_snapshot
+from app.workers.worker_process import combine_reported_pools, read_worker_process_reports
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -19,11 +23,40 @@ config_manager_instance = ConfigManager() # Create an instance
 async def get_service_status_info(
     request: Request,
     settings: AppSettings = Depends(get_current_settings),
+    db: Session = Depends(get_db),
     api_key: str = Depends(get_write_api_key) 
 ):
-    num_actively_processing_from_set = len(request.app.state.actively_processing_cases) if hasattr(request.app.state, 'actively_processing_cases') else 0
-    active_processing_counter = request.app.state.active_processing_count if hasattr(request.app.state, 'active_processing_count') else 0
-    queue_size = request.app.state.case_processing_queue.qsize() if hasattr(request.app.state, 'case_processing_queue') else 0
+    queue_size = await request.app.state.case_processing_queue.qsize() if hasattr(request.app.state, 'case_processing_queue') else 0
+    worker_process_supervisor = getattr(request.app.state, 'worker_process_supervisor', None)
+    llm_extraction_cache = getattr(request.app.state, 'llm_extraction_cache', None)
+
+    if settings.WORKER_PROCESSES > 0:
+        # The workers live in other processes: use what they last reported, summed or keyed by process
+        reports = read_worker_process_reports(settings)
+        per_process = {f"worker-process-{report.process_index}": report.metrics for report in reports}
+        worker_metrics: Dict[str, Any] = {
+            key: sum(metrics.get(key, 0) for metrics in per_process.values())
+            for key in ("active_processing_tasks_count", "distinct_cases_actively_processing_count", "llm_stage_queue_size")
+        }
+        browser_pool: Dict[str, int] = {}
+        for metrics in per_process.values():
+            for stat, value in metrics.get("browser_pool", {}).items():
+                browser_pool[stat] = browser_pool.get(stat, 0) + value
+        worker_metrics["browser_pool"] = browser_pool
+        for key in ("llm_rate_limiter", "document_downloads", "resource_blocking", "page_waits"):
+            worker_metrics[key] = {process: metrics.get(key, {}) for process, metrics in per_process.items()}
+        worker_processes_reporting = len(reports)
+        pool_snapshot = combine_reported_pools(reports)
+    else:
+        worker_metrics = collect_worker_metrics(request.app)
+        worker_processes_reporting = 0
+        pool_snapshot = worker_pool_snapshot(request.app, settings)
+    
+    try:
+        llm_usage = await asyncio.to_thread(crud.get_llm_usage_totals, db) # Aggregate over every case; keep it off the event loop
+    except Exception as e:
+        logger.warning(f"Could not aggregate LLM usage: {e}")
+        llm_usage = {}
     
     session_file_path = settings.UNICOURT_SESSION_PATH
     unicourt_session_ok = os.path.exists(session_file_path)
@@ -32,10 +65,23 @@ async def get_service_status_info(
         service_ready=getattr(request.app.state, "service_ready", False),
         unicourt_session_file_exists=unicourt_session_ok,
         current_queue_size=queue_size,
-        active_processing_tasks_count=active_processing_counter,
-        distinct_cases_actively_processing_count=num_actively_processing_from_set,
-        max_concurrent_tasks=settings.MAX_CONCURRENT_TASKS,
+        active_processing_tasks_count=worker_metrics["active_processing_tasks_count"],
+        distinct_cases_actively_processing_count=worker_metrics["distinct_cases_actively_processing_count"],
+        max_concurrent_tasks=pool_snapshot.target_workers if pool_snapshot else settings.MAX_CONCURRENT_TASKS,
+        llm_stage_queue_size=worker_metrics["llm_stage_queue_size"],
+        llm_stage_workers=settings.LLM_STAGE_WORKERS,
         playwright_initialized=hasattr(request.app.state, 'playwright_instance') and request.app.state.playwright_instance is not None,
+        browser_pool=worker_metrics["browser_pool"],
+        worker_processes=settings.WORKER_PROCESSES,
+        worker_processes_alive=worker_process_supervisor.alive_count() if worker_process_supervisor else 0,
+        worker_processes_reporting=worker_processes_reporting,
+        leased_queue_items=await request.app.state.case_processing_queue.leased_count() if hasattr(request.app.state, 'case_processing_queue') else 0,
+        llm_rate_limiter=worker_metrics["llm_rate_limiter"],
+        document_downloads=worker_metrics["document_downloads"],
+        resource_blocking=worker_metrics["resource_blocking"],
+        page_waits=worker_metrics["page_waits"],
+        llm_cache=llm_extraction_cache.stats() if llm_extraction_cache else {},
+        llm_usage=llm_usage,
         current_download_location=settings.CURRENT_DOWNLOAD_LOCATION,
         extract_associated_party_addresses_enabled=settings.EXTRACT_ASSOCIATED_PARTY_ADDRESSES
     )
@@ -76,6 +122,56 @@ async def update_client_configuration(
         logger.error(f"Failed to update client configuration: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not update client configuration: {e}")
 
+def _get_worker_pool_snapshot(request: Request, settings: AppSettings):
+    snapshot = worker_pool_snapshot(request.app, settings)
+    if snapshot is None:
+        detail = "No worker process has reported its worker pool yet." if settings.WORKER_PROCESSES > 0 else "Worker pool is not running."
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
+    return snapshot
+
+@router.get("/worker-pool", response_model=api_models.WorkerPoolStatusResponse)
+async def get_worker_pool_status(
+    request: Request,
+    settings: AppSettings = Depends(get_current_settings),
+    api_key: str = Depends(get_write_api_key)
+):
+    """In multi-process mode: worker counts summed over the worker processes, min/max per process."""
+    return api_models.WorkerPoolStatusResponse(**_get_worker_pool_snapshot(request, settings).model_dump())
+
+@router.put("/worker-pool", response_model=api_models.WorkerPoolStatusResponse)
+async def update_worker_pool_limits(
+    request: Request,
+    update_payload: api_models.WorkerPoolLimitsUpdateRequest,
+    settings: AppSettings = Depends(get_current_settings),
+    db: Session = Depends(get_db),
+    api_key: str = Depends(get_write_api_key)
+):
+    logger.info(f"Received request to update worker pool limits: {update_payload.model_dump(exclude_unset=True)}")
+    controller = getattr(request.app.state, "worker_pool_controller", None)
+    if controller is not None:
+        try:
+            await controller.set_limits(min_workers=update_payload.min_workers, max_workers=update_payload.max_workers)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return api_models.WorkerPoolStatusResponse(**controller.snapshot().model_dump())
+    if settings.WORKER_PROCESSES == 0:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Worker pool is not running.")
+
+    # Multi-process mode: store the limits; every worker process applies them with its next heartbeat
+    current_min, current_max = crud.get_worker_pool_limits_override(db) or (settings.WORKER_POOL_MIN, settings.WORKER_POOL_MAX)
+    new_min = current_min if update_payload.min_workers is None else update_payload.min_workers
+    new_max = current_max if update_payload.max_workers is None else update_payload.max_workers
+    if new_min > new_max:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid worker pool limits: min={new_min}, max={new_max}")
+    crud.set_worker_pool_limits_override(db, new_min, new_max)
+    pending_note = f"limits set to [{new_min}, {new_max}] per process; applied within {settings.WORKER_PROCESS_HEARTBEAT_SECONDS:g}s"
+    snapshot = worker_pool_snapshot(request.app, settings)
+    if snapshot is None:
+        return api_models.WorkerPoolStatusResponse(min_workers=new_min, max_workers=new_max, target_workers=0, running_workers=0,
+                                                   draining_workers=0, processes=0, last_decision=pending_note)
+    return api_models.WorkerPoolStatusResponse(**snapshot.model_copy(
+        update={"min_workers": new_min, "max_workers": new_max, "last_decision": pending_note}).model_dump())
+
 @router.post("/request-restart", status_code=status.HTTP_202_ACCEPTED)
 async def request_server_restart(
     request: Request, 
@@ -87,11 +183,13 @@ async def request_server_restart(
         logger.error("Server state not fully initialized. Cannot process restart request safely.")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Server state error, cannot restart.")
 
-    queue_size = request.app.state.case_processing_queue.qsize()
-    active_tasks = request.app.state.active_processing_count
+    queue_size = await request.app.state.case_processing_queue.qsize()
+    # Leased queue items also cover cases running in worker processes, which this process doesn't count
+    active_tasks = max(request.app.state.active_processing_count, await request.app.state.case_processing_queue.leased_count())
 
-    if queue_size == 0 and active_tasks == 0:
-        logger.info("Queue is empty and no active tasks. Proceeding with graceful shutdown signal.")
+    # Queued cases are persisted and picked up again after the restart; only in-flight work blocks it.
+    if active_tasks == 0:
+        logger.info(f"No active tasks ({queue_size} case(s) queued, kept across restart). Proceeding with graceful shutdown signal.")
         request.app.state.shutting_down = True 
         async def delayed_shutdown():
             await asyncio.sleep(0.5)
@@ -104,5 +202,5 @@ async def request_server_restart(
         logger.warning(f"Cannot restart now. Queue size: {queue_size}, Active tasks: {active_tasks}.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail=f"Cannot restart: {queue_size} case(s) in queue, {active_tasks} task(s) actively processing."
+            detail=f"Cannot restart: {active_tasks} task(s) actively processing ({queue_size} case(s) queued)."
         )
\ No newline at end of file
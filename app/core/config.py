@@ -110,6 +110,15 @@ class AppSettings(BaseModel):
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
     
     MAX_CONCURRENT_TASKS: int = Field(int(os.getenv("MAX_CONCURRENT_TASKS", "2")), gt=0)
+    # Adaptive browser worker pool: starts at MAX_CONCURRENT_TASKS and is resized within [WORKER_POOL_MIN, WORKER_POOL_MAX]
+    # from browser-stage latency, Unicourt error rate and available host memory. Limits can be changed at runtime via the API.
+    WORKER_POOL_MIN: int = Field(int(os.getenv("WORKER_POOL_MIN", "1")), ge=0)
+    WORKER_POOL_MAX: int = Field(int(os.getenv("WORKER_POOL_MAX", "8")), gt=0)
+    WORKER_POOL_ADJUST_INTERVAL_SECONDS: int = Field(int(os.getenv("WORKER_POOL_ADJUST_INTERVAL_SECONDS", "30")), gt=0)
+    WORKER_POOL_MAX_ERROR_RATE: float = Field(float(os.getenv("WORKER_POOL_MAX_ERROR_RATE", "0.2")), ge=0, le=1)
+    WORKER_POOL_MIN_AVAILABLE_MEMORY_MB: int = Field(int(os.getenv("WORKER_POOL_MIN_AVAILABLE_MEMORY_MB", "1024")), ge=0)
+    # Chromium processes shared by all workers; each worker gets its own isolated context on one of them
+    BROWSER_POOL_SIZE: int = Field(int(os.getenv("BROWSER_POOL_SIZE", "1")), gt=0)
     CURRENT_DOWNLOAD_LOCATION: str = os.getenv("CURRENT_DOWNLOAD_LOCATION", "unicourt_downloads") 
 
     INITIAL_URL: str = "https://app.unicourt.com/dashboard"
@@ -124,6 +133,31 @@ class AppSettings(BaseModel):
     SHORT_TIMEOUT_SECONDS: int = Field(int(os.getenv("SHORT_TIMEOUT_SECONDS", "20")), gt=0)
     VERY_LONG_TIMEOUT_SECONDS: int = Field(int(os.getenv("VERY_LONG_TIMEOUT_SECONDS", "300")), gt=0)
 
+    # Open previously located cases straight from the stored detail-page URL (case_url_index) instead of searching
+    CASE_URL_FAST_PATH_ENABLED: bool = Field(os.getenv("CASE_URL_FAST_PATH_ENABLED", "true").lower() in ("true", "1", "yes"))
+    # Fetch CrowdSourced documents with one request through the logged-in context; the viewer tab is only a fallback
+    DIRECT_DOCUMENT_FETCH_ENABLED: bool = Field(os.getenv("DIRECT_DOCUMENT_FETCH_ENABLED", "true").lower() in ("true", "1", "yes"))
+    # Page waits target the DOM signal each step needs; after WAIT_MIN_SAMPLES observations a step's timeout shrinks
+    # to the observed WAIT_TIMEOUT_PERCENTILE times WAIT_TIMEOUT_HEADROOM (the configured timeouts stay the ceiling)
+    WAIT_ADAPTIVE_TIMEOUTS_ENABLED: bool = Field(os.getenv("WAIT_ADAPTIVE_TIMEOUTS_ENABLED", "true").lower() in ("true", "1", "yes"))
+    WAIT_TIMEOUT_PERCENTILE: float = Field(float(os.getenv("WAIT_TIMEOUT_PERCENTILE", "0.95")), gt=0, le=1)
+    WAIT_TIMEOUT_HEADROOM: float = Field(float(os.getenv("WAIT_TIMEOUT_HEADROOM", "1.5")), ge=1)
+    WAIT_MIN_SAMPLES: int = Field(int(os.getenv("WAIT_MIN_SAMPLES", "10")), gt=0)
+    # Worker contexts abort requests for these resource types and for URLs containing any of these patterns (trackers,
+    # analytics). Document file URLs are never blocked. Note that routing turns off Chromium's HTTP cache for the context.
+    BLOCK_NON_ESSENTIAL_RESOURCES: bool = Field(os.getenv("BLOCK_NON_ESSENTIAL_RESOURCES", "true").lower() in ("true", "1", "yes"))
+    BLOCKED_RESOURCE_TYPES: List[str] = Field([t.strip().lower() for t in os.getenv("BLOCKED_RESOURCE_TYPES", "image,font,media").split(",") if t.strip()])
+    BLOCKED_URL_PATTERNS: List[str] = Field([p.strip().lower() for p in os.getenv(
+        "BLOCKED_URL_PATTERNS",
+        "google-analytics.com,googletagmanager.com,doubleclick.net,facebook.net,hotjar.com,segment.io,segment.com,"
+        "mixpanel.com,fullstory.com,intercom.io,intercomcdn.com,clarity.ms,nr-data.net,newrelic.com,hubspot.com,"
+        "hs-analytics.net,sentry.io,linkedin.com/px,bat.bing.com"
+    ).split(",") if p.strip()])
+    # Parallel CrowdSourced downloads per case, under a process-wide per-host limit (concurrency and spacing of starts)
+    DOCUMENT_DOWNLOAD_CONCURRENCY: int = Field(int(os.getenv("DOCUMENT_DOWNLOAD_CONCURRENCY", "4")), gt=0)
+    DOCUMENT_DOWNLOAD_HOST_CONCURRENCY: int = Field(int(os.getenv("DOCUMENT_DOWNLOAD_HOST_CONCURRENCY", "6")), gt=0)
+    DOCUMENT_DOWNLOAD_HOST_MIN_INTERVAL_SECONDS: float = Field(float(os.getenv("DOCUMENT_DOWNLOAD_HOST_MIN_INTERVAL_SECONDS", "0.3")), ge=0)
+
     EXTRACT_ASSOCIATED_PARTY_ADDRESSES: bool = Field(bool(os.getenv("EXTRACT_ASSOCIATED_PARTY_ADDRESSES", True)))
 
     DOC_KEYWORDS_FJ: List[str] = ["FINAL", "JUDGMENT"] 
@@ -132,6 +166,71 @@ class AppSettings(BaseModel):
 
     MAX_IMAGES_PER_LLM_CALL: int = Field(int(os.getenv("MAX_IMAGES_PER_LLM_CALL", "5")), gt=0)
     MAX_LLM_ATTEMPTS_PER_BATCH: int = Field(int(os.getenv("MAX_LLM_ATTEMPTS_PER_BATCH", "2")), gt=0)
+    # Batches of one document sent to the LLM at the same time (1 = one after another). Results are still merged in page order
+    LLM_BATCH_CONCURRENCY: int = Field(int(os.getenv("LLM_BATCH_CONCURRENCY", "3")), gt=0)
+    # Born-digital PDFs: pages whose text layer has at least TEXT_LAYER_MIN_CHARS_PER_PAGE visible characters are sent
+    # to the LLM as text instead of images (0 = always send images). Text pages are packed up to TEXT_LAYER_MAX_CHARS_PER_CALL per call
+    TEXT_LAYER_MIN_CHARS_PER_PAGE: int = Field(int(os.getenv("TEXT_LAYER_MIN_CHARS_PER_PAGE", "200")), ge=0)
+    TEXT_LAYER_MAX_CHARS_PER_CALL: int = Field(int(os.getenv("TEXT_LAYER_MAX_CHARS_PER_CALL", "60000")), gt=0)
+    # Send the small documents of one case (together within MAX_IMAGES_PER_LLM_CALL pages) in a single LLM call.
+    # The model attributes each answer to a document; if it can't, the documents are processed one by one
+    LLM_CROSS_DOCUMENT_BATCHING_ENABLED: bool = Field(os.getenv("LLM_CROSS_DOCUMENT_BATCHING_ENABLED", "true").lower() in ("true", "1", "yes"))
+    # Score pages from their text layer (field keywords, party names, addresses) and send the most relevant first,
+    # so the early stop after all fields are found skips exhibits. Scanned pages without text keep document order
+    LLM_PAGE_RANKING_ENABLED: bool = Field(os.getenv("LLM_PAGE_RANKING_ENABLED", "true").lower() in ("true", "1", "yes"))
+    # Chat-completions endpoint; point it at a local stand-in (python -m app.tools.mock_openrouter) to run offline
+    OPENROUTER_API_URL: str = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+    # Process-wide OpenRouter budget shared by all LLM calls (0 = no limit); split evenly across WORKER_PROCESSES.
+    # Input tokens are estimated (~4 chars per token, LLM_ESTIMATED_TOKENS_PER_IMAGE per page image).
+    # Failed calls are retried after a jittered exponential backoff (base/max seconds); 429 Retry-After pauses every caller
+    LLM_REQUESTS_PER_MINUTE: int = Field(int(os.getenv("LLM_REQUESTS_PER_MINUTE", "120")), ge=0)
+    LLM_INPUT_TOKENS_PER_MINUTE: int = Field(int(os.getenv("LLM_INPUT_TOKENS_PER_MINUTE", "400000")), ge=0)
+    LLM_ESTIMATED_TOKENS_PER_IMAGE: int = Field(int(os.getenv("LLM_ESTIMATED_TOKENS_PER_IMAGE", "1500")), ge=0)
+    LLM_RETRY_BASE_SECONDS: float = Field(float(os.getenv("LLM_RETRY_BASE_SECONDS", "2")), gt=0)
+    LLM_RETRY_MAX_SECONDS: float = Field(float(os.getenv("LLM_RETRY_MAX_SECONDS", "60")), gt=0)
+    # Shared keep-alive HTTP client for OpenRouter (one per process). HTTP/2 needs the h2 package (httpx[http2]);
+    # without it the client falls back to HTTP/1.1 with pooled keep-alive connections
+    LLM_HTTP2_ENABLED: bool = Field(os.getenv("LLM_HTTP2_ENABLED", "true").lower() in ("true", "1", "yes"))
+    LLM_HTTP_MAX_CONNECTIONS: int = Field(int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20")), gt=0)
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(int(os.getenv("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "10")), ge=0)
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = Field(float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS", "60")), gt=0)
+    # Persistent cache of LLM answers keyed by document content, model, prompt and encoding (llm_extraction_cache table).
+    # Entries expire after LLM_CACHE_TTL_HOURS; beyond LLM_CACHE_MAX_ENTRIES the least recently used are evicted
+    LLM_CACHE_ENABLED: bool = Field(os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("true", "1", "yes"))
+    LLM_CACHE_TTL_HOURS: float = Field(float(os.getenv("LLM_CACHE_TTL_HOURS", "720")), gt=0)
+    LLM_CACHE_MAX_ENTRIES: int = Field(int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000")), gt=0)
+    # How pages are rendered/encoded for the LLM (see IMAGE_ENCODING_PROFILES in app/services/image_encoding.py).
+    # The per-document-type settings override the default when set; compare profiles with app/tools/benchmark_image_profiles.py
+    IMAGE_ENCODING_PROFILE: str = os.getenv("IMAGE_ENCODING_PROFILE", "legacy")
+    IMAGE_ENCODING_PROFILE_FJ: str = os.getenv("IMAGE_ENCODING_PROFILE_FJ", "")
+    IMAGE_ENCODING_PROFILE_COMPLAINT: str = os.getenv("IMAGE_ENCODING_PROFILE_COMPLAINT", "")
+
+    # Persistent work queue: how long a worker's claim on a case lasts before another worker may reclaim it.
+    # Workers renew the lease while they are processing, so this only bounds recovery time after a crash.
+    QUEUE_LEASE_SECONDS: int = Field(int(os.getenv("QUEUE_LEASE_SECONDS", "900")), gt=0)
+    # Scheduling: higher priority first, +1 effective priority level per QUEUE_PRIORITY_AGING_MINUTES waited,
+    # and cases within QUEUE_DEADLINE_URGENT_MINUTES of their deadline ahead of everything else
+    QUEUE_PRIORITY_AGING_MINUTES: float = Field(float(os.getenv("QUEUE_PRIORITY_AGING_MINUTES", "60")), gt=0)
+    QUEUE_DEADLINE_URGENT_MINUTES: float = Field(float(os.getenv("QUEUE_DEADLINE_URGENT_MINUTES", "120")), ge=0)
+    # Idle workers are woken by submissions/acks; this is only the fallback re-check interval (e.g. for expired leases)
+    QUEUE_POLL_INTERVAL_SECONDS: float = Field(float(os.getenv("QUEUE_POLL_INTERVAL_SECONDS", "30")), gt=0)
+
+    # Multi-process mode: with WORKER_PROCESSES > 0 the API process only admits jobs and answers status queries,
+    # and that many worker processes (each with its own event loop, Playwright and worker pool) take cases from the DB queue.
+    # Submissions can't wake workers in other processes, so they re-check the queue every WORKER_PROCESS_QUEUE_POLL_SECONDS.
+    WORKER_PROCESSES: int = Field(int(os.getenv("WORKER_PROCESSES", "0")), ge=0)
+    WORKER_PROCESS_QUEUE_POLL_SECONDS: float = Field(float(os.getenv("WORKER_PROCESS_QUEUE_POLL_SECONDS", "1")), gt=0)
+    # Worker processes report their pool and metrics (for /service/status, /service/worker-pool and queue ETAs) and pick up
+    # pool limits set through the API this often; a process silent for three intervals is left out of the status.
+    WORKER_PROCESS_HEARTBEAT_SECONDS: float = Field(float(os.getenv("WORKER_PROCESS_HEARTBEAT_SECONDS", "5")), gt=0)
+    SQLITE_BUSY_TIMEOUT_SECONDS: float = Field(float(os.getenv("SQLITE_BUSY_TIMEOUT_SECONDS", "30")), gt=0)
+
+    # Pipelined processing: browser workers (MAX_CONCURRENT_TASKS) hand cases to a separate pool of LLM workers.
+    # The hand-off queue is bounded so browser workers pause instead of piling up downloaded cases.
+    LLM_STAGE_WORKERS: int = Field(int(os.getenv("LLM_STAGE_WORKERS", "4")), gt=0)
+    LLM_STAGE_QUEUE_MAXSIZE: int = Field(int(os.getenv("LLM_STAGE_QUEUE_MAXSIZE", "8")), gt=0)
+    # Processes that rasterize PDF/TIFF documents for the LLM stage, off the event loop (0 = use a thread instead)
+    RASTER_POOL_SIZE: int = Field(int(os.getenv("RASTER_POOL_SIZE", "2")), ge=0)
 
 
 
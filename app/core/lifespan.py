@@ -6,6 +6,8 @@ from contextlib import asynccontextmanager
 from playwright.async_api import async_playwright
 from app.core.config import get_app_settings
 from app.services.unicourt_handler import UnicourtHandler
+from app.services.browser_manager import BrowserManager
+from app.db.init_db import init_db
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +48,20 @@ async def lifespan_manager(app):
         except Exception as e:
             logger.warning(f"Could not create debug screenshots directory {debug_screenshots_dir}: {e}. Screenshots may fail.")
 
+    # Database must exist before the persistent queue can be recovered
+    init_db()
+
+    # Recover work from the persistent queue: no worker is running yet, so every lease
+    # left in the table belongs to a previous process and can be handed out again.
+    try:
+        reclaimed_leases, requeued_cases = await app.state.case_processing_queue.reclaim_on_startup()
+        logger.info(f"Persistent queue recovered: {reclaimed_leases} lease(s) reclaimed, {requeued_cases} orphaned case(s) re-queued. "
+                    f"{await app.state.case_processing_queue.qsize()} case(s) pending.")
+    except Exception as e:
+        logger.critical(f"CRITICAL: Could not recover persistent case queue: {e}", exc_info=True)
+        app.state.service_ready = False
+        yield
+        return
 
     # Check essential configurations
     if not all([app_settings.UNICOURT_EMAIL, app_settings.UNICOURT_PASSWORD, app_settings.API_ACCESS_KEY]) or \
@@ -57,34 +73,72 @@ async def lifespan_manager(app):
         logger.info("--- FastAPI App Shut Down (Lifespan - startup failed due to missing creds) ---")
         return
 
-    logger.info("--- Initializing Playwright (Lifespan) ---")
+    if app_settings.WORKER_PROCESSES > 0:
+        # Worker processes run their own Playwright; this process only admits jobs and answers queries
+        logger.info(f"--- Worker process mode: {app_settings.WORKER_PROCESSES} worker process(es) will run the browsers (Lifespan) ---")
+        app.state.service_ready = True
+    else:
+        app.state.service_ready = await start_browser_runtime(app, app_settings)
+    
+    app.state.settings = app_settings
+
+    yield # Application is running
+
+    logger.info("--- FastAPI App Shutting Down (Lifespan Manager) ---")
+    supervisor = getattr(app.state, "worker_process_supervisor", None)
+    if supervisor:
+        await supervisor.stop()
+    await stop_worker_runtime(app, app_settings)
+    logger.info("--- FastAPI App Shutdown Complete (Lifespan Manager) ---")
+
+
+async def start_browser_runtime(app, app_settings) -> bool:
+    """
+    Starts Playwright and the shared browser pool and makes sure a Unicourt session exists.
+    Used by the API process (in-process workers) and by every worker process. Returns whether workers can start.
+    """
+    logger.info("--- Initializing Playwright ---")
     try:
         app.state.playwright_instance = await async_playwright().start()
-        logger.info("--- Playwright Initialized (Lifespan) ---")
+        logger.info("--- Playwright Initialized ---")
     except Exception as e:
         logger.critical(f"CRITICAL STARTUP FAILURE: Could not initialize Playwright: {e}")
-        app.state.service_ready = False
-        yield
-        logger.info("--- FastAPI App Shut Down (Lifespan - playwright init failed) ---")
-        return
+        return False
 
-    logger.info("--- Ensuring Unicourt Authenticated Session (Lifespan) ---")
-    unicourt_handler = UnicourtHandler(app.state.playwright_instance, app_settings, dashboard_page_for_worker=None) 
+    # One shared browser (or a small pool); workers each get an isolated context on it
+    try:
+        app.state.browser_manager = BrowserManager(app.state.playwright_instance, pool_size=app_settings.BROWSER_POOL_SIZE)
+        await app.state.browser_manager.start()
+    except Exception as e:
+        logger.critical(f"CRITICAL STARTUP FAILURE: Could not launch browser pool: {e}")
+        app.state.browser_manager = None
+        return False
+
+    logger.info("--- Ensuring Unicourt Authenticated Session ---")
+    unicourt_handler = UnicourtHandler(app.state.playwright_instance, app_settings, dashboard_page_for_worker=None,
+                                       browser_manager=app.state.browser_manager) 
     login_success = await unicourt_handler.ensure_authenticated_session()
     
     if not login_success:
         logger.critical("CRITICAL STARTUP FAILURE: Could not establish Unicourt authenticated session.")
-        app.state.service_ready = False
-    else:
-        logger.info("--- Unicourt Session Ready (Lifespan) ---")
-        app.state.service_ready = True
-    
-    app.state.settings = app_settings
+        return False
+    logger.info("--- Unicourt Session Ready ---")
+    return True
 
-    yield # Application is running
 
-    logger.info("--- FastAPI App Shutting Down (Lifespan Manager) ---")
+async def stop_worker_runtime(app, app_settings) -> None:
+    """Stops workers, the browser pool and Playwright. Safe to call when any of them never started."""
     app.state.shutting_down = True
+    # Wake every worker blocked on the queue so it sees the shutdown right away
+    if getattr(app.state, "case_processing_queue", None):
+        app.state.case_processing_queue.close()
+    if getattr(app.state, "llm_stage_stop_event", None):
+        app.state.llm_stage_stop_event.set()
+
+    # Browser workers are owned by the pool controller and come and go at runtime; shut them down together with the rest
+    pool_controller = getattr(app.state, "worker_pool_controller", None)
+    if pool_controller:
+        app.state.background_worker_tasks.extend(pool_controller.tasks())
 
     if hasattr(app.state, "background_worker_tasks") and app.state.background_worker_tasks:
         logger.info("Cancelling background workers...")
@@ -103,13 +157,43 @@ async def lifespan_manager(app):
         except Exception as e:
             logger.error(f"Error during background worker shutdown: {e}")
 
-    if app.state.playwright_instance:
-        logger.info("Stopping Playwright (Lifespan)...")
+    # Cases this process leased (in a browser worker or waiting in llm_stage_queue) go back to the queue now,
+    # instead of staying blocked for QUEUE_LEASE_SECONDS. Only a process that ran workers holds leases, and
+    # a worker that is still running after the timeout keeps its lease.
+    workers_stopped = all(task.done() for task in getattr(app.state, "background_worker_tasks", []))
+    if pool_controller and workers_stopped and getattr(app.state, "case_processing_queue", None):
+        try:
+            released = await app.state.case_processing_queue.release_leases_held_by(app.state.worker_name_prefix)
+            if released:
+                logger.info(f"Released {released} leased case(s) back to the queue.")
+        except Exception as e:
+            logger.error(f"Error releasing leased cases: {e}")
+
+    # After the workers: an LLM call still in flight would fail on a closed client
+    if getattr(app.state, "llm_http_client", None):
+        try:
+            await app.state.llm_http_client.aclose()
+        except Exception as e:
+            logger.error(f"Error closing LLM HTTP client: {e}")
+        app.state.llm_http_client = None
+
+    if getattr(app.state, "raster_pool", None):
+        app.state.raster_pool.shutdown()
+        app.state.raster_pool = None
+
+    if getattr(app.state, "browser_manager", None):
+        logger.info("Closing browser pool...")
+        try:
+            await app.state.browser_manager.close()
+        except Exception as e:
+            logger.error(f"Error closing browser pool: {e}")
+        app.state.browser_manager = None
+
+    if getattr(app.state, "playwright_instance", None):
+        logger.info("Stopping Playwright...")
         try:
             await app.state.playwright_instance.stop()
             app.state.playwright_instance = None
-            logger.info("Playwright stopped (Lifespan).")
+            logger.info("Playwright stopped.")
         except Exception as e:
             logger.error(f"Error stopping Playwright: {e}")
-    
-    logger.info("--- FastAPI App Shutdown Complete (Lifespan Manager) ---")
\ No newline at end of file
@@ -1,12 +1,14 @@
 # app/db/crud.py
 from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_, select, case as sql_case, func
+from sqlalchemy.orm import aliased
 from sqlalchemy.exc import IntegrityError
 from app.db import models as db_models # refers to db_models now
 from app.models_api import cases as api_models # for CaseSubmitDetail type hint
 from app.utils import common # common utilities
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import json # For handling JSON fields
 
 logger = logging.getLogger(__name__)
@@ -27,6 +29,12 @@ def get_cases_by_ids(db: Session, case_ids: List[int]) -> List[db_models.Case]:
         return []
     return db.query(db_models.Case).filter(db_models.Case.id.in_(case_ids)).all()
 
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """DB datetimes are stored as naive UTC; aware inputs are converted, naive ones taken as UTC."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 def create_case(db: Session, case_data: api_models.CaseSubmitDetail) -> db_models.Case:
     db_case = db_models.Case(
         case_number=case_data.case_number_for_db_id.strip(),
@@ -36,6 +44,8 @@ def create_case(db: Session, case_data: api_models.CaseSubmitDetail) -> db_model
         creditor_type=case_data.creditor_type,
         status=db_models.CaseStatusEnum.QUEUED,
         last_submitted_at=datetime.utcnow(),
+        priority=case_data.priority,
+        deadline=_to_naive_utc(case_data.deadline),
         processed_documents_summary=[] # Initialize as empty list
     )
     db.add(db_case)
@@ -155,4 +165,401 @@ def delete_case_by_id(db: Session, case_id: int) -> bool:
         db.delete(db_case)
         db.commit()
         return True
-    return False
\ No newline at end of file
+    return False
+
+
+# --- Persistent Work Queue (case_queue table) ---
+
+def enqueue_case(
+    db: Session, case_id: int, case_number: str, priority: int = 0, deadline: Optional[datetime] = None
+) -> db_models.CaseQueueItem:
+    """
+    Adds a case to the queue, coalescing per case_number: if the case is already waiting, the existing
+    entry is reused (pointed at the newest case_id, keeping the higher priority and earlier deadline)
+    instead of adding a duplicate. If the case is only leased (being processed), a single pending entry
+    is added; it becomes claimable once that lease ends.
+    """
+    Q = db_models.CaseQueueItem
+    deadline = _to_naive_utc(deadline)
+    pending_item = db.query(Q).filter(
+        Q.case_number == case_number, Q.status == db_models.QueueItemStatusEnum.PENDING
+    ).order_by(Q.id).first()
+    if pending_item:
+        pending_item.case_id = case_id
+        pending_item.priority = max(pending_item.priority or 0, priority)
+        if deadline is not None and (pending_item.deadline is None or deadline < pending_item.deadline):
+            pending_item.deadline = deadline
+        db_case = db.query(db_models.Case).filter(db_models.Case.id == case_id).first()
+        if db_case: # Keep the case record showing the scheduling the queue will actually use
+            db_case.priority = pending_item.priority
+            db_case.deadline = pending_item.deadline
+        db.commit()
+        db.refresh(pending_item)
+        return pending_item
+
+    queue_item = Q(
+        case_id=case_id,
+        case_number=case_number,
+        status=db_models.QueueItemStatusEnum.PENDING,
+        priority=priority,
+        deadline=deadline,
+        enqueued_at=datetime.utcnow()
+    )
+    db.add(queue_item)
+    db.commit()
+    db.refresh(queue_item)
+    return queue_item
+
+def queue_scheduling_order(now: datetime, aging_minutes_per_level: float, deadline_urgent_minutes: float) -> list:
+    """
+    ORDER BY clauses for picking the next queue item:
+    1. Items whose deadline is within `deadline_urgent_minutes` (or already past), earliest deadline first.
+    2. Effective priority, highest first: priority + one level per `aging_minutes_per_level` spent waiting,
+       so a long-waiting low-priority item eventually overtakes fresh high-priority work.
+    3. Submission order.
+    """
+    Q = db_models.CaseQueueItem
+    urgent_cutoff = now + timedelta(minutes=deadline_urgent_minutes)
+    is_urgent = and_(Q.deadline.is_not(None), Q.deadline <= urgent_cutoff)
+    waited_minutes = (func.julianday(now) - func.julianday(Q.enqueued_at)) * 1440.0
+    effective_priority = func.coalesce(Q.priority, 0) + waited_minutes / aging_minutes_per_level
+    return [
+        sql_case((is_urgent, 0), else_=1),
+        sql_case((is_urgent, Q.deadline), else_=None),
+        effective_priority.desc(),
+        Q.id,
+    ]
+
+def _claimable_queue_items_filter(now: datetime):
+    """
+    Rows a worker may lease: pending rows, or rows whose lease has expired, excluding any case_number
+    that currently has a live lease (one lease per case_number, so duplicates never run concurrently).
+    """
+    Q = db_models.CaseQueueItem
+    LiveLease = aliased(db_models.CaseQueueItem)
+    live_leased_case_numbers = select(LiveLease.case_number).where(
+        LiveLease.status == db_models.QueueItemStatusEnum.LEASED, LiveLease.lease_expires_at >= now
+    )
+    return and_(
+        or_(
+            Q.status == db_models.QueueItemStatusEnum.PENDING,
+            and_(Q.status == db_models.QueueItemStatusEnum.LEASED, Q.lease_expires_at < now)
+        ),
+        Q.case_number.not_in(live_leased_case_numbers)
+    )
+
+def lease_next_queue_item(
+    db: Session, lease_owner: str, lease_seconds: int, max_claim_attempts: int = 5,
+    aging_minutes_per_level: float = 60.0, deadline_urgent_minutes: float = 120.0
+) -> Optional[db_models.CaseQueueItem]:
+    """
+    Claims the most urgent claimable item (see _claimable_queue_items_filter and queue_scheduling_order) for lease_owner.
+    The claim is a conditional UPDATE re-checking the same filter, so two workers racing for the same
+    row, or for two rows of the same case_number, cannot both win.
+    """
+    Q = db_models.CaseQueueItem
+    for _ in range(max_claim_attempts):
+        now = datetime.utcnow()
+        claimable = _claimable_queue_items_filter(now)
+        candidate = db.query(Q).filter(claimable).order_by(
+            *queue_scheduling_order(now, aging_minutes_per_level, deadline_urgent_minutes)
+        ).first()
+        if not candidate:
+            return None
+        if candidate.status == db_models.QueueItemStatusEnum.LEASED:
+            logger.warning(f"Queue item {candidate.id} (case {candidate.case_number}) lease held by '{candidate.lease_owner}' expired at {candidate.lease_expires_at}. Reclaiming.")
+
+        updated_rows = db.query(Q).filter(Q.id == candidate.id, claimable).update(
+            {
+                Q.status: db_models.QueueItemStatusEnum.LEASED,
+                Q.lease_owner: lease_owner,
+                Q.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                Q.attempts: Q.attempts + 1,
+            },
+            synchronize_session=False
+        )
+        db.commit()
+        if updated_rows == 1:
+            db.refresh(candidate)
+            return candidate
+        logger.debug(f"Queue item {candidate.id} was claimed by someone else, retrying.")
+    return None
+
+def extend_queue_item_lease(db: Session, item_id: int, lease_owner: str, lease_seconds: int) -> bool:
+    Q = db_models.CaseQueueItem
+    updated_rows = db.query(Q).filter(
+        Q.id == item_id, Q.status == db_models.QueueItemStatusEnum.LEASED, Q.lease_owner == lease_owner
+    ).update({Q.lease_expires_at: datetime.utcnow() + timedelta(seconds=lease_seconds)}, synchronize_session=False)
+    db.commit()
+    return updated_rows == 1
+
+def ack_queue_item(db: Session, item_id: int, lease_owner: str) -> bool:
+    """
+    Removes a finished item from the queue. Only the current lease holder can ack it: once an expired lease
+    has been reclaimed, the old owner's ack must not delete the row the new owner is still working on.
+    """
+    Q = db_models.CaseQueueItem
+    deleted_rows = db.query(Q).filter(
+        Q.id == item_id, Q.status == db_models.QueueItemStatusEnum.LEASED, Q.lease_owner == lease_owner
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted_rows == 1
+
+def release_queue_item(db: Session, item_id: int, lease_owner: str) -> bool:
+    """Returns a leased item to the pending state without counting it as done. Only the current lease holder can release it."""
+    Q = db_models.CaseQueueItem
+    updated_rows = db.query(Q).filter(
+        Q.id == item_id, Q.status == db_models.QueueItemStatusEnum.LEASED, Q.lease_owner == lease_owner
+    ).update(
+        {Q.status: db_models.QueueItemStatusEnum.PENDING, Q.lease_owner: None, Q.lease_expires_at: None},
+        synchronize_session=False
+    )
+    db.commit()
+    return updated_rows == 1
+
+def reclaim_leased_queue_items(db: Session) -> int:
+    """Puts every leased item back to pending. Only safe when no worker is running (i.e. at startup)."""
+    Q = db_models.CaseQueueItem
+    updated_rows = db.query(Q).filter(Q.status == db_models.QueueItemStatusEnum.LEASED).update(
+        {Q.status: db_models.QueueItemStatusEnum.PENDING, Q.lease_owner: None, Q.lease_expires_at: None},
+        synchronize_session=False
+    )
+    db.commit()
+    return updated_rows
+
+def release_queue_items_leased_by(db: Session, lease_owner_prefix: str) -> int:
+    """
+    Puts the items leased by owners starting with lease_owner_prefix (one worker process's workers) back to pending.
+    For a process that is stopping: its cases become claimable right away instead of when their leases expire.
+    """
+    Q = db_models.CaseQueueItem
+    updated_rows = db.query(Q).filter(
+        Q.status == db_models.QueueItemStatusEnum.LEASED, Q.lease_owner.startswith(lease_owner_prefix, autoescape=True)
+    ).update(
+        {Q.status: db_models.QueueItemStatusEnum.PENDING, Q.lease_owner: None, Q.lease_expires_at: None},
+        synchronize_session=False
+    )
+    db.commit()
+    return updated_rows
+
+def requeue_orphaned_cases(db: Session) -> int:
+    """
+    Re-enqueues cases left in Queued/Processing without a queue entry
+    (e.g. submitted before the queue was persistent, or interrupted mid-processing).
+    """
+    queued_case_ids = {row[0] for row in db.query(db_models.CaseQueueItem.case_id).all()}
+    stuck_cases = db.query(db_models.Case).filter(
+        db_models.Case.status.in_([db_models.CaseStatusEnum.QUEUED, db_models.CaseStatusEnum.PROCESSING])
+    ).order_by(db_models.Case.id).all()
+
+    requeued_count = 0
+    for stuck_case in stuck_cases:
+        if stuck_case.status != db_models.CaseStatusEnum.QUEUED:
+            stuck_case.status = db_models.CaseStatusEnum.QUEUED
+        if stuck_case.id not in queued_case_ids:
+            db.add(db_models.CaseQueueItem(
+                case_id=stuck_case.id,
+                case_number=stuck_case.case_number,
+                status=db_models.QueueItemStatusEnum.PENDING,
+                priority=stuck_case.priority or 0,
+                deadline=stuck_case.deadline,
+                enqueued_at=datetime.utcnow()
+            ))
+            requeued_count += 1
+    db.commit()
+    return requeued_count
+
+def get_queue_item_by_case_number(db: Session, case_number: str) -> Optional[db_models.CaseQueueItem]:
+    return db.query(db_models.CaseQueueItem).filter(db_models.CaseQueueItem.case_number == case_number).first()
+
+def get_queued_case_numbers(db: Session, status: Optional[db_models.QueueItemStatusEnum] = None) -> List[str]:
+    """Case numbers with a queue entry, pending or leased (or only those with an entry in `status`)."""
+    query = db.query(db_models.CaseQueueItem.case_number)
+    if status is not None:
+        query = query.filter(db_models.CaseQueueItem.status == status)
+    return [row[0] for row in query.all()]
+
+def get_queue_positions(
+    db: Session, case_numbers: List[str], aging_minutes_per_level: float = 60.0, deadline_urgent_minutes: float = 120.0
+) -> Dict[str, int]:
+    """
+    1-based positions of the given cases' pending items in scheduling order; cases that are not waiting are left out.
+    The numbering is done by SQLite (ROW_NUMBER over the scheduling order), so only the requested rows come back.
+    """
+    if not case_numbers:
+        return {}
+    Q = db_models.CaseQueueItem
+    ranked = db.query(
+        Q.case_number.label("case_number"),
+        func.row_number().over(
+            order_by=queue_scheduling_order(datetime.utcnow(), aging_minutes_per_level, deadline_urgent_minutes)
+        ).label("position")
+    ).filter(Q.status == db_models.QueueItemStatusEnum.PENDING).subquery()
+    rows = db.query(ranked.c.case_number, ranked.c.position).filter(ranked.c.case_number.in_(set(case_numbers))).all()
+    return {case_number: position for case_number, position in rows}
+
+def count_queue_items(db: Session, status: Optional[db_models.QueueItemStatusEnum] = None) -> int:
+    query = db.query(db_models.CaseQueueItem)
+    if status is not None:
+        query = query.filter(db_models.CaseQueueItem.status == status)
+    return query.count()
+
+# --- Case URL Index ---
+
+def get_case_url_index_entry(db: Session, case_number: str) -> Optional[db_models.CaseUrlIndexEntry]:
+    return db.query(db_models.CaseUrlIndexEntry).filter(db_models.CaseUrlIndexEntry.case_number == case_number).first()
+
+def upsert_case_url_index_entry(
+    db: Session,
+    case_number: str,
+    case_url: str,
+    unicourt_case_name: Optional[str] = None,
+    unicourt_case_number: Optional[str] = None
+) -> db_models.CaseUrlIndexEntry:
+    entry = get_case_url_index_entry(db, case_number)
+    if entry is None:
+        entry = db_models.CaseUrlIndexEntry(case_number=case_number, case_url=case_url)
+        db.add(entry)
+    entry.case_url = case_url
+    if unicourt_case_name is not None:
+        entry.unicourt_case_name = unicourt_case_name
+    if unicourt_case_number is not None:
+        entry.unicourt_case_number = unicourt_case_number
+    entry.last_verified_at = datetime.utcnow()
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+def delete_case_url_index_entry(db: Session, case_number: str) -> bool:
+    deleted_rows = db.query(db_models.CaseUrlIndexEntry).filter(db_models.CaseUrlIndexEntry.case_number == case_number).delete()
+    db.commit()
+    return deleted_rows > 0
+
+
+# --- Worker process reports (multi-process mode) ---
+
+def upsert_worker_process_heartbeat(db: Session, process_index: int, pid: int, pool_snapshot: Optional[Dict[str, Any]],
+                                    metrics: Dict[str, Any]) -> None:
+    heartbeat = db.query(db_models.WorkerProcessHeartbeat).filter(db_models.WorkerProcessHeartbeat.process_index == process_index).first()
+    if heartbeat is None:
+        heartbeat = db_models.WorkerProcessHeartbeat(process_index=process_index)
+        db.add(heartbeat)
+    heartbeat.pid = pid
+    heartbeat.pool_snapshot = pool_snapshot
+    heartbeat.metrics = metrics
+    heartbeat.updated_at = datetime.utcnow()
+    db.commit()
+
+def get_worker_process_heartbeats(db: Session, updated_after: datetime) -> List[db_models.WorkerProcessHeartbeat]:
+    """Reports newer than updated_after; older rows belong to processes that stopped or hung."""
+    return db.query(db_models.WorkerProcessHeartbeat).filter(
+        db_models.WorkerProcessHeartbeat.updated_at >= updated_after
+    ).order_by(db_models.WorkerProcessHeartbeat.process_index).all()
+
+def delete_worker_process_heartbeat(db: Session, process_index: int) -> None:
+    db.query(db_models.WorkerProcessHeartbeat).filter(db_models.WorkerProcessHeartbeat.process_index == process_index).delete()
+    db.commit()
+
+def get_worker_pool_limits_override(db: Session) -> Optional[Tuple[int, int]]:
+    """(min_workers, max_workers) set through the API, or None to keep WORKER_POOL_MIN/WORKER_POOL_MAX."""
+    row = db.query(db_models.WorkerPoolLimitsOverride).filter(db_models.WorkerPoolLimitsOverride.id == 1).first()
+    return (row.min_workers, row.max_workers) if row else None
+
+def set_worker_pool_limits_override(db: Session, min_workers: int, max_workers: int) -> None:
+    row = db.query(db_models.WorkerPoolLimitsOverride).filter(db_models.WorkerPoolLimitsOverride.id == 1).first()
+    if row is None:
+        row = db_models.WorkerPoolLimitsOverride(id=1)
+        db.add(row)
+    row.min_workers = min_workers
+    row.max_workers = max_workers
+    row.updated_at = datetime.utcnow()
+    db.commit()
+
+def clear_worker_process_state(db: Session) -> None:
+    """Drops reports and runtime limits of a previous run, so a restart starts from the configured limits."""
+    db.query(db_models.WorkerProcessHeartbeat).delete()
+    db.query(db_models.WorkerPoolLimitsOverride).delete()
+    db.commit()
+
+
+# --- LLM extraction cache ---
+
+def get_llm_cache_entry(db: Session, cache_key: str, created_after: datetime) -> Optional[db_models.LLMExtractionCacheEntry]:
+    """Entry for cache_key if it is younger than created_after (TTL); records the hit."""
+    entry = db.query(db_models.LLMExtractionCacheEntry).filter(
+        db_models.LLMExtractionCacheEntry.cache_key == cache_key,
+        db_models.LLMExtractionCacheEntry.created_at >= created_after
+    ).first()
+    if entry is not None:
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_used_at = datetime.utcnow()
+        db.commit()
+        db.refresh(entry)
+    return entry
+
+def upsert_llm_cache_entry(db: Session, cache_key: str, content_hash: str, model: str,
+                           response_data: Dict[str, Any], notes: Optional[str] = None) -> db_models.LLMExtractionCacheEntry:
+    now = datetime.utcnow()
+    entry = db.query(db_models.LLMExtractionCacheEntry).filter(db_models.LLMExtractionCacheEntry.cache_key == cache_key).first()
+    if entry is None:
+        entry = db_models.LLMExtractionCacheEntry(cache_key=cache_key, hit_count=0)
+        db.add(entry)
+    entry.content_hash = content_hash
+    entry.model = model
+    entry.response_data = response_data
+    entry.notes = notes
+    entry.created_at = now
+    entry.last_used_at = now
+    try:
+        db.commit()
+    except IntegrityError: # Another worker stored the same key first; theirs is just as good
+        db.rollback()
+        entry = db.query(db_models.LLMExtractionCacheEntry).filter(db_models.LLMExtractionCacheEntry.cache_key == cache_key).first()
+    return entry
+
+def evict_llm_cache_entries(db: Session, created_before: datetime, max_entries: int) -> int:
+    """Deletes entries past their TTL, then the least recently used ones above max_entries. Returns the number deleted."""
+    deleted = db.query(db_models.LLMExtractionCacheEntry).filter(
+        db_models.LLMExtractionCacheEntry.created_at < created_before
+    ).delete(synchronize_session=False)
+    overflow = db.query(func.count(db_models.LLMExtractionCacheEntry.id)).scalar() - max_entries
+    if overflow > 0:
+        lru_ids = select(db_models.LLMExtractionCacheEntry.id).order_by(
+            db_models.LLMExtractionCacheEntry.last_used_at.asc(), db_models.LLMExtractionCacheEntry.id.asc()
+        ).limit(overflow)
+        deleted += db.query(db_models.LLMExtractionCacheEntry).filter(
+            db_models.LLMExtractionCacheEntry.id.in_(lru_ids.scalar_subquery())
+        ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+def get_llm_cache_stats(db: Session) -> Dict[str, int]:
+    entries, total_hits = db.query(
+        func.count(db_models.LLMExtractionCacheEntry.id), func.coalesce(func.sum(db_models.LLMExtractionCacheEntry.hit_count), 0)
+    ).one()
+    return {"entries": int(entries or 0), "total_hits": int(total_hits or 0)}
+
+# Numeric fields of LLMUsage.summary(), as stored in Case.llm_usage_totals
+LLM_USAGE_TOTAL_FIELDS = ("calls", "failed_calls", "images", "text_pages", "prompt_tokens", "completion_tokens",
+                          "total_tokens", "cost_usd", "latency_seconds")
+
+def get_llm_usage_totals(db: Session) -> Dict[str, Any]:
+    """
+    LLM usage summed over every case that recorded some (Case.llm_usage_totals), plus per-case averages.
+    Summed by SQLite (json_extract) in one aggregate query; no case rows are loaded.
+    """
+    usage = db_models.Case.llm_usage_totals
+    row = db.query(
+        func.count().label("cases"),
+        *[func.coalesce(func.sum(func.json_extract(usage, f"$.{field}")), 0).label(field) for field in LLM_USAGE_TOTAL_FIELDS]
+    ).filter(func.json_type(usage) == "object").one()
+    cases = row.cases
+    totals: Dict[str, Any] = {field: getattr(row, field) for field in LLM_USAGE_TOTAL_FIELDS}
+    result: Dict[str, Any] = {"cases": cases, **totals}
+    result["cost_usd"] = round(totals["cost_usd"], 6)
+    result["latency_seconds"] = round(totals["latency_seconds"], 2)
+    if cases:
+        result["avg_cost_usd_per_case"] = round(totals["cost_usd"] / cases, 6)
+        result["avg_images_per_case"] = round(totals["images"] / cases, 2)
+        result["avg_total_tokens_per_case"] = round(totals["total_tokens"] / cases, 1)
+    return result
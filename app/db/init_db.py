@@ -1,7 +1,8 @@
 # app/db/init_db.py
 import logging
 from app.db.session import engine, Base
-from app.db.models import Case # Only Case model now
+from app.db.models import (Case, CaseQueueItem, CaseUrlIndexEntry, LLMExtractionCacheEntry, # Imported so create_all() sees every table
+                           WorkerProcessHeartbeat, WorkerPoolLimitsOverride)
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +29,8 @@ def migrate_add_final_judgment_columns():
         'case_url_on_unicourt': 'VARCHAR',
         'status': 'VARCHAR DEFAULT "Queued" NOT NULL',
         'last_submitted_at': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP',
+        'priority': 'INTEGER DEFAULT 0 NOT NULL',
+        'deadline': 'TIMESTAMP',
         'original_creditor_name_from_doc': 'VARCHAR',
         'original_creditor_name_source_doc_title': 'VARCHAR',
         'creditor_address_from_doc': 'TEXT',
@@ -40,7 +42,8 @@ def migrate_add_final_judgment_columns():
         'final_judgment_awarded_to_creditor': 'VARCHAR',
         'final_judgment_awarded_source_doc_title': 'VARCHAR',
         'final_judgment_awarded_to_creditor_context': 'TEXT',
-        'processed_documents_summary': 'JSON'
+        'processed_documents_summary': 'JSON',
+        'llm_usage_totals': 'JSON'
     }
     
     try:
@@ -67,6 +70,8 @@ def migrate_add_final_judgment_columns():
                     case_url_on_unicourt VARCHAR,
                     status VARCHAR DEFAULT 'Queued' NOT NULL,
                     last_submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    priority INTEGER DEFAULT 0 NOT NULL,
+                    deadline TIMESTAMP,
                     original_creditor_name_from_doc VARCHAR,
                     original_creditor_name_source_doc_title VARCHAR,
                     creditor_address_from_doc TEXT,
@@ -78,7 +83,8 @@ def migrate_add_final_judgment_columns():
                     final_judgment_awarded_to_creditor VARCHAR,
                     final_judgment_awarded_source_doc_title VARCHAR,
                     final_judgment_awarded_to_creditor_context TEXT,
-                    processed_documents_summary JSON
+                    processed_documents_summary JSON,
+                    llm_usage_totals JSON
                 )
                 """
                 connection.execute(text(create_table_sql))
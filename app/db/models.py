@@ -1,6 +1,7 @@
 # app/db/models.py
 from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, JSON, ARRAY
 from sqlalchemy.sql import func
+from datetime import datetime
 from app.db.session import Base
 import enum
 
@@ -17,6 +18,11 @@ class CaseStatusEnum(str, enum.Enum):
     SESSION_ERROR = "Failed_Initial_Login_Or_Session" # Replaces generic "Failed_Initial_Login_Or_Session"
     WORKER_ERROR = "Generic_Case_Error" # Replaces specific "Worker_Unhandled_Error"
 
+# Status of an entry in the persistent work queue (case_queue table)
+class QueueItemStatusEnum(str, enum.Enum):
+    PENDING = "Pending" # Waiting to be claimed by a worker
+    LEASED = "Leased" # Claimed by a worker; reclaimable once lease_expires_at has passed
+
 # For in-memory categorization and processed_documents_summary status
 class DocumentTypeEnum(str, enum.Enum):
     FINAL_JUDGMENT = "FJ"
@@ -60,6 +66,8 @@ class Case(Base):
     # --- Processing Status & Timestamps ---
     status = Column(String, default=CaseStatusEnum.QUEUED, nullable=False)
     last_submitted_at = Column(DateTime(timezone=True), server_default=func.now())
+    priority = Column(Integer, default=0, nullable=False) # Scheduling priority, higher runs first
+    deadline = Column(DateTime, nullable=True) # Naive UTC
 
     # --- Extracted Data by LLM (Stored Directly in Case) ---
     original_creditor_name_from_doc = Column(String, nullable=True)
@@ -84,7 +92,98 @@ class Case(Base):
     # --- Summary of Transient Document Processing ---
     # Stores: [{"document_name": "Doc Title", "unicourt_doc_key": "key_or_null", "status": "DocProcessingStatus"}, ...]
     processed_documents_summary = Column(JSON, nullable=True)
+    # What the case's LLM calls consumed: {"calls", "failed_calls", "images", "text_pages", "prompt_tokens",
+    # "completion_tokens", "total_tokens", "cost_usd", "latency_seconds"}; per-document figures are in the summary items
+    llm_usage_totals = Column(JSON, nullable=True)
+
+
+    def __repr__(self):
+        return f"<Case(case_number='{self.case_number}', status='{self.status}')>"
+
+
+# --- Persistent Work Queue ---
+# One row per case waiting for (or currently leased by) a worker. Rows are deleted on ack,
+# so anything left here after a crash/restart is work that still has to be done.
+class CaseQueueItem(Base):
+    __tablename__ = "case_queue"
+
+    id = Column(Integer, primary_key=True, index=True)
+    case_id = Column(Integer, index=True, nullable=False)
+    case_number = Column(String, index=True, nullable=False)
+
+    status = Column(String, default=QueueItemStatusEnum.PENDING, nullable=False, index=True)
+    lease_owner = Column(String, nullable=True) # e.g. "worker-0"
+    lease_expires_at = Column(DateTime, nullable=True) # Naive UTC, like last_submitted_at writes
+    attempts = Column(Integer, default=0, nullable=False) # Number of times this item was leased
+    priority = Column(Integer, default=0, nullable=False) # Copied from the case; see crud.queue_scheduling_order
+    deadline = Column(DateTime, nullable=True) # Naive UTC, copied from the case
+    enqueued_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<CaseQueueItem(case_number='{self.case_number}', status='{self.status}', attempts={self.attempts})>"
+
+
+# --- Case URL Index ---
+# Where each case number was last found on Unicourt. Unlike Case rows, entries survive a
+# resubmission (which deletes and recreates the Case), so known cases can skip the dashboard search.
+class CaseUrlIndexEntry(Base):
+    __tablename__ = "case_url_index"
+
+    id = Column(Integer, primary_key=True, index=True)
+    case_number = Column(String, unique=True, index=True, nullable=False) # Same key as Case.case_number
+    case_url = Column(String, nullable=False)
+    unicourt_case_name = Column(String, nullable=True)
+    unicourt_case_number = Column(String, nullable=True) # As shown on the detail page, used to verify the URL still points at this case
+    last_verified_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<CaseUrlIndexEntry(case_number='{self.case_number}', case_url='{self.case_url}')>"
+
+
+class LLMExtractionCacheEntry(Base):
+    """
+    Parsed LLM answer for one document, reused when the same file is sent again with the same request.
+    cache_key covers the document content hash, the model, the exact prompt (requested fields, creditor,
+    parties) and the encoding settings, so any change in what we would send is a miss.
+    """
+    __tablename__ = "llm_extraction_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, index=True, nullable=False)
+    content_hash = Column(String, index=True, nullable=False) # sha256 of the document file
+    model = Column(String, nullable=False)
+    response_data = Column(JSON, nullable=False) # LLMResponseData as a dict
+    notes = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True) # Eviction order
+    hit_count = Column(Integer, default=0, nullable=False)
 
+    def __repr__(self):
+        return f"<LLMExtractionCacheEntry(cache_key='{self.cache_key[:12]}...', model='{self.model}', hits={self.hit_count})>"
+
+
+# --- Multi-process mode (WORKER_PROCESSES > 0) ---
+# Worker processes share nothing with the API process but the database, so they report their pool
+# and metrics here and pick up pool limits set through the API from here.
+class WorkerProcessHeartbeat(Base):
+    """Latest report of one worker process; rewritten every WORKER_PROCESS_HEARTBEAT_SECONDS."""
+    __tablename__ = "worker_process_heartbeats"
+
+    process_index = Column(Integer, primary_key=True) # Slot kept by the supervisor across restarts
+    pid = Column(Integer, nullable=False)
+    pool_snapshot = Column(JSON, nullable=True) # WorkerPoolSnapshot as a dict
+    metrics = Column(JSON, nullable=True) # See runtime.collect_worker_metrics
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False) # Naive UTC
 
     def __repr__(self):
-        return f"<Case(case_number='{self.case_number}', status='{self.status}')>"
\ No newline at end of file
+        return f"<WorkerProcessHeartbeat(process_index={self.process_index}, pid={self.pid}, updated_at='{self.updated_at}')>"
+
+
+class WorkerPoolLimitsOverride(Base):
+    """Single row (id=1): per-process worker pool limits set through PUT /service/worker-pool."""
+    __tablename__ = "worker_pool_limits"
+
+    id = Column(Integer, primary_key=True)
+    min_workers = Column(Integer, nullable=False)
+    max_workers = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
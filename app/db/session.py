@@ -1,5 +1,5 @@
 # app/db/session.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings # settings should be loaded by now
 import logging
@@ -13,9 +13,21 @@ logger.info(f"Database URL for SQLAlchemy: {SQLALCHEMY_DATABASE_URL}")
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False} # Needed for SQLite with FastAPI
+    connect_args={
+        "check_same_thread": False, # Needed for SQLite with FastAPI
+        "timeout": settings.SQLITE_BUSY_TIMEOUT_SECONDS # Wait for other writers instead of failing with "database is locked"
+    }
 )
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers (status queries) run alongside the single writer, which matters once
+    # several worker processes and the API process share the database file.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -11,9 +11,9 @@ from app.core.lifespan import lifespan_manager
 from app.api.routers import cases as cases_router
 from app.api.routers import service_control as service_control_router
 from app.api.routers import health as health_router
-from app.workers.case_worker import background_processor_worker
+from app.workers.runtime import init_worker_state, start_in_process_workers
+from app.workers.worker_process import WorkerProcessSupervisor, reset_worker_process_state
 from app.db.session import engine, SQLALCHEMY_DATABASE_URL 
-from app.db.init_db import init_db
 
 load_dotenv()
 initial_settings = load_settings()
@@ -33,24 +33,19 @@ async def app_lifespan(app_fastapi: FastAPI): # Renamed 'app' to 'app_fastapi' t
     current_app_settings = get_app_settings() 
     logger.info(f"Using database at: {SQLALCHEMY_DATABASE_URL}")
 
-    app_fastapi.state.playwright_instance = None # Initialized in lifespan_manager
-    app_fastapi.state.active_processing_count = 0
-    app_fastapi.state.processing_count_lock = asyncio.Lock()
-    app_fastapi.state.case_processing_queue = asyncio.Queue()
-    app_fastapi.state.actively_processing_cases = set() 
-    app_fastapi.state.active_cases_lock = asyncio.Lock()
-    app_fastapi.state.background_worker_tasks = []
-    app_fastapi.state.service_ready = False 
-    app_fastapi.state.shutting_down = False
-
-    async with lifespan_manager(app_fastapi): # lifespan_manager handles Playwright setup
-        init_db() 
-
-        if app_fastapi.state.service_ready:
-            for i in range(current_app_settings.MAX_CONCURRENT_TASKS):
-                task = asyncio.create_task(background_processor_worker(app_fastapi, worker_id=i))
-                app_fastapi.state.background_worker_tasks.append(task)
-            logger.info(f"Started {len(app_fastapi.state.background_worker_tasks)} background worker(s).")
+    init_worker_state(app_fastapi, current_app_settings)
+
+    async with lifespan_manager(app_fastapi): # lifespan_manager handles DB init, queue recovery and Playwright setup
+        if app_fastapi.state.service_ready and current_app_settings.WORKER_PROCESSES > 0:
+            # Queue recovery already ran in lifespan_manager, before any worker process can lease
+            reset_worker_process_state()
+            app_fastapi.state.worker_process_supervisor = WorkerProcessSupervisor(
+                process_count=current_app_settings.WORKER_PROCESSES,
+                shutdown_timeout_seconds=current_app_settings.GENERAL_TIMEOUT_SECONDS * 2
+            )
+            app_fastapi.state.worker_process_supervisor.start()
+        elif app_fastapi.state.service_ready:
+            await start_in_process_workers(app_fastapi, current_app_settings)
         else:
             logger.error("Service not ready after lifespan setup. Workers not started.")
         
@@ -1,6 +1,7 @@
 # app/models_api/cases.py
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
+from datetime import datetime
 from app.db.models import CaseStatusEnum
 
 class CaseSubmitDetail(BaseModel):
@@ -9,6 +10,8 @@ class CaseSubmitDetail(BaseModel):
     input_creditor_name: str = Field(..., min_length=1, description="Name of the creditor for LLM focus and party identification.")
     is_business: bool = Field(..., description="Indicates if the creditor is a business entity.")
     creditor_type: str = Field(..., description="Type of the creditor.")
+    priority: int = Field(0, ge=0, le=100, description="Scheduling priority; higher runs first. Waiting cases gain priority over time so low priorities are not starved.")
+    deadline: Optional[datetime] = Field(None, description="Optional time (UTC if no offset) by which the case should be processed; cases close to their deadline jump ahead.")
 
 class CaseSubmitRequest(BaseModel):
     cases: List[CaseSubmitDetail] = Field(..., min_items=1)
@@ -19,6 +22,7 @@ class CaseSubmitResponse(BaseModel):
     deleted_and_resubmitted_cases: int
     already_queued_or_processing: int
     current_queue_size: int
+    updated_queued_cases: int = 0 # Already waiting; re-submission raised priority / moved deadline earlier
 
 # --- Response Models for Getters ---
 
@@ -27,6 +31,7 @@ class ProcessedDocumentSummaryItem(BaseModel):
     unicourt_doc_key: Optional[str] = None
     status: str # From DocumentProcessingStatusEnum
     notes: Optional[str] = None # General message about processing status
+    llm_usage: Optional[Dict[str, Any]] = None # Calls, images, tokens, cost_usd, latency of this document's LLM calls
 
 class AssociatedPartyData(BaseModel):
     name: str
@@ -48,6 +53,8 @@ class CaseDetailResponse(BaseModel):
     
     status: str # String representation of CaseStatusEnum
     last_submitted_at: Optional[str] = None 
+    priority: int = 0
+    deadline: Optional[str] = None
 
     original_creditor_name_from_doc: Optional[str] = None
     original_creditor_name_source_doc_title: Optional[str] = None
@@ -61,6 +68,7 @@ class CaseDetailResponse(BaseModel):
     final_judgment_awarded_source_doc_title: Optional[str] = None
     final_judgment_awarded_to_creditor_context: Optional[str] = None  # Context/phrase used to determine the judgment
     processed_documents_summary: List[ProcessedDocumentSummaryItem] = []
+    llm_usage_totals: Optional[Dict[str, Any]] = None # Sum over all LLM calls made for the case
 
     class Config:
         from_attributes = True
@@ -70,6 +78,8 @@ class CaseStatusResponseItem(BaseModel):
     case_number_for_db_id: str
     status: str 
     message: Optional[str] = None # General message about status (e.g., "In queue", "Processing")
+    queue_position: Optional[int] = None # 1-based position in scheduling order, only while queued
+    eta_seconds: Optional[float] = None # Rough estimate until processing completes, only while queued
     data: Optional[CaseDetailResponse] = None # Full data if available
 
 class BatchCaseRequest(BaseModel):
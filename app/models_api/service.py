@@ -24,6 +24,40 @@ class ServiceStatusResponse(BaseModel):
     active_processing_tasks_count: int
     distinct_cases_actively_processing_count: int
     max_concurrent_tasks: int 
+    llm_stage_queue_size: int = 0 # Cases done with the browser stage, waiting for an LLM worker
+    llm_stage_workers: int = 0
     playwright_initialized: bool
+    browser_pool: Dict[str, int] = {} # browsers_connected, open_contexts, relaunch_count
+    worker_processes: int = 0 # Configured worker processes (0 = workers run in the API process)
+    worker_processes_alive: int = 0
+    worker_processes_reporting: int = 0 # Worker processes with a recent heartbeat; the worker metrics below come from these
+    leased_queue_items: int = 0 # Cases currently held by a worker in any process
+    document_downloads: Dict[str, Any] = {} # Per-host download limit and, per host, in-flight/peak/total downloads (multi-process: keyed by worker process)
+    page_waits: Dict[str, Any] = {} # Per wait step: successes, timeouts, p50/p95 seconds and the current timeout (multi-process: keyed by worker process)
+    resource_blocking: Dict[str, Any] = {} # Requests aborted by the open worker contexts, estimated bytes saved (multi-process: keyed by worker process)
+    llm_rate_limiter: Dict[str, Any] = {} # Budget, availability, saturation (share of recent calls that had to wait), 429 count (multi-process: keyed by worker process)
+    llm_cache: Dict[str, Any] = {} # hits, misses, hit_rate, stores, evictions (this process); entries, total_hits (all processes)
+    llm_usage: Dict[str, Any] = {} # Summed over all cases: calls, images, tokens, cost_usd, latency; per-case averages
     current_download_location: str
-    extract_associated_party_addresses_enabled: bool
\ No newline at end of file
+    extract_associated_party_addresses_enabled: bool
+
+class WorkerPoolLimitsUpdateRequest(BaseModel):
+    min_workers: Optional[int] = Field(None, ge=0)
+    max_workers: Optional[int] = Field(None, gt=0)
+
+    class Config:
+        extra = 'forbid'
+
+class WorkerPoolStatusResponse(BaseModel):
+    min_workers: int
+    max_workers: int
+    target_workers: int
+    running_workers: int
+    draining_workers: int
+    browser_stage_median_seconds: Optional[float] = None
+    browser_stage_baseline_seconds: Optional[float] = None
+    browser_stage_error_rate: Optional[float] = None
+    llm_stage_median_seconds: Optional[float] = None
+    available_memory_mb: Optional[float] = None
+    last_decision: Optional[str] = None
+    processes: int = 1 # Worker processes covered; in multi-process mode counts are totals and min/max apply per process
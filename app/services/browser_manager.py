@@ -0,0 +1,85 @@
+# app/services/browser_manager.py
+import asyncio
+import logging
+from typing import Optional, List, Dict, Any
+from playwright.async_api import Playwright, Browser, BrowserContext
+
+logger = logging.getLogger(__name__)
+
+BROWSER_LAUNCH_ARGS = ['--disable-blink-features=AutomationControlled', '--no-sandbox']
+
+
+class BrowserManager:
+    """
+    Owns the shared Chromium process(es) for the whole app.
+
+    Workers no longer launch their own browser; they ask for an isolated BrowserContext instead.
+    Contexts share the browser process but not cookies, storage or cache, so workers stay independent
+    while the per-worker cost drops from a full Chromium process to a context.
+    With pool_size > 1, new contexts go to the browser currently hosting the fewest contexts.
+    A browser that has crashed or disconnected is relaunched the next time a context is requested from it.
+    """
+    def __init__(self, playwright_instance: Playwright, pool_size: int = 1):
+        self.playwright = playwright_instance
+        self.pool_size = max(1, pool_size)
+        self._browsers: List[Optional[Browser]] = [None] * self.pool_size
+        self._lock = asyncio.Lock()
+        self._closed = False
+        self.relaunch_count = 0
+
+    async def _launch_browser(self) -> Browser:
+        return await self.playwright.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+
+    async def start(self) -> None:
+        """Launches the browser pool eagerly so the first workers don't pay the startup cost."""
+        async with self._lock:
+            for slot in range(self.pool_size):
+                await self._ensure_browser(slot)
+        logger.info(f"Browser pool started with {self.pool_size} browser(s).")
+
+    async def _ensure_browser(self, slot: int) -> Browser:
+        browser = self._browsers[slot]
+        if browser is not None and browser.is_connected():
+            return browser
+        if browser is not None:
+            logger.warning(f"Browser {slot} in pool is disconnected. Relaunching.")
+            self.relaunch_count += 1
+        browser = await self._launch_browser()
+        self._browsers[slot] = browser
+        return browser
+
+    def _pick_slot(self) -> int:
+        def load(slot: int) -> int:
+            browser = self._browsers[slot]
+            if browser is None or not browser.is_connected():
+                return 0
+            return len(browser.contexts)
+        return min(range(self.pool_size), key=load)
+
+    async def new_context(self, **context_options: Any) -> BrowserContext:
+        """Creates an isolated context on the least-loaded browser. The caller owns (and closes) the context."""
+        if self._closed:
+            raise RuntimeError("BrowserManager is closed.")
+        async with self._lock:
+            browser = await self._ensure_browser(self._pick_slot())
+        return await browser.new_context(**context_options)
+
+    def stats(self) -> Dict[str, int]:
+        connected = [b for b in self._browsers if b is not None and b.is_connected()]
+        return {
+            "browsers_connected": len(connected),
+            "open_contexts": sum(len(b.contexts) for b in connected),
+            "relaunch_count": self.relaunch_count,
+        }
+
+    async def close(self) -> None:
+        self._closed = True
+        async with self._lock:
+            for slot, browser in enumerate(self._browsers):
+                if browser is not None and browser.is_connected():
+                    try:
+                        await browser.close()
+                    except Exception:
+                        logger.warning(f"Error while closing browser {slot} in pool", exc_info=True)
+                self._browsers[slot] = None
+        logger.info("Browser pool closed.")
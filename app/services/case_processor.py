@@ -4,6 +4,7 @@ import asyncio
 import logging
 import shutil # For deleting folders
 from typing import Tuple, Optional, Dict, Any, Set, List
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
 from playwright.async_api import Page
@@ -11,17 +12,30 @@ from playwright.async_api import Page
 from app.core.config import AppSettings
 from app.db import crud, models as db_models
 from app.services.unicourt_handler import UnicourtHandler, TransientDocumentInfo
-from app.services.llm_processor import LLMProcessor, LLMResponseData
+from app.services.llm_processor import LLMProcessor, LLMResponseData, LLMUsage, PackedDocument
+from app.services.image_encoding import resolve_image_encoding_profile
 from app.utils import common, playwright_utils
 
 logger = logging.getLogger(__name__)
 
+
+class CaseLLMJob(BaseModel):
+    """Hand-off from the browser stage to the LLM stage: everything the LLM stage needs about a case."""
+    case_id: int
+    case_number: str
+    temp_case_download_path: str
+    llm_bundle_docs: List[TransientDocumentInfo]
+    target_associated_party_names: List[str] = []
+
+
 class CaseProcessorService:
-    def __init__(self, db: Session, settings: AppSettings, unicourt_handler: UnicourtHandler, llm_processor: LLMProcessor):
+    def __init__(self, db: Session, settings: AppSettings, unicourt_handler: Optional[UnicourtHandler], llm_processor: LLMProcessor):
         self.db = db
         self.settings = settings
         self.unicourt_handler = unicourt_handler
         self.llm_processor = llm_processor
+        # Outcome of the last run_browser_stage (None if it handed off to the LLM stage); read by the worker pool controller
+        self.browser_stage_status: Optional[db_models.CaseStatusEnum] = None
 
     async def _process_single_document_with_llm(
         self,
@@ -33,7 +47,8 @@ class CaseProcessorService:
         found_reg_state_for_case: bool, 
         found_final_judgment_awarded_for_case: bool,
         found_party_addresses_for_case: Dict[str, bool], 
-        target_associated_party_names_for_case: List[str]
+        target_associated_party_names_for_case: List[str],
+        usage: Optional[LLMUsage] = None # Filled with what this document's LLM calls consumed
     ) -> Tuple[Optional[LLMResponseData], str, bool, bool, bool, bool, Dict[str,bool]]:
         
         llm_api_notes = "LLM processing not attempted for document."
@@ -43,23 +58,10 @@ class CaseProcessorService:
             logger.error(f"[{case_db_obj.case_number}] LLM: File missing for '{trans_doc_info.original_title}' at '{trans_doc_info.temp_local_path}'.")
             return None, "File missing for LLM.", found_original_creditor_name_for_case, found_creditor_address_for_case, found_reg_state_for_case, found_final_judgment_awarded_for_case, found_party_addresses_for_case
 
-        # Determine what info is still needed for this LLM call based on overall case needs
-        info_to_extract_for_this_doc_pass: Dict[str, bool] = {
-            "original_creditor_name": not found_original_creditor_name_for_case,
-            "creditor_address": not found_creditor_address_for_case,
-            # Only ask for associated party addresses if the global setting is true
-            # AND if there are parties whose addresses haven't been found yet.
-            "associated_parties_addresses": self.settings.EXTRACT_ASSOCIATED_PARTY_ADDRESSES and \
-                                            any(not found_party_addresses_for_case.get(name, False) for name in target_associated_party_names_for_case),
-            "reg_state": case_db_obj.is_business and not found_reg_state_for_case,
-            "final_judgment_awarded": not found_final_judgment_awarded_for_case
-        }
-        
-        current_target_party_names_for_llm_pass = [
-            name for name in target_associated_party_names_for_case 
-            if self.settings.EXTRACT_ASSOCIATED_PARTY_ADDRESSES and not found_party_addresses_for_case.get(name, False)
-        ] if info_to_extract_for_this_doc_pass.get("associated_parties_addresses") else []
-
+        info_to_extract_for_this_doc_pass, current_target_party_names_for_llm_pass = self._info_needed_from_llm(
+            case_db_obj, found_original_creditor_name_for_case, found_creditor_address_for_case, found_reg_state_for_case,
+            found_final_judgment_awarded_for_case, found_party_addresses_for_case, target_associated_party_names_for_case
+        )
 
         if not any(info_to_extract_for_this_doc_pass.values()):
             llm_api_notes = "All required case-level info already found before processing this doc with LLM."
@@ -77,9 +79,59 @@ class CaseProcessorService:
             target_associated_party_names=current_target_party_names_for_llm_pass, # Pass only those still needed
             info_to_extract_for_doc=info_to_extract_for_this_doc_pass, # What to look for in this doc
             max_images_per_llm_call=self.settings.MAX_IMAGES_PER_LLM_CALL, # Add to AppSettings
-            max_llm_attempts_per_batch=self.settings.MAX_LLM_ATTEMPTS_PER_BATCH # Add to AppSettings
+            max_llm_attempts_per_batch=self.settings.MAX_LLM_ATTEMPTS_PER_BATCH, # Add to AppSettings
+            encoding_profile=resolve_image_encoding_profile(self.settings, trans_doc_info.document_type),
+            usage=usage
+        )
+
+        found_original_creditor_name_for_case, found_creditor_address_for_case, found_reg_state_for_case, \
+        found_final_judgment_awarded_for_case, found_party_addresses_for_case = self._apply_llm_data_to_case(
+            llm_data, trans_doc_info.original_title, case_db_obj, found_original_creditor_name_for_case,
+            found_creditor_address_for_case, found_reg_state_for_case, found_final_judgment_awarded_for_case, found_party_addresses_for_case
         )
+        return llm_data, llm_api_notes, found_original_creditor_name_for_case, found_creditor_address_for_case, found_reg_state_for_case, found_final_judgment_awarded_for_case, found_party_addresses_for_case
+
+    def _info_needed_from_llm(
+        self,
+        case_db_obj: db_models.Case,
+        found_original_creditor_name_for_case: bool,
+        found_creditor_address_for_case: bool,
+        found_reg_state_for_case: bool,
+        found_final_judgment_awarded_for_case: bool,
+        found_party_addresses_for_case: Dict[str, bool],
+        target_associated_party_names_for_case: List[str]
+    ) -> Tuple[Dict[str, bool], List[str]]:
+        """What the next LLM pass should look for, and the party names whose addresses are still needed."""
+        # Determine what info is still needed for this LLM call based on overall case needs
+        info_to_extract_for_this_doc_pass: Dict[str, bool] = {
+            "original_creditor_name": not found_original_creditor_name_for_case,
+            "creditor_address": not found_creditor_address_for_case,
+            # Only ask for associated party addresses if the global setting is true
+            # AND if there are parties whose addresses haven't been found yet.
+            "associated_parties_addresses": self.settings.EXTRACT_ASSOCIATED_PARTY_ADDRESSES and \
+                                            any(not found_party_addresses_for_case.get(name, False) for name in target_associated_party_names_for_case),
+            "reg_state": case_db_obj.is_business and not found_reg_state_for_case,
+            "final_judgment_awarded": not found_final_judgment_awarded_for_case
+        }
+        
+        current_target_party_names_for_llm_pass = [
+            name for name in target_associated_party_names_for_case 
+            if self.settings.EXTRACT_ASSOCIATED_PARTY_ADDRESSES and not found_party_addresses_for_case.get(name, False)
+        ] if info_to_extract_for_this_doc_pass.get("associated_parties_addresses") else []
+        return info_to_extract_for_this_doc_pass, current_target_party_names_for_llm_pass
 
+    def _apply_llm_data_to_case(
+        self,
+        llm_data: Optional[LLMResponseData],
+        source_doc_title: str,
+        case_db_obj: db_models.Case,
+        found_original_creditor_name_for_case: bool,
+        found_creditor_address_for_case: bool,
+        found_reg_state_for_case: bool,
+        found_final_judgment_awarded_for_case: bool,
+        found_party_addresses_for_case: Dict[str, bool]
+    ) -> Tuple[bool, bool, bool, bool, Dict[str, bool]]:
+        """Writes what one document's LLM answer adds to the case (sourced to source_doc_title); returns the updated found flags."""
         # Update case_db_obj and found_flags based on llm_data
         # This part remains largely the same, it merges new info from llm_data
         # into the case object and updates the overall found_..._for_case flags
@@ -87,25 +139,25 @@ class CaseProcessorService:
             db_changed = False
             if llm_data.original_creditor_name and not case_db_obj.original_creditor_name_from_doc:
                 case_db_obj.original_creditor_name_from_doc = llm_data.original_creditor_name
-                case_db_obj.original_creditor_name_source_doc_title = trans_doc_info.original_title
+                case_db_obj.original_creditor_name_source_doc_title = source_doc_title
                 found_original_creditor_name_for_case = True # Update case-level flag                
                 db_changed = True
             
             if llm_data.creditor_address and not case_db_obj.creditor_address_from_doc:
                 case_db_obj.creditor_address_from_doc = llm_data.creditor_address
-                case_db_obj.creditor_address_source_doc_title = trans_doc_info.original_title
+                case_db_obj.creditor_address_source_doc_title = source_doc_title
                 found_creditor_address_for_case = True # Update case-level flag
                 db_changed = True
 
             if case_db_obj.is_business and llm_data.creditor_registration_state and not case_db_obj.creditor_registration_state_from_doc:
                 case_db_obj.creditor_registration_state_from_doc = llm_data.creditor_registration_state
-                case_db_obj.creditor_registration_state_source_doc_title = trans_doc_info.original_title
+                case_db_obj.creditor_registration_state_source_doc_title = source_doc_title
                 found_reg_state_for_case = True # Update case-level flag
                 db_changed = True
 
             if llm_data.final_judgment_awarded_to_creditor and not case_db_obj.final_judgment_awarded_to_creditor:
                 case_db_obj.final_judgment_awarded_to_creditor = llm_data.final_judgment_awarded_to_creditor
-                case_db_obj.final_judgment_awarded_source_doc_title = trans_doc_info.original_title
+                case_db_obj.final_judgment_awarded_source_doc_title = source_doc_title
                 case_db_obj.final_judgment_awarded_to_creditor_context = llm_data.final_judgment_awarded_to_creditor_context
                 found_final_judgment_awarded_for_case = True # Update case-level flag
                 db_changed = True
@@ -126,7 +178,7 @@ class CaseProcessorService:
                         current_case_assoc_parties_on_db.append({
                             "name": party_name,
                             "address": party_address, # This will be stored as a string, or null if None
-                            "source_doc_title": trans_doc_info.original_title
+                            "source_doc_title": source_doc_title
                         })
                         found_party_addresses_for_case[party_name] = True # Mark address as found for this party for the case
                         db_changed = True # Signal that case_db_obj.associated_parties_data needs update
@@ -142,8 +194,81 @@ class CaseProcessorService:
                 except Exception as e_commit:
                     logger.error(f"[{case_db_obj.case_number}] Error committing LLM updates to DB: {e_commit}")
                     self.db.rollback()
-        
-        return llm_data, llm_api_notes, found_original_creditor_name_for_case, found_creditor_address_for_case, found_reg_state_for_case, found_final_judgment_awarded_for_case, found_party_addresses_for_case
+
+        return found_original_creditor_name_for_case, found_creditor_address_for_case, found_reg_state_for_case, found_final_judgment_awarded_for_case, found_party_addresses_for_case
+
+    async def _process_document_pack_with_llm(
+        self,
+        llm_bundle_docs: List[TransientDocumentInfo], # Sorted by priority
+        case_db_obj: db_models.Case,
+        found_original_creditor_name_for_case: bool,
+        found_creditor_address_for_case: bool,
+        found_reg_state_for_case: bool,
+        found_final_judgment_awarded_for_case: bool,
+        found_party_addresses_for_case: Dict[str, bool],
+        target_associated_party_names_for_case: List[str],
+        case_llm_usage: LLMUsage # The shared call's usage is added here (once), whether or not the pack is used
+    ) -> Tuple[Set[int], bool, bool, bool, bool, Dict[str, bool]]:
+        """
+        Sends the case's small documents (together within MAX_IMAGES_PER_LLM_CALL pages) to the LLM in one call
+        and records each answer against the document it came from. Returns the indices (into llm_bundle_docs) of
+        the documents handled here plus the updated found flags; an empty set means the documents still need the
+        one-call-per-document path (nothing to pack, or the pack call failed or couldn't be attributed).
+        """
+        unchanged = (set(), found_original_creditor_name_for_case, found_creditor_address_for_case, found_reg_state_for_case,
+                     found_final_judgment_awarded_for_case, found_party_addresses_for_case)
+        info_to_extract, target_party_names_for_pass = self._info_needed_from_llm(
+            case_db_obj, found_original_creditor_name_for_case, found_creditor_address_for_case, found_reg_state_for_case,
+            found_final_judgment_awarded_for_case, found_party_addresses_for_case, target_associated_party_names_for_case
+        )
+        if not any(info_to_extract.values()):
+            return unchanged
+        candidate_indices = [i for i, doc in enumerate(llm_bundle_docs) if doc.temp_local_path and os.path.exists(doc.temp_local_path)]
+        pack_positions = await self.llm_processor.select_document_pack(
+            [llm_bundle_docs[i].temp_local_path for i in candidate_indices], self.settings.MAX_IMAGES_PER_LLM_CALL)
+        if not pack_positions:
+            return unchanged
+        pack_indices = [candidate_indices[position] for position in pack_positions]
+        pack_docs = [llm_bundle_docs[i] for i in pack_indices]
+
+        logger.info(f"[{case_db_obj.case_number}] LLM: Sending {len(pack_docs)} small documents in one call: {[d.original_title for d in pack_docs]}")
+        pack_usage = LLMUsage()
+        per_document_data, pack_notes = await self.llm_processor.process_document_pack_for_case_info(
+            documents=[
+                PackedDocument(file_path=doc.temp_local_path, title=doc.original_title,
+                               encoding_profile=resolve_image_encoding_profile(self.settings, doc.document_type))
+                for doc in pack_docs
+            ],
+            input_creditor_name=case_db_obj.input_creditor_name,
+            is_business=case_db_obj.is_business,
+            creditor_type=case_db_obj.creditor_type,
+            target_associated_party_names=target_party_names_for_pass,
+            info_to_extract_for_doc=info_to_extract,
+            max_llm_attempts_per_batch=self.settings.MAX_LLM_ATTEMPTS_PER_BATCH,
+            usage=pack_usage
+        )
+        case_llm_usage.add(pack_usage)
+        if per_document_data is None:
+            logger.warning(f"[{case_db_obj.case_number}] LLM: Multi-document call not usable, processing documents one by one. Notes: {pack_notes}")
+            return unchanged
+
+        for doc, llm_data in zip(pack_docs, per_document_data):
+            found_original_creditor_name_for_case, found_creditor_address_for_case, found_reg_state_for_case, \
+            found_final_judgment_awarded_for_case, found_party_addresses_for_case = self._apply_llm_data_to_case(
+                llm_data, doc.original_title, case_db_obj, found_original_creditor_name_for_case,
+                found_creditor_address_for_case, found_reg_state_for_case, found_final_judgment_awarded_for_case, found_party_addresses_for_case
+            )
+            if llm_data.model_dump(exclude_defaults=True):
+                status = db_models.DocumentProcessingStatusEnum.LLM_EXTRACTION_SUCCESS
+                doc_notes = pack_notes
+            else:
+                status = db_models.DocumentProcessingStatusEnum.LLM_EXTRACTION_FAILED
+                doc_notes = f"No requested data attributed to this document. {pack_notes}"
+            # Each document shows the whole shared call; the case total counts it once
+            self._update_doc_summary_status(case_db_obj, doc.original_title, doc.unicourt_doc_key, status, doc_notes,
+                                            llm_usage={**pack_usage.summary(), "shared_by_documents": len(pack_docs)})
+        return (set(pack_indices), found_original_creditor_name_for_case, found_creditor_address_for_case, found_reg_state_for_case,
+                found_final_judgment_awarded_for_case, found_party_addresses_for_case)
 
 
     async def process_single_case(
@@ -151,6 +276,21 @@ class CaseProcessorService:
         case_id: int, 
         case_obj_from_queue: db_models.Case # Pass the full case object now
     ) -> None:
+        """Runs both pipeline stages back to back on the calling task."""
+        llm_job = await self.run_browser_stage(case_id, case_obj_from_queue)
+        if llm_job:
+            await self.run_llm_stage(llm_job)
+
+    async def run_browser_stage(
+        self, 
+        case_id: int, 
+        case_obj_from_queue: db_models.Case
+    ) -> Optional[CaseLLMJob]:
+        """
+        Stage 1 of the pipeline: search, parties and document download on the worker's browser.
+        Returns a CaseLLMJob when downloaded documents still need the LLM; otherwise the case is
+        finished here (final status written, temp files removed) and None is returned.
+        """
         case_number_for_db = case_obj_from_queue.case_number
         case_name_for_search = case_obj_from_queue.case_name_for_search
         input_creditor_name = case_obj_from_queue.input_creditor_name
@@ -165,12 +305,10 @@ class CaseProcessorService:
         case_obj_from_queue = crud.get_case_by_case_number(self.db, case_number_for_db)
         if not case_obj_from_queue:
             logger.error(f"Case with ID {case_id} not found in database after status update")
-            return
+            return None
 
         # Temporary download path for this case's docs
-        sane_case_folder_name = common.sanitize_filename(case_number_for_db)
-        # CURRENT_DOWNLOAD_LOCATION is the base for DB file and session, temp files go into subfolder
-        temp_case_specific_download_path = os.path.join(self.settings.CURRENT_DOWNLOAD_LOCATION, "temp_case_files", sane_case_folder_name)
+        temp_case_specific_download_path = self._temp_case_download_path(case_number_for_db)
         
         # Ensure clean slate for temp downloads for this run
         if os.path.exists(temp_case_specific_download_path):
@@ -187,51 +325,42 @@ class CaseProcessorService:
             msg = f"[{case_number_for_db}] Worker's dashboard page is not available. Cannot process."
             logger.error(msg)
             crud.update_case_status(self.db, case_id, db_models.CaseStatusEnum.WORKER_ERROR)
-            return
+            self.browser_stage_status = db_models.CaseStatusEnum.WORKER_ERROR
+            return None
 
         case_page: Optional[Page] = None
         final_case_status = db_models.CaseStatusEnum.COMPLETED_WITH_ERRORS # Default pessimistic
+        llm_job: Optional[CaseLLMJob] = None
         
         # Re-fetch case object for latest state if any background update happened
         # though it's less likely now with direct param passing
         case_db_obj = crud.get_case_by_case_number(self.db, case_number_for_db)
         if not case_db_obj: # Should not happen if case_id and case_obj_from_queue are valid
             logger.error(f"[{case_number_for_db}] Case (ID: {case_id}) vanished from DB. Aborting.")
-            return
-
+            return None
 
-        # --- Overall Case Processing State ---
-        found_original_creditor_name_for_case: bool = bool(case_db_obj.original_creditor_name_from_doc)
-        found_creditor_address_for_case: bool = bool(case_db_obj.creditor_address_from_doc)
-        found_reg_state_for_case: bool = bool(case_db_obj.creditor_registration_state_from_doc) if case_db_obj.is_business else True # True if not business
-        found_final_judgment_awarded_for_case: bool = bool(case_db_obj.final_judgment_awarded_to_creditor)
-        
-        # For associated parties, from case_db_obj.associated_parties_data
-        # Initialize found_party_addresses_for_case based on what's already in DB (if reprocessing an existing entry)
         target_associated_party_names: List[str] = [] # This will be filled after party tab interaction
-        found_party_addresses_for_case: Dict[str, bool] = {} # party_name -> True if address found
-        if case_db_obj.associated_parties_data:
-            for party_entry in case_db_obj.associated_parties_data:
-                if party_entry.get("name") and party_entry.get("address"):
-                    found_party_addresses_for_case[party_entry["name"]] = True
-        # --- End Overall Case Processing State ---
-
 
         try:
             if not await self.unicourt_handler.ensure_authenticated_session(page_to_check=dashboard_page):
                 msg = f"[{case_number_for_db}] Failed to ensure Unicourt session."
                 logger.error(msg)
-                crud.update_case_status(self.db, case_id, db_models.CaseStatusEnum.SESSION_ERROR)
-                return
+                final_case_status = db_models.CaseStatusEnum.SESSION_ERROR
+                return None
               # --- Phase 1: Get the Case Page ---
             case_page, search_notes, unicourt_actual_name, unicourt_actual_number = \
-                await self.unicourt_handler.search_and_open_case_page(dashboard_page, case_name_for_search, case_number_for_db)
+                await self._open_case_page(dashboard_page, case_name_for_search, case_number_for_db)
 
             if not case_page:
                 logger.warning(f"[{case_number_for_db}] Failed to open Unicourt case page. Search notes: {search_notes}")
                 final_case_status = db_models.CaseStatusEnum.CASE_NOT_FOUND_ON_UNICOURT
-                return
+                return None
             
+            crud.upsert_case_url_index_entry(
+                self.db, case_number_for_db, case_page.url,
+                unicourt_case_name=unicourt_actual_name,
+                unicourt_case_number=unicourt_actual_number
+            )
             crud.update_case_details_from_unicourt_page(
                 self.db, case_id, 
                 unicourt_case_name=unicourt_actual_name, 
@@ -258,11 +387,6 @@ class CaseProcessorService:
                 crud.update_case_details_from_unicourt_page(
                     self.db, case_id, associated_parties=target_associated_party_names
                 )
-
-            # Initialize found_party_addresses_for_case for these new targets if not already present from DB
-            for name in target_associated_party_names:
-                if name not in found_party_addresses_for_case:
-                    found_party_addresses_for_case[name] = False
             
             # --- Phase 2.3 & Download Logic (Revised): Identify, Order, Download ---
             # This function now handles Paid section (ordering) and CrowdSourced (downloading)
@@ -290,6 +414,98 @@ class CaseProcessorService:
                     final_case_status = db_models.CaseStatusEnum.COMPLETED_WITH_ERRORS # Or a more specific status if needed
                 raise Exception("NoDocsForLLMStopProcessing")
 
+            # Browser work for this case is done; the documents move on to the LLM stage
+            llm_job = CaseLLMJob(
+                case_id=case_id,
+                case_number=case_number_for_db,
+                temp_case_download_path=temp_case_specific_download_path,
+                llm_bundle_docs=llm_bundle_docs,
+                target_associated_party_names=target_associated_party_names
+            )
+            logger.info(f"[{case_number_for_db}] Browser stage finished with {len(llm_bundle_docs)} document(s) for the LLM stage.")
+            return llm_job
+
+        except (Exception) as e: # Catch custom stop exceptions and others
+            error_msg = f"Error processing case {case_number_for_db} (ID: {case_id}): {type(e).__name__} - {str(e)}"
+            if str(e) == "VoluntaryDismissalStopProcessing":
+                # Final status already set if this was the cause
+                pass
+            elif str(e) == "NoDocsForLLMStopProcessing":
+                # Final status already set if this was the cause
+                pass
+            else: # Unhandled/generic error
+                logger.critical(error_msg, exc_info=True)
+                page_to_shot = case_page if case_page and not case_page.is_closed() else dashboard_page
+                if page_to_shot and not page_to_shot.is_closed():
+                    await playwright_utils.safe_screenshot(page_to_shot, self.settings, "critical_case_proc_error", case_number_for_db)
+                final_case_status = db_models.CaseStatusEnum.WORKER_ERROR
+            return None
+        finally:
+            if case_page and not case_page.is_closed():
+                try: await case_page.close()
+                except Exception as e_close: logger.error(f"Error closing case_page in finally: {e_close}")
+            
+            if dashboard_page and not dashboard_page.is_closed():
+                 logger.debug(f"[{case_number_for_db}] Clearing search on dashboard page post-processing.")
+                 await self.unicourt_handler.clear_search_input(dashboard_page)
+
+            if llm_job is None: # Case ends in this stage
+                self.browser_stage_status = final_case_status
+                self._finalize_case(case_id, case_number_for_db, temp_case_specific_download_path, final_case_status)
+
+    async def _open_case_page(
+        self, dashboard_page: Page, case_name_for_search: str, case_number_for_db: str
+    ) -> Tuple[Optional[Page], str, Optional[str], Optional[str]]:
+        """Opens the case detail page from the case URL index when possible, otherwise via dashboard search."""
+        index_entry = crud.get_case_url_index_entry(self.db, case_number_for_db) if self.settings.CASE_URL_FAST_PATH_ENABLED else None
+        if index_entry:
+            case_page, notes, name_on_page, number_on_page = await self.unicourt_handler.open_case_page_by_url(
+                dashboard_page, index_entry.case_url, case_number_for_db, expected_unicourt_case_number=index_entry.unicourt_case_number
+            )
+            if case_page:
+                return case_page, notes, name_on_page, number_on_page
+            crud.delete_case_url_index_entry(self.db, case_number_for_db)
+            logger.info(f"[{case_number_for_db}] Falling back to dashboard search.")
+        return await self.unicourt_handler.search_and_open_case_page(dashboard_page, case_name_for_search, case_number_for_db)
+
+    async def run_llm_stage(self, llm_job: CaseLLMJob) -> None:
+        """
+        Stage 2 of the pipeline: runs the downloaded documents through the LLM and writes the final status.
+        Needs no browser, so it runs on the LLM worker pool while the browser worker moves on.
+        """
+        case_id = llm_job.case_id
+        case_number_for_db = llm_job.case_number
+        llm_bundle_docs = list(llm_job.llm_bundle_docs)
+        target_associated_party_names = llm_job.target_associated_party_names
+        final_case_status = db_models.CaseStatusEnum.COMPLETED_WITH_ERRORS # Default pessimistic
+        case_llm_usage = LLMUsage() # Everything this case's LLM calls consumed
+
+        case_db_obj = crud.get_case_by_id(self.db, case_id)
+        if not case_db_obj:
+            logger.error(f"[{case_number_for_db}] Case (ID: {case_id}) vanished from DB before LLM stage. Aborting.")
+            self._remove_temp_case_files(case_number_for_db, llm_job.temp_case_download_path)
+            return
+
+        # --- Overall Case Processing State ---
+        found_original_creditor_name_for_case: bool = bool(case_db_obj.original_creditor_name_from_doc)
+        found_creditor_address_for_case: bool = bool(case_db_obj.creditor_address_from_doc)
+        found_reg_state_for_case: bool = bool(case_db_obj.creditor_registration_state_from_doc) if case_db_obj.is_business else True # True if not business
+        found_final_judgment_awarded_for_case: bool = bool(case_db_obj.final_judgment_awarded_to_creditor)
+        
+        # For associated parties, from case_db_obj.associated_parties_data
+        # Initialize found_party_addresses_for_case based on what's already in DB (if reprocessing an existing entry)
+        found_party_addresses_for_case: Dict[str, bool] = {} # party_name -> True if address found
+        if case_db_obj.associated_parties_data:
+            for party_entry in case_db_obj.associated_parties_data:
+                if party_entry.get("name") and party_entry.get("address"):
+                    found_party_addresses_for_case[party_entry["name"]] = True
+        # Initialize found_party_addresses_for_case for the targets from the Parties tab if not already present from DB
+        for name in target_associated_party_names:
+            if name not in found_party_addresses_for_case:
+                found_party_addresses_for_case[name] = False
+        # --- End Overall Case Processing State ---
+
+        try:
             def sort_key_for_llm_docs(doc_info: TransientDocumentInfo):
                 if doc_info.document_type == db_models.DocumentTypeEnum.FINAL_JUDGMENT:
                     return 0  # Process FJs first
@@ -301,14 +517,33 @@ class CaseProcessorService:
             llm_bundle_docs.sort(key=sort_key_for_llm_docs)
             logger.info(f"[{case_number_for_db}] Sorted llm_bundle_docs for processing. Order: {[d.document_type.value for d in llm_bundle_docs]}")
 
-
             # --- Phase 3: Process Downloaded Documents with LLM ---
             logger.info(f"[{case_number_for_db}] Processing {len(llm_bundle_docs)} downloaded documents with LLM.")
             
             docs_iterated_count = 0 # To track how many docs we've started to process in the loop
 
-            for trans_doc_info in llm_bundle_docs: 
+            # Short filings (e.g. a 2-page FJ and a 2-page complaint) share one LLM call; whatever isn't packed,
+            # or a pack the LLM couldn't attribute, goes through the per-document loop below
+            packed_doc_indices: Set[int] = set()
+            if self.settings.LLM_CROSS_DOCUMENT_BATCHING_ENABLED and len(llm_bundle_docs) > 1:
+                packed_doc_indices, found_original_creditor_name_for_case, found_creditor_address_for_case, \
+                found_reg_state_for_case, found_final_judgment_awarded_for_case, found_party_addresses_for_case = \
+                    await self._process_document_pack_with_llm(
+                        llm_bundle_docs,
+                        case_db_obj,
+                        found_original_creditor_name_for_case,
+                        found_creditor_address_for_case,
+                        found_reg_state_for_case,
+                        found_final_judgment_awarded_for_case,
+                        found_party_addresses_for_case,
+                        target_associated_party_names,
+                        case_llm_usage
+                    )
+
+            for doc_index, trans_doc_info in enumerate(llm_bundle_docs):
                 docs_iterated_count += 1
+                if doc_index in packed_doc_indices:
+                    continue # Already sent to the LLM together with other small documents
                 logger.info(f"[{case_number_for_db}] Considering LLM for: {trans_doc_info.original_title} (Type: {trans_doc_info.document_type.value})")
                 
                 # Determine if all required data for the case has *already* been found *before* this document
@@ -329,6 +564,7 @@ class CaseProcessorService:
                     continue # Move to the next document in llm_bundle_docs
 
                 # If we reach here, some case-level info is still needed, so we process this document with LLM
+                doc_llm_usage = LLMUsage()
                 returned_llm_data, llm_notes, \
                 found_original_creditor_name_for_case, found_creditor_address_for_case, \
                 found_reg_state_for_case, found_final_judgment_awarded_for_case, found_party_addresses_for_case = \
@@ -340,8 +576,10 @@ class CaseProcessorService:
                         found_reg_state_for_case,
                         found_final_judgment_awarded_for_case,
                         found_party_addresses_for_case,
-                        target_associated_party_names
+                        target_associated_party_names,
+                        usage=doc_llm_usage
                     )
+                case_llm_usage.add(doc_llm_usage)
                 
                 # Determine the outcome status for *this document's* LLM processing attempt
                 current_doc_llm_status: db_models.DocumentProcessingStatusEnum
@@ -357,7 +595,8 @@ class CaseProcessorService:
                 else: # Assumed success if llm_data is present and no specific error notes for this doc
                     current_doc_llm_status = db_models.DocumentProcessingStatusEnum.LLM_EXTRACTION_SUCCESS
                 
-                self._update_doc_summary_status(case_db_obj, trans_doc_info.original_title, trans_doc_info.unicourt_doc_key, current_doc_llm_status, llm_notes)
+                self._update_doc_summary_status(case_db_obj, trans_doc_info.original_title, trans_doc_info.unicourt_doc_key, current_doc_llm_status, llm_notes,
+                                                llm_usage=doc_llm_usage.summary())
 
             # are also marked appropriately. This is more of a safeguard now.
             if docs_iterated_count < len(llm_bundle_docs):
@@ -415,43 +654,44 @@ class CaseProcessorService:
                 
                 logger.info(f"[{case_number_for_db}] Case processing finished. Final status: {final_case_status.value}")
 
-        except (Exception) as e: # Catch custom stop exceptions and others
-            error_msg = f"Error processing case {case_number_for_db} (ID: {case_id}): {type(e).__name__} - {str(e)}"
-            if str(e) == "VoluntaryDismissalStopProcessing":
-                # Final status already set if this was the cause
-                pass
-            elif str(e) == "NoDocsForLLMStopProcessing":
-                # Final status already set if this was the cause
-                pass
-            else: # Unhandled/generic error
-                logger.critical(error_msg, exc_info=True)
-                page_to_shot = case_page if case_page and not case_page.is_closed() else dashboard_page
-                if page_to_shot and not page_to_shot.is_closed():
-                    await playwright_utils.safe_screenshot(page_to_shot, self.settings, "critical_case_proc_error", case_number_for_db)
-                final_case_status = db_models.CaseStatusEnum.WORKER_ERROR
+        except Exception as e:
+            logger.critical(f"Error in LLM stage for case {case_number_for_db} (ID: {case_id}): {type(e).__name__} - {str(e)}", exc_info=True)
+            final_case_status = db_models.CaseStatusEnum.WORKER_ERROR
         finally:
-            if case_page and not case_page.is_closed():
-                try: await case_page.close()
-                except Exception as e_close: logger.error(f"Error closing case_page in finally: {e_close}")
-            
-            if dashboard_page and not dashboard_page.is_closed():
-                 logger.debug(f"[{case_number_for_db}] Clearing search on dashboard page post-processing.")
-                 await self.unicourt_handler.clear_search_input(dashboard_page)
+            self._save_case_llm_usage(case_db_obj, case_llm_usage)
+            self._finalize_case(case_id, case_number_for_db, llm_job.temp_case_download_path, final_case_status)
 
-            # Clean up temporary downloaded files for this case
-            try:
-                if os.path.exists(temp_case_specific_download_path):
-                    shutil.rmtree(temp_case_specific_download_path)
-                    logger.info(f"[{case_number_for_db}] Successfully deleted temp download folder: {temp_case_specific_download_path}")
-            except Exception as e_rm_final:
-                logger.error(f"[{case_number_for_db}] Failed to delete temp download folder {temp_case_specific_download_path}: {e_rm_final}")
-
-            # Update final case status in DB
-            crud.update_case_status(self.db, case_id, final_case_status)
-            logger.info(f"[{case_number_for_db}] Cleaned up. Final DB status: {final_case_status.value}")
-
-    def _update_doc_summary_status(self, case_db_obj: db_models.Case, doc_name: str, doc_key: Optional[str], new_status: db_models.DocumentProcessingStatusEnum, notes: Optional[str] = None):
-        """Helper to update a specific document's status in the summary list."""
+    def _temp_case_download_path(self, case_number_for_db: str) -> str:
+        sane_case_folder_name = common.sanitize_filename(case_number_for_db)
+        # CURRENT_DOWNLOAD_LOCATION is the base for DB file and session, temp files go into subfolder
+        return os.path.join(self.settings.CURRENT_DOWNLOAD_LOCATION, "temp_case_files", sane_case_folder_name)
+
+    def _remove_temp_case_files(self, case_number_for_db: str, temp_case_specific_download_path: str):
+        # Clean up temporary downloaded files for this case
+        try:
+            if os.path.exists(temp_case_specific_download_path):
+                shutil.rmtree(temp_case_specific_download_path)
+                logger.info(f"[{case_number_for_db}] Successfully deleted temp download folder: {temp_case_specific_download_path}")
+        except Exception as e_rm_final:
+            logger.error(f"[{case_number_for_db}] Failed to delete temp download folder {temp_case_specific_download_path}: {e_rm_final}")
+
+    def _finalize_case(self, case_id: int, case_number_for_db: str, temp_case_specific_download_path: str, final_case_status: db_models.CaseStatusEnum):
+        self._remove_temp_case_files(case_number_for_db, temp_case_specific_download_path)
+        # Update final case status in DB
+        crud.update_case_status(self.db, case_id, final_case_status)
+        logger.info(f"[{case_number_for_db}] Cleaned up. Final DB status: {final_case_status.value}")
+
+    def _save_case_llm_usage(self, case_db_obj: db_models.Case, case_llm_usage: LLMUsage):
+        case_db_obj.llm_usage_totals = case_llm_usage.summary()
+        try:
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"[{case_db_obj.case_number}] DB error saving LLM usage totals: {e}")
+            self.db.rollback()
+
+    def _update_doc_summary_status(self, case_db_obj: db_models.Case, doc_name: str, doc_key: Optional[str], new_status: db_models.DocumentProcessingStatusEnum, notes: Optional[str] = None,
+                                   llm_usage: Optional[Dict[str, Any]] = None):
+        """Helper to update a specific document's status (and LLM usage, if given) in the summary list."""
         if case_db_obj.processed_documents_summary is None: # Should be initialized as []
             case_db_obj.processed_documents_summary = []
         
@@ -464,6 +704,7 @@ class CaseProcessorService:
             if match_key or match_name_if_no_key:
                 item["status"] = new_status.value
                 if notes: item["notes"] = notes # Add or overwrite notes
+                if llm_usage is not None: item["llm_usage"] = llm_usage
                 logger.debug(f"[{case_db_obj.case_number}] Updated doc '{doc_name}' (Key: {doc_key}) status to '{new_status.value}' in summary.")
                 updated = True
                 break
@@ -473,7 +714,8 @@ class CaseProcessorService:
                 "document_name": doc_name,
                 "unicourt_doc_key": doc_key,
                 "status": new_status.value,
-                "notes": notes
+                "notes": notes,
+                **({"llm_usage": llm_usage} if llm_usage is not None else {})
             })
         
         case_db_obj.processed_documents_summary = summary_list # Assign back
@@ -0,0 +1,66 @@
+# app/services/download_limiter.py
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class _HostState:
+    def __init__(self, max_concurrent: int):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.start_lock = asyncio.Lock()
+        self.last_start = float("-inf")
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_downloads = 0
+
+
+class HostDownloadLimiter:
+    """
+    Process-wide politeness limit for document downloads, shared by every worker: at most `max_concurrent_per_host`
+    downloads per host at once, and consecutive downloads to a host start at least `min_interval_seconds` apart.
+    Per-case parallelism (DOCUMENT_DOWNLOAD_CONCURRENCY) sits underneath this.
+    """
+    def __init__(self, max_concurrent_per_host: int, min_interval_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_concurrent_per_host = max(1, max_concurrent_per_host)
+        self.min_interval_seconds = max(0.0, min_interval_seconds)
+        self._clock = clock
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _host_state(self, url: str) -> _HostState:
+        host = urlparse(url).netloc.lower()
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.max_concurrent_per_host)
+        return self._hosts[host]
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Holds one download slot for the URL's host; waits for a free slot and for the start interval."""
+        state = self._host_state(url)
+        async with state.semaphore:
+            async with state.start_lock:
+                wait = state.last_start + self.min_interval_seconds - self._clock()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                state.last_start = self._clock()
+            state.in_flight += 1
+            state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+            try:
+                yield
+            finally:
+                state.in_flight -= 1
+                state.total_downloads += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent_per_host": self.max_concurrent_per_host,
+            "min_interval_seconds": self.min_interval_seconds,
+            "hosts": {
+                host: {"in_flight": state.in_flight, "peak_in_flight": state.peak_in_flight, "total_downloads": state.total_downloads}
+                for host, state in self._hosts.items()
+            },
+        }
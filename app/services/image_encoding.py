@@ -0,0 +1,68 @@
+# app/services/image_encoding.py
+import base64
+import io
+import logging
+from typing import Dict, Literal, Optional
+from PIL import Image
+from pydantic import BaseModel, Field
+
+from app.core.config import AppSettings
+from app.db.models import DocumentTypeEnum
+
+logger = logging.getLogger(__name__)
+
+
+class ImageEncodingProfile(BaseModel):
+    """How a document page is rendered and encoded before it is sent to the LLM."""
+    name: str
+    dpi: int = Field(144, gt=0) # PDF render resolution (72 = 1x). TIFF frames keep their own resolution
+    color_mode: Literal["RGB", "L", "1"] = "RGB" # Full color, grayscale or bilevel (black/white)
+    image_format: Literal["PNG", "JPEG", "WEBP"] = "PNG"
+    quality: int = Field(85, ge=1, le=100) # JPEG/WebP only
+    max_dimension: Optional[int] = Field(None, gt=0) # Longest side in pixels; larger pages are downscaled
+
+    @property
+    def mime_type(self) -> str:
+        return f"image/{self.image_format.lower()}"
+
+
+IMAGE_ENCODING_PROFILES: Dict[str, ImageEncodingProfile] = {
+    # What we always sent: 2x render, full-color PNG
+    "legacy": ImageEncodingProfile(name="legacy", dpi=144, color_mode="RGB", image_format="PNG"),
+    # Court documents are black text on white; grayscale JPEG keeps them legible at a fraction of the size
+    "grayscale_jpeg": ImageEncodingProfile(name="grayscale_jpeg", dpi=150, color_mode="L", image_format="JPEG", quality=70, max_dimension=2000),
+    "compact_webp": ImageEncodingProfile(name="compact_webp", dpi=110, color_mode="L", image_format="WEBP", quality=55, max_dimension=1600),
+    # Bilevel PNG compresses clean scans very well, but loses faint stamps and signatures
+    "bilevel": ImageEncodingProfile(name="bilevel", dpi=200, color_mode="1", image_format="PNG", max_dimension=2200),
+}
+
+DEFAULT_IMAGE_ENCODING_PROFILE = "legacy"
+
+
+def resolve_image_encoding_profile(settings: AppSettings, document_type: Optional[DocumentTypeEnum] = None) -> ImageEncodingProfile:
+    """Profile configured for the document type, falling back to IMAGE_ENCODING_PROFILE and then to 'legacy'."""
+    per_type = {
+        DocumentTypeEnum.FINAL_JUDGMENT: settings.IMAGE_ENCODING_PROFILE_FJ,
+        DocumentTypeEnum.COMPLAINT: settings.IMAGE_ENCODING_PROFILE_COMPLAINT,
+    }
+    name = per_type.get(document_type) or settings.IMAGE_ENCODING_PROFILE
+    profile = IMAGE_ENCODING_PROFILES.get(name)
+    if profile is None:
+        logger.warning(f"Unknown image encoding profile '{name}'. Using '{DEFAULT_IMAGE_ENCODING_PROFILE}'.")
+        profile = IMAGE_ENCODING_PROFILES[DEFAULT_IMAGE_ENCODING_PROFILE]
+    return profile
+
+
+def encode_page_image(img: Image.Image, profile: ImageEncodingProfile) -> str:
+    """Applies the profile's color mode, size cap and format to one page. Returns a data URL."""
+    if img.mode != profile.color_mode:
+        img = img.convert(profile.color_mode)
+    if profile.max_dimension and max(img.size) > profile.max_dimension:
+        img = img.copy()
+        img.thumbnail((profile.max_dimension, profile.max_dimension), Image.LANCZOS)
+    img_byte_arr = io.BytesIO()
+    if profile.image_format == "PNG":
+        img.save(img_byte_arr, format="PNG")
+    else:
+        img.save(img_byte_arr, format=profile.image_format, quality=profile.quality)
+    return f"data:{profile.mime_type};base64,{base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')}"
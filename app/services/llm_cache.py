@@ -0,0 +1,99 @@
+# app/services/llm_cache.py
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Any, Tuple
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db import crud
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def hash_file_contents(file_path: str) -> str:
+    """sha256 of the file. Blocking; call it off the event loop."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_cache_key(content_hash: str, model: str, prompt_text: str, input_signature: str) -> str:
+    """
+    Key of one extraction: same document bytes, same model, same prompt (which encodes the requested fields,
+    creditor and target parties) and same page encoding/batching (input_signature).
+    """
+    digest = hashlib.sha256()
+    for part in (content_hash, model, prompt_text, input_signature):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LLMExtractionCache:
+    """
+    Persistent (llm_extraction_cache table) store of parsed LLM answers per document and request.
+
+    A resubmitted case, or a document shared by several cases, is answered from here instead of another set of
+    vision calls. Entries expire after ttl_hours; above max_entries the least recently used ones are evicted.
+    Hit/miss counters are per process; entry and total hit counts come from the table.
+    """
+    def __init__(self, ttl_hours: float, max_entries: int, session_factory: Callable[[], Session] = SessionLocal):
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_entries = max_entries
+        self._session_factory = session_factory
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _run_db(self, fn, *args, **kwargs):
+        db = self._session_factory()
+        try:
+            return fn(db, *args, **kwargs)
+        finally:
+            db.close()
+
+    def get(self, cache_key: str) -> Optional[Tuple[Dict[str, Any], Optional[str]]]:
+        """
+        (response data, notes stored with it) for cache_key, or None on a miss. Errors count as misses.
+        The notes are the original LLM notes, so a hit can be classified like the call that produced it.
+        """
+        try:
+            entry = self._run_db(crud.get_llm_cache_entry, cache_key, datetime.utcnow() - self.ttl)
+            cached = (dict(entry.response_data), entry.notes) if entry is not None else None
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed, treating as miss: {e}")
+            cached = None
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+
+    def put(self, cache_key: str, content_hash: str, model: str, response_data: Dict[str, Any], notes: Optional[str] = None) -> None:
+        try:
+            self._run_db(crud.upsert_llm_cache_entry, cache_key, content_hash, model, response_data, notes)
+            self.stores += 1
+            self.evictions += self._run_db(crud.evict_llm_cache_entries, datetime.utcnow() - self.ttl, self.max_entries)
+        except Exception as e:
+            logger.warning(f"Could not store LLM cache entry: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats: Dict[str, Any] = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+        try:
+            stats.update(self._run_db(crud.get_llm_cache_stats))
+        except Exception as e:
+            logger.warning(f"Could not read LLM cache stats: {e}")
+        return stats
@@ -0,0 +1,38 @@
+# app/services/llm_http_client.py
+import logging
+import httpx
+from app.core.config import AppSettings
+
+logger = logging.getLogger(__name__)
+
+
+def http2_available() -> bool:
+    """HTTP/2 in httpx needs the optional `h2` package (httpx[http2])."""
+    try:
+        import h2 # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_llm_http_client(settings: AppSettings) -> httpx.AsyncClient:
+    """
+    Long-lived client for OpenRouter calls, shared by every LLMProcessor in the process.
+    Connections are kept alive and reused, so a batch doesn't pay DNS + TCP + TLS setup each time; with HTTP/2,
+    concurrent calls are multiplexed over a few connections. The owner must aclose() it on shutdown.
+    Auth headers are set per request, since the API key can be changed at runtime.
+    """
+    use_http2 = settings.LLM_HTTP2_ENABLED and http2_available()
+    if settings.LLM_HTTP2_ENABLED and not use_http2:
+        logger.warning("LLM_HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1 keep-alive connections.")
+    client = httpx.AsyncClient(
+        http2=use_http2,
+        timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=settings.SHORT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+    logger.info(f"LLM HTTP client ready ({'HTTP/2' if use_http2 else 'HTTP/1.1'}, max {settings.LLM_HTTP_MAX_CONNECTIONS} connections).")
+    return client
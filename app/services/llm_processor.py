@@ -1,17 +1,23 @@
 # app/services/llm_processor.py
-import base64
 import json
+import time
 import httpx
 import logging
-from typing import Tuple, Optional, Dict, List, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Tuple, Optional, Dict, List, Any, AsyncIterator, Iterator
 
 from pydantic import BaseModel
 from app.core.config import AppSettings
 from app.db.models import DocumentTypeEnum # For type hint if needed
+from app.services.raster_pool import RasterPool
+from app.services.llm_rate_limiter import LLMRateLimiter, parse_retry_after, backoff_delay
+from app.services.llm_cache import LLMExtractionCache, hash_file_contents, build_cache_key
+from app.services.image_encoding import ImageEncodingProfile, IMAGE_ENCODING_PROFILES, DEFAULT_IMAGE_ENCODING_PROFILE, encode_page_image
 import fitz  # PyMuPDF
 from PIL import Image
-import io
 import os
+import re
 import asyncio
 
 # Disable PIL debug logging
@@ -19,7 +25,31 @@ logging.getLogger('PIL').setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+TEXT_LAYER_MIN_ALNUM_RATIO = 0.6 # Below this share of letters/digits a text layer is treated as garbage
+
+# Page relevance pre-pass: phrases that mark the pages the extraction fields usually sit on, by requested field
+PAGE_SCORE_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "final_judgment_awarded": {"judgment": 3.0, "in favor of": 4.0, "judgment is entered": 5.0, "it is ordered": 2.0,
+                               "it is hereby ordered": 2.0, "adjudged": 3.0, "awarded": 2.0, "decree": 1.0},
+    "original_creditor_name": {"original creditor": 5.0, "originally": 2.0, "assignee": 3.0, "assigned": 2.0,
+                               "purchased": 1.0, "successor in interest": 3.0, "charged off": 2.0},
+    "creditor_address": {"principal place of business": 4.0, "located at": 2.0, "address": 1.0, "plaintiff": 1.0},
+    "reg_state": {"organized under the laws": 5.0, "incorporated": 3.0, "corporation": 1.0,
+                  "limited liability company": 2.0, "registered agent": 2.0},
+    "associated_parties_addresses": {"resides at": 4.0, "residing at": 4.0, "last known address": 4.0,
+                                     "defendant": 1.0, "address": 1.0},
+}
+PAGE_SCORE_ADDRESS_PATTERNS = [
+    # "1234 Main Street", "55 W. Oak Ave", "100 Park Blvd Suite 200"
+    re.compile(r"\b\d{1,6}\s+(?:[A-Za-z0-9.'-]+\s+){0,4}(?:street|st|avenue|ave|road|rd|boulevard|blvd|drive|dr|lane|ln|way|"
+               r"court|ct|place|pl|parkway|pkwy|highway|hwy|circle|cir|suite|ste)\b\.?", re.IGNORECASE),
+    re.compile(r"\bP\.?\s?O\.?\s+Box\s+\d+", re.IGNORECASE),
+    re.compile(r"\b[A-Z]{2}\s+\d{5}(?:-\d{4})?\b"), # "CA 90012", "TX 75201-1234"
+]
+PAGE_SCORE_PARTY_NAME_WEIGHT = 4.0
+PAGE_SCORE_ADDRESS_WEIGHT = 2.0
+PAGE_SCORE_MAX_MATCHES_PER_TERM = 3 # An exhibit listing the same phrase 40 times isn't 40 times as relevant
+PAGE_SCORE_MIN_TEXT_CHARS = 10 # Fewer letters/digits than this (e.g. only a stamped page number): a scan, can't be scored
 
 
 class AssociatedPartyLLMDetail(BaseModel): 
@@ -36,54 +66,311 @@ class LLMResponseData(BaseModel):
     final_judgment_awarded_to_creditor_context: Optional[str] = None  # Context/phrase used to determine the judgment
 
 
+class LLMUsage(BaseModel):
+    """What LLM calls consumed, as reported by OpenRouter (usage.include); summed per document and per case."""
+    calls: int = 0 # Answered calls
+    failed_calls: int = 0 # HTTP/network errors (retried or not)
+    images: int = 0
+    text_pages: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cost_usd: float = 0.0
+    latency_seconds: float = 0.0 # Sum over answered calls
+
+    def add(self, other: "LLMUsage") -> None:
+        for field in type(self).model_fields:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def summary(self) -> Dict[str, Any]:
+        data = self.model_dump()
+        data["cost_usd"] = round(self.cost_usd, 6)
+        data["latency_seconds"] = round(self.latency_seconds, 2)
+        return data
+
+
+# Usage accumulator of the document being processed; batch tasks inherit it from the task that created them
+_current_llm_usage: ContextVar[Optional[LLMUsage]] = ContextVar("current_llm_usage", default=None)
+
+
+@contextmanager
+def recording_llm_usage(usage: Optional[LLMUsage]) -> Iterator[None]:
+    """LLM calls made inside the block (including tasks started in it) are added to `usage`."""
+    token = _current_llm_usage.set(usage)
+    try:
+        yield
+    finally:
+        _current_llm_usage.reset(token)
+
+
+class DocumentConversionError(Exception):
+    """Raised when part of a document can't be rasterized."""
+
+
+class PageContent(BaseModel):
+    """One document page as sent to the LLM: its text layer when usable, otherwise an encoded image."""
+    page_number: int # 1-based
+    text: Optional[str] = None
+    image_url: Optional[str] = None # data URL
+    document_number: Optional[int] = None # 1-based, when pages of several documents share one call
+
+
+class PackedDocument(BaseModel):
+    """One document of a multi-document LLM call (see LLMProcessor.process_document_pack_for_case_info)."""
+    file_path: str
+    title: str
+    encoding_profile: Optional[ImageEncodingProfile] = None # Default: 'legacy'
+
+
+def usable_page_text(page: "fitz.Page", min_chars: int) -> Optional[str]:
+    """
+    The page's text layer if it can stand in for the page image: at least min_chars non-whitespace characters,
+    mostly letters/digits (scanned PDFs with a broken OCR layer or glyph-mapped fonts extract as symbol soup).
+    """
+    if min_chars <= 0:
+        return None
+    return _usable_text(page.get_text("text", sort=True), min_chars)
+
+
+def _usable_text(text: str, min_chars: int) -> Optional[str]:
+    if min_chars <= 0:
+        return None
+    text = text.strip()
+    visible = re.sub(r"\s+", "", text)
+    if len(visible) < min_chars:
+        return None
+    if sum(1 for c in visible if c.isalnum()) / len(visible) < TEXT_LAYER_MIN_ALNUM_RATIO:
+        return None
+    return text
+
+
+def analyze_document_pages(file_path: str, text_layer_min_chars: int = 0) -> List[int]:
+    """
+    Per page, the length of its usable text layer (0 = the page has to be sent as an image). Doesn't render anything.
+    TIFF frames are always images. Raises DocumentConversionError.
+    """
+    return analyze_and_score_document_pages(file_path, text_layer_min_chars)[0]
+
+
+def analyze_and_score_document_pages(
+    file_path: str, text_layer_min_chars: int = 0, party_names: Optional[List[str]] = None,
+    info_to_extract: Optional[Dict[str, bool]] = None
+) -> Tuple[List[int], Optional[List[Optional[float]]]]:
+    """
+    One pass over the document (one open, one text extraction per page): the usable text layer length of every
+    page (see analyze_document_pages) and, when `info_to_extract` is given, its score_page_text relevance.
+    Pages without a text layer to score (scans, TIFF frames) get None rather than 0. Raises DocumentConversionError.
+    """
+    file_extension = os.path.splitext(file_path)[1].lower()
+    try:
+        if file_extension == ".pdf":
+            text_chars: List[int] = []
+            scores: List[Optional[float]] = []
+            with fitz.open(file_path) as pdf_document:
+                for page in pdf_document:
+                    text = page.get_text("text", sort=True)
+                    text_chars.append(len(_usable_text(text, text_layer_min_chars) or ""))
+                    if info_to_extract is not None:
+                        scoreable = sum(1 for c in text if c.isalnum()) >= PAGE_SCORE_MIN_TEXT_CHARS
+                        scores.append(score_page_text(text, party_names or [], info_to_extract) if scoreable else None)
+            return text_chars, scores if info_to_extract is not None else None
+        if file_extension == ".tif" or file_extension == ".tiff":
+            with Image.open(file_path) as img_tiff:
+                frames = img_tiff.n_frames
+            return [0] * frames, [None] * frames if info_to_extract is not None else None
+    except Exception as e:
+        raise DocumentConversionError(f"Failed to open {file_path}: {type(e).__name__} - {str(e)}") from e
+    raise DocumentConversionError(f"Unsupported file type for image conversion: {file_extension}")
+
+
+def score_page_text(text: str, party_names: List[str], info_to_extract: Dict[str, bool]) -> float:
+    """
+    Cheap relevance score of one page's text for the fields being requested: weighted keyword hits, mentions of
+    the creditor/target party names and address-shaped strings. 0 when nothing matches (or there's no text).
+    """
+    if not text:
+        return 0.0
+    lowered = re.sub(r"\s+", " ", text.lower())
+    score = 0.0
+    for field, keywords in PAGE_SCORE_KEYWORDS.items():
+        if not info_to_extract.get(field):
+            continue
+        for keyword, weight in keywords.items():
+            score += weight * min(lowered.count(keyword), PAGE_SCORE_MAX_MATCHES_PER_TERM)
+    for name in party_names:
+        name = re.sub(r"\s+", " ", name.strip().lower())
+        if name:
+            score += PAGE_SCORE_PARTY_NAME_WEIGHT * min(lowered.count(name), PAGE_SCORE_MAX_MATCHES_PER_TERM)
+    if info_to_extract.get("creditor_address") or info_to_extract.get("associated_parties_addresses"):
+        for pattern in PAGE_SCORE_ADDRESS_PATTERNS:
+            score += PAGE_SCORE_ADDRESS_WEIGHT * min(len(pattern.findall(text)), PAGE_SCORE_MAX_MATCHES_PER_TERM)
+    return score
+
+
+def rank_pages(page_scores: List[Optional[float]]) -> List[int]:
+    """
+    Order in which to send pages. Pages with a text layer are reordered among themselves: the first page (caption:
+    parties, court, case type) and then every page with a positive score, best first; the rest keep document order.
+    Pages without text to score (None, e.g. a scanned signed judgment) are neutral: they keep their slot in the
+    document order instead of going behind every text page. Without any signal this is plain document order.
+    """
+    def is_ranked(index: int) -> bool:
+        return index == 0 or page_scores[index] > 0
+    text_pages = [i for i, score in enumerate(page_scores) if score is not None]
+    ranked = sorted((i for i in text_pages if is_ranked(i)), key=lambda i: (i != 0, -page_scores[i], i))
+    text_page_order = iter(ranked + [i for i in text_pages if not is_ranked(i)])
+    return [slot if score is None else next(text_page_order) for slot, score in enumerate(page_scores)]
+
+
+def render_document_pages(
+    file_path: str,
+    first_page: int = 0,
+    last_page: Optional[int] = None,
+    profile: Optional[ImageEncodingProfile] = None,
+    text_layer_min_chars: int = 0,
+    page_indices: Optional[List[int]] = None
+) -> Tuple[List[PageContent], str]:
+    """
+    Prepares pages [first_page, last_page) of a PDF/TIFF (the whole file by default), or exactly the 0-based
+    page_indices when given, for the LLM. PDF pages with a
+    usable text layer (text_layer_min_chars > 0) are returned as text; every other page is rasterized and encoded
+    with `profile` (default: 'legacy', 2x full-color PNG). Returns (pages, notes); pages is empty on failure.
+    Top-level and side-effect free so it can run in a RasterPool worker process.
+    """
+    profile = profile or IMAGE_ENCODING_PROFILES[DEFAULT_IMAGE_ENCODING_PROFILE]
+    processing_notes = ""
+    pages: List[PageContent] = []
+    file_extension = os.path.splitext(file_path)[1].lower()
+
+    try:
+        if file_extension == ".pdf":
+            pdf_document = fitz.open(file_path)
+            zoom = profile.dpi / 72
+            # Render grayscale directly for non-color profiles: a third of the pixel data to copy and convert
+            colorspace = fitz.csRGB if profile.color_mode == "RGB" else fitz.csGRAY
+            if page_indices is None:
+                page_indices = list(range(first_page, min(len(pdf_document), last_page if last_page is not None else len(pdf_document))))
+            for page_num in page_indices:
+                page = pdf_document[page_num]
+                page_text = usable_page_text(page, text_layer_min_chars)
+                if page_text is not None:
+                    pages.append(PageContent(page_number=page_num + 1, text=page_text))
+                    continue
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace, alpha=False)
+                img = Image.frombytes("RGB" if pix.n == 3 else "L", [pix.width, pix.height], pix.samples)
+                pages.append(PageContent(page_number=page_num + 1, image_url=encode_page_image(img, profile)))
+            pdf_document.close()
+            text_count = sum(1 for p in pages if p.text is not None)
+            processing_notes = f"Converted PDF to {len(pages) - text_count} images ({profile.name})" + \
+                               (f" and {text_count} text-layer pages." if text_count else ".")
+
+        elif file_extension == ".tif" or file_extension == ".tiff":
+            img_tiff = Image.open(file_path)
+            if page_indices is None:
+                page_indices = list(range(first_page, min(img_tiff.n_frames, last_page if last_page is not None else img_tiff.n_frames)))
+            for i in page_indices: # Handle multi-page TIFFs
+                img_tiff.seek(i)
+                # Frames can be B/W, palette or CMYK; normalize before the profile's own color conversion
+                img_page = img_tiff.convert("RGB" if profile.color_mode == "RGB" else "L")
+                pages.append(PageContent(page_number=i + 1, image_url=encode_page_image(img_page, profile)))
+            img_tiff.close()
+            processing_notes = f"Converted TIFF to {len(pages)} images ({profile.name})."
+        else:
+            return [], f"Unsupported file type for image conversion: {file_extension}"
+
+        if not pages:
+            return [], f"File at {file_path} converted to 0 images."
+        return pages, processing_notes
+        
+    except Exception as e:
+        error_msg = f"Failed to convert {file_path} to images: {type(e).__name__} - {str(e)}"
+        logger.error(error_msg, exc_info=True)
+        return [], error_msg
+
+
+def convert_file_to_images(
+    file_path: str,
+    first_page: int = 0,
+    last_page: Optional[int] = None,
+    profile: Optional[ImageEncodingProfile] = None
+) -> Tuple[List[str], str]:
+    """Image-only variant of render_document_pages: (image data URLs, notes)."""
+    pages, notes = render_document_pages(file_path, first_page, last_page, profile)
+    return [p.image_url for p in pages], notes
+
+
+def plan_page_batches(page_text_chars: List[int], max_images_per_call: int, max_text_chars_per_call: int) -> List[Tuple[int, int]]:
+    """
+    Splits a document into consecutive page ranges [start, end), one per LLM call. A call holds at most
+    max_images_per_call image pages and about max_text_chars_per_call characters of text-layer pages,
+    so all-text documents go out in far fewer calls than one per MAX_IMAGES_PER_LLM_CALL pages.
+    """
+    batches: List[Tuple[int, int]] = []
+    start, images, chars = 0, 0, 0
+    for index, text_chars in enumerate(page_text_chars):
+        is_image = text_chars == 0
+        if index > start and ((is_image and images >= max_images_per_call) or (chars + text_chars > max_text_chars_per_call)):
+            batches.append((start, index))
+            start, images, chars = index, 0, 0
+        images += 1 if is_image else 0
+        chars += text_chars
+    if page_text_chars:
+        batches.append((start, len(page_text_chars)))
+    return batches
+
+
+# (start, end, pages) for one LLM call; [start, end) are positions in the order pages are sent (document order unless ranked)
+PageBatch = Tuple[int, int, List[PageContent]]
+
+
 class LLMProcessor:
-    def __init__(self, settings: AppSettings):
+    def __init__(self, settings: AppSettings, raster_pool: Optional[RasterPool] = None,
+                 extraction_cache: Optional[LLMExtractionCache] = None, http_client: Optional[httpx.AsyncClient] = None,
+                 rate_limiter: Optional[LLMRateLimiter] = None):
         self.settings = settings
+        self.rate_limiter = rate_limiter # Process-wide OpenRouter request/token budget; None = unthrottled
+        self.http_client = http_client # Shared keep-alive client owned by the worker runtime; None opens one per call
+        self.raster_pool = raster_pool # Shared process pool for rasterization; None runs it on a thread
+        self.extraction_cache = extraction_cache # Answers for documents we have already sent with the same request
 
-    def _convert_file_to_images(self, file_path: str) -> Tuple[List[str], str]: # Renamed
-        processing_notes = ""
-        image_base64_list = []
-        file_extension = os.path.splitext(file_path)[1].lower()
+    async def _run_raster_job(self, fn, *args):
+        """Runs rasterization work off the event loop so a long document doesn't stall the other workers."""
+        if self.raster_pool is not None:
+            return await self.raster_pool.run(fn, *args)
+        return await asyncio.to_thread(fn, *args)
 
+    async def _render_pages(
+        self, file_path: str, first_page: int = 0, last_page: Optional[int] = None,
+        profile: Optional[ImageEncodingProfile] = None, text_layer_min_chars: int = 0, page_indices: Optional[List[int]] = None
+    ) -> Tuple[List[PageContent], str]:
         try:
-            if file_extension == ".pdf":
-                pdf_document = fitz.open(file_path)
-                for page_num in range(len(pdf_document)):
-                    page = pdf_document[page_num]
-                    pix = page.get_pixmap(matrix=fitz.Matrix(2, 2)) # Higher DPI
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    
-                    img_byte_arr = io.BytesIO()
-                    img.save(img_byte_arr, format='PNG') # Convert to PNG for consistency
-                    img_base64 = base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
-                    image_base64_list.append(img_base64)
-                pdf_document.close()
-                processing_notes = f"Converted PDF to {len(image_base64_list)} PNG images."
-
-            elif file_extension == ".tif" or file_extension == ".tiff":
-                img_tiff = Image.open(file_path)
-                for i in range(img_tiff.n_frames): # Handle multi-page TIFFs
-                    img_tiff.seek(i)
-                    # Convert to RGB if not already (some TIFFs can be B/W or other modes)
-                    img_page = img_tiff.convert("RGB") 
-                    
-                    img_byte_arr = io.BytesIO()
-                    img_page.save(img_byte_arr, format='PNG') # Convert to PNG
-                    img_base64 = base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
-                    image_base64_list.append(img_base64)
-                processing_notes = f"Converted TIFF to {len(image_base64_list)} PNG images."
-            else:
-                return [], f"Unsupported file type for image conversion: {file_extension}"
-
-            if not image_base64_list:
-                return [], f"File at {file_path} converted to 0 images."
-            return image_base64_list, processing_notes
-            
+            return await self._run_raster_job(render_document_pages, file_path, first_page, last_page, profile, text_layer_min_chars, page_indices)
         except Exception as e:
             error_msg = f"Failed to convert {file_path} to images: {type(e).__name__} - {str(e)}"
             logger.error(error_msg, exc_info=True)
             return [], error_msg
 
+    async def _render_batches(
+        self, file_path: str, page_ranges: List[Tuple[int, int]],
+        profile: Optional[ImageEncodingProfile] = None, text_layer_min_chars: int = 0, page_order: Optional[List[int]] = None
+    ) -> AsyncIterator[PageBatch]:
+        """
+        Renders one batch of pages at a time, only when the consumer asks for it. With page_order, the ranges are
+        positions in that send order (see rank_pages); each batch is rendered in document order.
+        """
+        for start_index, end_index in page_ranges:
+            if page_order is None:
+                pages, notes = await self._render_pages(file_path, start_index, end_index, profile, text_layer_min_chars)
+            else:
+                indices = sorted(page_order[start_index:end_index])
+                if indices == list(range(indices[0], indices[-1] + 1)):
+                    pages, notes = await self._render_pages(file_path, indices[0], indices[-1] + 1, profile, text_layer_min_chars)
+                else:
+                    pages, notes = await self._render_pages(file_path, profile=profile, text_layer_min_chars=text_layer_min_chars, page_indices=indices)
+            if not pages:
+                raise DocumentConversionError(notes)
+            yield start_index, end_index, pages
+
     def _build_dynamic_prompt(
         self,
         input_creditor_name: str,
@@ -93,8 +380,8 @@ class LLMProcessor:
         creditor_type: str
     ) -> str:
         prompt_parts = [
-            f"You are an expert legal assistant analyzing a court document (provided as images). The primary creditor of interest is '{input_creditor_name}'."
-            "Please extract the following information based *only* on the content of the provided document images:"
+            f"You are an expert legal assistant analyzing a court document (provided as page images and/or extracted page text, each page introduced by a [Page N] marker). The primary creditor of interest is '{input_creditor_name}'."
+            "Please extract the following information based *only* on the content of the provided document pages:"
         ]
 
         if info_needed.get("original_creditor_name"):
@@ -190,13 +477,19 @@ Ensure all string values are properly escaped within the JSON. If a top-level fi
                 return text 
         return text # Return original if no clear JSON object delimiters found
 
-    async def _call_llm_with_image_batch(
+    def _estimate_input_tokens(self, prompt_text: str, page_batch: List[PageContent]) -> int:
+        """Rough input size for the token budget: ~4 characters per text token plus a flat cost per image."""
+        text_chars = len(prompt_text) + sum(len(p.text) for p in page_batch if p.text is not None)
+        num_images = sum(1 for p in page_batch if p.text is None)
+        return text_chars // 4 + num_images * self.settings.LLM_ESTIMATED_TOKENS_PER_IMAGE
+
+    async def _call_llm_with_page_batch(
         self,
-        image_batch_b64: List[str], # A subset of images
+        page_batch: List[PageContent], # A subset of the document's pages
         prompt_text: str,
         attempt: int = 1
     ) -> Tuple[Optional[Dict[str, Any]], str]: # Returns raw JSON dict from LLM or None, and notes
-        """Helper to make a single API call with a batch of images."""
+        """Helper to make a single API call with a batch of pages (text-layer pages as text, the rest as images)."""
         headers = {
             "Authorization": f"Bearer {self.settings.OPENROUTER_API_KEY}",
             "Content-Type": "application/json",
@@ -205,47 +498,104 @@ Ensure all string values are properly escaped within the JSON. If a top-level fi
             "X-Title": "UniCourt Processor Backend"
         }
 
-        logger.debug(f"Preparing LLM call with {len(image_batch_b64)} images for prompt: {prompt_text}... (Attempt {attempt})")
+        num_images = sum(1 for p in page_batch if p.text is None)
+        logger.debug(f"Preparing LLM call with {num_images} images and {len(page_batch) - num_images} text pages for prompt: {prompt_text}... (Attempt {attempt})")
         
         content_parts: List[Dict[str, Any]] = [{"type": "text", "text": prompt_text}]
-        for img_b64 in image_batch_b64:
-            content_parts.append({"type": "image_url", "image_url": {"url": f"data:image/png;base64,{img_b64}"}})
+        for page in page_batch:
+            marker = f"[Page {page.page_number}]" if page.document_number is None else f"[Document {page.document_number}, Page {page.page_number}]"
+            if page.text is not None:
+                content_parts.append({"type": "text", "text": f"{marker}\n{page.text}"})
+            else:
+                content_parts.append({"type": "text", "text": marker})
+                content_parts.append({"type": "image_url", "image_url": {"url": page.image_url}})
 
         data = {
             "model": self.settings.OPENROUTER_LLM_MODEL,
             "messages": [{"role": "user", "content": content_parts}],
             "max_tokens": 1500,
-            "temperature": 0.1
+            "temperature": 0.1,
+            "usage": {"include": True} # Token counts and cost in the response, for per-document accounting
         }
+        usage = _current_llm_usage.get()
         
         try:
-            async with httpx.AsyncClient(timeout=self.settings.LLM_TIMEOUT_SECONDS) as client:
-                logger.info(f"Calling LLM API (attempt {attempt}) with {len(image_batch_b64)} images.")
-                response = await client.post(OPENROUTER_API_URL, headers=headers, json=data)
-                response.raise_for_status()
-                response_json = response.json()
-                message_content_str = response_json.get("choices", [{}])[0].get("message", {}).get("content", "")
-                
-                if not message_content_str:
-                    return None, "LLM response content is empty."
-
-                # Strip markdown fences before parsing
-                cleaned_json_str = self._strip_markdown_json(message_content_str)
-                
-                try:
-                    extracted_json_dict = json.loads(cleaned_json_str)
-                    return extracted_json_dict, "LLM call successful, content parsed to dict."
-                except json.JSONDecodeError as e_json:
-                    # Log the cleaned string as well for better debugging
-                    return None, f"Failed to parse JSON from LLM response. Cleaned string: '{cleaned_json_str}'.\nOriginal string: '{message_content_str}'.\nError: {e_json}"
+            if self.rate_limiter is not None:
+                waited = await self.rate_limiter.acquire(self._estimate_input_tokens(prompt_text, page_batch))
+                if waited > 1:
+                    logger.info(f"LLM rate limiter held this call back for {waited:.1f}s.")
+            logger.info(f"Calling LLM API (attempt {attempt}) with {num_images} images and {len(page_batch) - num_images} text pages.")
+            started = time.perf_counter()
+            if self.http_client is not None:
+                response = await self.http_client.post(self.settings.OPENROUTER_API_URL, headers=headers, json=data)
+            else:
+                async with httpx.AsyncClient(timeout=self.settings.LLM_TIMEOUT_SECONDS) as client:
+                    response = await client.post(self.settings.OPENROUTER_API_URL, headers=headers, json=data)
+            response.raise_for_status()
+            response_json = response.json()
+            if usage is not None:
+                reported = response_json.get("usage") or {}
+                usage.calls += 1
+                usage.images += num_images
+                usage.text_pages += len(page_batch) - num_images
+                usage.prompt_tokens += int(reported.get("prompt_tokens") or 0)
+                usage.completion_tokens += int(reported.get("completion_tokens") or 0)
+                usage.total_tokens += int(reported.get("total_tokens") or 0)
+                usage.cost_usd += float(reported.get("cost") or 0)
+                usage.latency_seconds += time.perf_counter() - started
+            message_content_str = response_json.get("choices", [{}])[0].get("message", {}).get("content", "")
+            
+            if not message_content_str:
+                return None, "LLM response content is empty."
+
+            # Strip markdown fences before parsing
+            cleaned_json_str = self._strip_markdown_json(message_content_str)
+            
+            try:
+                extracted_json_dict = json.loads(cleaned_json_str)
+                return extracted_json_dict, "LLM call successful, content parsed to dict."
+            except json.JSONDecodeError as e_json:
+                # Log the cleaned string as well for better debugging
+                return None, f"Failed to parse JSON from LLM response. Cleaned string: '{cleaned_json_str}'.\nOriginal string: '{message_content_str}'.\nError: {e_json}"
         except httpx.HTTPStatusError as e:
+            if usage is not None:
+                usage.failed_calls += 1
+            if e.response.status_code in (429, 503) and self.rate_limiter is not None:
+                retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                if retry_after is not None or e.response.status_code == 429:
+                    self.rate_limiter.pause_for(retry_after if retry_after is not None else self.settings.LLM_RETRY_BASE_SECONDS)
             return None, f"LLM API HTTP Error {e.response.status_code} (attempt {attempt}): {e.response.text}"
         except httpx.RequestError as e:
+            if usage is not None:
+                usage.failed_calls += 1
             return None, f"LLM API Request Error (attempt {attempt}): {str(e)}"
         except Exception as e:
             return None, f"Unexpected LLM call error (attempt {attempt}): {type(e).__name__} - {str(e)}"
 
 
+    @staticmethod
+    def _has_all_requested_info(
+        aggregated_llm_data: LLMResponseData,
+        is_business: bool,
+        target_associated_party_names: List[str],
+        info_to_extract_for_doc: Dict[str, bool]
+    ) -> bool:
+        """True once every field requested for this document pass has been found, so later pages can be skipped."""
+        if info_to_extract_for_doc.get("original_creditor_name") and not aggregated_llm_data.original_creditor_name:
+            return False
+        if info_to_extract_for_doc.get("creditor_address") and not aggregated_llm_data.creditor_address:
+            return False
+        if is_business and info_to_extract_for_doc.get("reg_state") and not aggregated_llm_data.creditor_registration_state:
+            return False
+        if info_to_extract_for_doc.get("final_judgment_awarded") and not (
+                aggregated_llm_data.final_judgment_awarded_to_creditor and aggregated_llm_data.final_judgment_awarded_to_creditor_context):
+            return False
+        if info_to_extract_for_doc.get("associated_parties_addresses"):
+            found_party_names = {p.name for p in aggregated_llm_data.associated_parties if p.address}
+            if any(name not in found_party_names for name in target_associated_party_names):
+                return False
+        return True
+
     async def extract_info_from_document_images( # Renamed from extract_info_from_pdf_images
         self,
         all_images_base64: List[str],
@@ -257,9 +607,94 @@ Ensure all string values are properly escaped within the JSON. If a top-level fi
         max_images_per_llm_call: int,
         max_llm_attempts_per_batch: int
     ) -> Tuple[Optional[LLMResponseData], str]:
-
+        """Same as process_document_for_case_info, for page images that are already rendered (data URLs or base64 PNG)."""
         if not all_images_base64:
             return None, "No document image content provided to LLM."
+
+        pages = [
+            PageContent(page_number=index + 1, image_url=img if img.startswith("data:") else f"data:image/png;base64,{img}")
+            for index, img in enumerate(all_images_base64)
+        ]
+        page_ranges = plan_page_batches([0] * len(pages), max_images_per_llm_call, self.settings.TEXT_LAYER_MAX_CHARS_PER_CALL)
+
+        async def page_batches() -> AsyncIterator[PageBatch]:
+            for start_index, end_index in page_ranges:
+                yield start_index, end_index, pages[start_index:end_index]
+
+        return await self._extract_info_from_page_batches(
+            page_batches(), len(pages), len(page_ranges), input_creditor_name, is_business, creditor_type,
+            target_associated_party_names, info_to_extract_for_doc, max_llm_attempts_per_batch
+        )
+
+    async def _call_llm_with_retries(
+        self, page_batch: List[PageContent], prompt_text: str, batch_index: int, max_llm_attempts_per_batch: int
+    ) -> Tuple[Optional[Dict[str, Any]], str]:
+        raw_json_dict: Optional[Dict[str, Any]] = None
+        batch_note = ""
+        for attempt in range(1, max_llm_attempts_per_batch + 1):
+            raw_json_dict, batch_note = await self._call_llm_with_page_batch(page_batch, prompt_text, attempt)
+            if raw_json_dict is not None: # Successful call and JSON parsing
+                break 
+            logger.warning(f"LLM batch {batch_index+1} attempt {attempt} failed. Note: {batch_note}")
+            if attempt < max_llm_attempts_per_batch:
+                # Jittered so batches that failed together don't retry together; a Retry-After pause is enforced by the rate limiter
+                await asyncio.sleep(backoff_delay(attempt, self.settings.LLM_RETRY_BASE_SECONDS, self.settings.LLM_RETRY_MAX_SECONDS))
+        return raw_json_dict, batch_note
+
+    @staticmethod
+    def _merge_batch_data(aggregated_llm_data: LLMResponseData, raw_json_dict: Dict[str, Any], batch_index: int, all_batch_notes: List[str]) -> None:
+        """Merges one batch's answer into the document result; values from earlier pages win."""
+        i = batch_index
+        try:
+            # Convert any "Not Found" strings to None for consistency
+            for key in raw_json_dict:
+                if key != "associated_parties" and raw_json_dict[key] == "Not Found":
+                    raw_json_dict[key] = None
+            
+            # Validate and merge data from this batch
+            batch_llm_data = LLMResponseData(**raw_json_dict)
+            
+            # Merge logic: Prioritize newly found data
+            if batch_llm_data.original_creditor_name and not aggregated_llm_data.original_creditor_name:
+                aggregated_llm_data.original_creditor_name = batch_llm_data.original_creditor_name
+            if batch_llm_data.creditor_address and not aggregated_llm_data.creditor_address:
+                aggregated_llm_data.creditor_address = batch_llm_data.creditor_address
+            if batch_llm_data.creditor_registration_state and not aggregated_llm_data.creditor_registration_state:
+                aggregated_llm_data.creditor_registration_state = batch_llm_data.creditor_registration_state
+            if batch_llm_data.final_judgment_awarded_to_creditor and not aggregated_llm_data.final_judgment_awarded_to_creditor:
+                aggregated_llm_data.final_judgment_awarded_to_creditor = batch_llm_data.final_judgment_awarded_to_creditor
+            if batch_llm_data.final_judgment_awarded_to_creditor_context and not aggregated_llm_data.final_judgment_awarded_to_creditor_context:
+                aggregated_llm_data.final_judgment_awarded_to_creditor_context = batch_llm_data.final_judgment_awarded_to_creditor_context
+            
+            # Merge associated parties, avoiding duplicates by name
+            existing_assoc_party_names = {p.name for p in aggregated_llm_data.associated_parties}
+            for new_party_detail in batch_llm_data.associated_parties:
+                if new_party_detail.name and new_party_detail.address and new_party_detail.name not in existing_assoc_party_names:
+                    aggregated_llm_data.associated_parties.append(new_party_detail)
+                    existing_assoc_party_names.add(new_party_detail.name)
+                    
+        except Exception as e_val:
+            all_batch_notes.append(f"Batch {i+1} Pydantic/Merge Error: {e_val}. Data: {str(raw_json_dict)[:200]}")
+            logger.warning(f"Error validating/merging LLM data for batch {i+1}: {e_val}")
+
+    async def _extract_info_from_page_batches(
+        self,
+        page_batches: AsyncIterator[PageBatch],
+        num_pages: int,
+        num_batches: int,
+        input_creditor_name: str,
+        is_business: bool,
+        creditor_type: str,
+        target_associated_party_names: List[str],
+        info_to_extract_for_doc: Dict[str, bool],
+        max_llm_attempts_per_batch: int,
+        page_order: Optional[List[int]] = None
+    ) -> Tuple[Optional[LLMResponseData], str]:
+        """
+        Sends the document to the LLM one batch at a time and merges the answers. Batches are pulled lazily,
+        so when they are rendered on demand, pages after the batch that completed the requested info are never rendered.
+        page_order is the send order when pages were ranked (see rank_pages); None means document order.
+        """
         if not self.settings.OPENROUTER_API_KEY or not self.settings.OPENROUTER_LLM_MODEL or \
            self.settings.OPENROUTER_API_KEY == "default_openrouter_api_key_please_configure":
             msg = "OpenRouter API Key or Model not configured or is default."
@@ -272,9 +707,6 @@ Ensure all string values are properly escaped within the JSON. If a top-level fi
             logger.info("No new information specifically requested from LLM for this document processing pass.")
             return LLMResponseData(), "No specific information requested for this LLM pass." 
 
-        num_images = len(all_images_base64)
-        num_batches = (num_images + max_images_per_llm_call - 1) // max_images_per_llm_call
-        
         aggregated_llm_data = LLMResponseData() # To accumulate results if batching
         all_batch_notes: List[str] = []
         
@@ -289,63 +721,75 @@ Ensure all string values are properly escaped within the JSON. If a top-level fi
             creditor_type
         )
 
-        for i in range(num_batches):
-            start_index = i * max_images_per_llm_call
-            end_index = min((i + 1) * max_images_per_llm_call, num_images)
-            image_batch = all_images_base64[start_index:end_index]
-            
-            logger.info(f"Processing image batch {i+1}/{num_batches} (images {start_index+1}-{end_index}) for document.")
-
-            raw_json_dict: Optional[Dict[str, Any]] = None
-            batch_note = ""
-
-            for attempt in range(1, max_llm_attempts_per_batch + 1):
-                raw_json_dict, batch_note = await self._call_llm_with_image_batch(image_batch, prompt_text, attempt)
-                if raw_json_dict is not None: # Successful call and JSON parsing
-                    break 
-                logger.warning(f"LLM batch {i+1} attempt {attempt} failed. Note: {batch_note}")
-                if attempt < max_llm_attempts_per_batch:
-                    await asyncio.sleep(2) # Wait before retrying
-            
-            all_batch_notes.append(f"Batch {i+1}: {batch_note}")
-
-            if raw_json_dict:
-                try:
-                    # Convert any "Not Found" strings to None for consistency
-                    for key in raw_json_dict:
-                        if key != "associated_parties" and raw_json_dict[key] == "Not Found":
-                            raw_json_dict[key] = None
-                    
-                    # Validate and merge data from this batch
-                    batch_llm_data = LLMResponseData(**raw_json_dict)
-                    
-                    # Merge logic: Prioritize newly found data
-                    if batch_llm_data.original_creditor_name and not aggregated_llm_data.original_creditor_name:
-                        aggregated_llm_data.original_creditor_name = batch_llm_data.original_creditor_name
-                    if batch_llm_data.creditor_address and not aggregated_llm_data.creditor_address:
-                        aggregated_llm_data.creditor_address = batch_llm_data.creditor_address
-                    if batch_llm_data.creditor_registration_state and not aggregated_llm_data.creditor_registration_state:
-                        aggregated_llm_data.creditor_registration_state = batch_llm_data.creditor_registration_state
-                    if batch_llm_data.final_judgment_awarded_to_creditor and not aggregated_llm_data.final_judgment_awarded_to_creditor:
-                        aggregated_llm_data.final_judgment_awarded_to_creditor = batch_llm_data.final_judgment_awarded_to_creditor
-                    if batch_llm_data.final_judgment_awarded_to_creditor_context and not aggregated_llm_data.final_judgment_awarded_to_creditor_context:
-                        aggregated_llm_data.final_judgment_awarded_to_creditor_context = batch_llm_data.final_judgment_awarded_to_creditor_context
-                    
-                    # Merge associated parties, avoiding duplicates by name
-                    existing_assoc_party_names = {p.name for p in aggregated_llm_data.associated_parties}
-                    for new_party_detail in batch_llm_data.associated_parties:
-                        if new_party_detail.name and new_party_detail.address and new_party_detail.name not in existing_assoc_party_names:
-                            aggregated_llm_data.associated_parties.append(new_party_detail)
-                            existing_assoc_party_names.add(new_party_detail.name)
-                            
-                except Exception as e_val:
-                    all_batch_notes.append(f"Batch {i+1} Pydantic/Merge Error: {e_val}. Data: {str(raw_json_dict)[:200]}")
-                    logger.warning(f"Error validating/merging LLM data for batch {i+1}: {e_val}")
-            else:
-                logger.error(f"LLM processing failed for batch {i+1} after {max_llm_attempts_per_batch} attempts.")
-                # If any batch fails completely, we might return None for the whole document
-                # or return what was aggregated so far. For now, let's be strict.
-                return None, "; ".join(all_batch_notes)        
+        # Up to LLM_BATCH_CONCURRENCY batches are rendered and in flight at once. Answers are merged strictly in
+        # page order (as if sent one by one), and once the merged prefix has everything requested, the calls
+        # still outstanding are cancelled and no further pages are rendered.
+        concurrency = max(1, self.settings.LLM_BATCH_CONCURRENCY)
+        in_flight: Dict[asyncio.Task, int] = {}
+        batch_ranges: Dict[int, Tuple[int, int]] = {}
+        finished: Dict[int, Tuple[Optional[Dict[str, Any]], str]] = {}
+        next_batch_no = 0 # Next batch to pull from page_batches
+        next_to_merge = 0
+        batches_exhausted = False
+        stop_reason: Optional[Tuple[Optional[LLMResponseData], str]] = None # Set on failure or early stop
+
+        try:
+            while True:
+                while not batches_exhausted and len(in_flight) < concurrency:
+                    try:
+                        start_index, end_index, page_batch = await page_batches.__anext__()
+                    except StopAsyncIteration:
+                        batches_exhausted = True
+                        break
+                    logger.info(f"Processing page batch {next_batch_no+1}/{num_batches} (pages {', '.join(str(p.page_number) for p in page_batch)}) for document.")
+                    batch_ranges[next_batch_no] = (start_index, end_index)
+                    task = asyncio.create_task(self._call_llm_with_retries(page_batch, prompt_text, next_batch_no, max_llm_attempts_per_batch))
+                    in_flight[task] = next_batch_no
+                    next_batch_no += 1
+                if not in_flight:
+                    break
+
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    finished[in_flight.pop(task)] = task.result()
+
+                while next_to_merge in finished:
+                    i = next_to_merge
+                    next_to_merge += 1
+                    raw_json_dict, batch_note = finished.pop(i)
+                    all_batch_notes.append(f"Batch {i+1}: {batch_note}")
+                    if not raw_json_dict:
+                        logger.error(f"LLM processing failed for batch {i+1} after {max_llm_attempts_per_batch} attempts.")
+                        # If any batch fails completely, we might return None for the whole document
+                        # or return what was aggregated so far. For now, let's be strict.
+                        stop_reason = (None, "; ".join(all_batch_notes))
+                        break
+                    self._merge_batch_data(aggregated_llm_data, raw_json_dict, i, all_batch_notes)
+
+                    end_index = batch_ranges[i][1]
+                    if end_index < num_pages and self._has_all_requested_info(aggregated_llm_data, is_business, target_associated_party_names, info_to_extract_for_doc):
+                        if page_order is None:
+                            skipped_pages = f"{end_index+1}-{num_pages}"
+                        else:
+                            skipped_pages = ", ".join(str(page_index + 1) for page_index in sorted(page_order[end_index:]))
+                        logger.info(f"All requested information found after batch {i+1}/{num_batches}; skipping pages {skipped_pages}.")
+                        all_batch_notes.append(f"Stopped after batch {i+1}/{num_batches}: all requested info found, pages {skipped_pages} skipped")
+                        stop_reason = (aggregated_llm_data, "")
+                        break
+                if stop_reason is not None:
+                    break
+        finally:
+            # Failure, early stop or cancellation of the whole document: drop the calls nobody will merge
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            if hasattr(page_batches, "aclose"):
+                await page_batches.aclose()
+
+        if stop_reason is not None and stop_reason[0] is None:
+            return stop_reason
+
         # Check if any meaningful data was aggregated
         if not aggregated_llm_data.original_creditor_name and \
            not aggregated_llm_data.creditor_address and \
@@ -370,32 +814,224 @@ Ensure all string values are properly escaped within the JSON. If a top-level fi
         target_associated_party_names: List[str], # For the whole case
         info_to_extract_for_doc: Dict[str, bool], # Specifically for this document pass
         max_images_per_llm_call: int,
-        max_llm_attempts_per_batch: int
+        max_llm_attempts_per_batch: int,
+        encoding_profile: Optional[ImageEncodingProfile] = None, # Default: 'legacy'
+        usage: Optional[LLMUsage] = None # Filled with what this document's LLM calls consumed
 
     ) -> Tuple[Optional[LLMResponseData], str]:
         
         logger.info(f"Starting LLM processing for document: {doc_full_path}")
-        images_base64, conv_notes = self._convert_file_to_images(doc_full_path) # Use new method
-        
-        if not images_base64:
+        encoding_profile = encoding_profile or IMAGE_ENCODING_PROFILES[DEFAULT_IMAGE_ENCODING_PROFILE]
+        text_layer_min_chars = self.settings.TEXT_LAYER_MIN_CHARS_PER_PAGE
+
+        cache_key: Optional[str] = None
+        content_hash: Optional[str] = None
+        if self.extraction_cache is not None and any(info_to_extract_for_doc.values()):
+            try:
+                content_hash = await asyncio.to_thread(hash_file_contents, doc_full_path)
+                prompt_text = self._build_dynamic_prompt(input_creditor_name, is_business, target_associated_party_names,
+                                                         info_to_extract_for_doc, creditor_type)
+                input_signature = (f"{encoding_profile.model_dump_json()}|text={text_layer_min_chars}/{self.settings.TEXT_LAYER_MAX_CHARS_PER_CALL}"
+                                   f"|images={max_images_per_llm_call}|ranked={self.settings.LLM_PAGE_RANKING_ENABLED}")
+                cache_key = build_cache_key(content_hash, self.settings.OPENROUTER_LLM_MODEL, prompt_text, input_signature)
+                cached = await asyncio.to_thread(self.extraction_cache.get, cache_key) # SQLite; off the event loop like the hash
+                if cached is not None:
+                    cached_data, cached_notes = cached
+                    logger.info(f"LLM extraction cache hit for document {doc_full_path}.")
+                    # The original notes decide the document status (e.g. "found no requested data"), as on the first run
+                    return LLMResponseData(**cached_data), f"LLM: Served from extraction cache (same document and request seen before). {cached_notes or ''}".strip()
+            except Exception as e: # The cache is an optimization; never fail a document because of it
+                logger.warning(f"LLM extraction cache unavailable for {doc_full_path}: {e}")
+                cache_key = None
+
+        # Text layer lengths and, for ranking, page relevance scores come from the same single pass over the file
+        rank = self.settings.LLM_PAGE_RANKING_ENABLED
+        try:
+            page_text_chars, page_scores = await self._run_raster_job(
+                analyze_and_score_document_pages, doc_full_path, text_layer_min_chars,
+                [input_creditor_name] + list(target_associated_party_names) if rank else None,
+                info_to_extract_for_doc if rank else None)
+        except Exception as e:
+            conv_notes = str(e) if isinstance(e, DocumentConversionError) else f"{type(e).__name__} - {str(e)}"
             logger.error(f"Document to images conversion failed for {doc_full_path}. Notes: {conv_notes}")
             return None, f"File_Conversion_Failed: {conv_notes}"
-            
-        llm_data, llm_api_notes = await self.extract_info_from_document_images(
-            images_base64, 
-            input_creditor_name, 
-            is_business,
-            creditor_type, 
-            target_associated_party_names,
-            info_to_extract_for_doc,
-            max_images_per_llm_call=max_images_per_llm_call,
-            max_llm_attempts_per_batch=max_llm_attempts_per_batch
-        )
+        if not page_text_chars:
+            logger.error(f"Document {doc_full_path} has no pages.")
+            return None, f"File_Conversion_Failed: File at {doc_full_path} has 0 pages."
+        # Pages that look relevant for the requested fields go out first, so the early stop skips the exhibits
+        page_order: Optional[List[int]] = None
+        if page_scores is not None and len(page_text_chars) > 1:
+            page_order = rank_pages(page_scores)
+            if page_order == list(range(len(page_text_chars))):
+                page_order = None
+        # Born-digital pages go out as their text layer; scanned pages (no usable text) as images
+        ordered_text_chars = page_text_chars if page_order is None else [page_text_chars[i] for i in page_order]
+        page_ranges = plan_page_batches(ordered_text_chars, max_images_per_llm_call, self.settings.TEXT_LAYER_MAX_CHARS_PER_CALL)
+        text_pages = sum(1 for chars in page_text_chars if chars)
+        conv_notes = (f"Document has {len(page_text_chars)} page(s), {text_pages} with a usable text layer; "
+                      f"{len(page_ranges)} batch(es), images encoded as {encoding_profile.name}.")
+        if page_order is not None:
+            conv_notes += f" Pages ranked by relevance, sent as: {', '.join(str(i + 1) for i in page_order[:20])}{'...' if len(page_order) > 20 else ''}."
+        logger.info(f"{doc_full_path}: {conv_notes}")
+
+        # Pages are rendered batch by batch as the LLM loop asks for them (at most one batch in memory)
+        try:
+            with recording_llm_usage(usage):
+                llm_data, llm_api_notes = await self._extract_info_from_page_batches(
+                    self._render_batches(doc_full_path, page_ranges, encoding_profile, text_layer_min_chars, page_order),
+                    len(page_text_chars),
+                    len(page_ranges),
+                    input_creditor_name, 
+                    is_business,
+                    creditor_type, 
+                    target_associated_party_names,
+                    info_to_extract_for_doc,
+                    max_llm_attempts_per_batch=max_llm_attempts_per_batch,
+                    page_order=page_order
+                )
+        except DocumentConversionError as e:
+            logger.error(f"Document to images conversion failed for {doc_full_path}. Notes: {e}")
+            return None, f"File_Conversion_Failed: {e}"
         combined_notes = f"Conv: {conv_notes}. LLM: {llm_api_notes}".strip()
         
         if llm_data is not None: # Could be an empty LLMResponseData if nothing found
             logger.info(f"LLM processing for document {doc_full_path} completed.")
+            if cache_key is not None:
+                # Upsert plus TTL/LRU eviction: several SQLite statements, kept off the event loop
+                await asyncio.to_thread(self.extraction_cache.put, cache_key, content_hash, self.settings.OPENROUTER_LLM_MODEL,
+                                        llm_data.model_dump(), llm_api_notes[:2000])
         else: # Hard failure
             logger.warning(f"Failed to extract info from {doc_full_path} using LLM. Notes: {combined_notes}")
             
-        return llm_data, combined_notes
\ No newline at end of file
+        return llm_data, combined_notes
+
+    async def select_document_pack(self, doc_full_paths: List[str], max_pages: int) -> List[int]:
+        """
+        Indices (in the given order) of the documents that fit into one LLM call together: at most max_pages pages
+        and TEXT_LAYER_MAX_CHARS_PER_CALL text-layer characters in total. Documents that don't fit, or can't be
+        read, are left for the one-call-per-document path. Fewer than two fitting documents means no pack.
+        """
+        text_layer_min_chars = self.settings.TEXT_LAYER_MIN_CHARS_PER_PAGE
+        selected: List[int] = []
+        total_pages, total_chars = 0, 0
+        for index, doc_full_path in enumerate(doc_full_paths):
+            try:
+                page_text_chars = await self._run_raster_job(analyze_document_pages, doc_full_path, text_layer_min_chars)
+            except Exception as e:
+                logger.info(f"Not packing {doc_full_path} with other documents: {e}")
+                continue
+            if not page_text_chars or total_pages + len(page_text_chars) > max_pages or \
+               total_chars + sum(page_text_chars) > self.settings.TEXT_LAYER_MAX_CHARS_PER_CALL:
+                continue
+            selected.append(index)
+            total_pages += len(page_text_chars)
+            total_chars += sum(page_text_chars)
+        return selected if len(selected) > 1 else []
+
+    @staticmethod
+    def _document_attribution_prompt(documents: List[PackedDocument]) -> str:
+        """Appendix to the extraction prompt for a multi-document call: which document each answer came from."""
+        document_list = "\n".join(f"- Document {number}: '{doc.title}'" for number, doc in enumerate(documents, start=1))
+        return (
+            f"\nIMPORTANT: The pages above belong to {len(documents)} separate court documents of the same case. Each page is "
+            f"introduced by a [Document D, Page N] marker:\n{document_list}\n"
+            "Treat them as separate documents (the final judgment decision must come from a single document). In addition to the "
+            "fields above, return a \"source_documents\" object in the same JSON that gives, for every field you filled, the number "
+            "of the document the value was taken from, e.g. \"source_documents\": {\"original_creditor_name\": 1, \"creditor_address\": 2, "
+            "\"final_judgment_awarded_to_creditor\": 1, \"associated_parties\": {\"Associated Party Name 1\": 2}}. "
+            "Omit fields you set to null."
+        )
+
+    @staticmethod
+    def _split_by_source_document(
+        llm_data: LLMResponseData, source_documents: Any, num_documents: int
+    ) -> Optional[List[LLMResponseData]]:
+        """
+        Splits a multi-document answer into one LLMResponseData per document using the model's source_documents.
+        None if any filled field lacks a valid document number, since the source titles would then be guesses.
+        """
+        if not isinstance(source_documents, dict):
+            return None
+
+        def document_index(value: Any) -> Optional[int]:
+            try:
+                number = int(value)
+            except (TypeError, ValueError):
+                return None
+            return number - 1 if 1 <= number <= num_documents else None
+
+        per_document = [LLMResponseData() for _ in range(num_documents)]
+        for field in ("original_creditor_name", "creditor_address", "creditor_registration_state"):
+            value = getattr(llm_data, field)
+            if value:
+                index = document_index(source_documents.get(field))
+                if index is None:
+                    return None
+                setattr(per_document[index], field, value)
+        if llm_data.final_judgment_awarded_to_creditor or llm_data.final_judgment_awarded_to_creditor_context:
+            index = document_index(source_documents.get("final_judgment_awarded_to_creditor",
+                                                        source_documents.get("final_judgment_awarded_to_creditor_context")))
+            if index is None:
+                return None
+            per_document[index].final_judgment_awarded_to_creditor = llm_data.final_judgment_awarded_to_creditor
+            per_document[index].final_judgment_awarded_to_creditor_context = llm_data.final_judgment_awarded_to_creditor_context
+        party_sources = source_documents.get("associated_parties")
+        for party in llm_data.associated_parties:
+            index = document_index(party_sources.get(party.name)) if isinstance(party_sources, dict) else None
+            if index is None:
+                return None
+            per_document[index].associated_parties.append(party)
+        return per_document
+
+    async def process_document_pack_for_case_info(
+        self,
+        documents: List[PackedDocument], # Small documents of one case, in priority order
+        input_creditor_name: str,
+        is_business: bool,
+        creditor_type: str,
+        target_associated_party_names: List[str],
+        info_to_extract_for_doc: Dict[str, bool], # What the case still needs
+        max_llm_attempts_per_batch: int,
+        usage: Optional[LLMUsage] = None # Filled with what the shared call consumed
+    ) -> Tuple[Optional[List[LLMResponseData]], str]:
+        """
+        Sends all pages of several small documents in a single LLM call and asks the model which document each
+        answer came from. Returns one LLMResponseData per document (in the order given), so the caller can keep
+        per-document source titles. Returns (None, notes) when the call fails or the answer can't be attributed;
+        the caller then processes the documents one by one. Pack answers are not cached (the cache is per document).
+        """
+        if not self.settings.OPENROUTER_API_KEY or not self.settings.OPENROUTER_LLM_MODEL or \
+           self.settings.OPENROUTER_API_KEY == "default_openrouter_api_key_please_configure":
+            return None, "OpenRouter API Key or Model not configured or is default."
+        if not any(info_to_extract_for_doc.values()):
+            return [LLMResponseData() for _ in documents], "No specific information requested for this LLM pass."
+
+        pages: List[PageContent] = []
+        for number, doc in enumerate(documents, start=1):
+            profile = doc.encoding_profile or IMAGE_ENCODING_PROFILES[DEFAULT_IMAGE_ENCODING_PROFILE]
+            doc_pages, conv_notes = await self._render_pages(doc.file_path, profile=profile,
+                                                             text_layer_min_chars=self.settings.TEXT_LAYER_MIN_CHARS_PER_PAGE)
+            if not doc_pages:
+                return None, f"Pack: could not prepare '{doc.title}': {conv_notes}"
+            pages.extend(page.model_copy(update={"document_number": number}) for page in doc_pages)
+
+        prompt_text = self._build_dynamic_prompt(input_creditor_name, is_business, target_associated_party_names,
+                                                 info_to_extract_for_doc, creditor_type) + self._document_attribution_prompt(documents)
+        logger.info(f"Sending {len(documents)} documents ({len(pages)} pages) in one LLM call.")
+        with recording_llm_usage(usage):
+            raw_json_dict, call_notes = await self._call_llm_with_retries(pages, prompt_text, 0, max_llm_attempts_per_batch)
+        if not raw_json_dict:
+            return None, f"Pack: LLM call failed: {call_notes}"
+
+        source_documents = raw_json_dict.pop("source_documents", None)
+        merged = LLMResponseData()
+        merge_notes: List[str] = []
+        self._merge_batch_data(merged, raw_json_dict, 0, merge_notes)
+        if merge_notes:
+            return None, f"Pack: {'; '.join(merge_notes)}"
+        per_document = self._split_by_source_document(merged, source_documents, len(documents))
+        if per_document is None:
+            logger.warning(f"LLM answer for a {len(documents)}-document pack has no usable source_documents; falling back to one call per document.")
+            return None, "Pack: answer could not be attributed to documents."
+        return per_document, f"Processed together with {len(documents) - 1} other document(s) in one LLM call. {call_notes}"
+
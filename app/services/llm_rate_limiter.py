@@ -0,0 +1,138 @@
+# app/services/llm_rate_limiter.py
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SATURATION_WINDOW_SECONDS = 60.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date), or None if absent/unparseable."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_seconds: float, max_seconds: float, retry_after: Optional[float] = None) -> float:
+    """
+    Delay before retry number `attempt` (1-based): full-jitter exponential backoff, so workers that failed together
+    don't retry together. A server-provided Retry-After is a lower bound.
+    """
+    delay = random.uniform(0, min(max_seconds, base_seconds * (2 ** (attempt - 1))))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class LLMRateLimiter:
+    """
+    Process-wide token bucket in front of OpenRouter, shared by every LLMProcessor.
+
+    Two buckets refill continuously: requests per minute and (estimated) input tokens per minute; a call waits
+    until both have room. A 429/503 with Retry-After pauses all callers until then instead of letting each
+    worker find out on its own. Waiters are served in arrival order. A limit of 0 disables that bucket.
+    """
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, clock: Callable[[], float] = time.monotonic):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._request_allowance = float(requests_per_minute)
+        self._token_allowance = float(tokens_per_minute)
+        self._last_refill = clock()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self._recent: Deque[Tuple[float, bool]] = deque(maxlen=5000) # (time, had to wait) per acquisition
+        self.total_acquisitions = 0
+        self.waited_acquisitions = 0
+        self.total_wait_seconds = 0.0
+        self.rate_limited_responses = 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.requests_per_minute > 0:
+            self._request_allowance = min(self.requests_per_minute, self._request_allowance + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute > 0:
+            self._token_allowance = min(self.tokens_per_minute, self._token_allowance + elapsed * self.tokens_per_minute / 60)
+
+    def _seconds_until_available(self, tokens: float) -> float:
+        wait = max(0.0, self._paused_until - self._clock())
+        if self.requests_per_minute > 0 and self._request_allowance < 1:
+            wait = max(wait, (1 - self._request_allowance) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute > 0 and self._token_allowance < tokens:
+            wait = max(wait, (tokens - self._token_allowance) * 60 / self.tokens_per_minute)
+        return wait
+
+    async def acquire(self, estimated_tokens: int = 0) -> float:
+        """Waits until one request of `estimated_tokens` input tokens fits in both buckets. Returns the seconds waited."""
+        started = self._clock()
+        # A single request bigger than the whole per-minute budget would otherwise never fit
+        tokens = min(float(estimated_tokens), float(self.tokens_per_minute)) if self.tokens_per_minute > 0 else 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = self._seconds_until_available(tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.requests_per_minute > 0:
+                self._request_allowance -= 1
+            if self.tokens_per_minute > 0:
+                self._token_allowance -= tokens
+        waited = self._clock() - started
+        self.total_acquisitions += 1
+        self._recent.append((self._clock(), waited > 0.01))
+        if waited > 0.01:
+            self.waited_acquisitions += 1
+            self.total_wait_seconds += waited
+        return waited
+
+    def pause_for(self, seconds: float) -> None:
+        """Holds every caller back for `seconds` (server asked us to back off, e.g. 429 Retry-After)."""
+        self.rate_limited_responses += 1
+        paused_until = self._clock() + seconds
+        if paused_until > self._paused_until:
+            self._paused_until = paused_until
+            logger.warning(f"LLM rate limiter: pausing all LLM calls for {seconds:.1f}s (server requested backoff).")
+
+    def saturation(self) -> Optional[float]:
+        """Share of acquisitions in the last minute that had to wait; None without recent traffic."""
+        cutoff = self._clock() - SATURATION_WINDOW_SECONDS
+        recent = [waited for at, waited in self._recent if at >= cutoff]
+        if not recent:
+            return None
+        return round(sum(recent) / len(recent), 3)
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "requests_available": round(self._request_allowance, 1) if self.requests_per_minute > 0 else None,
+            "tokens_available": int(self._token_allowance) if self.tokens_per_minute > 0 else None,
+            "paused_for_seconds": round(max(0.0, self._paused_until - self._clock()), 1),
+            "saturation": self.saturation(),
+            "total_acquisitions": self.total_acquisitions,
+            "waited_acquisitions": self.waited_acquisitions,
+            "total_wait_seconds": round(self.total_wait_seconds, 1),
+            "rate_limited_responses": self.rate_limited_responses,
+        }
@@ -0,0 +1,56 @@
+# app/services/raster_pool.py
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RasterPool:
+    """
+    Bounded process pool for CPU-heavy document work (PDF/TIFF rasterization and image encoding).
+
+    Rasterizing a long complaint takes seconds of pure CPU; run inline it would block the event loop and with it
+    every worker's Playwright traffic and the API. Jobs run in separate processes instead and are awaited.
+    With max_workers == 0 jobs run on the event loop's default thread pool (no extra processes).
+    A pool broken by a crashed child (e.g. a segfault on a malformed file) is replaced for the next job.
+    """
+    def __init__(self, max_workers: int):
+        self.max_workers = max(0, max_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._closed = False
+        self.restart_count = 0
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers == 0:
+            return None
+        if self._executor is None:
+            # Spawned (not forked) children: the parent runs an event loop and Playwright threads
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Runs fn(*args) off the event loop. fn and args must be picklable (top-level function, plain values)."""
+        if self._closed:
+            raise RuntimeError("RasterPool is closed.")
+        executor = self._get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            logger.error("Raster process pool broke (a child process died). It will be recreated for the next job.")
+            if self._executor is executor:
+                self._executor = None
+                self.restart_count += 1
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def shutdown(self) -> None:
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        logger.info("Raster pool shut down.")
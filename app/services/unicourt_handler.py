@@ -3,19 +3,190 @@ import os
 import asyncio
 import logging
 import re
+import weakref
 from datetime import datetime
+from urllib.parse import urljoin
 from typing import Optional, Tuple, List, Set, Dict, Any, AsyncGenerator
 from pydantic import BaseModel
-from playwright.async_api import Playwright, Page, BrowserContext, Browser, TimeoutError as PlaywrightTimeoutError, expect, Download, Locator
+from playwright.async_api import Playwright, Page, BrowserContext, Browser, TimeoutError as PlaywrightTimeoutError, expect, Download, Locator, Route
 from fuzzywuzzy import fuzz
 import unicodedata
 
 from app.core.config import AppSettings, UnicourtSelectors
 from app.db.models import DocumentTypeEnum, DocumentProcessingStatusEnum # Enums for logic
 from app.utils import playwright_utils, common 
+from app.services.browser_manager import BrowserManager, BROWSER_LAUNCH_ARGS
+from app.services.download_limiter import HostDownloadLimiter
+from app.services.wait_strategy import WaitStrategy
 
 logger = logging.getLogger(__name__)
 
+# CrowdSourced document links point here; the URL serves the file itself to a logged-in session
+DIRECT_DOCUMENT_URL_MARKER = "/file/researchCourtCaseFile/"
+DIRECT_DOCUMENT_CONTENT_TYPES = {"application/pdf": ".pdf", "image/tiff": ".tif", "image/tif": ".tif"}
+
+
+def _document_extension_from_response(content_type: str, content_disposition: Optional[str], body: bytes) -> Optional[str]:
+    """File extension for a directly fetched document, or None if the response isn't a document (e.g. an HTML page)."""
+    if content_type.startswith("text/") or content_type.endswith(("html", "json", "xml")):
+        return None
+    if body.startswith(b"%PDF"):
+        return ".pdf"
+    if body[:4] in (b"II*\x00", b"MM\x00*"):
+        return ".tif"
+    if content_type in DIRECT_DOCUMENT_CONTENT_TYPES:
+        return DIRECT_DOCUMENT_CONTENT_TYPES[content_type]
+    if content_type == "application/octet-stream" and body:
+        filename_match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)', content_disposition or "", re.IGNORECASE)
+        _, ext = os.path.splitext(filename_match.group(1) if filename_match else "")
+        return ext.lower() or ".file"
+    return None
+
+
+# Associated parties whose names contain any of these (case-insensitive) are institutions or public bodies, not
+# individuals/businesses we look up addresses for
+ASSOCIATED_PARTY_SKIP_KEYWORDS: List[str] = [
+    "bank","credit", "funding", "internal revenue service",
+    "cach", "capital", "union", "state", "asset", "recovery",
+    "financial", "fcu", "fargo", "casualty", "hospital","CAVALRY",
+    "investments", "compensation", "workers", "student", "unifund",
+    "american express", "insurance", "savings", "mortgage",
+    "county", "university", "loan", "servicing", "school",
+    "community", "hosp", "city of", "west coast cu", "hma llc",
+    "suncoast", "HSBC", "CHRYSLER", "HOA", "card services",
+    "CACV", "target", "national", "brightstar", "finance",
+    "taxation", "commissioner", "finance", "BUREAU", "recoveries",
+    "compliance", "consumers", "rent a car",
+    "SPRINGLEAF HOME EQUITY INC", "sherwin", "washington mutual",
+    "lending", "midflorida", "budget", "john deere", "home equity",
+    "CONDOMINI", "ocw retail", "us of america", "st of colo",
+    "liberty mutual", "account management", "resolutions",
+    "accounts retrievable", "american builders", "cisco",
+    "deere", "collection", "INVESTMENT RETRIEVERS INC",
+    "homeowners", "WAKEFIELD & ASSOCIATES INC", "point loma",
+    "college", "CARDFLEX INC", "commonwealth", "water management",
+    "RBS CITIZENS NA", "trust", "condo", "equity one", "PBC CU",
+    "shopping center", "american general", "portfolio management",
+    "hotel", "first service", "midland central", "oil",
+    "NEIGHBORHOOD NETWORKS", "AMERICU", "health systems",
+    "FUNDATION", "AUTOVEST", "tekton", "abf freight", "fedex",
+    "tax", "of america", "SCP DISTRIBUTORS", "owners assn",
+    "Government", "Stewart", "INS Group", "Prop Owners",
+    "Maintenance ASSN", "Wachovia", "Court of","Beneficial Florida",
+    "Santander", "Receivables", "financing", "CNTY", "CARMAX",
+    "GMAC LLC", "ECONOMIC DEV", "BOARD", "HAJOCA", "SYSCO",
+    "SUBSIDENCE", "INLAND AMERICAN", "GARLAND ISD", "BYZFUNDER",
+    "NAR INC", "FOUNDERS CONFERENCE", "COLLECT", "NUMERICA CU",
+    "SAFWAY SERVICES LLC", "GMAC INC", "REGIONAL WATER",
+    "CLEARWATER NEIGHBORHOOD", "ENTERPRISE LEASING",
+    "MEMORIAL HEALTH", "EXP REALTY LLC", "LA COMMERCIAL GROUP INC",
+    "ASSN", "MEDICAL CENTER", "NSTAR ELECTRIC", "CRAFCO INC",
+    "MCT GROUP", "PALLIDA LLC", "DODEKA LLC", "ANTERO RESOURCES",
+    "ELLIOTT ELECTRIC SUPPLY INC", "PREMIERONE CU",
+    "DODGE ENTS INC", "ALLEGHENY RESOURCES LLC", "ACME LIFT CO LLC",
+    "H&E EQUIPMENT SERVICES INC", "US Securities",
+    "Exchange Commission", "AMPLIFY CU", "FORD MOTOR",
+    "METRO REVENUE", "BEST SERVICE CO INC", "VYSTAR CU",
+    "COMPREHENSIVE LEGAL SOLUTIONS", "US FOODS INC",
+    "GRIMES CENTRAL APPRAISAL", "VIBE CU", "UHG I LLC",
+    "GUARDIANS CU", "BENEFICIAL CALIFORNIA INC", "DNFIS USA LLC",
+    "CAMPUS USA CU", "PYOD LLC", "SUNBELT RENTALS INC",
+    "DELTA FUEL CO LLC", "HEALTH SYSTEM", "BELLCO CU",
+    "JACKSON HEWITT INC", "FED EX OFFICE", "EMPLOYEES CU",
+    "PATELCO CU", "CAG ACCEPTANCE LLC", "INS CO", "PORTFOLIO DEBT",
+    "PORTFOLIO INVS", "FC MARKETPLACE LLC", "ACCELA INC",
+    "PORTFOLIO INVS", "SEARS", "DYCK-O'NEAL INC",
+    "RAMADA WORLDWIDE INC", "COMMINITY CU", "CONNECT CU",
+    "HEALTHCARE SYSTEM", "LOTTERY", "FEDERATED FIN",
+    "UNITED JOINT VENTURE", "SUNNOVA ENERGY CORP",
+    "RIVER VALLEY CU", "CHERRYWOOD ENTS LLC", "UNIFIRST CORP",
+    "MID HUDSON VALLEY FED CU", "BENEFICIAL NEW YORK INC",
+    "GLOBAL LINK SYSTEMS INC", "NIAGARA MOHAWK POWER CORP",
+    "VALENTINE ELECTRIC INC", "VANTAGE WEST CU",
+    "ATLANTA DEV AUTHORITY", "TBA CU", "LAKE MICHIGAN CU",
+    "GENISYS CU", "ELGA CU", "ADVENTURE CU", "DOW CU",
+    "AMERICAN 1 CU", "GENISYS CU", "SECURITIES & EXCHANGE",
+    "MERCHANT ADVANCE LLC", "DYKE-O'NEAL INC", "PANHANDLE CU",
+    "AMERI CU", "District Court", "Department", "NNSECU",
+    "WESTLAKE SERVICES INC", "MORGAN STANLEY", "TIAA FSB",
+    "FAIRWINDS CU", "SPACE COAST CU", "MERCURY INDEMNITY",
+    "ENTERPRISE RENT", "HERTZ CORP", "BANCO POPULAR", "INDEMNITY",
+    "BERKSHIRE", "DEUTSCHE BK", "FIRST SOUTHWESTERN",
+    "ORANGE & ROCKLAND UTILITIES", "LAMARCA INS", "LOS ANGELES DEPT",
+    "FLORIDA CU", "CENTRAL CU OF FLORIDA", "WESTLAKE SERVICES LLC",
+    "MID FLORIDA CU", "ISPC", "NELNET INC",
+    "NISSAN MOTOR ACCEPTANCE CORP", "CFG MERCHANT SOLUTIONS LLC",
+    "WESTLAKE SERVICES LLC", "FEDERAL TRADE COMMISSION",
+    "CHASE, REVENUE SERVICES", "PRIORITY ONE CU", "ISPC",
+    "BELLSOUTH TELECOMMUNICATIONS", "ATTY GENERAL",
+    "FLORIDA CLINICAL PRACTICE ASSO", "VILLAGE OF WELLINGTON",
+    "FLORIDA TRANSPORTATION CU", "COLUMBIA SPORTSWEAR USA CORP",
+    "COMDATA NETWORK INC", "IPFS CORP", "KEYPOINT CU",
+    "FLORIDA RETAIL FEDERATION", "CONSOLIDATED ELECTRICAL DISTRI",
+    "AMERICAN BLDRS & CONTRACTORS", "FLORIDA CENTRAL CU", "DEUTSCHE BK",
+    "HIBU INC", "CIVIL ENFORCEMENT DIVISION", "INVERSTMENTS BUILDERS/FLORIDA",
+    "PORTFOLIO ROCOVERY ASSOCIATES", "SUN LIFE ASSURANCE", "MASDA",
+    "PRIMUS AUTOMOTIVE", "ACCLAIM CORP", "BUILDERS FIRSTSOURCE", "CIT GROUP",
+    "SUN CU", "BOTFLY LLC", "GULFSIDE SUPPLY INC", "ENVISION CU",
+    "FLORIDA TELCO CU", "YELLOW BOOK SALES", "COMPTROLLER", "INSURANC",
+    "FLORIDA COMMERCE CU", "OCMAC LLC", "ACCOUNTS RECEIVABLE",
+    "SOUTHWEST GENERAL HEALTH CTR", "BIZFUND LLC", "CU"
+]
+_ASSOCIATED_PARTY_SKIP_KEYWORDS_LOWER = tuple(keyword.lower() for keyword in ASSOCIATED_PARTY_SKIP_KEYWORDS)
+
+# True once the page is taller than the given height, i.e. more content loaded after a scroll
+PAGE_GREW_JS = "lastHeight => document.body.scrollHeight > lastHeight"
+
+# Blocked requests are never sent, so their size is unknown; these typical sizes give an estimate of the bandwidth saved
+BLOCKED_RESOURCE_ESTIMATED_BYTES: Dict[str, int] = {
+    "image": 25_000, "font": 40_000, "media": 250_000, "script": 60_000, "stylesheet": 20_000,
+}
+BLOCKED_RESOURCE_DEFAULT_ESTIMATED_BYTES = 5_000
+
+
+class ResourceBlockStats:
+    """Counts the requests a worker context aborted, per resource type, and the bytes that saved (estimated)."""
+    def __init__(self):
+        self.blocked_requests = 0
+        self.allowed_requests = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.estimated_bytes_saved = 0
+
+    def record_blocked(self, resource_type: str) -> None:
+        self.blocked_requests += 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        self.estimated_bytes_saved += BLOCKED_RESOURCE_ESTIMATED_BYTES.get(resource_type, BLOCKED_RESOURCE_DEFAULT_ESTIMATED_BYTES)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "blocked_requests": self.blocked_requests,
+            "allowed_requests": self.allowed_requests,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+        }
+
+
+# Stats of every context with resource blocking installed; entries go away with their context
+_context_block_stats: "weakref.WeakKeyDictionary[BrowserContext, ResourceBlockStats]" = weakref.WeakKeyDictionary()
+
+
+def get_resource_block_stats(context: BrowserContext) -> Optional[ResourceBlockStats]:
+    return _context_block_stats.get(context)
+
+
+def resource_block_totals() -> Dict[str, Any]:
+    """Summed stats of the open worker contexts in this process."""
+    totals = ResourceBlockStats()
+    contexts = list(_context_block_stats.values())
+    for stats in contexts:
+        totals.blocked_requests += stats.blocked_requests
+        totals.allowed_requests += stats.allowed_requests
+        totals.estimated_bytes_saved += stats.estimated_bytes_saved
+        for resource_type, count in stats.blocked_by_type.items():
+            totals.blocked_by_type[resource_type] = totals.blocked_by_type.get(resource_type, 0) + count
+    return {"contexts": len(contexts), **totals.as_dict()}
+
+
 # Structure for transient document info during processing
 class TransientDocumentInfo(BaseModel):
     original_title: str
@@ -37,15 +208,66 @@ class TransientDocumentInfo(BaseModel):
 
 
 class UnicourtHandler:
-    def __init__(self, playwright_instance: Playwright, settings: AppSettings, dashboard_page_for_worker: Optional[Page] = None):
+    def __init__(self, playwright_instance: Playwright, settings: AppSettings, dashboard_page_for_worker: Optional[Page] = None,
+                 browser_manager: Optional[BrowserManager] = None, download_limiter: Optional[HostDownloadLimiter] = None,
+                 wait_strategy: Optional[WaitStrategy] = None):
         self.playwright = playwright_instance
         self.settings = settings
         self.selectors: UnicourtSelectors = settings.UNICOURT_SELECTORS
         self.dashboard_page_for_worker: Optional[Page] = dashboard_page_for_worker
+        self.browser_manager: Optional[BrowserManager] = browser_manager
+        # Shared by all workers when passed in; otherwise the handler creates its own on first download
+        self.download_limiter: Optional[HostDownloadLimiter] = download_limiter
+        # Viewer tabs are matched to clicks with context.expect_page, so only one may be opening at a time
+        self._viewer_tab_lock = asyncio.Lock()
+        # Shared by all workers when passed in, so timeouts adapt from every worker's observations
+        self.waits: WaitStrategy = wait_strategy or WaitStrategy()
 
     async def _launch_browser(self) -> Browser:
-        browser_launch_args = ['--disable-blink-features=AutomationControlled', '--no-sandbox']
-        return await self.playwright.chromium.launch(headless=True, args=browser_launch_args)
+        return await self.playwright.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+
+    async def _new_context(self, **context_options: Any) -> Tuple[Optional[Browser], BrowserContext]:
+        """
+        Returns (owned_browser, context). With a BrowserManager the context lives on the shared browser
+        and owned_browser is None, so callers only ever close browsers they launched themselves.
+        """
+        if self.browser_manager:
+            return None, await self.browser_manager.new_context(**context_options)
+        browser = await self._launch_browser()
+        try:
+            return browser, await browser.new_context(**context_options)
+        except Exception:
+            await browser.close()
+            raise
+
+    def _should_block_request(self, resource_type: str, url: str) -> bool:
+        if DIRECT_DOCUMENT_URL_MARKER in url: # Documents (TIFFs are requested as images) must always get through
+            return False
+        if resource_type in self.settings.BLOCKED_RESOURCE_TYPES:
+            return True
+        url_lower = url.lower()
+        return any(pattern in url_lower for pattern in self.settings.BLOCKED_URL_PATTERNS)
+
+    async def _install_resource_blocking(self, context: BrowserContext) -> ResourceBlockStats:
+        """Routes every request of the context through a filter that aborts non-essential resources (images, fonts, trackers)."""
+        stats = ResourceBlockStats()
+
+        async def route_request(route: Route) -> None:
+            request = route.request
+            if self._should_block_request(request.resource_type, request.url):
+                stats.record_blocked(request.resource_type)
+                await route.abort("blockedbyclient")
+            else:
+                stats.allowed_requests += 1
+                await route.continue_()
+
+        await context.route("**/*", route_request)
+        _context_block_stats[context] = stats
+        return stats
+
+    def _login_or_dashboard_selector(self) -> str:
+        # Either one means the Unicourt app has rendered: the login form (no session) or the dashboard (logged in)
+        return f"{self.selectors.EMAIL_INPUT}, {self.selectors.DASHBOARD_LOGIN_SUCCESS_DETECTOR}"
 
     def _get_common_context_options(self) -> Dict:
         return {
@@ -63,7 +285,8 @@ class UnicourtHandler:
             return False
         logger.info("Attempting fully headless automated login...")
         try:
-            await page.goto(self.settings.INITIAL_URL, wait_until="networkidle", timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000)
+            await self.waits.goto(page, "initial_page_load", self.settings.INITIAL_URL, self._login_or_dashboard_selector(),
+                                  self.settings.GENERAL_TIMEOUT_SECONDS, required=False)
             await playwright_utils.handle_cookie_banner_if_present(page, self.settings)
             
             # Check if already logged in (e.g., due to a valid session file being loaded by context)
@@ -74,7 +297,8 @@ class UnicourtHandler:
             
             if self.settings.LOGIN_PAGE_URL_IDENTIFIER not in page.url:
                 logger.info(f"Not on login page (current: {page.url}). Navigating to login page.")
-                await page.goto(self.settings.INITIAL_URL, wait_until="networkidle", timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000)
+                await self.waits.goto(page, "initial_page_load", self.settings.INITIAL_URL, self._login_or_dashboard_selector(),
+                                      self.settings.GENERAL_TIMEOUT_SECONDS, required=False)
                 if self.settings.DASHBOARD_URL_IDENTIFIER in page.url: # Check again after navigation
                     if await page.locator(self.selectors.DASHBOARD_LOGIN_SUCCESS_DETECTOR).is_visible(timeout=3000):
                         logger.info("Navigated to dashboard, already logged in.")
@@ -90,11 +314,11 @@ class UnicourtHandler:
             login_button = page.locator(self.selectors.LOGIN_BUTTON)
             await expect(login_button).to_be_enabled(timeout=self.settings.SHORT_TIMEOUT_SECONDS * 1000)
             
-            async with page.expect_navigation(wait_until="networkidle", timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000 * 1.5):
+            async with page.expect_navigation(wait_until="domcontentloaded", timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000 * 1.5):
                 await login_button.click()
             logger.info(f"Navigation after login click completed. Current URL: {page.url}")
             await playwright_utils.handle_cookie_banner_if_present(page, self.settings)
-            await page.wait_for_selector(self.selectors.DASHBOARD_LOGIN_SUCCESS_DETECTOR, timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000, state="visible")
+            await self.waits.wait_for_selector(page, "dashboard_after_login", self.selectors.DASHBOARD_LOGIN_SUCCESS_DETECTOR, self.settings.GENERAL_TIMEOUT_SECONDS)
             logger.info("Headless automated login successful: Target dashboard detector visible.")
             return True
         except PlaywrightTimeoutError as e:
@@ -129,7 +353,8 @@ class UnicourtHandler:
                     page_for_ops = page_to_check
                 else:
                     logger.info(f"Provided page URL '{page_to_check.url}' not dashboard/login. Attempting navigation.")
-                    await page_to_check.goto(self.settings.INITIAL_URL, wait_until="networkidle", timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000)
+                    await self.waits.goto(page_to_check, "initial_page_load", self.settings.INITIAL_URL, self._login_or_dashboard_selector(),
+                                          self.settings.GENERAL_TIMEOUT_SECONDS, required=False)
                     if self.settings.DASHBOARD_URL_IDENTIFIER in page_to_check.url.lower():
                         try:
                             await page_to_check.wait_for_selector(self.selectors.DASHBOARD_LOGIN_SUCCESS_DETECTOR, timeout=3000, state="visible")
@@ -143,10 +368,10 @@ class UnicourtHandler:
 
             if not page_for_ops and os.path.exists(session_file_path):
                 logger.info(f"Checking existing session file: {session_file_path}")
-                browser = await self._launch_browser()
-                context = await browser.new_context(storage_state=session_file_path, **self._get_common_context_options())
+                browser, context = await self._new_context(storage_state=session_file_path, **self._get_common_context_options())
                 page_for_ops = await context.new_page()
-                await page_for_ops.goto(self.settings.INITIAL_URL, wait_until="networkidle", timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000)
+                await self.waits.goto(page_for_ops, "initial_page_load", self.settings.INITIAL_URL, self._login_or_dashboard_selector(),
+                                      self.settings.GENERAL_TIMEOUT_SECONDS, required=False)
                 await playwright_utils.handle_cookie_banner_if_present(page_for_ops, self.settings)
                 try:
                     await page_for_ops.wait_for_selector(self.selectors.DASHBOARD_LOGIN_SUCCESS_DETECTOR, timeout=self.settings.SHORT_TIMEOUT_SECONDS * 1000, state="visible")
@@ -163,8 +388,7 @@ class UnicourtHandler:
             if not page_for_ops or page_for_ops.is_closed():
                 if context and not context.is_closed(): await context.close()
                 if browser and browser.is_connected(): await browser.close()
-                browser = await self._launch_browser()
-                context = await browser.new_context(**self._get_common_context_options())
+                browser, context = await self._new_context(**self._get_common_context_options())
                 page_for_ops = await context.new_page()
                 # Initial goto handled by _perform_headless_automated_login
 
@@ -189,6 +413,7 @@ class UnicourtHandler:
                  await browser.close()
     
     async def create_worker_browser_context_and_dashboard_page(self) -> Tuple[Optional[Browser], Optional[BrowserContext], Optional[Page]]:
+        # The returned browser is None when the context lives on the shared BrowserManager browser
         if not os.path.exists(self.settings.UNICOURT_SESSION_PATH):
             logger.error(f"Unicourt session file not found at {self.settings.UNICOURT_SESSION_PATH}.")
             if not await self.ensure_authenticated_session(): # This will try to log in
@@ -199,16 +424,17 @@ class UnicourtHandler:
         context: Optional[BrowserContext] = None
         dashboard_page: Optional[Page] = None
         try:
-            browser = await self._launch_browser()
-            context = await browser.new_context(
+            browser, context = await self._new_context(
                 storage_state=self.settings.UNICOURT_SESSION_PATH,
                 **self._get_common_context_options()
             )
+            if self.settings.BLOCK_NON_ESSENTIAL_RESOURCES:
+                await self._install_resource_blocking(context)
             dashboard_page = await context.new_page()
             logger.info(f"[WorkerSetup] Navigating to Unicourt dashboard: {self.settings.INITIAL_URL}")
-            await dashboard_page.goto(self.settings.INITIAL_URL, wait_until="networkidle", timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000 * 2)
+            await self.waits.goto(dashboard_page, "dashboard_load", self.settings.INITIAL_URL, self.selectors.DASHBOARD_LOGIN_SUCCESS_DETECTOR,
+                                  self.settings.GENERAL_TIMEOUT_SECONDS * 2)
             await playwright_utils.handle_cookie_banner_if_present(dashboard_page, self.settings) # Handle cookies after navigation
-            await dashboard_page.wait_for_selector(self.selectors.DASHBOARD_LOGIN_SUCCESS_DETECTOR, timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000)
             logger.info(f"[WorkerSetup] Worker dashboard page loaded: {dashboard_page.url}")
             self.dashboard_page_for_worker = dashboard_page
             return browser, context, dashboard_page
@@ -232,6 +458,10 @@ class UnicourtHandler:
 
         # Close context if exists
         if context:
+            block_stats = get_resource_block_stats(context)
+            if block_stats and block_stats.blocked_requests:
+                logger.info(f"Worker context blocked {block_stats.blocked_requests} non-essential requests "
+                            f"(~{block_stats.estimated_bytes_saved / 1_000_000:.1f} MB saved): {block_stats.blocked_by_type}")
             try:
                 await context.close()
             except Exception:
@@ -298,7 +528,8 @@ class UnicourtHandler:
             
             if search_term_secondary is None: # This is a primary search operation
                 logger.info(f"{log_prefix} Performing primary search. Ensuring fresh dashboard state.")
-                await dashboard_page.goto(self.settings.INITIAL_URL, wait_until="networkidle", timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000 * 1.5) # Increased timeout slightly
+                await self.waits.goto(dashboard_page, "dashboard_load", self.settings.INITIAL_URL, self.selectors.DASHBOARD_LOGIN_SUCCESS_DETECTOR,
+                                      self.settings.GENERAL_TIMEOUT_SECONDS * 1.5)
                 await playwright_utils.handle_cookie_banner_if_present(dashboard_page, self.settings)
                 await self.clear_search_input(dashboard_page) # Clear any previous state
                 
@@ -363,8 +594,14 @@ class UnicourtHandler:
             await expect(final_search_button_locator).to_be_enabled(timeout=self.settings.SHORT_TIMEOUT_SECONDS * 1000)
             await final_search_button_locator.click()
             
-            await dashboard_page.wait_for_selector(self.selectors.SEARCH_RESULTS_AREA_DETECTOR, timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000 * 2) # Increased timeout
-            await common.random_delay(1.5, 3.5, "after final search click for results to populate") # Allow results to populate
+            await self.waits.wait_for_selector(dashboard_page, "search_results_area", self.selectors.SEARCH_RESULTS_AREA_DETECTOR,
+                                               self.settings.GENERAL_TIMEOUT_SECONDS * 2)
+            # Results populate after the area appears: wait for the first row or the no-results message
+            results_or_empty = dashboard_page.locator(self.selectors.SEARCH_RESULT_ROW_DIV).or_(
+                dashboard_page.get_by_text(self.selectors.SEARCH_NO_RESULTS_TEXT_PATTERN)
+            ).first
+            await self.waits.run("search_results_populated", lambda timeout_ms: results_or_empty.wait_for(state="attached", timeout=timeout_ms),
+                                 3.5, expect_timeout=True)
             return True, "; ".join(search_notes)
         except Exception as e:
             note = f"SearchPerformError: {type(e).__name__} for '{search_term_primary}{(' + ' + search_term_secondary) if search_term_secondary else ''}': {str(e).splitlines()[0]}" # Cleaner error
@@ -373,6 +610,38 @@ class UnicourtHandler:
             await playwright_utils.safe_screenshot(dashboard_page, self.settings, "search_perform_exception", common.sanitize_filename(search_term_primary))
             return False, "; ".join(search_notes)
         
+    async def open_case_page_by_url(
+        self, dashboard_page: Page, case_url: str, case_number_for_db_id: str, expected_unicourt_case_number: Optional[str] = None
+    ) -> Tuple[Optional[Page], str, Optional[str], Optional[str]]:
+        """
+        Fast path for cases located before: opens the stored detail-page URL in the worker's context.
+        Same return shape as search_and_open_case_page. Returns no page when the URL is stale (no detail page,
+        redirected elsewhere, or showing a different case number) so the caller can fall back to search.
+        """
+        log_prefix = f"[{case_number_for_db_id}]"
+        case_page: Optional[Page] = None
+        try:
+            case_page = await dashboard_page.context.new_page()
+            await case_page.goto(case_url, wait_until="domcontentloaded", timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000)
+            if self.settings.LOGIN_PAGE_URL_IDENTIFIER in case_page.url.lower():
+                raise Exception("Redirected to login page")
+            await case_page.wait_for_selector(self.selectors.CASE_DETAIL_PAGE_LOAD_DETECTOR, timeout=self.settings.SHORT_TIMEOUT_SECONDS * 1000, state="visible")
+
+            final_case_name_on_page = await self.extract_case_name_from_detail_page(case_page, case_number_for_db_id)
+            final_case_number_on_page = await self.extract_case_number_from_detail_page(case_page, case_number_for_db_id)
+            if expected_unicourt_case_number and final_case_number_on_page and \
+               final_case_number_on_page.strip().lower() != expected_unicourt_case_number.strip().lower():
+                raise Exception(f"Page shows case number '{final_case_number_on_page}', expected '{expected_unicourt_case_number}'")
+
+            logger.info(f"{log_prefix} Opened case page directly from stored URL: {case_page.url}")
+            return case_page, "Opened directly from stored case URL.", final_case_name_on_page, final_case_number_on_page
+        except Exception as e:
+            note = f"Stored case URL is stale ({type(e).__name__}: {e})."
+            logger.warning(f"{log_prefix} {note} URL: {case_url}")
+            if case_page and not case_page.is_closed():
+                await case_page.close()
+            return None, note, None, None
+
     async def search_and_open_case_page(self, dashboard_page: Page, case_name_for_search: str, case_number_for_db_id: str) -> Tuple[Optional[Page], str, Optional[str], Optional[str]]:
         log_prefix = f"[{case_name_for_search} / {case_number_for_db_id}]"
         search_notes_list: List[str] = []
@@ -388,9 +657,10 @@ class UnicourtHandler:
         num_results = await all_results_locators.count()
         logger.info(f"{log_prefix} Found {num_results} result(s) after case name search.")
 
-        # Double check after a small delay if no results found
+        # Double check if no results found: rows can still be rendering
         if num_results == 0:
-            await common.random_delay(1.0, 2.0)
+            await self.waits.wait_for_selector(dashboard_page, "search_results_late", self.selectors.SEARCH_RESULT_ROW_DIV, 2.0,
+                                               state="attached", expect_timeout=True, adaptive=False) # Full wait before concluding "no results"
             num_results = await all_results_locators.count()
 
         target_case_link_locator: Optional[Locator] = None
@@ -531,20 +801,19 @@ class UnicourtHandler:
 
             while scroll_attempts < max_scroll_attempts:
                 await case_page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                # Wait for potential dynamic content to load after scroll
-                await case_page.wait_for_timeout(1500) # Increased from 1000ms
+                # Wait for dynamic content to load after scroll (the page grows)
+                grew = await self.waits.wait_for_function(case_page, "docket_scroll_growth", PAGE_GREW_JS, 1.5, arg=last_height, expect_timeout=True)
                 
-                new_height = await case_page.evaluate('document.body.scrollHeight')
-                
-                if new_height == last_height:
-                    # Height hasn't changed, try one more time after a longer pause
-                    logger.debug(f"[{case_identifier}] Scroll height unchanged ({new_height}). Pausing for final check.")
-                    await case_page.wait_for_timeout(2500) # Longer pause for final check
-                    new_height = await case_page.evaluate('document.body.scrollHeight')
-                    if new_height == last_height:
+                if not grew:
+                    # Height hasn't changed, give it one longer final check
+                    logger.debug(f"[{case_identifier}] Scroll height unchanged ({last_height}). Waiting for final check.")
+                    grew = await self.waits.wait_for_function(case_page, "docket_scroll_final_check", PAGE_GREW_JS, 2.5, arg=last_height,
+                                                              expect_timeout=True, adaptive=False) # Full wait: a timeout ends the docket
+                    if not grew:
                         logger.debug(f"[{case_identifier}] Scroll height confirmed unchanged. Assuming end of scrollable content.")
                         break # Exit loop if height is still the same
                 
+                new_height = await case_page.evaluate('document.body.scrollHeight')
                 last_height = new_height
                 scroll_attempts += 1
                 logger.debug(f"[{case_identifier}] Scrolling... Attempt {scroll_attempts}, Current height: {new_height}")
@@ -601,6 +870,39 @@ class UnicourtHandler:
         # 85% similarity threshold - adjust as needed
         return similarity_ratio >= 85
 
+    def _select_associated_party_names(
+        self, party_rows: List[Dict[str, Optional[str]]], target_creditor_type: str, input_creditor_name: str, case_identifier: str
+    ) -> List[str]:
+        """Names of the parties of target_creditor_type, minus institutions (skip keywords) and the input creditor itself."""
+        associated_party_names: List[str] = []
+        for row in party_rows:
+            if row.get("name") is None or row.get("type") is None:
+                logger.warning(f"[{case_identifier}] Skipping a party row without name/type cells: {row}")
+                continue
+            party_name = common.clean_html_text(row["name"])
+            party_type_str = common.clean_html_text(row["type"])
+
+            # Check if this party matches the target creditor type
+            if target_creditor_type.lower() not in party_type_str.lower():
+                continue
+
+            party_name_lower = party_name.lower().strip()
+
+            # Skip if party name contains any of the skip keywords
+            if any(keyword in party_name_lower for keyword in _ASSOCIATED_PARTY_SKIP_KEYWORDS_LOWER):
+                logger.debug(f"[{case_identifier}] Skipping party '{party_name}' due to skip keyword match.")
+                continue
+
+            # Use fuzzywuzzy to exclude the input creditor
+            if self._is_creditor_name_match(party_name, input_creditor_name):
+                logger.debug(f"[{case_identifier}] Excluding party '{party_name}' as it matches input creditor '{input_creditor_name}'.")
+                continue
+
+            # If passed all checks, add the party name
+            associated_party_names.append(party_name)
+            logger.debug(f"[{case_identifier}] Found matching associated party: '{party_name}' (Type: '{party_type_str}')")
+        return associated_party_names
+
     async def extract_party_names_from_parties_tab(
         self, case_page: Page, target_creditor_type: str, input_creditor_name: str, case_identifier: str
     ) -> List[str]:
@@ -619,132 +921,16 @@ class UnicourtHandler:
                                             state="visible", 
                                             timeout=self.settings.SHORT_TIMEOUT_SECONDS * 1000)
 
-            party_rows = await case_page.locator(self.selectors.PARTY_ROW_SELECTOR).all()
+            # All rows in one round trip; filtering happens in Python over the whole list
+            party_rows = await playwright_utils.extract_table_rows(case_page, self.selectors.PARTY_ROW_SELECTOR, {
+                "name": self.selectors.PARTY_NAME_SELECTOR,
+                "type": self.selectors.PARTY_TYPE_SELECTOR,
+            })
             if not party_rows:
-                
                 logger.warning(f"[{case_identifier}] No party rows found using selector '{self.selectors.PARTY_ROW_SELECTOR}'.")
                 return []
 
-            for row in party_rows:
-                try:
-                    party_name_element = row.locator(self.selectors.PARTY_NAME_SELECTOR)
-                    party_type_element = row.locator(self.selectors.PARTY_TYPE_SELECTOR)
-
-                    party_name = common.clean_html_text(await party_name_element.inner_text(timeout=2000))
-                    party_type_str = common.clean_html_text(await party_type_element.inner_text(timeout=2000))
-
-                    # Check if this party matches the target creditor type
-                    if target_creditor_type.lower() not in party_type_str.lower():
-                        continue
-                    
-                    # Skip common financial institutions and system entities
-                    skip_keywords = [
-                        "bank","credit", "funding", "internal revenue service", 
-                        "cach", "capital", "union", "state", "asset", "recovery", 
-                        "financial", "fcu", "fargo", "casualty", "hospital","CAVALRY", 
-                        "investments", "compensation", "workers", "student", "unifund", 
-                        "american express", "insurance", "savings", "mortgage", 
-                        "county", "university", "loan", "servicing", "school", 
-                        "community", "hosp", "city of", "west coast cu", "hma llc", 
-                        "suncoast", "HSBC", "CHRYSLER", "HOA", "card services", 
-                        "CACV", "target", "national", "brightstar", "finance", 
-                        "taxation", "commissioner", "finance", "BUREAU", "recoveries", 
-                        "compliance", "consumers", "rent a car", 
-                        "SPRINGLEAF HOME EQUITY INC", "sherwin", "washington mutual", 
-                        "lending", "midflorida", "budget", "john deere", "home equity", 
-                        "CONDOMINI", "ocw retail", "us of america", "st of colo", 
-                        "liberty mutual", "account management", "resolutions", 
-                        "accounts retrievable", "american builders", "cisco", 
-                        "deere", "collection", "INVESTMENT RETRIEVERS INC", 
-                        "homeowners", "WAKEFIELD & ASSOCIATES INC", "point loma", 
-                        "college", "CARDFLEX INC", "commonwealth", "water management", 
-                        "RBS CITIZENS NA", "trust", "condo", "equity one", "PBC CU", 
-                        "shopping center", "american general", "portfolio management", 
-                        "hotel", "first service", "midland central", "oil", 
-                        "NEIGHBORHOOD NETWORKS", "AMERICU", "health systems", 
-                        "FUNDATION", "AUTOVEST", "tekton", "abf freight", "fedex", 
-                        "tax", "of america", "SCP DISTRIBUTORS", "owners assn", 
-                        "Government", "Stewart", "INS Group", "Prop Owners", 
-                        "Maintenance ASSN", "Wachovia", "Court of","Beneficial Florida", 
-                        "Santander", "Receivables", "financing", "CNTY", "CARMAX", 
-                        "GMAC LLC", "ECONOMIC DEV", "BOARD", "HAJOCA", "SYSCO", 
-                        "SUBSIDENCE", "INLAND AMERICAN", "GARLAND ISD", "BYZFUNDER", 
-                        "NAR INC", "FOUNDERS CONFERENCE", "COLLECT", "NUMERICA CU", 
-                        "SAFWAY SERVICES LLC", "GMAC INC", "REGIONAL WATER", 
-                        "CLEARWATER NEIGHBORHOOD", "ENTERPRISE LEASING", 
-                        "MEMORIAL HEALTH", "EXP REALTY LLC", "LA COMMERCIAL GROUP INC", 
-                        "ASSN", "MEDICAL CENTER", "NSTAR ELECTRIC", "CRAFCO INC", 
-                        "MCT GROUP", "PALLIDA LLC", "DODEKA LLC", "ANTERO RESOURCES", 
-                        "ELLIOTT ELECTRIC SUPPLY INC", "PREMIERONE CU", 
-                        "DODGE ENTS INC", "ALLEGHENY RESOURCES LLC", "ACME LIFT CO LLC", 
-                        "H&E EQUIPMENT SERVICES INC", "US Securities", 
-                        "Exchange Commission", "AMPLIFY CU", "FORD MOTOR", 
-                        "METRO REVENUE", "BEST SERVICE CO INC", "VYSTAR CU", 
-                        "COMPREHENSIVE LEGAL SOLUTIONS", "US FOODS INC", 
-                        "GRIMES CENTRAL APPRAISAL", "VIBE CU", "UHG I LLC", 
-                        "GUARDIANS CU", "BENEFICIAL CALIFORNIA INC", "DNFIS USA LLC", 
-                        "CAMPUS USA CU", "PYOD LLC", "SUNBELT RENTALS INC", 
-                        "DELTA FUEL CO LLC", "HEALTH SYSTEM", "BELLCO CU", 
-                        "JACKSON HEWITT INC", "FED EX OFFICE", "EMPLOYEES CU", 
-                        "PATELCO CU", "CAG ACCEPTANCE LLC", "INS CO", "PORTFOLIO DEBT", 
-                        "PORTFOLIO INVS", "FC MARKETPLACE LLC", "ACCELA INC", 
-                        "PORTFOLIO INVS", "SEARS", "DYCK-O'NEAL INC", 
-                        "RAMADA WORLDWIDE INC", "COMMINITY CU", "CONNECT CU", 
-                        "HEALTHCARE SYSTEM", "LOTTERY", "FEDERATED FIN", 
-                        "UNITED JOINT VENTURE", "SUNNOVA ENERGY CORP", 
-                        "RIVER VALLEY CU", "CHERRYWOOD ENTS LLC", "UNIFIRST CORP", 
-                        "MID HUDSON VALLEY FED CU", "BENEFICIAL NEW YORK INC", 
-                        "GLOBAL LINK SYSTEMS INC", "NIAGARA MOHAWK POWER CORP", 
-                        "VALENTINE ELECTRIC INC", "VANTAGE WEST CU", 
-                        "ATLANTA DEV AUTHORITY", "TBA CU", "LAKE MICHIGAN CU", 
-                        "GENISYS CU", "ELGA CU", "ADVENTURE CU", "DOW CU", 
-                        "AMERICAN 1 CU", "GENISYS CU", "SECURITIES & EXCHANGE", 
-                        "MERCHANT ADVANCE LLC", "DYKE-O'NEAL INC", "PANHANDLE CU", 
-                        "AMERI CU", "District Court", "Department", "NNSECU", 
-                        "WESTLAKE SERVICES INC", "MORGAN STANLEY", "TIAA FSB", 
-                        "FAIRWINDS CU", "SPACE COAST CU", "MERCURY INDEMNITY", 
-                        "ENTERPRISE RENT", "HERTZ CORP", "BANCO POPULAR", "INDEMNITY", 
-                        "BERKSHIRE", "DEUTSCHE BK", "FIRST SOUTHWESTERN", 
-                        "ORANGE & ROCKLAND UTILITIES", "LAMARCA INS", "LOS ANGELES DEPT", 
-                        "FLORIDA CU", "CENTRAL CU OF FLORIDA", "WESTLAKE SERVICES LLC", 
-                        "MID FLORIDA CU", "ISPC", "NELNET INC", 
-                        "NISSAN MOTOR ACCEPTANCE CORP", "CFG MERCHANT SOLUTIONS LLC", 
-                        "WESTLAKE SERVICES LLC", "FEDERAL TRADE COMMISSION", 
-                        "CHASE, REVENUE SERVICES", "PRIORITY ONE CU", "ISPC", 
-                        "BELLSOUTH TELECOMMUNICATIONS", "ATTY GENERAL", 
-                        "FLORIDA CLINICAL PRACTICE ASSO", "VILLAGE OF WELLINGTON", 
-                        "FLORIDA TRANSPORTATION CU", "COLUMBIA SPORTSWEAR USA CORP", 
-                        "COMDATA NETWORK INC", "IPFS CORP", "KEYPOINT CU", 
-                        "FLORIDA RETAIL FEDERATION", "CONSOLIDATED ELECTRICAL DISTRI", 
-                        "AMERICAN BLDRS & CONTRACTORS", "FLORIDA CENTRAL CU", "DEUTSCHE BK", 
-                        "HIBU INC", "CIVIL ENFORCEMENT DIVISION", "INVERSTMENTS BUILDERS/FLORIDA", 
-                        "PORTFOLIO ROCOVERY ASSOCIATES", "SUN LIFE ASSURANCE", "MASDA", 
-                        "PRIMUS AUTOMOTIVE", "ACCLAIM CORP", "BUILDERS FIRSTSOURCE", "CIT GROUP", 
-                        "SUN CU", "BOTFLY LLC", "GULFSIDE SUPPLY INC", "ENVISION CU", 
-                        "FLORIDA TELCO CU", "YELLOW BOOK SALES", "COMPTROLLER", "INSURANC", 
-                        "FLORIDA COMMERCE CU", "OCMAC LLC", "ACCOUNTS RECEIVABLE", 
-                        "SOUTHWEST GENERAL HEALTH CTR", "BIZFUND LLC", "CU"
-                    ]
-                    
-                    party_name_lower = party_name.lower().strip()
-                    
-                    # Skip if party name contains any of the skip keywords
-                    if any(keyword.lower() in party_name_lower for keyword in skip_keywords):
-                        logger.debug(f"[{case_identifier}] Skipping party '{party_name}' due to skip keyword match.")
-                        continue
-                    
-                    # Use fuzzywuzzy to exclude the input creditor
-                    if self._is_creditor_name_match(party_name, input_creditor_name):
-                        logger.debug(f"[{case_identifier}] Excluding party '{party_name}' as it matches input creditor '{input_creditor_name}'.")
-                        continue
-                    
-                    # If passed all checks, add the party name
-                    associated_party_names.append(party_name)
-                    logger.debug(f"[{case_identifier}] Found matching associated party: '{party_name}' (Type: '{party_type_str}')")
-                    
-                except Exception as e_row:
-                    logger.warning(f"[{case_identifier}] Error processing a party row: {e_row}")
-            
+            associated_party_names = self._select_associated_party_names(party_rows, target_creditor_type, input_creditor_name, case_identifier)
             logger.info(f"[{case_identifier}] Extracted {len(associated_party_names)} associated party names: {associated_party_names}")
             return list(set(associated_party_names)) # Return unique names
         except Exception as e:
@@ -761,6 +947,74 @@ class UnicourtHandler:
         if is_complaint: return DocumentTypeEnum.COMPLAINT
         return DocumentTypeEnum.UNKNOWN
 
+    def _document_save_path(self, temp_case_download_path: str, doc_title: str, unicourt_doc_key: Optional[str],
+                            case_identifier: str, suggested_filename: str) -> str:
+        """Free path in the case's download folder: '<title>_k-<key>' plus the extension of the suggested filename."""
+        key_suffix = f"_k-{unicourt_doc_key}" if unicourt_doc_key else ""
+        base_name = common.sanitize_filename(f"{doc_title}{key_suffix}", default_name=f"doc_{common.sanitize_filename(case_identifier)}{key_suffix}")
+
+        _, orig_ext = os.path.splitext(suggested_filename)
+        # Prefer .tif if it's in the original name, otherwise default to .pdf or original
+        if 'tif' in (orig_ext or "").lower():
+            final_ext = ".tif"
+        elif 'pdf' in (orig_ext or "").lower():
+            final_ext = ".pdf"
+        else:
+            final_ext = orig_ext or ".file"
+
+        counter = 0
+        prospective_filename = f"{base_name}{final_ext}"
+        save_path = os.path.join(temp_case_download_path, prospective_filename)
+        while os.path.exists(save_path):
+            counter += 1
+            prospective_filename = f"{base_name}_{counter}{final_ext}"
+            save_path = os.path.join(temp_case_download_path, prospective_filename)
+
+        # Ensure the directory exists before saving the file
+        os.makedirs(temp_case_download_path, exist_ok=True)
+        return save_path
+
+    async def _fetch_doc_directly(
+        self,
+        page_context: BrowserContext,
+        doc_url_href: str,
+        doc_title: str,
+        unicourt_doc_key: Optional[str],
+        case_identifier: str,
+        temp_case_download_path: str,
+        referer_url: Optional[str] = None
+    ) -> Tuple[Optional[str], str]: # (saved_filepath, notes)
+        """
+        Downloads a CrowdSourced document with one GET through the context's request API, which shares the
+        logged-in session cookies. Returns (None, notes) when the response isn't a document so the caller can fall back.
+        """
+        doc_url = urljoin(referer_url or self.settings.INITIAL_URL, doc_url_href)
+        try:
+            response = await page_context.request.get(
+                doc_url, timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000,
+                headers={"Referer": referer_url} if referer_url else None
+            )
+        except Exception as e:
+            return None, f"DirectFetchError: Request for '{doc_title}' failed: {type(e).__name__} - {str(e).splitlines()[0] if str(e) else ''}"
+
+        try:
+            if not response.ok:
+                return None, f"DirectFetchHTTPError: HTTP {response.status} for '{doc_title}'."
+            content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+            body = await response.body()
+            ext = _document_extension_from_response(content_type, response.headers.get("content-disposition"), body)
+            if not ext:
+                return None, f"DirectFetchNotADocument: '{doc_title}' returned '{content_type or 'no content type'}' ({len(body)} bytes)."
+
+            save_path = self._document_save_path(temp_case_download_path, doc_title, unicourt_doc_key, case_identifier, f"document{ext}")
+            with open(save_path, "wb") as f:
+                f.write(body)
+            notes = f"Downloaded '{doc_title}' as '{os.path.basename(save_path)}'."
+            logger.info(f"[{case_identifier}] CrowdSourced SUCCESS (direct fetch, {len(body)} bytes): {notes}")
+            return save_path, notes
+        finally:
+            await response.dispose()
+
     async def _download_doc_from_crowdsourced_section_link(
         self,
         page_context: BrowserContext, # Use page's context for new tab
@@ -768,12 +1022,38 @@ class UnicourtHandler:
         doc_title: str,
         unicourt_doc_key: Optional[str],
         case_identifier: str,
-        temp_case_download_path: str
+        temp_case_download_path: str,
+        doc_url_href: Optional[str] = None,
+        referer_url: Optional[str] = None
     ) -> Tuple[Optional[str], str]: # (saved_filepath, notes)
         """
         Helper to download a single document given its link locator from CrowdSourced.
-        Handles both direct PDF downloads and fallback for unsupported file types.
+        Fetches the file URL directly when possible; otherwise opens the viewer tab, which handles both
+        direct PDF downloads and fallback for unsupported file types.
         """
+        if self.settings.DIRECT_DOCUMENT_FETCH_ENABLED and doc_url_href and DIRECT_DOCUMENT_URL_MARKER in doc_url_href:
+            saved_path, direct_notes = await self._fetch_doc_directly(
+                page_context, doc_url_href, doc_title, unicourt_doc_key, case_identifier, temp_case_download_path, referer_url
+            )
+            if saved_path:
+                return saved_path, direct_notes
+            logger.warning(f"[{case_identifier}] CrowdSourced: {direct_notes} Falling back to the document viewer tab.")
+
+        async with self._viewer_tab_lock:
+            return await self._download_doc_via_viewer_tab(
+                page_context, link_locator, doc_title, unicourt_doc_key, case_identifier, temp_case_download_path
+            )
+
+    async def _download_doc_via_viewer_tab(
+        self,
+        page_context: BrowserContext,
+        link_locator: Locator,
+        doc_title: str,
+        unicourt_doc_key: Optional[str],
+        case_identifier: str,
+        temp_case_download_path: str
+    ) -> Tuple[Optional[str], str]: # (saved_filepath, notes)
+        """Clicks the document link, then captures the download from the viewer tab it opens."""
         new_doc_viewer_page: Optional[Page] = None
         notes = ""
         download_event: Optional[Download] = None
@@ -828,29 +1108,7 @@ class UnicourtHandler:
                 return None, notes
 
 
-            key_suffix = f"_k-{unicourt_doc_key}" if unicourt_doc_key else ""
-            base_name = common.sanitize_filename(f"{doc_title}{key_suffix}", default_name=f"doc_{common.sanitize_filename(case_identifier)}{key_suffix}")
-            
-            _, orig_ext = os.path.splitext(download_event.suggested_filename)
-            # Prefer .tif if it's in the original name, otherwise default to .pdf or original
-            if 'tif' in (orig_ext or "").lower():
-                final_ext = ".tif"
-            elif 'pdf' in (orig_ext or "").lower():
-                final_ext = ".pdf"
-            else:
-                final_ext = orig_ext or ".file"
-
-
-            counter = 0
-            prospective_filename = f"{base_name}{final_ext}"
-            save_path = os.path.join(temp_case_download_path, prospective_filename)
-            while os.path.exists(save_path): 
-                counter += 1
-                prospective_filename = f"{base_name}_{counter}{final_ext}"
-                save_path = os.path.join(temp_case_download_path, prospective_filename)
-
-            # Ensure the directory exists before saving the file
-            os.makedirs(temp_case_download_path, exist_ok=True)
+            save_path = self._document_save_path(temp_case_download_path, doc_title, unicourt_doc_key, case_identifier, download_event.suggested_filename)
             await download_event.save_as(save_path)
             notes = f"Downloaded '{doc_title}' as '{os.path.basename(save_path)}'."
             logger.info(f"[{case_identifier}] CrowdSourced SUCCESS: {notes}")
@@ -904,16 +1162,13 @@ class UnicourtHandler:
             await documents_tab_locator.wait_for(state="visible", timeout=self.settings.SHORT_TIMEOUT_SECONDS * 1000)
             await documents_tab_locator.click()
             
-            # Wait for either table to appear, or just a delay
-            # The existing random_delay is kept, but the subsequent try/except for table selectors is more robust.
-            await common.random_delay(3.0, 5.0, "after clicking Documents tab") 
-            
-            # Add a more robust wait for content loading, e.g. one of the table selectors
+            # Wait for either table to appear
             try:
-                await case_page.wait_for_selector(
+                await self.waits.wait_for_selector(
+                    case_page, "documents_tab_tables",
                     f"{self.selectors.PAID_DOCS_TABLE_SELECTOR}, {self.selectors.CROWDSOURCED_DOCS_TABLE_SELECTOR}",
-                    state="attached", # Check if element is in DOM, not necessarily visible
-                    timeout=self.settings.GENERAL_TIMEOUT_SECONDS * 1000
+                    self.settings.GENERAL_TIMEOUT_SECONDS,
+                    state="attached" # Check if element is in DOM, not necessarily visible
                 )
                 logger.info(f"[{case_identifier}] Documents tab content area detected.")
             except PlaywrightTimeoutError:
@@ -935,7 +1190,7 @@ class UnicourtHandler:
         
         if await case_page.locator(self.selectors.PAID_DOCS_TABLE_SELECTOR).is_visible(timeout=5000):
             logger.info(f"[{case_identifier}] Processing 'Documents available for Download' (Paid) section.")
-            await playwright_utils.scroll_to_bottom_of_scrollable(case_page, self.selectors.PAID_DOCS_SCROLLABLE_CONTAINER, self.selectors.PAID_DOC_ROW_SELECTOR, "Paid Docs", case_identifier)
+            await playwright_utils.scroll_to_bottom_of_scrollable(case_page, self.selectors.PAID_DOCS_SCROLLABLE_CONTAINER, self.selectors.PAID_DOC_ROW_SELECTOR, "Paid Docs", case_identifier, waits=self.waits)
             
             all_paid_doc_rows = await case_page.locator(self.selectors.PAID_DOC_ROW_SELECTOR).all()
             logger.info(f"[{case_identifier}] Found {len(all_paid_doc_rows)} rows in Paid section.")
@@ -1010,7 +1265,6 @@ class UnicourtHandler:
                     order_button = case_page.locator(self.selectors.ORDER_DOCUMENTS_BUTTON_SELECTOR)
                     if await order_button.is_visible(timeout=3000) and await order_button.is_enabled(timeout=1000):
                         await order_button.click()
-                        await common.random_delay(1,2, "after clicking order docs button")
                         confirm_dialog = case_page.locator(self.selectors.CONFIRM_ORDER_DIALOG_SELECTOR)
                         await confirm_dialog.wait_for(state="visible", timeout=self.settings.SHORT_TIMEOUT_SECONDS * 1000)
                         proceed_button = confirm_dialog.locator(self.selectors.CONFIRM_ORDER_PROCEED_BUTTON_SELECTOR)
@@ -1103,16 +1357,18 @@ class UnicourtHandler:
         # --- Phase B: "Documents in CrowdSourced Library™" Section (Sole Download Point) ---
         if await case_page.locator(self.selectors.CROWDSOURCED_DOCS_TABLE_SELECTOR).is_visible(timeout=5000):
             logger.info(f"[{case_identifier}] Processing 'Documents in CrowdSourced Library™' section for downloads.")
-            await playwright_utils.scroll_to_bottom_of_scrollable(case_page, self.selectors.CROWDSOURCED_DOCS_SCROLLABLE_CONTAINER, self.selectors.CROWDSOURCED_DOC_ROW_SELECTOR, "CrowdSourced Docs", case_identifier)
+            await playwright_utils.scroll_to_bottom_of_scrollable(case_page, self.selectors.CROWDSOURCED_DOCS_SCROLLABLE_CONTAINER, self.selectors.CROWDSOURCED_DOC_ROW_SELECTOR, "CrowdSourced Docs", case_identifier, waits=self.waits)
 
             all_crowdsourced_doc_rows = await case_page.locator(self.selectors.CROWDSOURCED_DOC_ROW_SELECTOR).all()
             logger.info(f"[{case_identifier}] Found {len(all_crowdsourced_doc_rows)} rows in CrowdSourced section.")
 
+            # Collect the relevant rows first, then download them in parallel
+            crowdsourced_docs: List[Tuple[TransientDocumentInfo, Locator, Optional[str]]] = [] # (doc info, link, link href)
+            crowdsourced_row_outcomes: List[Tuple[Optional[int], Optional[Dict[str, Any]]]] = [] # (index in crowdsourced_docs, or error summary), in row order
             for i, row_locator in enumerate(all_crowdsourced_doc_rows):
                 doc_original_title = "Unknown_CrowdSourced_Doc_Title"
                 unicourt_key: Optional[str] = None
-                doc_processing_status = DocumentProcessingStatusEnum.IDENTIFIED_FOR_PROCESSING # Default for this iteration
-                
+
                 try:
                     title_span = row_locator.locator(self.selectors.CROWDSOURCED_DOC_TITLE_SPAN_SELECTOR).first
                     doc_original_title = common.clean_html_text(await title_span.get_attribute('title') or await title_span.inner_text())
@@ -1126,55 +1382,98 @@ class UnicourtHandler:
                     if doc_url_href:
                         unicourt_key = common.extract_unicourt_document_key(doc_url_href)
                     
-                    logger.info(f"[{case_identifier}] CrowdSourced: Found '{doc_original_title}' (Type: {doc_type.value}, Key: {unicourt_key}). Attempting download.")
-                    
-                    temp_dl_path, dl_notes = await self._download_doc_from_crowdsourced_section_link(
-                        case_page.context, link_locator, doc_original_title, unicourt_key, case_identifier, temp_case_download_path
-                    )
-
-                    if temp_dl_path and os.path.exists(temp_dl_path):
-                        doc_processing_status = DocumentProcessingStatusEnum.DOWNLOAD_SUCCESS
-                        llm_processing_bundle.append(TransientDocumentInfo(
-                            original_title=doc_original_title,
-                            unicourt_doc_key=unicourt_key,
-                            document_type=doc_type,
-                            temp_local_path=temp_dl_path,
-                            processing_status=doc_processing_status # Will be updated after LLM
-                        ))
-                    else:
-                        doc_processing_status = DocumentProcessingStatusEnum.DOWNLOAD_FAILED
-                    
-                    # Add or update summary:
-                    # Check if this doc (by key if available, or title) was from paid section and already has an 'ORDERING_FAILED' status.
-                    # If so, we don't overwrite that, but log that it appeared in CS.
-                    # For simplicity now, just add. More robust merging might be needed if a doc fails order then magically appears in CS.
-                    existing_summary_entry = next((s for s in processed_doc_summaries if s["unicourt_doc_key"] == unicourt_key and unicourt_key is not None), None)
-                    if not existing_summary_entry and unicourt_key is None: # try by name if keyless
-                         existing_summary_entry = next((s for s in processed_doc_summaries if s["document_name"] == doc_original_title and s["unicourt_doc_key"] is None), None)
-
-
-                    if existing_summary_entry:
-                        # If it was previously marked SKIPPED_REQUIRES_PAYMENT or ORDERING_FAILED, and now we downloaded it,
-                        # this is an update. Or if it was already DOWNLOAD_SUCCESS (e.g. page reloaded, processed again)
-                        logger.info(f"[{case_identifier}] CrowdSourced: Doc '{doc_original_title}' (Key: {unicourt_key}) already in summary with status '{existing_summary_entry['status']}'. Updating to '{doc_processing_status.value}'.")
-                        existing_summary_entry["status"] = doc_processing_status.value
-                        if unicourt_key and existing_summary_entry["unicourt_doc_key"] is None:
-                            existing_summary_entry["unicourt_doc_key"] = unicourt_key
-                    else:
-                        processed_doc_summaries.append({
-                            "document_name": doc_original_title,
-                            "unicourt_doc_key": unicourt_key,
-                            "status": doc_processing_status.value,
-                            "notes": dl_notes
-                        })
-                    await common.random_delay(0.5, 1.5, f"after processing crowdsourced doc '{doc_original_title}'")                
+                    logger.info(f"[{case_identifier}] CrowdSourced: Found '{doc_original_title}' (Type: {doc_type.value}, Key: {unicourt_key}). Queued for download.")
+                    crowdsourced_row_outcomes.append((len(crowdsourced_docs), None))
+                    crowdsourced_docs.append((TransientDocumentInfo(
+                        original_title=doc_original_title,
+                        unicourt_doc_key=unicourt_key,
+                        document_type=doc_type
+                    ), link_locator, doc_url_href))
                 except Exception as e_cs_row:
                     logger.error(f"[{case_identifier}] CrowdSourced: Error processing row ('{doc_original_title}'): {e_cs_row}")
-                    processed_doc_summaries.append({
+                    crowdsourced_row_outcomes.append((None, {
                         "document_name": doc_original_title, 
                         "unicourt_doc_key": unicourt_key, 
                         "status": DocumentProcessingStatusEnum.GENERIC_PROCESSING_ERROR.value,
                         "notes": str(e_cs_row)
+                    }))
+
+            download_semaphore = asyncio.Semaphore(self.settings.DOCUMENT_DOWNLOAD_CONCURRENCY)
+            if self.download_limiter is None:
+                self.download_limiter = HostDownloadLimiter(
+                    self.settings.DOCUMENT_DOWNLOAD_HOST_CONCURRENCY, self.settings.DOCUMENT_DOWNLOAD_HOST_MIN_INTERVAL_SECONDS
+                )
+            referer_url = case_page.url
+
+            async def download_crowdsourced_doc(doc_info: TransientDocumentInfo, link_locator: Locator, doc_url_href: Optional[str]) -> Tuple[Optional[str], str]:
+                async with download_semaphore:
+                    async with self.download_limiter.slot(urljoin(referer_url, doc_url_href or "")):
+                        return await self._download_doc_from_crowdsourced_section_link(
+                            case_page.context, link_locator, doc_info.original_title,
+                            doc_info.unicourt_doc_key, case_identifier, temp_case_download_path,
+                            doc_url_href=doc_url_href, referer_url=referer_url
+                        )
+
+            if crowdsourced_docs:
+                logger.info(f"[{case_identifier}] CrowdSourced: Downloading {len(crowdsourced_docs)} document(s), up to {self.settings.DOCUMENT_DOWNLOAD_CONCURRENCY} at a time.")
+            download_results = await asyncio.gather(
+                *(download_crowdsourced_doc(doc_info, link_locator, doc_url_href) for doc_info, link_locator, doc_url_href in crowdsourced_docs),
+                return_exceptions=True
+            )
+
+            # Apply the outcomes in row order, so the bundle and summaries don't depend on which download finished first
+            for doc_index, row_error_summary in crowdsourced_row_outcomes:
+                if row_error_summary is not None:
+                    processed_doc_summaries.append(row_error_summary)
+                    continue
+                doc_info = crowdsourced_docs[doc_index][0]
+                doc_original_title, unicourt_key = doc_info.original_title, doc_info.unicourt_doc_key
+                download_result = download_results[doc_index]
+                if isinstance(download_result, BaseException):
+                    logger.error(f"[{case_identifier}] CrowdSourced: Error processing row ('{doc_original_title}'): {download_result}")
+                    processed_doc_summaries.append({
+                        "document_name": doc_original_title, 
+                        "unicourt_doc_key": unicourt_key, 
+                        "status": DocumentProcessingStatusEnum.GENERIC_PROCESSING_ERROR.value,
+                        "notes": str(download_result)
+                    })
+                    continue
+                temp_dl_path, dl_notes = download_result
+
+                if temp_dl_path and os.path.exists(temp_dl_path):
+                    doc_processing_status = DocumentProcessingStatusEnum.DOWNLOAD_SUCCESS
+                    llm_processing_bundle.append(TransientDocumentInfo(
+                        original_title=doc_original_title,
+                        unicourt_doc_key=unicourt_key,
+                        document_type=doc_info.document_type,
+                        temp_local_path=temp_dl_path,
+                        processing_status=doc_processing_status # Will be updated after LLM
+                    ))
+                else:
+                    doc_processing_status = DocumentProcessingStatusEnum.DOWNLOAD_FAILED
+                
+                # Add or update summary:
+                # Check if this doc (by key if available, or title) was from paid section and already has an 'ORDERING_FAILED' status.
+                # If so, we don't overwrite that, but log that it appeared in CS.
+                # For simplicity now, just add. More robust merging might be needed if a doc fails order then magically appears in CS.
+                existing_summary_entry = next((s for s in processed_doc_summaries if s["unicourt_doc_key"] == unicourt_key and unicourt_key is not None), None)
+                if not existing_summary_entry and unicourt_key is None: # try by name if keyless
+                     existing_summary_entry = next((s for s in processed_doc_summaries if s["document_name"] == doc_original_title and s["unicourt_doc_key"] is None), None)
+
+
+                if existing_summary_entry:
+                    # If it was previously marked SKIPPED_REQUIRES_PAYMENT or ORDERING_FAILED, and now we downloaded it,
+                    # this is an update. Or if it was already DOWNLOAD_SUCCESS (e.g. page reloaded, processed again)
+                    logger.info(f"[{case_identifier}] CrowdSourced: Doc '{doc_original_title}' (Key: {unicourt_key}) already in summary with status '{existing_summary_entry['status']}'. Updating to '{doc_processing_status.value}'.")
+                    existing_summary_entry["status"] = doc_processing_status.value
+                    if unicourt_key and existing_summary_entry["unicourt_doc_key"] is None:
+                        existing_summary_entry["unicourt_doc_key"] = unicourt_key
+                else:
+                    processed_doc_summaries.append({
+                        "document_name": doc_original_title,
+                        "unicourt_doc_key": unicourt_key,
+                        "status": doc_processing_status.value,
+                        "notes": dl_notes
                     })
         else:
             logger.info(f"[{case_identifier}] 'CrowdSourced Library' section not found or not visible.")
@@ -0,0 +1,141 @@
+# app/services/wait_strategy.py
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class _StepStats:
+    def __init__(self, window: int):
+        self.durations: Deque[float] = deque(maxlen=window) # Seconds taken by waits that saw their signal
+        self.default_seconds = 0.0
+        self.adaptive = True # False for steps whose callers always want the full timeout
+        self.successes = 0
+        self.timeouts = 0 # Signal never came, including expected ones (e.g. no more content after a scroll)
+        self.escalations = 0 # Adaptive timeout was too tight and the wait got the rest of its ceiling
+
+
+class WaitStrategy:
+    """
+    Central place for the handler's page waits. Each wait is a named step that waits for the specific DOM signal
+    that step needs (a selector, a JS condition) instead of networkidle or a fixed sleep, and records how long the
+    signal actually took.
+
+    The caller's timeout is the ceiling. Once a step has `min_samples` observations, its timeout shrinks to the
+    observed percentile times `headroom` (never below `min_timeout_seconds`). That matters most for waits that
+    are expected to time out, like "did the page grow after this scroll", where the timeout is the cost. If an
+    adaptive timeout runs out on a wait that must succeed, the wait continues up to the ceiling before failing.
+    A wait whose timeout is taken as a final answer ("no more content", "no results") passes `adaptive=False`
+    and always gets its full timeout, so one slow load is not mistaken for the end of a list.
+    """
+    def __init__(self, adaptive: bool = True, percentile: float = 0.95, headroom: float = 1.5, min_samples: int = 10,
+                 min_timeout_seconds: float = 0.25, window: int = 200, clock: Callable[[], float] = time.monotonic):
+        self.adaptive = adaptive
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.min_timeout_seconds = min_timeout_seconds
+        self.window = window
+        self._clock = clock
+        self._steps: Dict[str, _StepStats] = {}
+
+    def _step(self, step: str) -> _StepStats:
+        if step not in self._steps:
+            self._steps[step] = _StepStats(self.window)
+        return self._steps[step]
+
+    def timeout_seconds(self, step: str, default_seconds: float, adaptive: bool = True) -> float:
+        """Timeout for the next wait of this step: the default until enough samples exist, then the adaptive value."""
+        stats = self._step(step)
+        stats.default_seconds = default_seconds
+        stats.adaptive = adaptive
+        if not (self.adaptive and adaptive) or len(stats.durations) < self.min_samples:
+            return default_seconds
+        observed = _percentile(sorted(stats.durations), self.percentile)
+        return min(default_seconds, max(self.min_timeout_seconds, observed * self.headroom))
+
+    async def run(self, step: str, wait_fn: Callable[[float], Awaitable[T]], default_seconds: float,
+                  expect_timeout: bool = False, adaptive: bool = True) -> Optional[T]:
+        """
+        Runs `wait_fn(timeout_ms)` with this step's timeout. With `expect_timeout` a timeout means "the signal didn't
+        come" and returns None; otherwise it is retried up to the ceiling once and then raised.
+        `adaptive=False` always waits the full `default_seconds`.
+        """
+        stats = self._step(step)
+        timeout = self.timeout_seconds(step, default_seconds, adaptive=adaptive)
+        started = self._clock()
+        try:
+            result = await wait_fn(timeout * 1000)
+        except PlaywrightTimeoutError:
+            if expect_timeout:
+                stats.timeouts += 1
+                return None
+            if timeout >= default_seconds:
+                stats.timeouts += 1
+                raise
+            stats.escalations += 1
+            logger.debug(f"Wait '{step}' exceeded its adaptive {timeout:.2f}s timeout; waiting up to {default_seconds:.1f}s.")
+            try:
+                result = await wait_fn(max(0.0, default_seconds - timeout) * 1000)
+            except PlaywrightTimeoutError:
+                stats.timeouts += 1
+                raise
+        stats.successes += 1
+        stats.durations.append(self._clock() - started)
+        return result
+
+    async def wait_for_selector(self, page: Page, step: str, selector: str, default_seconds: float,
+                                state: str = "visible", expect_timeout: bool = False, adaptive: bool = True) -> bool:
+        """Waits for the selector to reach `state`. Returns False if it didn't within the timeout (with expect_timeout)."""
+        async def wait(timeout_ms: float) -> bool:
+            await page.wait_for_selector(selector, state=state, timeout=timeout_ms)
+            return True
+        return bool(await self.run(step, wait, default_seconds, expect_timeout=expect_timeout, adaptive=adaptive))
+
+    async def wait_for_function(self, page: Page, step: str, expression: str, default_seconds: float,
+                                arg: Any = None, expect_timeout: bool = False, adaptive: bool = True) -> bool:
+        """Waits until the JS expression is truthy. Returns False if it wasn't within the timeout (with expect_timeout)."""
+        async def wait(timeout_ms: float) -> bool:
+            await page.wait_for_function(expression, arg=arg, timeout=timeout_ms)
+            return True
+        return bool(await self.run(step, wait, default_seconds, expect_timeout=expect_timeout, adaptive=adaptive))
+
+    async def goto(self, page: Page, step: str, url: str, ready_selector: str, default_seconds: float,
+                   required: bool = True) -> bool:
+        """
+        Navigates (DOM parsed, no networkidle) and then waits for the element that shows the page is usable.
+        Returns whether it appeared; with `required=False` a missing element is left to the caller's own checks.
+        """
+        await page.goto(url, wait_until="domcontentloaded", timeout=default_seconds * 1000)
+        ready = await self.wait_for_selector(page, step, ready_selector, default_seconds, expect_timeout=not required)
+        if not ready:
+            logger.warning(f"Wait '{step}': '{ready_selector}' did not appear after navigating to {page.url}.")
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        steps: Dict[str, Any] = {}
+        for step, stats in self._steps.items():
+            durations = sorted(stats.durations)
+            steps[step] = {
+                "successes": stats.successes,
+                "timeouts": stats.timeouts,
+                "escalations": stats.escalations,
+                "p50_seconds": round(_percentile(durations, 0.5), 3) if durations else None,
+                "p95_seconds": round(_percentile(durations, 0.95), 3) if durations else None,
+                "timeout_seconds": round(self.timeout_seconds(step, stats.default_seconds, stats.adaptive), 3) if stats.default_seconds else None,
+            }
+        return {"adaptive": self.adaptive, "percentile": self.percentile, "headroom": self.headroom, "steps": steps}
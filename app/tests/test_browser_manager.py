@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.browser_manager import BrowserManager
+
+
+def _fake_browser():
+    browser = MagicMock()
+    browser.contexts = []
+    browser.is_connected.return_value = True
+
+    async def new_context(**kwargs):
+        context = MagicMock()
+        browser.contexts.append(context)
+        return context
+
+    browser.new_context = AsyncMock(side_effect=new_context)
+    browser.close = AsyncMock()
+    return browser
+
+
+def _fake_playwright():
+    playwright = MagicMock()
+    playwright.chromium.launch = AsyncMock(side_effect=lambda **kwargs: _fake_browser())
+    return playwright
+
+
+@pytest.mark.asyncio
+async def test_contexts_share_one_browser():
+    playwright = _fake_playwright()
+    manager = BrowserManager(playwright, pool_size=1)
+    await manager.start()
+
+    for _ in range(4):
+        await manager.new_context(accept_downloads=True)
+
+    assert playwright.chromium.launch.await_count == 1
+    assert manager.stats() == {"browsers_connected": 1, "open_contexts": 4, "relaunch_count": 0}
+
+
+@pytest.mark.asyncio
+async def test_pool_spreads_contexts_across_browsers():
+    manager = BrowserManager(_fake_playwright(), pool_size=2)
+    await manager.start()
+
+    for _ in range(4):
+        await manager.new_context()
+
+    assert sorted(len(b.contexts) for b in manager._browsers) == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_disconnected_browser_is_relaunched():
+    playwright = _fake_playwright()
+    manager = BrowserManager(playwright, pool_size=1)
+    await manager.start()
+    crashed = manager._browsers[0]
+    crashed.is_connected.return_value = False
+
+    await manager.new_context()
+
+    assert playwright.chromium.launch.await_count == 2
+    assert manager._browsers[0] is not crashed
+    assert manager.stats()["relaunch_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_close_closes_browsers_and_rejects_new_contexts():
+    manager = BrowserManager(_fake_playwright(), pool_size=2)
+    await manager.start()
+    browsers = list(manager._browsers)
+
+    await manager.close()
+
+    for browser in browsers:
+        browser.close.assert_awaited_once()
+    with pytest.raises(RuntimeError):
+        await manager.new_context()
@@ -0,0 +1,249 @@
+import asyncio
+import threading
+import pytest
+from datetime import datetime, timedelta
+
+from app.db import crud, models as db_models
+from app.workers.case_queue import PersistentCaseQueue
+
+
+def _add_case(session_factory, case_number: str, status=db_models.CaseStatusEnum.QUEUED) -> int:
+    db = session_factory()
+    try:
+        db_case = db_models.Case(case_number=case_number, case_name_for_search=f"Name {case_number}",
+                                 input_creditor_name="Creditor", is_business=False, creditor_type="Plaintiff",
+                                 status=status)
+        db.add(db_case)
+        db.commit()
+        return db_case.id
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_put_get_ack_is_fifo_and_removes_item(session_factory):
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory)
+    first_id = _add_case(session_factory, "CASE-1")
+    second_id = _add_case(session_factory, "CASE-2")
+    await queue.put(first_id, "CASE-1")
+    await queue.put(second_id, "CASE-2")
+    assert await queue.qsize() == 2
+
+    lease = await queue.get("worker-0", )
+    assert lease.case_id == first_id
+    assert lease.attempts == 1
+    assert await queue.qsize() == 1
+    assert await queue.leased_count() == 1
+    assert not await queue.is_pending("CASE-1")
+
+    await queue.ack(lease)
+    assert await queue.leased_count() == 0
+    assert await queue.queued_case_numbers() == ["CASE-2"]
+
+
+@pytest.mark.asyncio
+async def test_queue_database_work_runs_off_the_event_loop(session_factory):
+    session_threads = []
+
+    def recording_session_factory():
+        session_threads.append(threading.get_ident())
+        return session_factory()
+
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=recording_session_factory)
+    case_id = _add_case(session_factory, "CASE-1")
+    await queue.put(case_id, "CASE-1")
+    lease = await queue.get("worker-0")
+    await queue.release(lease)
+    await queue.ack(await queue.get("worker-0"))
+    assert await queue.qsize() == 0
+
+    assert len(session_threads) == 6
+    assert threading.get_ident() not in session_threads
+
+@pytest.mark.asyncio
+async def test_get_returns_none_when_empty_and_stopped(session_factory):
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory)
+    stop_event = asyncio.Event()
+    waiter = asyncio.create_task(queue.get("worker-0", stop_event=stop_event))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+    stop_event.set()
+    assert await asyncio.wait_for(waiter, timeout=1) is None
+
+
+@pytest.mark.asyncio
+async def test_waiting_get_wakes_on_put_and_on_close(session_factory):
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory, poll_interval_seconds=60)
+    case_id = _add_case(session_factory, "CASE-1")
+    waiter = asyncio.create_task(queue.get("worker-0"))
+    await asyncio.sleep(0.05)
+    await queue.put(case_id, "CASE-1")
+    lease = await asyncio.wait_for(waiter, timeout=1)
+    assert lease.case_id == case_id
+
+    idle_waiter = asyncio.create_task(queue.get("worker-1"))
+    await asyncio.sleep(0.05)
+    queue.close()
+    assert await asyncio.wait_for(idle_waiter, timeout=1) is None
+
+
+@pytest.mark.asyncio
+async def test_duplicate_case_is_coalesced_and_never_leased_concurrently(session_factory):
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory, poll_interval_seconds=60)
+    case_id = _add_case(session_factory, "CASE-1")
+    await queue.put(case_id, "CASE-1")
+    await queue.put(case_id, "CASE-1")
+    assert await queue.qsize() == 1
+
+    lease = await queue.get("worker-0")
+    # Resubmitted while being processed: waits behind the live lease instead of going to another worker
+    await queue.put(case_id, "CASE-1")
+    await queue.put(case_id, "CASE-1")
+    assert await queue.qsize() == 1
+    blocked = asyncio.create_task(queue.get("worker-1"))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    await queue.ack(lease)
+    second_lease = await asyncio.wait_for(blocked, timeout=1)
+    assert second_lease.case_number == "CASE-1"
+    assert second_lease.item_id != lease.item_id
+
+
+@pytest.mark.asyncio
+async def test_leased_items_survive_restart_and_are_reclaimed(session_factory):
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory)
+    case_id = _add_case(session_factory, "CASE-1", status=db_models.CaseStatusEnum.PROCESSING)
+    await queue.put(case_id, "CASE-1")
+    lease = await queue.get("worker-0", )
+    assert lease is not None
+
+    # Simulate a restart: a new queue object over the same database
+    restarted_queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory)
+    reclaimed, requeued = await restarted_queue.reclaim_on_startup()
+    assert (reclaimed, requeued) == (1, 0)
+
+    lease_again = await restarted_queue.get("worker-1", )
+    assert lease_again.case_id == case_id
+    assert lease_again.attempts == 2
+
+    db = session_factory()
+    try:
+        assert crud.get_case_by_id(db, case_id).status == db_models.CaseStatusEnum.QUEUED
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_reclaim_requeues_cases_stuck_without_queue_entry(session_factory):
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory)
+    _add_case(session_factory, "CASE-QUEUED", status=db_models.CaseStatusEnum.QUEUED)
+    _add_case(session_factory, "CASE-PROCESSING", status=db_models.CaseStatusEnum.PROCESSING)
+    _add_case(session_factory, "CASE-DONE", status=db_models.CaseStatusEnum.COMPLETED_SUCCESSFULLY)
+
+    reclaimed, requeued = await queue.reclaim_on_startup()
+    assert (reclaimed, requeued) == (0, 2)
+    assert sorted(await queue.queued_case_numbers()) == ["CASE-PROCESSING", "CASE-QUEUED"]
+
+
+def test_expired_lease_can_be_claimed_by_another_worker(session_factory):
+    case_id = _add_case(session_factory, "CASE-1")
+    db = session_factory()
+    try:
+        crud.enqueue_case(db, case_id, "CASE-1")
+        first = crud.lease_next_queue_item(db, "worker-0", lease_seconds=60)
+        assert first is not None
+        assert crud.lease_next_queue_item(db, "worker-1", lease_seconds=60) is None
+
+        first.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+        reclaimed = crud.lease_next_queue_item(db, "worker-1", lease_seconds=60)
+        assert reclaimed.lease_owner == "worker-1"
+        assert not crud.extend_queue_item_lease(db, reclaimed.id, "worker-0", lease_seconds=60)
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_stale_owner_cannot_ack_or_release_a_reclaimed_lease(session_factory):
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory, poll_interval_seconds=60)
+    case_id = _add_case(session_factory, "CASE-1")
+    await queue.put(case_id, "CASE-1")
+    stale_lease = await queue.get("worker-0")
+
+    db = session_factory()
+    try:
+        db.query(db_models.CaseQueueItem).filter_by(id=stale_lease.item_id).update(
+            {db_models.CaseQueueItem.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+    finally:
+        db.close()
+    live_lease = await queue.get("worker-1")
+    assert live_lease.item_id == stale_lease.item_id
+
+    # The old owner finishing late must not free the case while worker-1 still runs it
+    await queue.ack(stale_lease)
+    await queue.release(stale_lease)
+    assert await queue.leased_case_numbers() == ["CASE-1"]
+    await queue.put(case_id, "CASE-1")
+    blocked = asyncio.create_task(queue.get("worker-2"))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    await queue.ack(live_lease)
+    assert (await asyncio.wait_for(blocked, timeout=1)).lease_owner == "worker-2"
+
+
+def test_stopping_process_releases_only_its_own_leases(session_factory):
+    db = session_factory()
+    try:
+        for number, owner in enumerate(["p1-worker-0", "p1-worker-3", "p10-worker-0", "p2-worker-0"]):
+            crud.enqueue_case(db, _add_case(session_factory, f"CASE-{number}"), f"CASE-{number}")
+            assert crud.lease_next_queue_item(db, owner, lease_seconds=60).lease_owner == owner
+        crud.enqueue_case(db, _add_case(session_factory, "CASE-WAITING"), "CASE-WAITING")
+
+        assert crud.release_queue_items_leased_by(db, "p1-") == 2
+        rows = {item.case_number: (item.status, item.lease_owner) for item in db.query(db_models.CaseQueueItem).all()}
+    finally:
+        db.close()
+    pending, leased = db_models.QueueItemStatusEnum.PENDING, db_models.QueueItemStatusEnum.LEASED
+    assert rows == {"CASE-0": (pending, None), "CASE-1": (pending, None), "CASE-2": (leased, "p10-worker-0"),
+                    "CASE-3": (leased, "p2-worker-0"), "CASE-WAITING": (pending, None)}
+
+
+@pytest.mark.asyncio
+async def test_priority_deadline_and_aging_order(session_factory):
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory,
+                                aging_minutes_per_level=60, deadline_urgent_minutes=120)
+    db = session_factory()
+    try:
+        now = datetime.utcnow()
+        crud.enqueue_case(db, _add_case(session_factory, "BACKFILL"), "BACKFILL", priority=0)
+        crud.enqueue_case(db, _add_case(session_factory, "URGENT"), "URGENT", priority=5)
+        crud.enqueue_case(db, _add_case(session_factory, "DUE-SOON"), "DUE-SOON", priority=0, deadline=now + timedelta(minutes=30))
+        crud.enqueue_case(db, _add_case(session_factory, "DUE-LATER"), "DUE-LATER", priority=0, deadline=now + timedelta(days=2))
+        # Waiting 10 hours at priority 0 ages past a fresh priority 5
+        starved = crud.enqueue_case(db, _add_case(session_factory, "STARVED"), "STARVED", priority=0)
+        starved.enqueued_at = now - timedelta(hours=10)
+        db.commit()
+    finally:
+        db.close()
+
+    assert await queue.queue_position("DUE-SOON") == 1
+    assert await queue.queue_position("STARVED") == 2
+    assert await queue.queue_position("URGENT") == 3
+    assert await queue.queue_position("MISSING") is None
+    leased_order = [(await queue._try_lease("worker-0")).case_number for _ in range(5)]
+    assert leased_order == ["DUE-SOON", "STARVED", "URGENT", "BACKFILL", "DUE-LATER"]
+
+
+def test_coalesced_submission_keeps_highest_priority_and_earliest_deadline(session_factory):
+    case_id = _add_case(session_factory, "CASE-1")
+    deadline = datetime(2030, 1, 1, 12, 0)
+    db = session_factory()
+    try:
+        crud.enqueue_case(db, case_id, "CASE-1", priority=1, deadline=deadline)
+        item = crud.enqueue_case(db, case_id, "CASE-1", priority=7, deadline=deadline + timedelta(days=1))
+        assert (item.priority, item.deadline) == (7, deadline)
+    finally:
+        db.close()
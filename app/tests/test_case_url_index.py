@@ -0,0 +1,83 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, Mock
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.db import crud, models as db_models
+from app.services.unicourt_handler import UnicourtHandler
+
+
+@pytest.fixture
+def handler():
+    settings = Mock()
+    settings.GENERAL_TIMEOUT_SECONDS = 30
+    settings.SHORT_TIMEOUT_SECONDS = 10
+    settings.LOGIN_PAGE_URL_IDENTIFIER = "/login"
+    settings.UNICOURT_SELECTORS = Mock(CASE_DETAIL_PAGE_LOAD_DETECTOR=".case-detail-page")
+    handler = UnicourtHandler(None, settings)
+    handler.extract_case_name_from_detail_page = AsyncMock(return_value="Acme v. Doe")
+    handler.extract_case_number_from_detail_page = AsyncMock(return_value="CV-123")
+    return handler
+
+
+def _dashboard_with_case_page(url: str):
+    case_page = MagicMock()
+    case_page.url = url
+    case_page.goto = AsyncMock()
+    case_page.wait_for_selector = AsyncMock()
+    case_page.close = AsyncMock()
+    case_page.is_closed.return_value = False
+    dashboard_page = MagicMock()
+    dashboard_page.context.new_page = AsyncMock(return_value=case_page)
+    return dashboard_page, case_page
+
+
+def test_index_entry_survives_case_deletion(db):
+    db_case = db_models.Case(case_number="CASE-1", case_name_for_search="Acme v. Doe", input_creditor_name="Acme",
+                             is_business=True, creditor_type="Plaintiff")
+    db.add(db_case)
+    db.commit()
+    crud.upsert_case_url_index_entry(db, "CASE-1", "https://app.unicourt.com/case/old", unicourt_case_number="CV-123")
+    crud.upsert_case_url_index_entry(db, "CASE-1", "https://app.unicourt.com/case/new")
+
+    crud.delete_case_by_id(db, db_case.id)
+
+    entry = crud.get_case_url_index_entry(db, "CASE-1")
+    assert entry.case_url == "https://app.unicourt.com/case/new"
+    assert entry.unicourt_case_number == "CV-123"
+    assert crud.delete_case_url_index_entry(db, "CASE-1")
+    assert crud.get_case_url_index_entry(db, "CASE-1") is None
+
+
+@pytest.mark.asyncio
+async def test_open_case_page_by_url_success(handler):
+    dashboard_page, case_page = _dashboard_with_case_page("https://app.unicourt.com/case/1")
+
+    page, notes, name, number = await handler.open_case_page_by_url(
+        dashboard_page, "https://app.unicourt.com/case/1", "CASE-1", expected_unicourt_case_number="cv-123")
+
+    assert page is case_page
+    assert (name, number) == ("Acme v. Doe", "CV-123")
+    case_page.goto.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_open_case_page_by_url_stale_when_detail_page_missing(handler):
+    dashboard_page, case_page = _dashboard_with_case_page("https://app.unicourt.com/case/1")
+    case_page.wait_for_selector.side_effect = PlaywrightTimeoutError("not found")
+
+    page, notes, _, _ = await handler.open_case_page_by_url(dashboard_page, "https://app.unicourt.com/case/1", "CASE-1")
+
+    assert page is None
+    assert "stale" in notes
+    case_page.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_open_case_page_by_url_stale_when_case_number_differs(handler):
+    dashboard_page, case_page = _dashboard_with_case_page("https://app.unicourt.com/case/1")
+
+    page, _, _, _ = await handler.open_case_page_by_url(
+        dashboard_page, "https://app.unicourt.com/case/1", "CASE-1", expected_unicourt_case_number="CV-999")
+
+    assert page is None
+    case_page.close.assert_awaited_once()
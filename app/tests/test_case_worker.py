@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.db import crud, models as db_models
+from app.workers.case_queue import PersistentCaseQueue
+from app.workers import case_worker
+
+
+class _FakeHandler:
+    """Stands in for UnicourtHandler: browser setup succeeds without a browser."""
+    def __init__(self, *args, **kwargs):
+        self.close_worker_browser_resources = AsyncMock()
+
+    async def create_worker_browser_context_and_dashboard_page(self):
+        return None, MagicMock(), MagicMock()
+
+
+@pytest.mark.asyncio
+async def test_failed_case_frees_its_slot_and_goes_back_to_the_queue(session_factory, monkeypatch):
+    monkeypatch.setattr(case_worker, "SessionLocal", session_factory)
+    monkeypatch.setattr(case_worker, "UnicourtHandler", _FakeHandler)
+    run_browser_stage = AsyncMock(side_effect=RuntimeError("boom"))
+    monkeypatch.setattr(case_worker.CaseProcessorService, "run_browser_stage", run_browser_stage)
+    # Even the WORKER_ERROR update fails, e.g. on a locked database
+    monkeypatch.setattr(crud, "update_case_status", MagicMock(side_effect=RuntimeError("database is locked")))
+    db = session_factory()
+    try:
+        db_case = db_models.Case(case_number="CASE-1", case_name_for_search="Name", input_creditor_name="Creditor",
+                                 is_business=False, creditor_type="Plaintiff", status=db_models.CaseStatusEnum.QUEUED)
+        db.add(db_case)
+        db.commit()
+        case_id = db_case.id
+    finally:
+        db.close()
+    queue = PersistentCaseQueue(lease_seconds=900, session_factory=session_factory)
+    await queue.put(case_id, "CASE-1")
+    app = SimpleNamespace(state=SimpleNamespace(
+        shutting_down=False, playwright_instance=None, browser_manager=None, case_processing_queue=queue,
+        llm_stage_queue=asyncio.Queue(), active_cases_lock=asyncio.Lock(), processing_count_lock=asyncio.Lock(),
+        actively_processing_cases=set(), active_processing_count=0, worker_pool_controller=None,
+    ))
+
+    worker = asyncio.create_task(case_worker.background_processor_worker(app, worker_id=0))
+
+    async def lease_given_up():
+        while run_browser_stage.await_count == 0 or await queue.leased_count():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(lease_given_up(), timeout=2)
+    worker.cancel() # Now in the outer loop's back-off after the error
+    await asyncio.wait_for(worker, timeout=2)
+
+    assert app.state.active_processing_count == 0 # /service/request-restart is not blocked forever
+    assert app.state.actively_processing_cases == set()
+    assert await queue.pending_case_numbers() == ["CASE-1"] # Runs again, not stuck behind a dead lease
+    assert await queue.leased_count() == 0
@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.api.routers.cases import get_batch_case_statuses, submit_cases_for_processing
+from app.core.config import AppSettings
+from app.db import crud
+from app.models_api import cases as api_models
+from app.workers.case_queue import PersistentCaseQueue
+
+
+def _request(queue: PersistentCaseQueue):
+    state = SimpleNamespace(service_ready=True, shutting_down=False, case_processing_queue=queue,
+                            active_cases_lock=asyncio.Lock(), actively_processing_cases=set(), worker_pool_controller=None)
+    return SimpleNamespace(app=SimpleNamespace(state=state))
+
+
+def _submission(case_number: str, priority: int = 0, deadline=None) -> api_models.CaseSubmitRequest:
+    return api_models.CaseSubmitRequest(cases=[api_models.CaseSubmitDetail(
+        case_number_for_db_id=case_number, case_name_for_search=f"Name {case_number}", input_creditor_name="Creditor",
+        is_business=False, creditor_type="Plaintiff", priority=priority, deadline=deadline)])
+
+
+async def _submit(session_factory, request, payload) -> api_models.CaseSubmitResponse:
+    db = session_factory()
+    try:
+        return await submit_cases_for_processing(payload, request, db=db, api_key="key", settings=AppSettings(OPENROUTER_API_KEY="test-key"))
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_resubmitting_a_queued_case_raises_its_priority_and_deadline(session_factory):
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory)
+    request = _request(queue)
+    for number in range(3):
+        await _submit(session_factory, request, _submission(f"BACKFILL-{number}"))
+    await _submit(session_factory, request, _submission("STUCK"))
+    assert await queue.queue_position("STUCK") == 4
+
+    deadline = datetime.utcnow() + timedelta(minutes=30)
+    response = await _submit(session_factory, request, _submission("STUCK", priority=90, deadline=deadline))
+
+    assert response.updated_queued_cases == 1
+    assert response.submitted_cases == 0
+    assert response.already_queued_or_processing == 0
+    db = session_factory()
+    try:
+        queue_item = crud.get_queue_item_by_case_number(db, "STUCK")
+        assert (queue_item.priority, queue_item.deadline) == (90, deadline)
+        assert crud.get_case_by_case_number(db, "STUCK").priority == 90
+    finally:
+        db.close()
+    assert await queue.qsize() == 4 # Coalesced, not duplicated
+    assert await queue.queue_position("STUCK") == 1
+
+    db = session_factory()
+    try:
+        statuses = await get_batch_case_statuses(
+            api_models.BatchCaseRequest(case_numbers_for_db_id=["STUCK", "BACKFILL-0", "UNKNOWN"]), request, db=db, api_key="key",
+            settings=AppSettings(OPENROUTER_API_KEY="test-key"))
+    finally:
+        db.close()
+    assert statuses.results["STUCK"].queue_position == 1
+    assert statuses.results["BACKFILL-0"].queue_position == 2
+    assert "UNKNOWN" in statuses.errors
+
+
+@pytest.mark.asyncio
+async def test_resubmitting_a_running_case_is_skipped(session_factory):
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory)
+    request = _request(queue)
+    await _submit(session_factory, request, _submission("RUNNING"))
+    lease = await queue.get("worker-0")
+    assert lease.case_number == "RUNNING"
+
+    response = await _submit(session_factory, request, _submission("RUNNING", priority=50))
+
+    assert response.already_queued_or_processing == 1
+    assert response.updated_queued_cases == 0
+    assert await queue.qsize() == 0
@@ -0,0 +1,91 @@
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.config import AppSettings
+from app.services.unicourt_handler import UnicourtHandler
+
+DOC_HREF = "/file/researchCourtCaseFile/ABC123/?key=KEY42"
+CASE_URL = "https://app.unicourt.com/case/CASE-1/documents"
+
+
+class FakeAPIResponse:
+    def __init__(self, status: int, content_type: str, body: bytes, content_disposition: str = None):
+        self.status = status
+        self.ok = 200 <= status < 300
+        self.headers = {"content-type": content_type}
+        if content_disposition:
+            self.headers["content-disposition"] = content_disposition
+        self._body = body
+        self.dispose = AsyncMock()
+
+    async def body(self) -> bytes:
+        return self._body
+
+
+def _handler(**overrides) -> UnicourtHandler:
+    return UnicourtHandler(None, AppSettings(OPENROUTER_API_KEY="test-key", **overrides))
+
+
+def _context(response: FakeAPIResponse):
+    return SimpleNamespace(request=SimpleNamespace(get=AsyncMock(return_value=response)), expect_page=MagicMock(), pages=[])
+
+
+@pytest.mark.asyncio
+async def test_document_is_fetched_without_opening_a_viewer_tab(tmp_path):
+    response = FakeAPIResponse(200, "application/pdf", b"%PDF-1.7 fake")
+    context = _context(response)
+    link = AsyncMock()
+
+    path, notes = await _handler()._download_doc_from_crowdsourced_section_link(
+        context, link, "Final Judgment", "KEY42", "CASE-1", str(tmp_path), doc_url_href=DOC_HREF, referer_url=CASE_URL)
+
+    assert os.path.basename(path) == "Final-Judgment_k-KEY42.pdf"
+    with open(path, "rb") as f:
+        assert f.read() == b"%PDF-1.7 fake"
+    (requested_url,), kwargs = context.request.get.await_args
+    assert requested_url == "https://app.unicourt.com/file/researchCourtCaseFile/ABC123/?key=KEY42"
+    assert kwargs["headers"] == {"Referer": CASE_URL}
+    context.expect_page.assert_not_called()
+    link.click.assert_not_called()
+    response.dispose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_tiff_and_name_collisions(tmp_path):
+    handler = _handler()
+    (tmp_path / "Complaint_k-KEY42.tif").write_bytes(b"existing")
+    response = FakeAPIResponse(200, "application/octet-stream", b"II*\x00tiffdata", 'attachment; filename="scan.tiff"')
+
+    path, _ = await handler._fetch_doc_directly(_context(response), DOC_HREF, "Complaint", "KEY42", "CASE-1", str(tmp_path))
+
+    assert os.path.basename(path) == "Complaint_k-KEY42_1.tif"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("response", [
+    FakeAPIResponse(200, "text/html; charset=utf-8", b"<html>viewer</html>"),
+    FakeAPIResponse(403, "application/pdf", b""),
+])
+async def test_non_document_responses_are_not_saved(tmp_path, response):
+    path, notes = await _handler()._fetch_doc_directly(_context(response), DOC_HREF, "Complaint", None, "CASE-1", str(tmp_path))
+
+    assert path is None
+    assert notes.startswith("DirectFetch")
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_direct_fetch_falls_back_to_viewer_tab(tmp_path):
+    handler = _handler()
+    handler._fetch_doc_directly = AsyncMock(return_value=(None, "DirectFetchHTTPError: HTTP 500 for 'Complaint'."))
+    context = _context(FakeAPIResponse(500, "text/html", b""))
+    context.expect_page = MagicMock(side_effect=RuntimeError("viewer tab opened"))
+
+    path, notes = await handler._download_doc_from_crowdsourced_section_link(
+        context, AsyncMock(), "Complaint", None, "CASE-1", str(tmp_path), doc_url_href=DOC_HREF)
+
+    assert path is None
+    assert "viewer tab opened" in notes
+    handler._fetch_doc_directly.assert_awaited_once()
@@ -0,0 +1,111 @@
+import pytest
+import fitz
+from unittest.mock import AsyncMock
+
+from app.core.config import AppSettings
+from app.db import models as db_models
+from app.services.case_processor import CaseProcessorService, CaseLLMJob
+from app.services.llm_processor import LLMProcessor, PackedDocument
+from app.services.unicourt_handler import TransientDocumentInfo
+
+INFO_NEEDED = {"original_creditor_name": True, "creditor_address": True, "associated_parties_addresses": False,
+               "reg_state": False, "final_judgment_awarded": True}
+
+
+def _make_pdf(path: str, pages: int, label: str) -> str:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"{label} page {i + 1}")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def _settings(**overrides) -> AppSettings:
+    return AppSettings(OPENROUTER_API_KEY="test-key", MAX_IMAGES_PER_LLM_CALL=5, **overrides)
+
+
+@pytest.mark.asyncio
+async def test_pack_is_one_call_split_by_source_document(tmp_path):
+    fj = _make_pdf(str(tmp_path / "fj.pdf"), 2, "Judgment")
+    complaint = _make_pdf(str(tmp_path / "complaint.pdf"), 2, "Complaint")
+    processor = LLMProcessor(_settings())
+    processor._call_llm_with_page_batch = AsyncMock(return_value=({
+        "original_creditor_name": "Acme Bank N.A.", "creditor_address": "1 Main St",
+        "final_judgment_awarded_to_creditor": "Y", "final_judgment_awarded_to_creditor_context": "Judgment for Plaintiff",
+        "source_documents": {"original_creditor_name": 2, "creditor_address": 2, "final_judgment_awarded_to_creditor": 1},
+    }, "LLM call successful"))
+
+    per_document, notes = await processor.process_document_pack_for_case_info(
+        [PackedDocument(file_path=fj, title="Final Judgment"), PackedDocument(file_path=complaint, title="Complaint")],
+        "Acme Bank", False, "Plaintiff", [], INFO_NEEDED, max_llm_attempts_per_batch=1)
+
+    assert processor._call_llm_with_page_batch.await_count == 1
+    (pages, prompt_text, *_), _ = processor._call_llm_with_page_batch.await_args
+    assert [(p.document_number, p.page_number) for p in pages] == [(1, 1), (1, 2), (2, 1), (2, 2)]
+    assert "Document 2: 'Complaint'" in prompt_text
+    assert per_document[0].final_judgment_awarded_to_creditor == "Y"
+    assert per_document[0].original_creditor_name is None
+    assert per_document[1].original_creditor_name == "Acme Bank N.A."
+    assert per_document[1].creditor_address == "1 Main St"
+    assert "1 other document" in notes
+
+
+@pytest.mark.asyncio
+async def test_unattributed_pack_answer_is_rejected(tmp_path):
+    fj = _make_pdf(str(tmp_path / "fj.pdf"), 1, "Judgment")
+    complaint = _make_pdf(str(tmp_path / "complaint.pdf"), 1, "Complaint")
+    processor = LLMProcessor(_settings())
+    processor._call_llm_with_page_batch = AsyncMock(return_value=({"original_creditor_name": "Acme Bank N.A."}, "LLM call successful"))
+
+    per_document, notes = await processor.process_document_pack_for_case_info(
+        [PackedDocument(file_path=fj, title="FJ"), PackedDocument(file_path=complaint, title="Complaint")],
+        "Acme Bank", False, "Plaintiff", [], INFO_NEEDED, max_llm_attempts_per_batch=1)
+
+    assert per_document is None
+    assert "could not be attributed" in notes
+
+
+@pytest.mark.asyncio
+async def test_pack_selection_respects_page_budget(tmp_path):
+    paths = [_make_pdf(str(tmp_path / f"doc{i}.pdf"), pages, f"Doc {i}") for i, pages in enumerate([2, 4, 3])]
+    processor = LLMProcessor(_settings())
+
+    assert await processor.select_document_pack(paths, max_pages=5) == [0, 2]
+    assert await processor.select_document_pack(paths, max_pages=2) == []
+
+
+@pytest.mark.asyncio
+async def test_case_stage_sends_small_documents_together_with_correct_sources(tmp_path, db):
+    case = db_models.Case(case_number="CASE-1", case_name_for_search="Name", input_creditor_name="Acme Bank",
+                          is_business=False, creditor_type="Plaintiff", status=db_models.CaseStatusEnum.PROCESSING,
+                          processed_documents_summary=[])
+    db.add(case)
+    db.commit()
+    docs = [
+        TransientDocumentInfo(original_title="Complaint", document_type=db_models.DocumentTypeEnum.COMPLAINT,
+                              temp_local_path=_make_pdf(str(tmp_path / "complaint.pdf"), 2, "Complaint")),
+        TransientDocumentInfo(original_title="Final Judgment", document_type=db_models.DocumentTypeEnum.FINAL_JUDGMENT,
+                              temp_local_path=_make_pdf(str(tmp_path / "fj.pdf"), 2, "Judgment")),
+    ]
+    llm_processor = LLMProcessor(_settings())
+    # Documents are sorted FJ first, so document 1 is the judgment
+    llm_processor._call_llm_with_page_batch = AsyncMock(return_value=({
+        "original_creditor_name": "Acme Bank N.A.", "creditor_address": "1 Main St",
+        "final_judgment_awarded_to_creditor": "Y", "final_judgment_awarded_to_creditor_context": "Judgment for Plaintiff",
+        "source_documents": {"original_creditor_name": 2, "creditor_address": 2, "final_judgment_awarded_to_creditor": 1},
+    }, "LLM call successful"))
+    service = CaseProcessorService(db, _settings(), None, llm_processor)
+
+    await service.run_llm_stage(CaseLLMJob(case_id=case.id, case_number="CASE-1",
+                                           temp_case_download_path=str(tmp_path / "unused"), llm_bundle_docs=docs))
+
+    db.refresh(case)
+    assert llm_processor._call_llm_with_page_batch.await_count == 1
+    assert case.original_creditor_name_source_doc_title == "Complaint"
+    assert case.final_judgment_awarded_source_doc_title == "Final Judgment"
+    assert case.status == db_models.CaseStatusEnum.COMPLETED_SUCCESSFULLY
+    assert {item["document_name"]: item["status"] for item in case.processed_documents_summary} == {
+        "Final Judgment": db_models.DocumentProcessingStatusEnum.LLM_EXTRACTION_SUCCESS.value,
+        "Complaint": db_models.DocumentProcessingStatusEnum.LLM_EXTRACTION_SUCCESS.value,
+    }
@@ -0,0 +1,72 @@
+import base64
+import io
+import fitz
+from PIL import Image
+
+from app.core.config import AppSettings
+from app.db.models import DocumentTypeEnum
+from app.services.image_encoding import IMAGE_ENCODING_PROFILES, resolve_image_encoding_profile
+from app.services.llm_processor import convert_file_to_images
+
+
+def _make_pdf(path: str, pages: int = 2) -> None:
+    """Scanned-looking pages: text over a grainy background, like the court documents we download."""
+    scan = io.BytesIO()
+    Image.effect_noise((1224, 1584), 20).point(lambda v: min(255, v + 90)).save(scan, format="PNG")
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=612, height=792)
+        page.insert_image(page.rect, stream=scan.getvalue())
+        page.insert_text((72, 72), f"IN THE CIRCUIT COURT - page {i + 1}", fontsize=14)
+    doc.save(path)
+    doc.close()
+
+
+def _decode(data_url: str) -> Image.Image:
+    header, payload = data_url.split(",", 1)
+    return Image.open(io.BytesIO(base64.b64decode(payload)))
+
+
+def test_legacy_profile_is_2x_color_png(tmp_path):
+    pdf_path = str(tmp_path / "doc.pdf")
+    _make_pdf(pdf_path)
+    images, _ = convert_file_to_images(pdf_path)
+    assert len(images) == 2
+    assert images[0].startswith("data:image/png;base64,")
+    img = _decode(images[0])
+    assert img.mode == "RGB"
+    assert img.size == (1224, 1584) # US Letter (612x792 pt) at 2x
+
+
+def test_compact_profiles_shrink_payload_and_respect_max_dimension(tmp_path):
+    pdf_path = str(tmp_path / "doc.pdf")
+    _make_pdf(pdf_path)
+    legacy, _ = convert_file_to_images(pdf_path, profile=IMAGE_ENCODING_PROFILES["legacy"])
+    for name in ("grayscale_jpeg", "compact_webp", "bilevel"):
+        profile = IMAGE_ENCODING_PROFILES[name]
+        images, notes = convert_file_to_images(pdf_path, profile=profile)
+        assert images[0].startswith(f"data:{profile.mime_type};base64,")
+        assert sum(map(len, images)) < sum(map(len, legacy)), name
+        img = _decode(images[0])
+        assert max(img.size) <= profile.max_dimension
+        if profile.image_format != "WEBP": # WebP has no grayscale mode and always decodes as RGB
+            assert img.mode in ("L", "1")
+        assert name in notes
+
+
+def test_tiff_frames_are_encoded_with_profile(tmp_path):
+    tiff_path = str(tmp_path / "doc.tif")
+    frames = [Image.new("RGB", (3000, 2000), "white") for _ in range(3)]
+    frames[0].save(tiff_path, save_all=True, append_images=frames[1:])
+    images, _ = convert_file_to_images(tiff_path, 1, 3, IMAGE_ENCODING_PROFILES["grayscale_jpeg"])
+    assert len(images) == 2
+    assert _decode(images[0]).size == (2000, 1333)
+
+
+def test_profile_resolution_per_document_type():
+    settings = AppSettings(IMAGE_ENCODING_PROFILE="grayscale_jpeg", IMAGE_ENCODING_PROFILE_FJ="bilevel",
+                           IMAGE_ENCODING_PROFILE_COMPLAINT="")
+    assert resolve_image_encoding_profile(settings, DocumentTypeEnum.FINAL_JUDGMENT).name == "bilevel"
+    assert resolve_image_encoding_profile(settings, DocumentTypeEnum.COMPLAINT).name == "grayscale_jpeg"
+    assert resolve_image_encoding_profile(settings).name == "grayscale_jpeg"
+    assert resolve_image_encoding_profile(AppSettings(IMAGE_ENCODING_PROFILE="nope")).name == "legacy"
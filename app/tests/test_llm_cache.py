@@ -0,0 +1,148 @@
+import shutil
+import threading
+import pytest
+import fitz
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+from app.core.config import AppSettings
+from app.db import models as db_models
+from app.services.llm_cache import LLMExtractionCache, build_cache_key
+from app.services.llm_processor import LLMProcessor, LLMResponseData
+
+INFO_NEEDED = {"original_creditor_name": True, "creditor_address": True, "associated_parties_addresses": False,
+               "reg_state": False, "final_judgment_awarded": False}
+
+
+def _make_pdf(path: str, text: str) -> None:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    doc.save(path)
+    doc.close()
+
+
+def test_put_get_and_metrics(session_factory):
+    cache = LLMExtractionCache(ttl_hours=1, max_entries=10, session_factory=session_factory)
+    assert cache.get("k1") is None
+    cache.put("k1", "hash", "model", {"creditor_address": "1 Main St"}, "LLM call successful")
+    assert cache.get("k1") == ({"creditor_address": "1 Main St"}, "LLM call successful")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert (stats["entries"], stats["total_hits"]) == (1, 1)
+
+
+def test_expired_entries_miss_and_are_evicted(session_factory):
+    cache = LLMExtractionCache(ttl_hours=1, max_entries=10, session_factory=session_factory)
+    cache.put("old", "hash", "model", {})
+    db = session_factory()
+    db.query(db_models.LLMExtractionCacheEntry).update({"created_at": datetime.utcnow() - timedelta(hours=2)})
+    db.commit()
+    db.close()
+    assert cache.get("old") is None
+    cache.put("new", "hash", "model", {})
+    assert cache.evictions == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_entries_evicted_above_limit(session_factory):
+    cache = LLMExtractionCache(ttl_hours=1, max_entries=2, session_factory=session_factory)
+    cache.put("a", "h", "m", {})
+    cache.put("b", "h", "m", {})
+    cache.get("a") # b is now the least recently used
+    cache.put("c", "h", "m", {})
+    assert cache.get("b") is None
+    assert cache.get("a") == ({}, None) and cache.get("c") == ({}, None)
+
+
+def test_cache_key_depends_on_every_input():
+    base = build_cache_key("hash", "model", "prompt", "legacy")
+    assert base == build_cache_key("hash", "model", "prompt", "legacy")
+    assert len({base, build_cache_key("other", "model", "prompt", "legacy"), build_cache_key("hash", "other", "prompt", "legacy"),
+                build_cache_key("hash", "model", "other", "legacy"), build_cache_key("hash", "model", "prompt", "bilevel")}) == 5
+
+
+@pytest.mark.asyncio
+async def test_same_document_and_request_is_served_from_cache(session_factory, tmp_path):
+    first, copy = str(tmp_path / "fj.pdf"), str(tmp_path / "same_fj_other_case.pdf")
+    _make_pdf(first, "Final judgment")
+    shutil.copyfile(first, copy) # Same bytes, different case folder
+    cache = LLMExtractionCache(ttl_hours=1, max_entries=10, session_factory=session_factory)
+    processor = LLMProcessor(AppSettings(OPENROUTER_API_KEY="test-key"), extraction_cache=cache)
+    processor._call_llm_with_page_batch = AsyncMock(return_value=({"creditor_address": "1 Main St"}, "LLM call successful"))
+
+    async def process(path, info=INFO_NEEDED):
+        return await processor.process_document_for_case_info(path, "Acme Bank", False, "Plaintiff", [], info,
+                                                              max_images_per_llm_call=5, max_llm_attempts_per_batch=1)
+
+    llm_data, _ = await process(first)
+    cached_data, notes = await process(copy)
+    assert cached_data.creditor_address == llm_data.creditor_address == "1 Main St"
+    assert "extraction cache" in notes
+    assert processor._call_llm_with_page_batch.await_count == 1
+
+    await process(copy, dict(INFO_NEEDED, final_judgment_awarded=True)) # Different request: different prompt
+    assert processor._call_llm_with_page_batch.await_count == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_cached_empty_result_keeps_its_found_nothing_notes(session_factory, tmp_path):
+    first, copy = str(tmp_path / "fj.pdf"), str(tmp_path / "same_fj_other_case.pdf")
+    _make_pdf(first, "Final judgment")
+    shutil.copyfile(first, copy)
+    cache = LLMExtractionCache(ttl_hours=1, max_entries=10, session_factory=session_factory)
+    processor = LLMProcessor(AppSettings(OPENROUTER_API_KEY="test-key"), extraction_cache=cache)
+    processor._call_llm_with_page_batch = AsyncMock(return_value=({"original_creditor_name": None}, "LLM call successful"))
+
+    results = [await processor.process_document_for_case_info(path, "Acme Bank", False, "Plaintiff", [], INFO_NEEDED,
+                                                               max_images_per_llm_call=5, max_llm_attempts_per_batch=1)
+               for path in (first, copy)]
+
+    assert processor._call_llm_with_page_batch.await_count == 1
+    assert cache.hits == 1
+    for llm_data, notes in results:
+        assert llm_data == LLMResponseData()
+        # CaseProcessorService maps this phrase to LLM_EXTRACTION_FAILED; a hit must not turn into a success
+        assert "LLM processed all batches but found no requested data" in notes
+    assert "extraction cache" in results[1][1]
+
+
+@pytest.mark.asyncio
+async def test_failed_extractions_are_not_cached(session_factory, tmp_path):
+    pdf_path = str(tmp_path / "fj.pdf")
+    _make_pdf(pdf_path, "Final judgment")
+    cache = LLMExtractionCache(ttl_hours=1, max_entries=10, session_factory=session_factory)
+    processor = LLMProcessor(AppSettings(OPENROUTER_API_KEY="test-key"), extraction_cache=cache)
+    processor._call_llm_with_page_batch = AsyncMock(return_value=(None, "LLM API HTTP Error 500"))
+
+    llm_data, _ = await processor.process_document_for_case_info(pdf_path, "Acme Bank", False, "Plaintiff", [], INFO_NEEDED,
+                                                                 max_images_per_llm_call=5, max_llm_attempts_per_batch=1)
+    assert llm_data is None
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_database_work_runs_off_the_event_loop(session_factory, tmp_path):
+    pdf_path = str(tmp_path / "fj.pdf")
+    _make_pdf(pdf_path, "Final judgment")
+    loop_thread = threading.get_ident()
+    cache_threads = []
+
+    class RecordingCache(LLMExtractionCache):
+        def get(self, cache_key):
+            cache_threads.append(threading.get_ident())
+            return super().get(cache_key)
+
+        def put(self, *args, **kwargs):
+            cache_threads.append(threading.get_ident())
+            super().put(*args, **kwargs)
+
+    processor = LLMProcessor(AppSettings(OPENROUTER_API_KEY="test-key"),
+                             extraction_cache=RecordingCache(ttl_hours=1, max_entries=10, session_factory=session_factory))
+    processor._call_llm_with_page_batch = AsyncMock(return_value=({"creditor_address": "1 Main St"}, "LLM call successful"))
+
+    await processor.process_document_for_case_info(pdf_path, "Acme Bank", False, "Plaintiff", [], INFO_NEEDED,
+                                                   max_images_per_llm_call=5, max_llm_attempts_per_batch=1)
+    assert len(cache_threads) == 2 # One lookup, one store
+    assert loop_thread not in cache_threads
@@ -0,0 +1,48 @@
+import json
+import httpx
+import pytest
+
+from app.core.config import AppSettings
+from app.services import llm_http_client
+from app.services.llm_processor import LLMProcessor, PageContent
+
+
+def _settings(**overrides) -> AppSettings:
+    return AppSettings(OPENROUTER_API_KEY="test-key", **overrides)
+
+
+@pytest.mark.asyncio
+async def test_processor_reuses_shared_client_for_every_call():
+    seen_requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_requests.append(request)
+        content = json.dumps({"creditor_address": "1 Main St"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        processor = LLMProcessor(_settings(), http_client=client)
+        page = PageContent(page_number=1, text="FINAL JUDGMENT")
+        for attempt in (1, 2):
+            result, notes = await processor._call_llm_with_page_batch([page], "prompt", attempt)
+            assert result == {"creditor_address": "1 Main St"}
+        assert not client.is_closed # The processor must not close a client it doesn't own
+
+    assert len(seen_requests) == 2
+    assert seen_requests[0].headers["Authorization"] == "Bearer test-key"
+    body = json.loads(seen_requests[0].content)
+    assert body["messages"][0]["content"][1] == {"type": "text", "text": "[Page 1]\nFINAL JUDGMENT"}
+
+
+@pytest.mark.asyncio
+async def test_client_uses_configured_limits_and_falls_back_without_h2(monkeypatch):
+    monkeypatch.setattr(llm_http_client, "http2_available", lambda: False)
+    client = llm_http_client.create_llm_http_client(_settings(LLM_HTTP_MAX_CONNECTIONS=7, LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS=3))
+    try:
+        pool = client._transport._pool
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 3
+        assert pool._http2 is False
+    finally:
+        await client.aclose()
+    assert client.is_closed
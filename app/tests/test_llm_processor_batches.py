@@ -0,0 +1,310 @@
+import asyncio
+import pytest
+import fitz
+from unittest.mock import AsyncMock
+
+from app.core.config import AppSettings
+from app.services.llm_processor import LLMProcessor, plan_page_batches, usable_page_text, score_page_text, rank_pages
+
+INFO_NEEDED = {"original_creditor_name": True, "creditor_address": True, "associated_parties_addresses": False,
+               "reg_state": False, "final_judgment_awarded": False}
+
+
+def _make_pdf(path: str, pages: int) -> None:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {i + 1}")
+    doc.save(path)
+    doc.close()
+
+
+def _processor(**settings_overrides) -> LLMProcessor:
+    return LLMProcessor(AppSettings(OPENROUTER_API_KEY="test-key", **settings_overrides))
+
+
+async def _process(processor: LLMProcessor, pdf_path: str):
+    return await processor.process_document_for_case_info(
+        pdf_path, "Acme Bank", is_business=False, creditor_type="Plaintiff", target_associated_party_names=[],
+        info_to_extract_for_doc=INFO_NEEDED, max_images_per_llm_call=2, max_llm_attempts_per_batch=1
+    )
+
+
+@pytest.mark.asyncio
+async def test_stops_rendering_once_requested_info_is_found(tmp_path):
+    pdf_path = str(tmp_path / "complaint.pdf")
+    _make_pdf(pdf_path, 10)
+    processor = _processor(LLM_BATCH_CONCURRENCY=1)
+    rendered_ranges = []
+    render = processor._render_pages
+
+    async def spy(file_path, first_page=0, last_page=None, profile=None, text_layer_min_chars=0):
+        rendered_ranges.append((first_page, last_page))
+        return await render(file_path, first_page, last_page, profile, text_layer_min_chars)
+
+    processor._render_pages = spy
+    processor._call_llm_with_page_batch = AsyncMock(side_effect=[
+        ({"original_creditor_name": "Acme Bank N.A."}, "LLM call successful"),
+        ({"creditor_address": "1 Main St"}, "LLM call successful"),
+    ])
+
+    llm_data, notes = await _process(processor, pdf_path)
+
+    assert llm_data.original_creditor_name == "Acme Bank N.A."
+    assert llm_data.creditor_address == "1 Main St"
+    assert rendered_ranges == [(0, 2), (2, 4)] # Pages 5-10 never rendered
+    assert all(len(call.args[0]) == 2 for call in processor._call_llm_with_page_batch.await_args_list)
+    assert "pages 5-10 skipped" in notes
+
+
+@pytest.mark.asyncio
+async def test_processes_every_batch_when_info_still_missing(tmp_path):
+    pdf_path = str(tmp_path / "complaint.pdf")
+    _make_pdf(pdf_path, 5)
+    processor = _processor()
+    processor._call_llm_with_page_batch = AsyncMock(return_value=({"original_creditor_name": None}, "LLM call successful"))
+
+    llm_data, _ = await _process(processor, pdf_path)
+
+    assert llm_data is not None
+    assert [len(call.args[0]) for call in processor._call_llm_with_page_batch.await_args_list] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_unreadable_document_reports_conversion_failure(tmp_path):
+    bad_path = tmp_path / "broken.pdf"
+    bad_path.write_bytes(b"not a pdf")
+    processor = _processor()
+    processor._call_llm_with_page_batch = AsyncMock()
+
+    llm_data, notes = await _process(processor, str(bad_path))
+
+    assert llm_data is None
+    assert notes.startswith("File_Conversion_Failed")
+    processor._call_llm_with_page_batch.assert_not_awaited()
+
+
+JUDGMENT_TEXT = ("FINAL JUDGMENT. This cause came before the Court on Plaintiff's motion. It is ordered and adjudged that "
+                 "Plaintiff, Acme Bank N.A., 1 Main Street, Springfield, IL 62701, shall recover from Defendant the sum of "
+                 "$12,345.67 for which let execution issue. DONE AND ORDERED in chambers.")
+
+
+def _make_mixed_pdf(path: str) -> None:
+    """Page 1 is born-digital (text layer), page 2 is a 'scan' (an image without any text)."""
+    doc = fitz.open()
+    doc.new_page().insert_textbox(fitz.Rect(72, 72, 540, 720), JUDGMENT_TEXT, fontsize=11)
+    scan = doc.new_page()
+    pix = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 200, 200), False)
+    pix.clear_with(200)
+    scan.insert_image(scan.rect, pixmap=pix)
+    doc.save(path)
+    doc.close()
+
+
+@pytest.mark.asyncio
+async def test_text_layer_pages_are_sent_as_text_and_scans_as_images(tmp_path):
+    pdf_path = str(tmp_path / "mixed.pdf")
+    _make_mixed_pdf(pdf_path)
+    processor = _processor()
+    processor._call_llm_with_page_batch = AsyncMock(return_value=({"original_creditor_name": None}, "LLM call successful"))
+
+    await _process(processor, pdf_path)
+
+    (pages, *_), _ = processor._call_llm_with_page_batch.await_args
+    assert [p.page_number for p in pages] == [1, 2]
+    assert "Acme Bank N.A." in pages[0].text and pages[0].image_url is None
+    assert pages[1].text is None and pages[1].image_url.startswith("data:image/png;base64,")
+
+
+@pytest.mark.asyncio
+async def test_text_layer_disabled_sends_images_only(tmp_path):
+    pdf_path = str(tmp_path / "mixed.pdf")
+    _make_mixed_pdf(pdf_path)
+    processor = LLMProcessor(AppSettings(OPENROUTER_API_KEY="test-key", TEXT_LAYER_MIN_CHARS_PER_PAGE=0))
+    processor._call_llm_with_page_batch = AsyncMock(return_value=({"original_creditor_name": None}, "LLM call successful"))
+
+    await _process(processor, pdf_path)
+
+    (pages, *_), _ = processor._call_llm_with_page_batch.await_args
+    assert all(p.text is None and p.image_url for p in pages)
+
+
+def test_garbled_text_layer_is_not_usable(tmp_path):
+    doc = fitz.open()
+    doc.new_page().insert_textbox(fitz.Rect(72, 72, 540, 720), "#%&*@!~^ " * 60, fontsize=11)
+    doc.new_page().insert_textbox(fitz.Rect(72, 72, 540, 720), JUDGMENT_TEXT, fontsize=11)
+    assert usable_page_text(doc[0], 50) is None
+    assert usable_page_text(doc[1], 50).startswith("FINAL JUDGMENT")
+    assert usable_page_text(doc[1], 5000) is None
+
+
+def test_batches_pack_text_pages_and_cap_images():
+    # 0 = image page, otherwise text-layer characters
+    assert plan_page_batches([0, 0, 0, 0, 0], max_images_per_call=2, max_text_chars_per_call=1000) == [(0, 2), (2, 4), (4, 5)]
+    assert plan_page_batches([300] * 6, max_images_per_call=2, max_text_chars_per_call=1000) == [(0, 3), (3, 6)]
+    assert plan_page_batches([300, 0, 0, 300, 0], max_images_per_call=2, max_text_chars_per_call=1000) == [(0, 4), (4, 5)]
+    assert plan_page_batches([5000, 100], max_images_per_call=2, max_text_chars_per_call=1000) == [(0, 1), (1, 2)]
+
+
+@pytest.mark.asyncio
+async def test_batches_run_concurrently_and_merge_in_page_order(tmp_path):
+    pdf_path = str(tmp_path / "complaint.pdf")
+    _make_pdf(pdf_path, 6)
+    processor = _processor(LLM_BATCH_CONCURRENCY=3)
+    running, peak = 0, 0
+    all_started = asyncio.Event()
+
+    async def fake_call(page_batch, prompt_text, attempt=1):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        if running == 3:
+            all_started.set()
+        await asyncio.wait_for(all_started.wait(), timeout=5)
+        first_page = page_batch[0].page_number
+        await asyncio.sleep(0.05 if first_page == 1 else 0) # First batch answers last
+        running -= 1
+        return {"original_creditor_name": f"Name from page {first_page}"}, "LLM call successful"
+
+    processor._call_llm_with_page_batch = fake_call
+    llm_data, notes = await _process(processor, pdf_path)
+
+    assert peak == 3
+    assert llm_data.original_creditor_name == "Name from page 1" # Earliest pages win regardless of finish order
+    assert notes.index("Batch 1:") < notes.index("Batch 2:") < notes.index("Batch 3:")
+
+
+@pytest.mark.asyncio
+async def test_outstanding_calls_cancelled_once_everything_is_found(tmp_path):
+    pdf_path = str(tmp_path / "complaint.pdf")
+    _make_pdf(pdf_path, 10)
+    processor = _processor(LLM_BATCH_CONCURRENCY=3)
+    cancelled = []
+
+    async def fake_call(page_batch, prompt_text, attempt=1):
+        first_page = page_batch[0].page_number
+        if first_page == 1:
+            return {"original_creditor_name": "Acme Bank N.A.", "creditor_address": "1 Main St"}, "LLM call successful"
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(first_page)
+            raise
+        return {}, "LLM call successful"
+
+    processor._call_llm_with_page_batch = fake_call
+    llm_data, notes = await asyncio.wait_for(_process(processor, pdf_path), timeout=2)
+
+    assert llm_data.creditor_address == "1 Main St"
+    assert sorted(cancelled) == [3, 5]
+    assert "pages 3-10 skipped" in notes
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_document_and_cancels_the_rest(tmp_path):
+    pdf_path = str(tmp_path / "complaint.pdf")
+    _make_pdf(pdf_path, 6)
+    processor = _processor(LLM_BATCH_CONCURRENCY=3)
+    cancelled = []
+
+    async def fake_call(page_batch, prompt_text, attempt=1):
+        if page_batch[0].page_number == 1:
+            return None, "LLM API HTTP Error 500"
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(page_batch[0].page_number)
+            raise
+
+    processor._call_llm_with_page_batch = fake_call
+    llm_data, notes = await asyncio.wait_for(_process(processor, pdf_path), timeout=2)
+
+    assert llm_data is None
+    assert "HTTP Error 500" in notes
+    assert sorted(cancelled) == [3, 5]
+
+
+def test_page_scores_follow_requested_fields_and_party_names():
+    judgment_only = {"final_judgment_awarded": True}
+    assert score_page_text(JUDGMENT_TEXT, [], judgment_only) > score_page_text("EXHIBIT A. Account statement.", [], judgment_only)
+    assert score_page_text(JUDGMENT_TEXT, [], {"reg_state": True}) == 0
+    assert score_page_text("Served on JOHN  Q. DOE at his residence.", ["John Q. Doe"], {"associated_parties_addresses": True}) > 0
+    assert score_page_text("Plaintiff is located at 1 Main Street, Springfield, IL 62701.", [], {"creditor_address": True}) > 0
+
+
+def test_rank_pages_keeps_caption_first_and_document_order_without_signal():
+    assert rank_pages([0, 0, 5, 0, 9]) == [0, 4, 2, 1, 3]
+    assert rank_pages([0, 0, 0]) == [0, 1, 2]
+
+
+def test_rank_pages_leaves_scanned_pages_in_their_document_slot():
+    assert rank_pages([0, 0, None, 5]) == [0, 3, 2, 1] # Scanned page 3 isn't pushed behind the text exhibit
+    assert rank_pages([None, 0, 7, None]) == [0, 2, 1, 3]
+    assert rank_pages([None, None]) == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_mixed_document_is_analyzed_and_scored_in_one_raster_job(tmp_path):
+    pdf_path = str(tmp_path / "mixed.pdf")
+    doc = fitz.open()
+    for text in ("Summons and complaint caption", "Exhibit B account statement", None, JUDGMENT_TEXT):
+        page = doc.new_page()
+        if text: # None: a scanned page, no text layer
+            page.insert_textbox(fitz.Rect(72, 72, 540, 720), text, fontsize=11)
+    doc.save(pdf_path)
+    doc.close()
+    processor = _processor(LLM_BATCH_CONCURRENCY=1)
+    raster_jobs = []
+    run_raster_job = processor._run_raster_job
+
+    async def spy(fn, *args):
+        raster_jobs.append(fn.__name__)
+        return await run_raster_job(fn, *args)
+
+    processor._run_raster_job = spy
+    processor._call_llm_with_page_batch = AsyncMock(return_value=({"final_judgment_awarded_to_creditor": None}, "LLM call successful"))
+
+    await processor.process_document_for_case_info(
+        pdf_path, "Acme Bank", is_business=False, creditor_type="Plaintiff", target_associated_party_names=[],
+        info_to_extract_for_doc={"final_judgment_awarded": True}, max_images_per_llm_call=1, max_llm_attempts_per_batch=1)
+
+    assert raster_jobs.count("analyze_and_score_document_pages") == 1
+    assert "analyze_document_pages" not in raster_jobs
+    sent = [page.page_number for call in processor._call_llm_with_page_batch.await_args_list for page in call.args[0]]
+    assert sent == [1, 4, 3, 2] # Scanned page 3 keeps its slot ahead of the text exhibit
+
+
+@pytest.mark.asyncio
+async def test_relevant_pages_are_sent_first_and_exhibits_skipped(tmp_path):
+    pdf_path = str(tmp_path / "complaint_with_exhibits.pdf")
+    doc = fitz.open()
+    for i in range(8):
+        page = doc.new_page()
+        if i == 6:
+            page.insert_textbox(fitz.Rect(72, 72, 540, 720), JUDGMENT_TEXT, fontsize=11)
+        else:
+            page.insert_text((72, 72), f"Exhibit page {i + 1}")
+    doc.save(pdf_path)
+    doc.close()
+    processor = _processor(LLM_BATCH_CONCURRENCY=1)
+    processor._call_llm_with_page_batch = AsyncMock(
+        return_value=({"original_creditor_name": "Acme Bank N.A.", "creditor_address": "1 Main Street"}, "LLM call successful"))
+
+    llm_data, notes = await _process(processor, pdf_path)
+
+    assert llm_data.creditor_address == "1 Main Street"
+    assert processor._call_llm_with_page_batch.await_count == 1
+    (pages, *_), _ = processor._call_llm_with_page_batch.await_args
+    assert [p.page_number for p in pages] == [1, 2, 7]
+    assert "pages 3, 4, 5, 6, 8 skipped" in notes
+
+
+@pytest.mark.asyncio
+async def test_page_ranking_disabled_keeps_document_order(tmp_path):
+    pdf_path = str(tmp_path / "complaint.pdf")
+    _make_mixed_pdf(pdf_path)
+    processor = _processor(LLM_PAGE_RANKING_ENABLED=False)
+    processor._call_llm_with_page_batch = AsyncMock(return_value=({"original_creditor_name": None}, "LLM call successful"))
+
+    _, notes = await _process(processor, pdf_path)
+
+    assert "ranked" not in notes
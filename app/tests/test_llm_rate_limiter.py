@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+
+from app.services import llm_rate_limiter as rate_limiter_module
+from app.services.llm_rate_limiter import LLMRateLimiter, parse_retry_after, backoff_delay
+
+_real_sleep = asyncio.sleep
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        await _real_sleep(0) # let other tasks run (and queue up) before time moves on
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter_module.asyncio, "sleep", fake.sleep)
+    return fake
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+def test_backoff_is_jittered_capped_and_respects_retry_after():
+    for attempt in range(1, 10):
+        assert 0 <= backoff_delay(attempt, 2, 10) <= 10
+    assert backoff_delay(1, 2, 10, retry_after=15) >= 15
+    assert len({backoff_delay(4, 2, 60) for _ in range(20)}) > 1
+
+
+@pytest.mark.asyncio
+async def test_requests_wait_once_bucket_is_empty(clock):
+    limiter = LLMRateLimiter(requests_per_minute=2, tokens_per_minute=0, clock=clock)
+    assert await limiter.acquire() == 0
+    assert await limiter.acquire() == 0
+    waited = await limiter.acquire()
+    assert waited == pytest.approx(30.0)
+    stats = limiter.stats()
+    assert stats["total_acquisitions"] == 3
+    assert stats["waited_acquisitions"] == 1
+    assert stats["saturation"] == pytest.approx(0.333)
+
+
+@pytest.mark.asyncio
+async def test_token_budget_and_oversized_request(clock):
+    limiter = LLMRateLimiter(requests_per_minute=0, tokens_per_minute=6000, clock=clock)
+    assert await limiter.acquire(5000) == 0
+    assert await limiter.acquire(3000) == pytest.approx(20.0) # 2000 missing at 100 tokens/s
+    # Larger than the whole budget: waits for a full bucket instead of forever
+    assert await limiter.acquire(50000) == pytest.approx(60.0)
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_every_caller(clock):
+    limiter = LLMRateLimiter(requests_per_minute=0, tokens_per_minute=0, clock=clock)
+    limiter.pause_for(12)
+    limiter.pause_for(3) # shorter pause doesn't cut the longer one
+    results = await asyncio.gather(limiter.acquire(), limiter.acquire())
+    assert results[0] == pytest.approx(12.0)
+    assert results[1] == pytest.approx(12.0)
+    assert limiter.stats()["rate_limited_responses"] == 2
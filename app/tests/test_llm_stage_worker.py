@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.db import crud, models as db_models
+from app.services.case_processor import CaseLLMJob
+from app.workers.case_queue import PersistentCaseQueue
+from app.workers.case_worker import LLMStageHandoff
+from app.workers import llm_worker
+
+
+async def _leased_case_app(session_factory, case_number: str):
+    db = session_factory()
+    try:
+        db_case = db_models.Case(case_number=case_number, case_name_for_search="Name",
+                                 input_creditor_name="Creditor", is_business=False, creditor_type="Plaintiff",
+                                 status=db_models.CaseStatusEnum.PROCESSING)
+        db.add(db_case)
+        db.commit()
+        case_id = db_case.id
+    finally:
+        db.close()
+
+    queue = PersistentCaseQueue(lease_seconds=60, session_factory=session_factory)
+    await queue.put(case_id, case_number)
+    lease = await queue.get("worker-0")
+    app = SimpleNamespace(state=SimpleNamespace(
+        shutting_down=False,
+        case_processing_queue=queue,
+        llm_stage_queue=asyncio.Queue(maxsize=2),
+        llm_stage_stop_event=asyncio.Event(),
+        active_cases_lock=asyncio.Lock(),
+        processing_count_lock=asyncio.Lock(),
+        actively_processing_cases={case_number},
+        active_processing_count=1,
+    ))
+    job = CaseLLMJob(case_id=case_id, case_number=case_number, temp_case_download_path="unused", llm_bundle_docs=[])
+    return app, queue, LLMStageHandoff(llm_job=job, lease=lease)
+
+
+async def _run_worker_until_drained(app):
+    worker = asyncio.create_task(llm_worker.llm_stage_worker(app, worker_id=0))
+    await asyncio.wait_for(app.state.llm_stage_queue.join(), timeout=2)
+    app.state.shutting_down = True
+    app.state.llm_stage_stop_event.set()
+    await asyncio.wait_for(worker, timeout=0.5) # Woken by the stop event, not a poll timeout
+
+
+@pytest.mark.asyncio
+async def test_llm_stage_worker_runs_job_and_acks_lease(session_factory, monkeypatch):
+    monkeypatch.setattr(llm_worker, "SessionLocal", session_factory)
+    run_llm_stage = AsyncMock()
+    monkeypatch.setattr(llm_worker.CaseProcessorService, "run_llm_stage", run_llm_stage)
+    app, queue, handoff = await _leased_case_app(session_factory, "CASE-1")
+
+    await app.state.llm_stage_queue.put(handoff)
+    await _run_worker_until_drained(app)
+
+    run_llm_stage.assert_awaited_once_with(handoff.llm_job)
+    assert await queue.leased_count() == 0
+    assert app.state.actively_processing_cases == set()
+    assert app.state.active_processing_count == 0
+
+
+@pytest.mark.asyncio
+async def test_llm_stage_worker_marks_worker_error_on_failure(session_factory, monkeypatch):
+    monkeypatch.setattr(llm_worker, "SessionLocal", session_factory)
+    monkeypatch.setattr(llm_worker.CaseProcessorService, "run_llm_stage", AsyncMock(side_effect=RuntimeError("boom")))
+    app, queue, handoff = await _leased_case_app(session_factory, "CASE-1")
+
+    await app.state.llm_stage_queue.put(handoff)
+    await _run_worker_until_drained(app)
+
+    assert await queue.leased_count() == 0
+    db = session_factory()
+    try:
+        assert crud.get_case_by_id(db, handoff.llm_job.case_id).status == db_models.CaseStatusEnum.WORKER_ERROR
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_idle_llm_stage_worker_wakes_on_handoff_and_on_stop(session_factory, monkeypatch):
+    monkeypatch.setattr(llm_worker, "SessionLocal", session_factory)
+    run_llm_stage = AsyncMock()
+    monkeypatch.setattr(llm_worker.CaseProcessorService, "run_llm_stage", run_llm_stage)
+    app, queue, handoff = await _leased_case_app(session_factory, "CASE-1")
+
+    worker = asyncio.create_task(llm_worker.llm_stage_worker(app, worker_id=0))
+    await asyncio.sleep(0.05) # Worker is now blocked on the empty stage queue
+    await app.state.llm_stage_queue.put(handoff)
+    await asyncio.wait_for(app.state.llm_stage_queue.join(), timeout=0.5)
+    run_llm_stage.assert_awaited_once_with(handoff.llm_job)
+
+    # Idle again; the stop event alone ends it, without the shutdown flag or a cancel
+    app.state.llm_stage_stop_event.set()
+    await asyncio.wait_for(worker, timeout=0.5)
+    assert app.state.llm_stage_queue.empty()
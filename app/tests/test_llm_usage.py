@@ -0,0 +1,106 @@
+import pytest
+import fitz
+import httpx
+from sqlalchemy import event
+
+from app.core.config import AppSettings
+from app.db import crud, models as db_models
+from app.services.case_processor import CaseProcessorService, CaseLLMJob
+from app.services.llm_processor import LLMProcessor, LLMUsage
+from app.services.unicourt_handler import TransientDocumentInfo
+from app.tools.mock_openrouter import MockOpenRouterConfig, create_mock_openrouter_app
+
+MOCK_URL = "http://mock-openrouter/api/v1/chat/completions"
+INFO_NEEDED = {"original_creditor_name": True, "creditor_address": True, "associated_parties_addresses": False,
+               "reg_state": False, "final_judgment_awarded": False}
+
+
+def _make_pdf(path: str, pages: int) -> str:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {i + 1}")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def _settings(**overrides) -> AppSettings:
+    return AppSettings(OPENROUTER_API_KEY="test-key", OPENROUTER_API_URL=MOCK_URL, LLM_RETRY_BASE_SECONDS=0.01,
+                       MAX_IMAGES_PER_LLM_CALL=2, **overrides)
+
+
+def _processor(config: MockOpenRouterConfig, **settings_overrides) -> LLMProcessor:
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_mock_openrouter_app(config)))
+    return LLMProcessor(_settings(**settings_overrides), http_client=client)
+
+
+@pytest.mark.asyncio
+async def test_document_usage_sums_every_call(tmp_path):
+    processor = _processor(MockOpenRouterConfig(latency_seconds=0, status_sequence=[500]))
+    usage = LLMUsage()
+
+    await processor.process_document_for_case_info(
+        _make_pdf(str(tmp_path / "doc.pdf"), 4), "Acme Bank", False, "Plaintiff", [], INFO_NEEDED,
+        max_images_per_llm_call=2, max_llm_attempts_per_batch=2, usage=usage)
+    await processor.http_client.aclose()
+
+    assert usage.calls == 2
+    assert usage.failed_calls == 1
+    assert usage.images == 4
+    assert usage.prompt_tokens >= 4000 # the mock reports 1000 tokens per image
+    assert usage.total_tokens == usage.prompt_tokens + usage.completion_tokens
+    assert usage.cost_usd > 0
+
+
+@pytest.mark.asyncio
+async def test_case_stage_stores_usage_per_document_and_case(tmp_path, db):
+    case = db_models.Case(case_number="CASE-1", case_name_for_search="Name", input_creditor_name="Acme Bank",
+                          is_business=False, creditor_type="Plaintiff", status=db_models.CaseStatusEnum.PROCESSING,
+                          processed_documents_summary=[])
+    db.add(case)
+    db.commit()
+    docs = [
+        TransientDocumentInfo(original_title="Final Judgment", document_type=db_models.DocumentTypeEnum.FINAL_JUDGMENT,
+                              temp_local_path=_make_pdf(str(tmp_path / "fj.pdf"), 3)),
+        TransientDocumentInfo(original_title="Complaint", document_type=db_models.DocumentTypeEnum.COMPLAINT,
+                              temp_local_path=_make_pdf(str(tmp_path / "complaint.pdf"), 1)),
+    ]
+    processor = _processor(MockOpenRouterConfig(latency_seconds=0), LLM_CROSS_DOCUMENT_BATCHING_ENABLED=False)
+    service = CaseProcessorService(db, processor.settings, None, processor)
+
+    await service.run_llm_stage(CaseLLMJob(case_id=case.id, case_number="CASE-1",
+                                           temp_case_download_path=str(tmp_path / "unused"), llm_bundle_docs=docs))
+    await processor.http_client.aclose()
+
+    db.refresh(case)
+    per_document = {item["document_name"]: item["llm_usage"] for item in case.processed_documents_summary}
+    assert per_document["Final Judgment"]["calls"] == 2
+    assert per_document["Final Judgment"]["images"] == 3
+    assert per_document["Complaint"]["calls"] == 1
+    assert case.llm_usage_totals["calls"] == 3
+    assert case.llm_usage_totals["images"] == 4
+    assert case.llm_usage_totals["cost_usd"] > 0
+
+    totals = crud.get_llm_usage_totals(db)
+    assert totals["cases"] == 1
+    assert totals["images"] == 4
+    assert totals["avg_images_per_case"] == 4
+
+
+def test_usage_totals_are_aggregated_in_sql(db):
+    usages = [LLMUsage(calls=2, images=3, total_tokens=100, cost_usd=0.25).summary(),
+              LLMUsage(calls=1, images=1, total_tokens=50, cost_usd=0.125, latency_seconds=1.5).summary(),
+              None] # No LLM stage yet
+    for number, usage in enumerate(usages):
+        db.add(db_models.Case(case_number=f"CASE-{number}", case_name_for_search="Name", input_creditor_name="Acme Bank",
+                              is_business=False, creditor_type="Plaintiff", llm_usage_totals=usage))
+    db.commit()
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    totals = crud.get_llm_usage_totals(db)
+
+    assert len(statements) == 1 and "json_extract" in statements[0]
+    assert (totals["cases"], totals["calls"], totals["images"], totals["total_tokens"]) == (2, 3, 4, 150)
+    assert (totals["cost_usd"], totals["latency_seconds"]) == (0.375, 1.5)
+    assert (totals["avg_images_per_case"], totals["avg_total_tokens_per_case"], totals["avg_cost_usd_per_case"]) == (2, 75, 0.1875)
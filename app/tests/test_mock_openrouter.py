@@ -0,0 +1,90 @@
+import pytest
+import fitz
+import httpx
+
+from app.core.config import AppSettings
+from app.services.llm_processor import LLMProcessor
+from app.services.llm_rate_limiter import LLMRateLimiter
+from app.tools.mock_openrouter import MockOpenRouterConfig, create_mock_openrouter_app
+
+MOCK_URL = "http://mock-openrouter/api/v1/chat/completions"
+INFO_NEEDED = {"original_creditor_name": True, "creditor_address": True, "associated_parties_addresses": False,
+               "reg_state": False, "final_judgment_awarded": False}
+
+
+def _make_pdf(path: str, pages: int) -> str:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {i + 1}")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def _processor(app, **settings_overrides) -> LLMProcessor:
+    settings = AppSettings(OPENROUTER_API_KEY="test-key", OPENROUTER_API_URL=MOCK_URL, LLM_PAGE_RANKING_ENABLED=False,
+                           LLM_RETRY_BASE_SECONDS=0.01, **settings_overrides)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    return LLMProcessor(settings, http_client=client, rate_limiter=LLMRateLimiter(requests_per_minute=0, tokens_per_minute=0))
+
+
+async def _process(processor: LLMProcessor, pdf_path: str, attempts: int = 1):
+    return await processor.process_document_for_case_info(
+        pdf_path, "Acme Bank", is_business=False, creditor_type="Plaintiff", target_associated_party_names=[],
+        info_to_extract_for_doc=INFO_NEEDED, max_images_per_llm_call=2, max_llm_attempts_per_batch=attempts
+    )
+
+
+@pytest.mark.asyncio
+async def test_canned_answer_round_trip(tmp_path):
+    app = create_mock_openrouter_app(MockOpenRouterConfig(
+        latency_seconds=0, responses=[{"original_creditor_name": "Acme Bank N.A.", "creditor_address": "1 Main St"}]))
+    processor = _processor(app)
+
+    llm_data, _ = await _process(processor, _make_pdf(str(tmp_path / "doc.pdf"), 2))
+    await processor.http_client.aclose()
+
+    assert llm_data.original_creditor_name == "Acme Bank N.A."
+    assert app.state.mock_stats.as_dict()["images_received"] == 2
+
+
+@pytest.mark.asyncio
+async def test_429_pauses_the_rate_limiter_and_retry_succeeds(tmp_path):
+    app = create_mock_openrouter_app(MockOpenRouterConfig(
+        latency_seconds=0, retry_after_seconds=0.2, status_sequence=[429],
+        responses=[{"original_creditor_name": "Acme Bank N.A.", "creditor_address": "1 Main St"}]))
+    processor = _processor(app)
+
+    llm_data, _ = await _process(processor, _make_pdf(str(tmp_path / "doc.pdf"), 1), attempts=2)
+    await processor.http_client.aclose()
+
+    assert llm_data.creditor_address == "1 Main St"
+    limiter_stats = processor.rate_limiter.stats()
+    assert limiter_stats["rate_limited_responses"] == 1
+    assert limiter_stats["total_wait_seconds"] >= 0.1
+    assert app.state.mock_stats.as_dict()["responses_by_status"] == {"200": 1, "429": 1}
+
+
+@pytest.mark.asyncio
+async def test_batches_reach_the_server_concurrently(tmp_path):
+    app = create_mock_openrouter_app(MockOpenRouterConfig(latency_seconds=1.0))
+    processor = _processor(app, LLM_BATCH_CONCURRENCY=3)
+
+    await _process(processor, _make_pdf(str(tmp_path / "doc.pdf"), 6))
+    await processor.http_client.aclose()
+
+    stats = app.state.mock_stats.as_dict()
+    assert stats["requests"] == 3
+    assert stats["peak_in_flight"] == 3
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_reported(tmp_path):
+    app = create_mock_openrouter_app(MockOpenRouterConfig(latency_seconds=0, error_rate=1.0))
+    processor = _processor(app)
+
+    llm_data, notes = await _process(processor, _make_pdf(str(tmp_path / "doc.pdf"), 1))
+    await processor.http_client.aclose()
+
+    assert llm_data is None
+    assert "HTTP Error 500" in notes
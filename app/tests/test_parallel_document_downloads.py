@@ -0,0 +1,104 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.config import AppSettings
+from app.db.models import DocumentProcessingStatusEnum
+from app.services import unicourt_handler as unicourt_handler_module
+from app.services.download_limiter import HostDownloadLimiter
+from app.services.unicourt_handler import UnicourtHandler
+
+CASE_URL = "https://app.unicourt.com/case/CASE-1/documents"
+
+
+def _row(title: str, href: str) -> MagicMock:
+    title_span = MagicMock()
+    title_span.get_attribute = AsyncMock(return_value=title)
+    link = MagicMock()
+    link.get_attribute = AsyncMock(return_value=href)
+    row = MagicMock()
+    row.locator = MagicMock(side_effect=lambda selector: MagicMock(first=link if selector == "a" else title_span))
+    return row
+
+
+def _case_page(handler: UnicourtHandler, rows) -> MagicMock:
+    def locator(selector):
+        loc = MagicMock()
+        loc.wait_for = AsyncMock()
+        loc.click = AsyncMock()
+        loc.is_visible = AsyncMock(return_value=selector == handler.selectors.CROWDSOURCED_DOCS_TABLE_SELECTOR)
+        loc.all = AsyncMock(return_value=rows)
+        return loc
+
+    page = MagicMock()
+    page.url = CASE_URL
+    page.locator = MagicMock(side_effect=locator)
+    page.wait_for_selector = AsyncMock()
+    return page
+
+
+@pytest.fixture
+def no_page_waits(monkeypatch):
+    monkeypatch.setattr(unicourt_handler_module.common, "random_delay", AsyncMock())
+    monkeypatch.setattr(unicourt_handler_module.playwright_utils, "scroll_to_bottom_of_scrollable", AsyncMock())
+    monkeypatch.setattr(unicourt_handler_module.playwright_utils, "safe_screenshot", AsyncMock())
+
+
+@pytest.mark.asyncio
+async def test_downloads_run_in_parallel_and_keep_row_order(tmp_path, no_page_waits):
+    settings = AppSettings(OPENROUTER_API_KEY="test-key", DOCUMENT_DOWNLOAD_CONCURRENCY=3)
+    handler = UnicourtHandler(None, settings, download_limiter=HostDownloadLimiter(10, 0))
+    handler.selectors = handler.selectors.model_copy(update={"CROWDSOURCED_DOC_LINK_A_SELECTOR": "a"})
+    titles = ["Complaint", "Exhibit A", "Final Judgment", "Amended Complaint", "Default Judgment"]
+    rows = [_row(title, f"/file/researchCourtCaseFile/{i}/?key=K{i}") for i, title in enumerate(titles)]
+    in_flight, peak = 0, 0
+
+    async def fake_download(context, link, title, key, case_identifier, download_path, doc_url_href=None, referer_url=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.2 if title == "Complaint" else 0.05) # first row finishes last
+        in_flight -= 1
+        if title == "Amended Complaint":
+            return None, "CrowdSourcedTimeout: viewer never loaded"
+        path = tmp_path / f"{key}.pdf"
+        path.write_bytes(b"%PDF")
+        return str(path), f"Downloaded '{title}'"
+
+    handler._download_doc_from_crowdsourced_section_link = fake_download
+
+    bundle, summaries = await handler.identify_and_process_documents_on_case_page(
+        _case_page(handler, rows), "CASE-1", str(tmp_path))
+
+    assert peak == 3
+    assert [doc.original_title for doc in bundle] == ["Complaint", "Final Judgment", "Default Judgment"]
+    assert [doc.unicourt_doc_key for doc in bundle] == ["K0", "K2", "K4"]
+    assert [(s["document_name"], s["status"]) for s in summaries] == [
+        ("Complaint", DocumentProcessingStatusEnum.DOWNLOAD_SUCCESS.value),
+        ("Final Judgment", DocumentProcessingStatusEnum.DOWNLOAD_SUCCESS.value),
+        ("Amended Complaint", DocumentProcessingStatusEnum.DOWNLOAD_FAILED.value),
+        ("Default Judgment", DocumentProcessingStatusEnum.DOWNLOAD_SUCCESS.value),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_host_limiter_caps_concurrency_and_spaces_starts():
+    limiter = HostDownloadLimiter(max_concurrent_per_host=2, min_interval_seconds=0.05)
+    starts = {}
+
+    async def download(url):
+        async with limiter.slot(url):
+            starts.setdefault(url.split("/")[2], []).append(time.monotonic())
+            await asyncio.sleep(0.1)
+
+    await asyncio.gather(*(download(f"https://app.unicourt.com/file/{i}") for i in range(4)),
+                         download("https://other.example.com/file"))
+
+    stats = limiter.stats()["hosts"]
+    assert stats["app.unicourt.com"]["peak_in_flight"] == 2
+    assert stats["app.unicourt.com"]["total_downloads"] == 4
+    assert stats["other.example.com"]["total_downloads"] == 1
+    unicourt_starts = starts["app.unicourt.com"]
+    assert all(later - earlier >= 0.045 for earlier, later in zip(unicourt_starts, unicourt_starts[1:]))
+    assert starts["other.example.com"][0] - unicourt_starts[0] < 0.045 # other hosts aren't held back
@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+
+from app.workers.pool_controller import WorkerPoolController, read_available_memory_mb
+
+
+def _controller(backlog=0, available_mb=8000.0, **kwargs):
+    started = []
+
+    async def worker(worker_id, drain_event):
+        started.append(worker_id)
+        await drain_event.wait()
+
+    params = dict(min_workers=1, max_workers=4, initial_workers=2, adjust_interval_seconds=60,
+                  max_error_rate=0.2, min_available_memory_mb=1024)
+    async def backlog_fn():
+        return backlog
+
+    params.update(kwargs)
+    controller = WorkerPoolController(worker_factory=worker, backlog_fn=backlog_fn,
+                                      memory_fn=lambda: available_mb, **params)
+    return controller, started
+
+
+@pytest.mark.asyncio
+async def test_start_spawns_initial_workers_and_set_limits_drains():
+    controller, started = _controller()
+    await controller.start()
+    await asyncio.sleep(0)
+    assert started == [0, 1]
+
+    await controller.set_limits(max_workers=1)
+    await asyncio.sleep(0)
+    snapshot = controller.snapshot()
+    assert (snapshot.target_workers, snapshot.running_workers, snapshot.draining_workers) == (1, 1, 0)
+
+    with pytest.raises(ValueError):
+        await controller.set_limits(min_workers=3)
+    await controller.stop()
+
+
+@pytest.mark.asyncio
+async def test_scales_up_when_healthy_with_backlog():
+    controller, _ = _controller(backlog=10)
+    await controller.start()
+    for _ in range(3):
+        controller.record_stage("browser", 10.0, ok=True)
+
+    await controller.adjust_once()
+    assert controller.target_workers == 3
+    await controller.stop()
+
+
+@pytest.mark.asyncio
+async def test_halves_on_unicourt_errors_and_backs_off_on_low_memory():
+    controller, _ = _controller(backlog=10, initial_workers=4)
+    await controller.start()
+    for ok in (False, False, True, True):
+        controller.record_stage("browser", 10.0, ok=ok)
+    await controller.adjust_once()
+    assert controller.target_workers == 2
+
+    low_memory, _ = _controller(backlog=10, available_mb=100.0)
+    assert low_memory.decide_target(backlog=10)[0] == 1
+    await controller.stop()
+
+
+def test_latency_above_baseline_triggers_backoff():
+    controller, _ = _controller(backlog=10, initial_workers=3)
+    controller._latency_baseline = 10.0
+    for _ in range(3):
+        controller.record_stage("browser", 30.0, ok=True)
+    target, reason = controller.decide_target(backlog=10)
+    assert target == 2
+    assert "baseline" in reason
+
+
+def test_read_available_memory_mb(tmp_path):
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text("MemTotal:       16384000 kB\nMemAvailable:    2048000 kB\n")
+    assert read_available_memory_mb(str(meminfo)) == 2000.0
+    assert read_available_memory_mb(str(tmp_path / "missing")) is None
+
+
+@pytest.mark.asyncio
+async def test_estimate_completion_seconds_uses_stage_medians_and_worker_count():
+    controller, _ = _controller(initial_workers=2)
+    assert controller.estimate_completion_seconds(1) is None
+    controller.record_stage("browser", 40.0, ok=True)
+    controller.record_stage("llm", 20.0, ok=True)
+    controller._workers = {0: (asyncio.Future(), asyncio.Event()), 1: (asyncio.Future(), asyncio.Event())}
+    assert controller.estimate_completion_seconds(1) == 60.0
+    assert controller.estimate_completion_seconds(5) == 180.0
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import pytest
+import fitz
+
+from app.services.llm_processor import convert_file_to_images
+from app.services.raster_pool import RasterPool
+
+
+def _make_pdf(path: str, pages: int) -> None:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {i + 1}")
+    doc.save(path)
+    doc.close()
+
+
+def _crash_child() -> None:
+    os._exit(1)
+
+
+@pytest.mark.asyncio
+async def test_pool_rasterizes_pdf_in_child_process(tmp_path):
+    pdf_path = str(tmp_path / "complaint.pdf")
+    _make_pdf(pdf_path, 3)
+    pool = RasterPool(max_workers=1)
+    try:
+        images, notes = await pool.run(convert_file_to_images, pdf_path)
+    finally:
+        pool.shutdown()
+    assert len(images) == 3
+    assert "3 images" in notes
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_rasterization(tmp_path):
+    pdf_path = str(tmp_path / "long.pdf")
+    _make_pdf(pdf_path, 20)
+    pool = RasterPool(max_workers=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker_task = asyncio.create_task(ticker())
+    try:
+        images, _ = await pool.run(convert_file_to_images, pdf_path)
+    finally:
+        ticker_task.cancel()
+        pool.shutdown()
+    assert len(images) == 20
+    assert ticks > 1
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_is_replaced_for_next_job(tmp_path):
+    pdf_path = str(tmp_path / "doc.pdf")
+    _make_pdf(pdf_path, 1)
+    pool = RasterPool(max_workers=1)
+    try:
+        with pytest.raises(Exception):
+            await pool.run(_crash_child)
+        assert pool.restart_count == 1
+        images, _ = await pool.run(convert_file_to_images, pdf_path)
+        assert len(images) == 1
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_zero_size_pool_runs_on_thread(tmp_path):
+    pdf_path = str(tmp_path / "doc.pdf")
+    _make_pdf(pdf_path, 2)
+    pool = RasterPool(max_workers=0)
+    images, _ = await pool.run(convert_file_to_images, pdf_path)
+    pool.shutdown()
+    assert len(images) == 2
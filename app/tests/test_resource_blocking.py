@@ -0,0 +1,56 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.config import AppSettings
+from app.services.unicourt_handler import UnicourtHandler, get_resource_block_stats, resource_block_totals
+
+
+def _route(resource_type: str, url: str):
+    return SimpleNamespace(request=SimpleNamespace(resource_type=resource_type, url=url),
+                           abort=AsyncMock(), continue_=AsyncMock())
+
+
+@pytest.mark.asyncio
+async def test_non_essential_requests_are_aborted_and_counted():
+    handler = UnicourtHandler(None, AppSettings(OPENROUTER_API_KEY="test-key"))
+    context = MagicMock()
+    context.route = AsyncMock()
+
+    stats = await handler._install_resource_blocking(context)
+    (pattern, route_request), _ = context.route.await_args
+    assert pattern == "**/*"
+
+    routes = {
+        "logo": _route("image", "https://app.unicourt.com/assets/logo.png"),
+        "font": _route("font", "https://fonts.gstatic.com/s/roboto.woff2"),
+        "tracker": _route("script", "https://www.googletagmanager.com/gtm.js?id=GTM-1"),
+        "app_js": _route("script", "https://app.unicourt.com/main.js"),
+        "api": _route("xhr", "https://app.unicourt.com/api/case/123"),
+        "tiff_doc": _route("image", "https://app.unicourt.com/file/researchCourtCaseFile/ABC/?key=K1"),
+    }
+    for route in routes.values():
+        await route_request(route)
+
+    for name in ("logo", "font", "tracker"):
+        routes[name].abort.assert_awaited_once()
+        routes[name].continue_.assert_not_called()
+    for name in ("app_js", "api", "tiff_doc"):
+        routes[name].continue_.assert_awaited_once()
+        routes[name].abort.assert_not_called()
+
+    assert stats.blocked_by_type == {"image": 1, "font": 1, "script": 1}
+    assert stats.allowed_requests == 3
+    assert stats.estimated_bytes_saved == 25_000 + 40_000 + 60_000
+    assert get_resource_block_stats(context) is stats
+    assert resource_block_totals()["blocked_requests"] >= 3
+
+
+@pytest.mark.asyncio
+async def test_blocked_types_and_patterns_are_configurable():
+    handler = UnicourtHandler(None, AppSettings(OPENROUTER_API_KEY="test-key", BLOCKED_RESOURCE_TYPES=["media"],
+                                                BLOCKED_URL_PATTERNS=["tracker.example"]))
+
+    assert handler._should_block_request("media", "https://cdn.example.com/intro.mp4")
+    assert handler._should_block_request("xhr", "https://tracker.example/collect")
+    assert not handler._should_block_request("image", "https://app.unicourt.com/assets/logo.png")
@@ -0,0 +1,45 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.config import AppSettings
+from app.services.unicourt_handler import UnicourtHandler
+from app.utils import playwright_utils
+
+
+def _parties_page(rows):
+    page = MagicMock()
+    page.wait_for_selector = AsyncMock()
+    page.evaluate = AsyncMock(return_value=rows)
+    page.locator.return_value.click = AsyncMock()
+    return page
+
+
+@pytest.mark.asyncio
+async def test_extract_table_rows_is_one_evaluate_call():
+    page = _parties_page([{"name": "Jane Doe", "href": "/case/1"}])
+
+    rows = await playwright_utils.extract_table_rows(page, "tbody tr", {"name": "td:nth-child(1)", "href": "a@href"})
+
+    assert rows == [{"name": "Jane Doe", "href": "/case/1"}]
+    page.evaluate.assert_awaited_once_with(playwright_utils.EXTRACT_TABLE_ROWS_JS,
+                                           ["tbody tr", {"name": "td:nth-child(1)", "href": "a@href"}])
+
+
+@pytest.mark.asyncio
+async def test_parties_tab_is_read_in_one_round_trip_and_filtered_in_python():
+    handler = UnicourtHandler(None, AppSettings(OPENROUTER_API_KEY="test-key"))
+    page = _parties_page([
+        {"name": "  Jane   Doe ", "type": "Plaintiff"},
+        {"name": "Acme Funding LLC", "type": "Plaintiff"}, # Skip keyword
+        {"name": "Midland Portfolio Services", "type": "Plaintiff"}, # The input creditor
+        {"name": "John Smith", "type": "Defendant"}, # Other party type
+        {"name": None, "type": "Plaintiff"}, # Row without a name cell
+        {"name": "Jane Doe", "type": "Plaintiff"},
+    ])
+
+    names = await handler.extract_party_names_from_parties_tab(page, "Plaintiff", "Midland Portfolio Services", "CASE-1")
+
+    assert names == ["Jane Doe"]
+    page.evaluate.assert_awaited_once()
+    assert page.evaluate.await_args.args[1][0] == handler.selectors.PARTY_ROW_SELECTOR
+    page.locator.assert_called_once_with(handler.selectors.PARTIES_TAB_BUTTON) # Only the tab click goes through a locator
@@ -0,0 +1,125 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.core.config import AppSettings
+from app.services.unicourt_handler import UnicourtHandler
+from app.services.wait_strategy import WaitStrategy
+from app.utils import playwright_utils
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _waits(clock: FakeClock, **overrides) -> WaitStrategy:
+    return WaitStrategy(clock=clock, **{"min_samples": 5, "headroom": 1.5, **overrides})
+
+
+async def _observe(waits: WaitStrategy, clock: FakeClock, step: str, seconds: float, default: float = 10.0) -> None:
+    async def wait(timeout_ms):
+        clock.now += seconds
+    await waits.run(step, wait, default)
+
+
+@pytest.mark.asyncio
+async def test_timeout_adapts_to_observed_percentile_within_the_ceiling():
+    clock = FakeClock()
+    waits = _waits(clock)
+
+    for seconds in (0.2, 0.3, 0.4, 0.5):
+        await _observe(waits, clock, "results", seconds)
+    assert waits.timeout_seconds("results", 10.0) == 10.0 # not enough samples yet
+
+    await _observe(waits, clock, "results", 0.6)
+    assert waits.timeout_seconds("results", 10.0) == pytest.approx(0.9) # p95 0.6s * 1.5
+    assert waits.timeout_seconds("results", 0.5) == 0.5 # never above the caller's ceiling
+    assert WaitStrategy(adaptive=False).timeout_seconds("results", 10.0) == 10.0
+
+    stats = waits.stats()["steps"]["results"]
+    assert stats["successes"] == 5
+    assert stats["p95_seconds"] == pytest.approx(0.6)
+
+
+@pytest.mark.asyncio
+async def test_expected_timeout_returns_false_and_required_wait_escalates_to_ceiling():
+    clock = FakeClock()
+    waits = _waits(clock)
+    for _ in range(5):
+        await _observe(waits, clock, "grow", 0.2)
+    page = MagicMock()
+    page.wait_for_function = AsyncMock(side_effect=PlaywrightTimeoutError("Timeout"))
+
+    assert await waits.wait_for_function(page, "grow", "() => false", 10.0, expect_timeout=True) is False
+    assert page.wait_for_function.await_args.kwargs["timeout"] == pytest.approx(300) # 0.2s * 1.5, not 10s
+
+    page.wait_for_selector = AsyncMock(side_effect=[PlaywrightTimeoutError("Timeout"), None])
+    assert await waits.wait_for_selector(page, "grow", "div.slow", 10.0) is True
+    timeouts = [call.kwargs["timeout"] for call in page.wait_for_selector.await_args_list]
+    assert timeouts == [pytest.approx(300), pytest.approx(9700)] # remaining ceiling on the second try
+
+    stats = waits.stats()["steps"]["grow"]
+    assert stats["timeouts"] == 1
+    assert stats["escalations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_docket_scroll_waits_for_page_growth_instead_of_sleeping():
+    handler = UnicourtHandler(None, AppSettings(OPENROUTER_API_KEY="test-key"))
+    page = MagicMock()
+    page.wait_for_selector = AsyncMock()
+    page.wait_for_timeout = AsyncMock()
+    heights = iter([1000, 2000, 3000])
+    page.evaluate = AsyncMock(side_effect=lambda script: next(heights) if "scrollHeight" in script and "scrollTo" not in script else None)
+    # Grows twice, then neither the normal nor the final check sees growth
+    page.wait_for_function = AsyncMock(side_effect=[None, None, PlaywrightTimeoutError("Timeout"), PlaywrightTimeoutError("Timeout")])
+    page.locator = MagicMock(return_value=MagicMock(inner_text=AsyncMock(return_value="Notice of Voluntary Dismissal filed")))
+
+    assert await handler.check_for_voluntary_dismissal(page, "CASE-1") is True
+
+    page.wait_for_timeout.assert_not_called()
+    assert page.wait_for_function.await_count == 4
+    assert [call.kwargs["arg"] for call in page.wait_for_function.await_args_list] == [1000, 2000, 3000, 3000]
+    steps = handler.waits.stats()["steps"]
+    assert steps["docket_scroll_growth"]["timeouts"] == 1
+    assert steps["docket_scroll_final_check"]["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_late_lazy_load_after_fast_history_is_not_taken_for_the_end_of_the_list():
+    clock = FakeClock()
+    waits = _waits(clock)
+    for _ in range(5): # Every earlier load was fast, so the growth wait has shrunk to its floor
+        await _observe(waits, clock, "scroll_items_growth", 0.1, default=2.0)
+        await _observe(waits, clock, "scroll_items_final_check", 0.1, default=4.0)
+    assert waits.timeout_seconds("scroll_items_growth", 2.0) == 0.25
+
+    state = {"items": 10, "since_scroll": 0.0, "load_delay": None}
+    load_delays = [0.1, 1.5] # Seconds until each scroll's batch arrives; the second one is slow, then the list ends
+
+    async def scroll(script):
+        state["since_scroll"], state["load_delay"] = 0.0, (load_delays.pop(0) if load_delays else None)
+
+    async def wait_for_function(expression, arg=None, timeout=None):
+        remaining = None if state["load_delay"] is None else state["load_delay"] - state["since_scroll"]
+        if remaining is not None and remaining * 1000 <= timeout:
+            clock.now += remaining
+            state["since_scroll"], state["load_delay"] = state["load_delay"], None
+            state["items"] += 10
+            return
+        clock.now += timeout / 1000
+        state["since_scroll"] += timeout / 1000
+        raise PlaywrightTimeoutError("Timeout")
+
+    page = MagicMock()
+    page.locator = MagicMock(return_value=MagicMock(is_visible=AsyncMock(return_value=True), evaluate=AsyncMock(side_effect=scroll),
+                                                    count=AsyncMock(side_effect=lambda: state["items"])))
+    page.wait_for_function = AsyncMock(side_effect=wait_for_function)
+
+    assert await playwright_utils.scroll_to_bottom_of_scrollable(page, "#list", ".row", "Docs", "CASE-1", waits=waits) == 30
+    final_check_timeouts = [call.kwargs["timeout"] for call in page.wait_for_function.await_args_list][2::2]
+    assert final_check_timeouts == [4000.0, 4000.0] # Full timeout despite the fast history
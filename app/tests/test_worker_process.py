@@ -0,0 +1,128 @@
+import asyncio
+import time
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.api.routers.service_control import get_worker_pool_status, update_worker_pool_limits
+from app.core.config import AppSettings
+from app.db import crud, models as db_models
+from app.models_api.service import WorkerPoolLimitsUpdateRequest
+from app.workers import worker_process
+from app.workers.pool_controller import WorkerPoolSnapshot, estimate_completion_seconds
+
+
+@pytest.fixture
+def session_factory(session_factory, monkeypatch):
+    monkeypatch.setattr(worker_process, "SessionLocal", session_factory)
+    return session_factory
+
+
+def _pool(running: int, browser_median: float, llm_median: float) -> dict:
+    return WorkerPoolSnapshot(min_workers=1, max_workers=4, target_workers=running, running_workers=running, draining_workers=0,
+                              browser_stage_median_seconds=browser_median, llm_stage_median_seconds=llm_median).model_dump()
+
+
+def _idle_worker_process(process_index: int) -> None:
+    time.sleep(60)
+
+
+@pytest.mark.asyncio
+async def test_supervisor_restarts_dead_processes_and_stops_all(monkeypatch):
+    monkeypatch.setattr(worker_process, "run_worker_process", _idle_worker_process)
+    monkeypatch.setattr(worker_process.WorkerProcessSupervisor, "RESTART_BACKOFF_SECONDS", 0.2)
+    supervisor = worker_process.WorkerProcessSupervisor(process_count=2, shutdown_timeout_seconds=5)
+    supervisor.start()
+    try:
+        assert supervisor.alive_count() == 2
+        first = supervisor._processes[0]
+        first.kill()
+        first.join(timeout=5)
+
+        for _ in range(50):
+            if supervisor.restart_count and supervisor.alive_count() == 2:
+                break
+            await asyncio.sleep(0.1)
+        assert supervisor.restart_count == 1
+        assert supervisor._processes[0] is not first
+    finally:
+        await supervisor.stop()
+    assert supervisor.alive_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_api_process_sees_the_pools_reported_by_worker_processes(session_factory):
+    settings = AppSettings(OPENROUTER_API_KEY="test-key", WORKER_PROCESSES=2, WORKER_PROCESS_HEARTBEAT_SECONDS=5)
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(worker_pool_controller=None)))
+    db = session_factory()
+    try:
+        crud.upsert_worker_process_heartbeat(db, 0, 100, _pool(3, 40.0, 20.0), {"page_waits": {"steps": {}}})
+        crud.upsert_worker_process_heartbeat(db, 1, 101, _pool(2, 60.0, 20.0), {})
+        crud.upsert_worker_process_heartbeat(db, 2, 102, _pool(4, 10.0, 0.0), {}) # Stale: a process that stopped reporting
+        db.query(db_models.WorkerProcessHeartbeat).filter(db_models.WorkerProcessHeartbeat.process_index == 2).update(
+            {db_models.WorkerProcessHeartbeat.updated_at: datetime.utcnow() - timedelta(minutes=5)})
+        db.commit()
+
+        pool = await get_worker_pool_status(request, settings=settings, api_key="key")
+        assert (pool.processes, pool.running_workers, pool.browser_stage_median_seconds) == (2, 5, 50.0)
+        assert estimate_completion_seconds(WorkerPoolSnapshot(**pool.model_dump()), 6) == 140.0 # Second wave of 5 workers, 70s per case
+
+        updated = await update_worker_pool_limits(request, WorkerPoolLimitsUpdateRequest(max_workers=2), settings=settings, db=db, api_key="key")
+        assert (updated.min_workers, updated.max_workers) == (1, 2)
+        assert crud.get_worker_pool_limits_override(db) == (1, 2)
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_process_applies_limits_set_through_the_api(session_factory):
+    controller = SimpleNamespace(min_workers=1, max_workers=8, set_limits=None)
+    applied = []
+    async def set_limits(min_workers, max_workers):
+        applied.append((min_workers, max_workers))
+        controller.min_workers, controller.max_workers = min_workers, max_workers
+    controller.set_limits = set_limits
+    app = SimpleNamespace(state=SimpleNamespace(worker_pool_controller=controller))
+
+    await worker_process._apply_pool_limits_override(app)
+    assert applied == [] # Nothing set through the API: keep WORKER_POOL_MIN/MAX
+
+    db = session_factory()
+    try:
+        crud.set_worker_pool_limits_override(db, 2, 3)
+    finally:
+        db.close()
+    await worker_process._apply_pool_limits_override(app)
+    await worker_process._apply_pool_limits_override(app)
+    assert applied == [(2, 3)]
+
+
+@pytest.mark.asyncio
+async def test_stopping_worker_runtime_hands_its_leased_cases_back(session_factory):
+    from app.core.lifespan import stop_worker_runtime
+    from app.workers.case_queue import PersistentCaseQueue
+    db = session_factory()
+    try:
+        case_ids = []
+        for case_number in ("CASE-1", "CASE-2"):
+            db_case = db_models.Case(case_number=case_number, case_name_for_search="Name", input_creditor_name="Creditor",
+                                     is_business=False, creditor_type="Plaintiff", status=db_models.CaseStatusEnum.PROCESSING)
+            db.add(db_case)
+            db.commit()
+            case_ids.append(db_case.id)
+    finally:
+        db.close()
+    queue = PersistentCaseQueue(lease_seconds=900, session_factory=session_factory)
+    await queue.put(case_ids[0], "CASE-1")
+    await queue.put(case_ids[1], "CASE-2")
+    await queue.get("p1-worker-0") # In the browser stage when SIGTERM arrives
+    await queue.get("p2-worker-0") # Another worker process, still running
+
+    in_flight = asyncio.create_task(asyncio.sleep(60))
+    state = SimpleNamespace(case_processing_queue=queue, worker_name_prefix="p1-", background_worker_tasks=[in_flight],
+                            worker_pool_controller=SimpleNamespace(tasks=lambda: []))
+    await stop_worker_runtime(SimpleNamespace(state=state), AppSettings(OPENROUTER_API_KEY="test-key"))
+
+    assert in_flight.cancelled()
+    assert await queue.pending_case_numbers() == ["CASE-1"] # Claimable now, not after QUEUE_LEASE_SECONDS
+    assert await queue.leased_case_numbers() == ["CASE-2"]
@@ -0,0 +1,117 @@
+# app/tools/benchmark_image_profiles.py
+"""
+Compares image encoding profiles on sample documents: payload bytes and render time for every profile, and with
+--llm also LLM latency and extraction accuracy (real OpenRouter calls, configured as for the service).
+
+    python -m app.tools.benchmark_image_profiles [--samples DIR] [--manifest FILE] [--profiles a,b] [--llm]
+
+The manifest is a JSON list describing the samples and what the LLM should find in them:
+    [{"file": "complaint.pdf", "document_type": "Complaint", "input_creditor_name": "Acme Bank",
+      "is_business": true, "creditor_type": "Plaintiff",
+      "expected": {"original_creditor_name": "Acme Bank, N.A.", "creditor_address": "1 Main St, Springfield, IL"}}]
+Without a manifest every PDF/TIFF in the samples directory is rendered (no LLM accuracy).
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import get_app_settings
+from app.services.image_encoding import IMAGE_ENCODING_PROFILES, ImageEncodingProfile
+from app.services.llm_processor import LLMProcessor, convert_file_to_images
+
+DEFAULT_SAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "test_data", "llm_docs")
+
+
+def _normalize(value: Any) -> str:
+    return re.sub(r"[\W_]+", " ", str(value or "")).strip().casefold()
+
+
+def _accuracy(expected: Dict[str, str], extracted: Dict[str, Any]) -> Optional[float]:
+    """Share of expected fields whose (normalized) value appears in the extracted value."""
+    if not expected:
+        return None
+    hits = sum(1 for field, value in expected.items() if _normalize(value) and _normalize(value) in _normalize(extracted.get(field)))
+    return hits / len(expected)
+
+
+def _load_samples(samples_dir: str, manifest_path: Optional[str]) -> List[Dict[str, Any]]:
+    if manifest_path:
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+    return [{"file": name} for name in sorted(os.listdir(samples_dir))
+            if os.path.splitext(name)[1].lower() in (".pdf", ".tif", ".tiff")]
+
+
+async def _benchmark_llm(processor: LLMProcessor, path: str, sample: Dict[str, Any], profile: ImageEncodingProfile) -> Dict[str, Any]:
+    settings = processor.settings
+    info_needed = {field: True for field in ("original_creditor_name", "creditor_address", "reg_state", "final_judgment_awarded")}
+    started = time.perf_counter()
+    llm_data, notes = await processor.process_document_for_case_info(
+        path, sample.get("input_creditor_name", ""), sample.get("is_business", False), sample.get("creditor_type", "Plaintiff"),
+        target_associated_party_names=[], info_to_extract_for_doc=info_needed,
+        max_images_per_llm_call=settings.MAX_IMAGES_PER_LLM_CALL, max_llm_attempts_per_batch=1, encoding_profile=profile
+    )
+    return {
+        "llm_seconds": time.perf_counter() - started,
+        "accuracy": _accuracy(sample.get("expected", {}), llm_data.model_dump() if llm_data else {}),
+        "llm_ok": llm_data is not None,
+    }
+
+
+async def run_benchmark(samples_dir: str, manifest_path: Optional[str], profile_names: List[str], with_llm: bool) -> List[Dict[str, Any]]:
+    processor = LLMProcessor(get_app_settings()) if with_llm else None
+    results = []
+    for sample in _load_samples(samples_dir, manifest_path):
+        path = os.path.join(samples_dir, sample["file"])
+        for name in profile_names:
+            profile = IMAGE_ENCODING_PROFILES[name]
+            started = time.perf_counter()
+            images, notes = convert_file_to_images(path, profile=profile)
+            row = {
+                "file": sample["file"], "profile": name, "pages": len(images),
+                "payload_kb": sum(len(i) for i in images) / 1024, "render_seconds": time.perf_counter() - started,
+            }
+            if not images:
+                row["error"] = notes
+            elif processor:
+                row.update(await _benchmark_llm(processor, path, sample, profile))
+            results.append(row)
+    return results
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    print(f"{'file':<28} {'profile':<15} {'pages':>5} {'payload KB':>11} {'render s':>9} {'LLM s':>7} {'accuracy':>8}")
+    for r in results:
+        llm_seconds = f"{r['llm_seconds']:.1f}" if "llm_seconds" in r else "-"
+        accuracy = f"{r['accuracy']:.0%}" if r.get("accuracy") is not None else "-"
+        print(f"{r['file'][:28]:<28} {r['profile']:<15} {r['pages']:>5} {r['payload_kb']:>11.0f} {r['render_seconds']:>9.2f} {llm_seconds:>7} {accuracy:>8}"
+              + (f"  {r['error']}" if "error" in r else ""))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark image encoding profiles for LLM payloads.")
+    parser.add_argument("--samples", default=DEFAULT_SAMPLES_DIR, help="Directory with sample PDF/TIFF documents")
+    parser.add_argument("--manifest", help="JSON manifest with per-sample LLM inputs and expected values")
+    parser.add_argument("--profiles", default=",".join(IMAGE_ENCODING_PROFILES), help="Comma-separated profile names")
+    parser.add_argument("--llm", action="store_true", help="Also call the LLM and measure latency/accuracy")
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON")
+    args = parser.parse_args()
+
+    profile_names = [name.strip() for name in args.profiles.split(",") if name.strip()]
+    unknown = [name for name in profile_names if name not in IMAGE_ENCODING_PROFILES]
+    if unknown:
+        parser.error(f"Unknown profile(s): {', '.join(unknown)}. Available: {', '.join(IMAGE_ENCODING_PROFILES)}")
+
+    results = asyncio.run(run_benchmark(args.samples, args.manifest, profile_names, args.llm))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+
+
+if __name__ == "__main__":
+    main()
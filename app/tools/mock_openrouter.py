@@ -0,0 +1,210 @@
+# app/tools/mock_openrouter.py
+"""
+Local stand-in for the OpenRouter chat-completions API, for running and benchmarking the LLM path offline
+(batch concurrency, rate limiting, retries) without network access or API spend.
+
+    python -m app.tools.mock_openrouter [--port 8089] [--latency 1.5] [--jitter 0.5] [--error-rate 0.05]
+                                         [--rate-limit-rate 0.05] [--requests-per-minute 60] [--retry-after 2]
+                                         [--responses FILE] [--seed 1]
+
+then start the service with OPENROUTER_API_URL=http://127.0.0.1:8089/api/v1/chat/completions.
+
+--responses is a JSON list of canned answers, used in turn: either the extraction JSON the model should return
+({"original_creditor_name": "...", ...}) or a complete recorded chat-completions response body (with "choices").
+Without it every call answers with all fields null. GET /stats shows request counts and peak concurrency;
+POST /stats/reset clears them.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+MOCK_CHAT_COMPLETIONS_PATH = "/api/v1/chat/completions"
+MOCK_TOKENS_PER_IMAGE = 1000 # Reported prompt tokens per image part
+
+EMPTY_EXTRACTION_ANSWER: Dict[str, Any] = {
+    "original_creditor_name": None,
+    "creditor_address": None,
+    "associated_parties": [],
+    "creditor_registration_state": None,
+    "final_judgment_awarded_to_creditor": None,
+    "final_judgment_awarded_to_creditor_context": None,
+}
+
+
+class MockOpenRouterConfig(BaseModel):
+    latency_seconds: float = 0.5 # Base response time of a successful call
+    latency_jitter_seconds: float = 0.0 # Uniform extra latency in [0, jitter]
+    error_rate: float = 0.0 # Share of calls answered 500
+    rate_limit_rate: float = 0.0 # Share of calls answered 429 with Retry-After
+    requests_per_minute: int = 0 # Sliding-window cap above which calls get 429 (0 = none), like an account limit
+    retry_after_seconds: float = 1.0
+    status_sequence: List[int] = [] # Scripted statuses for the first calls (200 = normal answer), before the rates apply
+    responses: List[Dict[str, Any]] = [] # Canned answers or recorded response bodies, used in turn
+    seed: Optional[int] = None
+    cost_per_million_tokens: float = 1.0 # For the usage.cost OpenRouter reports when asked (usage.include)
+
+
+class MockOpenRouterStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.responses_by_status: Dict[int, int] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.images_received = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "responses_by_status": {str(status): count for status, count in sorted(self.responses_by_status.items())},
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "images_received": self.images_received,
+        }
+
+
+def _count_content_parts(body: Dict[str, Any]) -> Dict[str, int]:
+    text_chars, images = 0, 0
+    for message in body.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            text_chars += len(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "image_url":
+                images += 1
+            elif part.get("type") == "text":
+                text_chars += len(part.get("text", ""))
+    return {"text_chars": text_chars, "images": images}
+
+
+def _completion_body(answer: Dict[str, Any], model: str, prompt_tokens: int, cost_per_million_tokens: float) -> Dict[str, Any]:
+    if "choices" in answer: # Recorded response, replayed as is
+        return answer
+    content = json.dumps(answer)
+    completion_tokens = max(1, len(content) // 4)
+    total_tokens = prompt_tokens + completion_tokens
+    return {
+        "id": f"gen-mock-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": total_tokens,
+                  "cost": total_tokens * cost_per_million_tokens / 1_000_000},
+    }
+
+
+def create_mock_openrouter_app(config: Optional[MockOpenRouterConfig] = None) -> FastAPI:
+    """ASGI app that answers chat-completions requests the way OpenRouter does, with the configured faults."""
+    config = config or MockOpenRouterConfig()
+    app = FastAPI(title="Mock OpenRouter")
+    stats = MockOpenRouterStats()
+    rng = random.Random(config.seed)
+    recent_requests: Deque[float] = deque()
+    scripted_statuses: Deque[int] = deque(config.status_sequence)
+    next_response = 0
+    app.state.mock_stats = stats
+
+    def error_response(status_code: int, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+        stats.responses_by_status[status_code] = stats.responses_by_status.get(status_code, 0) + 1
+        return JSONResponse({"error": {"code": status_code, "message": message}}, status_code=status_code, headers=headers)
+
+    def rate_limited() -> JSONResponse:
+        return error_response(429, "Rate limit exceeded (mock)", {"Retry-After": f"{config.retry_after_seconds:g}"})
+
+    @app.post(MOCK_CHAT_COMPLETIONS_PATH)
+    async def chat_completions(request: Request):
+        nonlocal next_response
+        stats.requests += 1
+        if not request.headers.get("authorization", "").startswith("Bearer "):
+            return error_response(401, "No auth credentials found")
+        body = await request.json()
+
+        now = time.monotonic()
+        while recent_requests and recent_requests[0] < now - 60:
+            recent_requests.popleft()
+        if config.requests_per_minute and len(recent_requests) >= config.requests_per_minute:
+            return rate_limited()
+        recent_requests.append(now)
+
+        if scripted_statuses:
+            status_code = scripted_statuses.popleft()
+        else:
+            roll = rng.random()
+            status_code = 429 if roll < config.rate_limit_rate else 500 if roll < config.rate_limit_rate + config.error_rate else 200
+        if status_code == 429:
+            return rate_limited()
+
+        parts = _count_content_parts(body)
+        stats.images_received += parts["images"]
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            await asyncio.sleep(config.latency_seconds + rng.uniform(0, config.latency_jitter_seconds))
+        finally:
+            stats.in_flight -= 1
+        if status_code != 200:
+            return error_response(status_code, "Upstream provider error (mock)")
+
+        answer = EMPTY_EXTRACTION_ANSWER
+        if config.responses:
+            answer = config.responses[next_response % len(config.responses)]
+            next_response += 1
+        stats.responses_by_status[200] = stats.responses_by_status.get(200, 0) + 1
+        prompt_tokens = parts["text_chars"] // 4 + parts["images"] * MOCK_TOKENS_PER_IMAGE
+        return _completion_body(answer, body.get("model", "mock/model"), prompt_tokens, config.cost_per_million_tokens)
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats.as_dict()
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        stats.reset()
+        return stats.as_dict()
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenRouter stand-in for offline LLM benchmarking.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per successful call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of calls answered 429")
+    parser.add_argument("--requests-per-minute", type=int, default=0, help="Answer 429 above this many calls per minute")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--responses", help="JSON file with a list of canned answers or recorded response bodies")
+    parser.add_argument("--seed", type=int, help="Random seed for latency and faults")
+    args = parser.parse_args()
+
+    responses: List[Dict[str, Any]] = []
+    if args.responses:
+        with open(args.responses, "r") as f:
+            responses = json.load(f)
+    config = MockOpenRouterConfig(
+        latency_seconds=args.latency, latency_jitter_seconds=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, requests_per_minute=args.requests_per_minute,
+        retry_after_seconds=args.retry_after, responses=responses, seed=args.seed,
+    )
+
+    import uvicorn
+    uvicorn.run(create_mock_openrouter_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,33 @@
 import asyncio
 import logging
 import os
+from typing import Dict, List, Optional, TYPE_CHECKING
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 from app.core.config import AppSettings, UnicourtSelectors # AppSettings needed
 from app.utils.common import sanitize_filename # Moved import here
 from app.core.config import get_app_settings # For accessing current settings
+if TYPE_CHECKING:
+    from app.services.wait_strategy import WaitStrategy
 logger = logging.getLogger(__name__)
 
+# True once more items than the given count match the selector
+ITEM_COUNT_GREW_JS = "([selector, count]) => document.querySelectorAll(selector).length > count"
+
+# One object per row; each column spec is a CSS selector inside the row (empty = the row itself), optionally
+# ending in "@attribute" to read that attribute instead of the element's text
+EXTRACT_TABLE_ROWS_JS = """
+([rowSelector, columns]) => Array.from(document.querySelectorAll(rowSelector), row => {
+    const values = {};
+    for (const [name, spec] of Object.entries(columns)) {
+        const attributeMatch = spec.match(/^(.*)@([\\w-]+)$/);
+        const selector = attributeMatch ? attributeMatch[1].trim() : spec;
+        const element = selector ? row.querySelector(selector) : row;
+        values[name] = !element ? null : attributeMatch ? element.getAttribute(attributeMatch[2]) : element.innerText;
+    }
+    return values;
+})
+"""
+
 async def handle_cookie_banner_if_present(page: Page, settings: AppSettings):
     selectors: UnicourtSelectors = settings.UNICOURT_SELECTORS
     try:
@@ -15,7 +36,7 @@ async def handle_cookie_banner_if_present(page: Page, settings: AppSettings):
         if await cookie_button.is_visible(timeout=3000):
             logger.info("Cookie consent banner found. Clicking 'I Agree'.")
             await cookie_button.click(timeout=settings.SHORT_TIMEOUT_SECONDS * 1000)
-            await page.wait_for_timeout(1000) 
+            await cookie_button.wait_for(state="hidden", timeout=3000)
             logger.info("Cookie consent banner handled.")
             return True
     except PlaywrightTimeoutError:
@@ -39,9 +60,20 @@ async def safe_screenshot(page: Page, settings: AppSettings, filename_prefix: st
     except Exception as e:
         logger.error(f"Failed to save screenshot {screenshot_path}: {e}")
 
-async def scroll_to_bottom_of_scrollable(page: Page, scrollable_container_selector: str, item_selector: str, section_name: str, case_identifier: str, no_change_threshold: int = 10):
+async def extract_table_rows(page: Page, row_selector: str, column_selectors: Dict[str, str]) -> List[Dict[str, Optional[str]]]:
+    """
+    Reads a whole table in a single round trip instead of several locator calls per row.
+    `column_selectors` maps output keys to row-relative CSS selectors ("td:nth-child(2)", "a.link@href");
+    a missing element gives None. Values are raw innerText/attribute strings, in row order.
+    """
+    return await page.evaluate(EXTRACT_TABLE_ROWS_JS, [row_selector, column_selectors])
+
+async def scroll_to_bottom_of_scrollable(page: Page, scrollable_container_selector: str, item_selector: str, section_name: str, case_identifier: str, no_change_threshold: int = 10,
+                                         waits: Optional["WaitStrategy"] = None):
     """
     Scrolls a specific container to load all items, like document lists.
+    With a WaitStrategy, each scroll waits for more items to appear instead of for network idle, and two scrolls
+    in a row that load nothing end the loop (the second wait gets the longer, never shortened, timeout).
     """
     logger.debug(f"[{case_identifier}] Scrolling in {section_name} using container '{scrollable_container_selector}' looking for '{item_selector}'.")
 
@@ -50,6 +82,20 @@ async def scroll_to_bottom_of_scrollable(page: Page, scrollable_container_select
         logger.warning(f"[{case_identifier}] Scrollable container for {section_name} ('{scrollable_container_selector}') not visible. Skipping scroll.")
         return 0
 
+    if waits:
+        current_items = await page.locator(item_selector).count()
+        while True:
+            await scrollable_container.evaluate("element => element.scrollTop = element.scrollHeight")
+            grew = await waits.wait_for_function(page, "scroll_items_growth", ITEM_COUNT_GREW_JS, 2.0, arg=[item_selector, current_items], expect_timeout=True)
+            if not grew:
+                grew = await waits.wait_for_function(page, "scroll_items_final_check", ITEM_COUNT_GREW_JS, 4.0, arg=[item_selector, current_items],
+                                                     expect_timeout=True, adaptive=False) # Never cut short: a timeout here ends the list
+            if not grew:
+                logger.info(f"[{case_identifier}] {section_name} scrolling stabilized. Found {current_items} items.")
+                return current_items
+            current_items = await page.locator(item_selector).count()
+            logger.debug(f"[{case_identifier}] {section_name} scrolled: {current_items} items.")
+
     last_item_count = -1
     no_change_count = 0
     i = 0
@@ -0,0 +1,176 @@
+# app/workers/case_queue.py
+import asyncio
+import logging
+from typing import Optional, Callable, Dict, List, Tuple
+from datetime import datetime
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db import crud, models as db_models
+
+logger = logging.getLogger(__name__)
+
+
+class QueueLease(BaseModel):
+    """Detached view of a leased case_queue row handed to a worker."""
+    item_id: int
+    case_id: int
+    case_number: str
+    lease_owner: str
+    attempts: int
+
+
+class PersistentCaseQueue:
+    """
+    SQLite-backed work queue with lease/ack semantics, keyed by case_number.
+
+    put() writes a row (coalescing with a waiting row for the same case), get() leases the oldest claimable
+    row for a worker, ack() deletes it. At most one row per case_number is leased at a time, so a duplicate
+    submission is held back until the running one is acked instead of being handed to a second worker.
+    A row whose worker dies is either reclaimed at startup (reclaim_on_startup) or, if the
+    process keeps running, once its lease expires. A process that stops cleanly hands its rows back (release_leases_held_by). Workers keep long cases alive with keep_alive().
+
+    Waiting workers are woken by put/ack/release (and by close() on shutdown) rather than by polling;
+    poll_interval_seconds only bounds how late an expired lease is noticed.
+    Table access runs in a thread (see _run_db), so a locked database never stalls the event loop.
+    """
+    def __init__(self, lease_seconds: int, session_factory: Callable[[], Session] = SessionLocal, poll_interval_seconds: float = 30.0,
+                 aging_minutes_per_level: float = 60.0, deadline_urgent_minutes: float = 120.0):
+        self.lease_seconds = lease_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        # Scheduling order knobs, see crud.queue_scheduling_order
+        self.aging_minutes_per_level = aging_minutes_per_level
+        self.deadline_urgent_minutes = deadline_urgent_minutes
+        self._session_factory = session_factory
+        # Replaced on every notify, so each waiter holds the event of the generation it last looked at
+        self._wakeup = asyncio.Event()
+        self._closed = False
+
+    def _run_db_sync(self, fn, *args, **kwargs):
+        db = self._session_factory()
+        try:
+            return fn(db, *args, **kwargs)
+        finally:
+            db.close()
+
+    async def _run_db(self, fn, *args, **kwargs):
+        # SQLite can block for up to its busy timeout while another process writes; never stall the event loop on it
+        return await asyncio.to_thread(self._run_db_sync, fn, *args, **kwargs)
+
+    def _notify(self) -> None:
+        """Wakes every waiting get() so it re-checks the table."""
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        """Stops handing out work: pending and future get() calls return None immediately. Rows are kept."""
+        self._closed = True
+        self._notify()
+
+    async def reclaim_on_startup(self) -> Tuple[int, int]:
+        """Returns (leases_reclaimed, orphaned_cases_requeued)."""
+        reclaimed = await self._run_db(crud.reclaim_leased_queue_items)
+        requeued = await self._run_db(crud.requeue_orphaned_cases)
+        if reclaimed or requeued:
+            self._notify()
+        return reclaimed, requeued
+
+    async def release_leases_held_by(self, lease_owner_prefix: str) -> int:
+        """Returns the items leased by this process's workers to the queue. Call once those workers have stopped."""
+        released = await self._run_db(crud.release_queue_items_leased_by, lease_owner_prefix)
+        if released:
+            self._notify()
+        return released
+
+    async def put(self, case_id: int, case_number: str, priority: int = 0, deadline: Optional[datetime] = None) -> None:
+        await self._run_db(crud.enqueue_case, case_id, case_number, priority=priority, deadline=deadline)
+        self._notify()
+
+    async def _try_lease(self, lease_owner: str) -> Optional[QueueLease]:
+        def _lease(db: Session) -> Optional[QueueLease]:
+            item = crud.lease_next_queue_item(db, lease_owner, self.lease_seconds,
+                                              aging_minutes_per_level=self.aging_minutes_per_level,
+                                              deadline_urgent_minutes=self.deadline_urgent_minutes)
+            if not item:
+                return None
+            return QueueLease(item_id=item.id, case_id=item.case_id, case_number=item.case_number,
+                              lease_owner=lease_owner, attempts=item.attempts)
+        return await self._run_db(_lease)
+
+    async def get(self, lease_owner: str, stop_event: Optional[asyncio.Event] = None) -> Optional[QueueLease]:
+        """
+        Leases the next claimable item, waiting until one is available.
+        Returns None once the queue is closed or `stop_event` is set (e.g. a draining worker).
+        """
+        while not self._closed and not (stop_event and stop_event.is_set()):
+            # Grab the current generation before looking, so a notify landing in between still wakes us
+            wakeup = self._wakeup
+            lease = await self._try_lease(lease_owner)
+            if lease:
+                return lease
+            waiters = [asyncio.ensure_future(wakeup.wait())]
+            if stop_event:
+                waiters.append(asyncio.ensure_future(stop_event.wait()))
+            try:
+                await asyncio.wait(waiters, timeout=self.poll_interval_seconds, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+        return None
+
+    async def ack(self, lease: QueueLease) -> None:
+        if not await self._run_db(crud.ack_queue_item, lease.item_id, lease.lease_owner):
+            logger.warning(f"Queue item {lease.item_id} (case {lease.case_number}) was no longer leased by '{lease.lease_owner}' on ack; left as is.")
+        self._notify() # A duplicate of this case may have been waiting on the lease
+
+    async def release(self, lease: QueueLease) -> None:
+        if not await self._run_db(crud.release_queue_item, lease.item_id, lease.lease_owner):
+            logger.warning(f"Queue item {lease.item_id} (case {lease.case_number}) was no longer leased by '{lease.lease_owner}' on release; left as is.")
+        self._notify()
+
+    async def keep_alive(self, lease: QueueLease) -> None:
+        """Renews the lease until cancelled. Run as a task alongside the work for `lease`."""
+        renew_every = max(1.0, self.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(renew_every)
+            if not await self._run_db(crud.extend_queue_item_lease, lease.item_id, lease.lease_owner, self.lease_seconds):
+                logger.warning(f"Could not renew lease on queue item {lease.item_id} (case {lease.case_number}); it may have been reclaimed.")
+                return
+
+    async def qsize(self) -> int:
+        """Number of items waiting to be leased."""
+        return await self._run_db(crud.count_queue_items, db_models.QueueItemStatusEnum.PENDING)
+
+    async def leased_count(self) -> int:
+        return await self._run_db(crud.count_queue_items, db_models.QueueItemStatusEnum.LEASED)
+
+    async def queued_case_numbers(self) -> List[str]:
+        """Case numbers that have a queue entry, pending or leased."""
+        return await self._run_db(crud.get_queued_case_numbers)
+
+    async def pending_case_numbers(self) -> List[str]:
+        """Case numbers with an entry waiting to be leased."""
+        return await self._run_db(crud.get_queued_case_numbers, db_models.QueueItemStatusEnum.PENDING)
+
+    async def leased_case_numbers(self) -> List[str]:
+        """Case numbers with an entry currently leased by a worker."""
+        return await self._run_db(crud.get_queued_case_numbers, db_models.QueueItemStatusEnum.LEASED)
+
+    async def is_pending(self, case_number: str) -> bool:
+        item = await self._run_db(crud.get_queue_item_by_case_number, case_number)
+        return item is not None and item.status == db_models.QueueItemStatusEnum.PENDING
+
+    async def queue_positions(self, case_numbers: List[str]) -> Dict[str, int]:
+        """1-based positions among waiting items in the order workers will take them; cases not waiting are absent."""
+        return await self._run_db(crud.get_queue_positions, case_numbers,
+                            aging_minutes_per_level=self.aging_minutes_per_level,
+                            deadline_urgent_minutes=self.deadline_urgent_minutes)
+
+    async def queue_position(self, case_number: str) -> Optional[int]:
+        """1-based position among waiting items in the order workers will take them, or None if not waiting."""
+        return (await self.queue_positions([case_number])).get(case_number)
@@ -1,37 +1,81 @@
 # app/workers/case_worker.py
 import asyncio
 import logging
+import time
 from typing import Optional
+from pydantic import BaseModel
 from fastapi import FastAPI # For type hinting app state
 from app.db.session import SessionLocal
-from app.services.case_processor import CaseProcessorService
+from app.services.case_processor import CaseProcessorService, CaseLLMJob
 from app.services.unicourt_handler import UnicourtHandler
 from app.services.llm_processor import LLMProcessor
 from app.core.config import get_app_settings # To get current settings for worker
+from app.workers.case_queue import QueueLease
+from app.db import models as db_models
 
 logger = logging.getLogger(__name__)
 
-async def background_processor_worker(app: FastAPI, worker_id: int):
+# Browser-stage outcomes the worker pool controller counts as Unicourt errors
+BROWSER_STAGE_ERROR_STATUSES = {db_models.CaseStatusEnum.SESSION_ERROR, db_models.CaseStatusEnum.WORKER_ERROR}
+
+
+class LLMStageHandoff(BaseModel):
+    """A case whose browser stage is done, queued for the LLM stage together with its queue lease."""
+    llm_job: CaseLLMJob
+    lease: QueueLease
+    lease_keep_alive_task: Optional[asyncio.Task] = None
+
+    model_config = {"arbitrary_types_allowed": True}
+
+
+async def finish_case_tracking(app: FastAPI, lease: QueueLease, requeue: bool = False) -> None:
+    """
+    Acks the queue lease (or with `requeue`, releases it so the case runs again) and releases the case's
+    active-processing slot. The slot is released even if the queue call fails; the lease then expires on its own.
+    """
+    try:
+        if requeue:
+            await app.state.case_processing_queue.release(lease)
+        else:
+            await app.state.case_processing_queue.ack(lease)
+    except Exception as e:
+        logger.error(f"Could not {'release' if requeue else 'ack'} queue lease of case {lease.case_number}: {e}")
+    async with app.state.active_cases_lock:
+        app.state.actively_processing_cases.discard(lease.case_number)
+    async with app.state.processing_count_lock:
+        app.state.active_processing_count -= 1
+
+
+async def background_processor_worker(app: FastAPI, worker_id: int, drain_event: Optional[asyncio.Event] = None):
+    """
+    Browser-stage worker. Runs until shutdown or until `drain_event` is set by the worker pool
+    controller; a draining worker finishes its current case before exiting.
+    """
     worker_browser = None
     worker_context = None
     worker_dashboard_page = None
     worker_unicourt_handler = None
     worker_settings = get_app_settings()
     playwright_instance = app.state.playwright_instance
+    browser_manager = getattr(app.state, "browser_manager", None)
+    case_queue = app.state.case_processing_queue
+    lease_owner = f"{getattr(app.state, 'worker_name_prefix', '')}worker-{worker_id}"
     
     async def initialize_browser_resources(retry_count=0):
         nonlocal worker_browser, worker_context, worker_dashboard_page, worker_unicourt_handler
         
-        # Close any existing resources first
-        if worker_unicourt_handler and worker_browser and worker_context:
+        # Close any existing resources first (worker_browser is None when the context is on the shared browser)
+        if worker_unicourt_handler and worker_context:
             await worker_unicourt_handler.close_worker_browser_resources(worker_browser, worker_context)
         elif worker_context:
             await worker_context.close()
         elif worker_browser:
             await worker_browser.close()
+        worker_browser, worker_context = None, None
         
         # Create fresh handler for setup
-        temp_handler_for_setup = UnicourtHandler(playwright_instance, worker_settings)
+        temp_handler_for_setup = UnicourtHandler(playwright_instance, worker_settings, browser_manager=browser_manager,
+                                                 wait_strategy=getattr(app.state, "wait_strategy", None))
         
         # On retry, force new session creation through login
         if retry_count > 0:
@@ -45,13 +89,16 @@ async def background_processor_worker(app: FastAPI, worker_id: int):
         worker_browser, worker_context, worker_dashboard_page = \
             await temp_handler_for_setup.create_worker_browser_context_and_dashboard_page()
 
-        if not worker_dashboard_page or not worker_browser or not worker_context:
+        if not worker_dashboard_page or not worker_context:
             logger.error(f"Worker {worker_id}: Failed to initialize Playwright resources.")
             return False
             
         # Create the worker's handler with the new page
         worker_unicourt_handler = UnicourtHandler(playwright_instance, worker_settings, 
-                                                dashboard_page_for_worker=worker_dashboard_page)
+                                                dashboard_page_for_worker=worker_dashboard_page,
+                                                browser_manager=browser_manager,
+                                                download_limiter=getattr(app.state, "download_limiter", None),
+                                                wait_strategy=getattr(app.state, "wait_strategy", None))
         logger.info(f"Worker {worker_id}: Playwright resources initialized successfully.")
         return True
     
@@ -62,43 +109,53 @@ async def background_processor_worker(app: FastAPI, worker_id: int):
             logger.error(f"Worker {worker_id}: Initial setup failed. Worker cannot start.")
             return
 
-        llm_processor = LLMProcessor(worker_settings)
+        llm_processor = LLMProcessor(worker_settings, raster_pool=getattr(app.state, "raster_pool", None),
+                                 extraction_cache=getattr(app.state, "llm_extraction_cache", None),
+                                 http_client=getattr(app.state, "llm_http_client", None),
+                                 rate_limiter=getattr(app.state, "llm_rate_limiter", None))
 
-        while not app.state.shutting_down:
+        while not app.state.shutting_down and not (drain_event and drain_event.is_set()):
             try:
-                # Get case details from the queue
-                # Queue items: (case_id, case_obj_from_queue: db_models.Case)
-                case_id, _ = await asyncio.wait_for(app.state.case_processing_queue.get(), timeout=1.0)
+                # Lease the next case from the persistent queue; blocks until work arrives, the queue is closed or we are drained
+                lease = await case_queue.get(lease_owner, stop_event=drain_event)
+                if lease is None:
+                    if case_queue.closed:
+                        break
+                    continue # Drained or woken without work, re-check the loop condition
+                case_id = lease.case_id
                 
                 # Create a new database session for this iteration
                 db_session = SessionLocal()
+                lease_keep_alive_task: Optional[asyncio.Task] = None
+                case_tracked = False # Counted in actively_processing_cases / active_processing_count
+                final_status_written = False
                 try:
                     # Get a fresh copy of the case object from the database
                     from app.db import crud
                     case_obj_for_processing = crud.get_case_by_id(db_session, case_id)
                     if not case_obj_for_processing:
-                        logger.error(f"Worker {worker_id}: Case with ID {case_id} not found in database")
-                        app.state.case_processing_queue.task_done()
+                        logger.error(f"Worker {worker_id}: Case with ID {case_id} not found in database. Dropping queue item.")
+                        await case_queue.ack(lease)
                         continue
 
                     case_number_for_db = case_obj_for_processing.case_number # For logging and tracking
 
-                    logger.info(f"Worker {worker_id}: Picked up case {case_number_for_db} (ID: {case_id}) from queue.")
+                    logger.info(f"Worker {worker_id}: Picked up case {case_number_for_db} (ID: {case_id}) from queue (lease attempt {lease.attempts}).")
 
+                    # The queue holds one lease per case_number, so no other worker can be on this case
                     async with app.state.active_cases_lock:
-                        if case_number_for_db in app.state.actively_processing_cases:
-                            logger.warning(f"Worker {worker_id}: Case {case_number_for_db} (ID: {case_id}) is already being processed by another worker. Re-queuing.")
-                            await app.state.case_processing_queue.put((case_id, case_obj_for_processing))
-                            app.state.case_processing_queue.task_done() # Mark original task_done
-                            await asyncio.sleep(0.1) # Small delay
-                            continue
                         app.state.actively_processing_cases.add(case_number_for_db)
-                    
                     async with app.state.processing_count_lock:
                         app.state.active_processing_count += 1
+                    case_tracked = True
+                    
+                    lease_keep_alive_task = asyncio.create_task(case_queue.keep_alive(lease))
                     
                     logger.info(f"Worker {worker_id}: Starting processing for case {case_number_for_db} (ID: {case_id}). Active tasks: {app.state.active_processing_count}")
 
+                    llm_job: Optional[CaseLLMJob] = None
+                    browser_stage_started = time.monotonic()
+                    browser_stage_ok = True
                     retry_count = 0
                     max_retries = 2
                     while retry_count <= max_retries:
@@ -109,7 +166,8 @@ async def background_processor_worker(app: FastAPI, worker_id: int):
                                 unicourt_handler=worker_unicourt_handler, # Pass worker-specific handler
                                 llm_processor=llm_processor
                             )
-                            await case_processor_service.process_single_case(case_id, case_obj_for_processing)
+                            llm_job = await case_processor_service.run_browser_stage(case_id, case_obj_for_processing)
+                            browser_stage_ok = case_processor_service.browser_stage_status not in BROWSER_STAGE_ERROR_STATUSES
                             break  # Success, exit retry loop
                             
                         except Exception as e:
@@ -126,24 +184,40 @@ async def background_processor_worker(app: FastAPI, worker_id: int):
                                 await asyncio.sleep(2)  # Brief pause before retry
                             else:
                                 logger.critical(f"Worker {worker_id}: Unhandled error during case {case_number_for_db} (ID: {case_id}) processing: {e}", exc_info=True)
-                                # Basic error status update in DB if process_single_case failed critically before setting status
+                                # Basic error status update in DB if run_browser_stage failed critically before setting status
                                 from app.db import crud, models as db_models # Local import for safety
                                 crud.update_case_status(db_session, case_id, db_models.CaseStatusEnum.WORKER_ERROR)
+                                browser_stage_ok = False
                                 break  # Exit retry loop on non-session errors
+                    # Without an LLM job the browser stage (or the WORKER_ERROR update above) has set the final status
+                    final_status_written = llm_job is None
                     
-                    app.state.case_processing_queue.task_done()
-                    async with app.state.active_cases_lock:
-                        if case_number_for_db in app.state.actively_processing_cases:
-                            app.state.actively_processing_cases.remove(case_number_for_db)
-                    async with app.state.processing_count_lock:
-                        app.state.active_processing_count -= 1
-                    logger.info(f"Worker {worker_id}: Finished processing case {case_number_for_db} (ID: {case_id}). Active tasks: {app.state.active_processing_count}")
+                    pool_controller = getattr(app.state, "worker_pool_controller", None)
+                    if pool_controller:
+                        pool_controller.record_stage("browser", time.monotonic() - browser_stage_started, ok=browser_stage_ok and retry_count == 0)
+
+                    if llm_job:
+                        # The LLM stage now owns the lease (and its keep-alive) and finishes the case tracking.
+                        # put() blocks while the LLM stage is saturated, which throttles this browser worker.
+                        await app.state.llm_stage_queue.put(LLMStageHandoff(llm_job=llm_job, lease=lease, lease_keep_alive_task=lease_keep_alive_task))
+                        lease_keep_alive_task = None
+                        case_tracked = False
+                        logger.info(f"Worker {worker_id}: Browser stage done for case {case_number_for_db} (ID: {case_id}); handed {len(llm_job.llm_bundle_docs)} doc(s) to the LLM stage.")
+                    else:
+                        case_tracked = False
+                        await finish_case_tracking(app, lease)
+                        logger.info(f"Worker {worker_id}: Finished processing case {case_number_for_db} (ID: {case_id}). Active tasks: {app.state.active_processing_count}")
                 finally:
+                    if lease_keep_alive_task:
+                        lease_keep_alive_task.cancel()
+                    if case_tracked:
+                        # Left early (error or cancel) without handing the case on: free its slot, and either
+                        # keep the final status already written or put the case back in the queue to run again
+                        logger.warning(f"Worker {worker_id}: Case {lease.case_number} (ID: {case_id}) stopped early; "
+                                       f"{'acking its lease' if final_status_written else 'releasing it back to the queue'}.")
+                        await finish_case_tracking(app, lease, requeue=not final_status_written)
                     db_session.close()
 
-            except asyncio.TimeoutError:
-                # Queue was empty, continue checking
-                await asyncio.sleep(0.1) # Prevent tight loop when idle
             except asyncio.CancelledError:
                 logger.info(f"Worker {worker_id}: Task cancelled. Shutting down.")
                 break
@@ -156,7 +230,7 @@ async def background_processor_worker(app: FastAPI, worker_id: int):
     except Exception as e_worker_setup:
         logger.critical(f"Worker {worker_id}: Fatal error during setup: {e_worker_setup}", exc_info=True)
     finally:
-        if worker_unicourt_handler and worker_browser and worker_context: # If handler was successfully created
+        if worker_unicourt_handler and worker_context: # If handler was successfully created
             logger.info(f"Worker {worker_id}: Closing Playwright resources...")
             await worker_unicourt_handler.close_worker_browser_resources(worker_browser, worker_context)
         elif worker_context: # If only context was created
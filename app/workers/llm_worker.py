@@ -0,0 +1,85 @@
+# app/workers/llm_worker.py
+import asyncio
+import logging
+import time
+from typing import Optional
+from fastapi import FastAPI # For type hinting app state
+from app.db.session import SessionLocal
+from app.db import crud, models as db_models
+from app.services.case_processor import CaseProcessorService
+from app.services.llm_processor import LLMProcessor
+from app.core.config import get_app_settings
+from app.workers.case_worker import LLMStageHandoff, finish_case_tracking
+
+logger = logging.getLogger(__name__)
+
+
+async def _next_handoff(llm_stage_queue: asyncio.Queue, stop_event: asyncio.Event) -> Optional[LLMStageHandoff]:
+    """Waits for the next handoff. Returns None once `stop_event` is set, leaving queued handoffs in place."""
+    get_task = asyncio.ensure_future(llm_stage_queue.get())
+    stop_task = asyncio.ensure_future(stop_event.wait())
+    try:
+        await asyncio.wait([get_task, stop_task], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stop_task.cancel()
+        if not get_task.done():
+            get_task.cancel() # A cancelled Queue.get() never consumes an item
+    if get_task.done() and not get_task.cancelled():
+        return get_task.result()
+    return None
+
+async def llm_stage_worker(app: FastAPI, worker_id: int):
+    """
+    Consumes cases whose browser stage is done (app.state.llm_stage_queue) and runs the LLM stage.
+    Runs independently of the browser workers, so Playwright sessions never sit idle waiting on LLM calls.
+    """
+    worker_settings = get_app_settings()
+    llm_processor = LLMProcessor(worker_settings, raster_pool=getattr(app.state, "raster_pool", None),
+                                 extraction_cache=getattr(app.state, "llm_extraction_cache", None),
+                                 http_client=getattr(app.state, "llm_http_client", None),
+                                 rate_limiter=getattr(app.state, "llm_rate_limiter", None))
+    llm_stage_queue: asyncio.Queue = app.state.llm_stage_queue
+    stop_event: asyncio.Event = app.state.llm_stage_stop_event
+    logger.info(f"LLM Worker {worker_id}: Started.")
+
+    try:
+        while not app.state.shutting_down:
+            # Blocks until a handoff arrives or shutdown sets the stop event; no polling
+            handoff = await _next_handoff(llm_stage_queue, stop_event)
+            if handoff is None:
+                break
+
+            llm_job = handoff.llm_job
+            db_session = SessionLocal()
+            llm_stage_started = time.monotonic()
+            llm_stage_ok = False
+            try:
+                logger.info(f"LLM Worker {worker_id}: Starting LLM stage for case {llm_job.case_number} (ID: {llm_job.case_id}).")
+                case_processor_service = CaseProcessorService(
+                    db=db_session,
+                    settings=worker_settings,
+                    unicourt_handler=None, # LLM stage never touches the browser
+                    llm_processor=llm_processor
+                )
+                await case_processor_service.run_llm_stage(llm_job)
+                llm_stage_ok = True
+            except Exception as e:
+                logger.critical(f"LLM Worker {worker_id}: Unhandled error during LLM stage of case {llm_job.case_number} (ID: {llm_job.case_id}): {e}", exc_info=True)
+                crud.update_case_status(db_session, llm_job.case_id, db_models.CaseStatusEnum.WORKER_ERROR)
+            finally:
+                pool_controller = getattr(app.state, "worker_pool_controller", None)
+                if pool_controller:
+                    pool_controller.record_stage("llm", time.monotonic() - llm_stage_started, ok=llm_stage_ok)
+                if handoff.lease_keep_alive_task:
+                    handoff.lease_keep_alive_task.cancel()
+                llm_stage_queue.task_done()
+                db_session.close()
+
+            # Only reached when the stage ran to an end state; a cancelled job keeps its lease, which
+            # stop_worker_runtime hands back to the queue once the workers have stopped.
+            await finish_case_tracking(app, handoff.lease)
+            logger.info(f"LLM Worker {worker_id}: Finished case {llm_job.case_number} (ID: {llm_job.case_id}). Active tasks: {app.state.active_processing_count}")
+    except asyncio.CancelledError:
+        logger.info(f"LLM Worker {worker_id}: Task cancelled. Shutting down.")
+    finally:
+        logger.info(f"LLM Worker {worker_id}: Stopped.")
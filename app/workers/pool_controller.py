@@ -0,0 +1,296 @@
+# app/workers/pool_controller.py
+import asyncio
+import logging
+import time
+from collections import deque
+from statistics import median
+from typing import Optional, Dict, Deque, Tuple, Callable, Awaitable, List
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+MEMINFO_PATH = "/proc/meminfo"
+
+
+def read_available_memory_mb(meminfo_path: str = MEMINFO_PATH) -> Optional[float]:
+    """MemAvailable from /proc/meminfo in MB, or None where that isn't available (non-Linux hosts)."""
+    try:
+        with open(meminfo_path, "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024.0 # Value is in kB
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class StageSample(BaseModel):
+    timestamp: float
+    stage: str
+    duration_seconds: float
+    ok: bool
+
+
+class WorkerPoolSnapshot(BaseModel):
+    min_workers: int
+    max_workers: int
+    target_workers: int
+    running_workers: int
+    draining_workers: int
+    browser_stage_median_seconds: Optional[float] = None
+    browser_stage_baseline_seconds: Optional[float] = None
+    browser_stage_error_rate: Optional[float] = None
+    llm_stage_median_seconds: Optional[float] = None
+    available_memory_mb: Optional[float] = None
+    last_decision: Optional[str] = None
+    processes: int = 1 # Worker processes covered; see combine_pool_snapshots
+
+
+def _median_or_none(values: List[Optional[float]]) -> Optional[float]:
+    known = [v for v in values if v is not None]
+    return median(known) if known else None
+
+
+def combine_pool_snapshots(snapshots: List[WorkerPoolSnapshot]) -> Optional[WorkerPoolSnapshot]:
+    """
+    One view over the pools of several worker processes: worker counts are summed, stage timings are the
+    median across processes. min/max stay per-process limits (every process applies the same ones).
+    """
+    if not snapshots:
+        return None
+    decisions = [f"p{i}: {s.last_decision}" for i, s in enumerate(snapshots) if s.last_decision]
+    return WorkerPoolSnapshot(
+        min_workers=snapshots[0].min_workers,
+        max_workers=snapshots[0].max_workers,
+        target_workers=sum(s.target_workers for s in snapshots),
+        running_workers=sum(s.running_workers for s in snapshots),
+        draining_workers=sum(s.draining_workers for s in snapshots),
+        browser_stage_median_seconds=_median_or_none([s.browser_stage_median_seconds for s in snapshots]),
+        browser_stage_baseline_seconds=_median_or_none([s.browser_stage_baseline_seconds for s in snapshots]),
+        browser_stage_error_rate=_median_or_none([s.browser_stage_error_rate for s in snapshots]),
+        llm_stage_median_seconds=_median_or_none([s.llm_stage_median_seconds for s in snapshots]),
+        available_memory_mb=min((s.available_memory_mb for s in snapshots if s.available_memory_mb is not None), default=None),
+        last_decision="; ".join(decisions) or None,
+        processes=sum(s.processes for s in snapshots),
+    )
+
+
+def estimate_completion_seconds(snapshot: WorkerPoolSnapshot, queue_position: int) -> Optional[float]:
+    """
+    Rough time until the case at `queue_position` is done: the waves of cases ahead of it across the
+    running workers, plus its own run, at the recent median browser + LLM stage durations.
+    None until there is timing data.
+    """
+    browser_median = snapshot.browser_stage_median_seconds or snapshot.browser_stage_baseline_seconds
+    if browser_median is None:
+        return None
+    case_seconds = browser_median + (snapshot.llm_stage_median_seconds or 0.0)
+    workers = max(1, snapshot.running_workers)
+    waves_ahead = (queue_position - 1) // workers
+    return (waves_ahead + 1) * case_seconds
+
+
+# Worker coroutine factory: (worker_id, drain_event) -> coroutine that returns once drain_event is set
+WorkerFactory = Callable[[int, asyncio.Event], Awaitable[None]]
+
+
+class WorkerPoolController:
+    """
+    Runs the browser worker pool and resizes it while the service is up.
+
+    Workers report each stage (duration, success) through record_stage(). Every adjust interval the
+    controller looks at the recent window and applies AIMD: Unicourt errors above the threshold halve the
+    pool, low host memory or browser-stage latency well above its healthy baseline take one worker away,
+    and a healthy pool with a backlog gets one more worker. The result always stays within [min, max].
+    Removing a worker sets its drain event; it finishes its current case and exits on its own.
+    """
+    LATENCY_BACKOFF_FACTOR = 2.0 # Back off when the window median exceeds this multiple of the healthy baseline
+    BASELINE_SMOOTHING = 0.2 # EWMA weight of a new healthy window in the latency baseline
+    MIN_SAMPLES_FOR_DECISION = 3
+
+    def __init__(
+        self,
+        worker_factory: WorkerFactory,
+        min_workers: int,
+        max_workers: int,
+        initial_workers: int,
+        adjust_interval_seconds: float,
+        max_error_rate: float,
+        min_available_memory_mb: float,
+        backlog_fn: Optional[Callable[[], Awaitable[int]]] = None, # Pending cases; a database query, so awaited
+        memory_fn: Callable[[], Optional[float]] = read_available_memory_mb,
+        window_seconds: Optional[float] = None,
+    ):
+        if min_workers < 0 or max_workers < 1 or min_workers > max_workers:
+            raise ValueError(f"Invalid worker pool limits: min={min_workers}, max={max_workers}")
+        self._worker_factory = worker_factory
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.target_workers = max(min_workers, min(initial_workers, max_workers))
+        self.adjust_interval_seconds = adjust_interval_seconds
+        self.max_error_rate = max_error_rate
+        self.min_available_memory_mb = min_available_memory_mb
+        self._backlog_fn = backlog_fn
+        self._memory_fn = memory_fn
+        self.window_seconds = window_seconds or adjust_interval_seconds * 4
+
+        self._workers: Dict[int, Tuple[asyncio.Task, asyncio.Event]] = {}
+        self._next_worker_id = 0
+        self._samples: Deque[StageSample] = deque(maxlen=1000)
+        self._latency_baseline: Optional[float] = None
+        self._control_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.last_decision: Optional[str] = None
+
+    # --- Metrics ---
+
+    def record_stage(self, stage: str, duration_seconds: float, ok: bool) -> None:
+        self._samples.append(StageSample(timestamp=time.monotonic(), stage=stage, duration_seconds=duration_seconds, ok=ok))
+
+    def _window(self, stage: str) -> List[StageSample]:
+        cutoff = time.monotonic() - self.window_seconds
+        return [s for s in self._samples if s.stage == stage and s.timestamp >= cutoff]
+
+    def _window_median(self, stage: str) -> Optional[float]:
+        durations = [s.duration_seconds for s in self._window(stage) if s.ok]
+        return median(durations) if durations else None
+
+    def _window_error_rate(self, stage: str) -> Optional[float]:
+        samples = self._window(stage)
+        if not samples:
+            return None
+        return sum(1 for s in samples if not s.ok) / len(samples)
+
+    # --- Worker lifecycle ---
+
+    def _active_workers(self) -> Dict[int, Tuple[asyncio.Task, asyncio.Event]]:
+        return {wid: (task, drain) for wid, (task, drain) in self._workers.items() if not drain.is_set() and not task.done()}
+
+    def _prune_finished(self) -> None:
+        for wid in [wid for wid, (task, _) in self._workers.items() if task.done()]:
+            del self._workers[wid]
+
+    def _spawn_worker(self) -> None:
+        worker_id = self._next_worker_id
+        self._next_worker_id += 1
+        drain_event = asyncio.Event()
+        task = asyncio.create_task(self._worker_factory(worker_id, drain_event))
+        self._workers[worker_id] = (task, drain_event)
+        logger.info(f"Worker pool: started worker {worker_id}.")
+
+    async def _reconcile(self) -> None:
+        """Starts or drains workers until the active count matches target_workers."""
+        async with self._lock:
+            self._prune_finished()
+            active = self._active_workers()
+            while len(active) < self.target_workers:
+                self._spawn_worker()
+                active = self._active_workers()
+            # Drain the newest workers first; older ones have warmed-up browser contexts
+            for wid in sorted(active, reverse=True)[:max(0, len(active) - self.target_workers)]:
+                active[wid][1].set()
+                logger.info(f"Worker pool: draining worker {wid}.")
+
+    def tasks(self) -> List[asyncio.Task]:
+        tasks = [task for task, _ in self._workers.values()]
+        if self._control_task:
+            tasks.append(self._control_task)
+        return tasks
+
+    async def start(self) -> None:
+        await self._reconcile()
+        self._control_task = asyncio.create_task(self._control_loop())
+        logger.info(f"Worker pool started with {self.target_workers} worker(s) (min {self.min_workers}, max {self.max_workers}).")
+
+    async def stop(self) -> None:
+        """Cancels the control loop and all workers and waits for them to finish."""
+        if self._control_task:
+            self._control_task.cancel()
+        for task, _ in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks(), return_exceptions=True)
+
+    async def set_limits(self, min_workers: Optional[int] = None, max_workers: Optional[int] = None) -> None:
+        new_min = self.min_workers if min_workers is None else min_workers
+        new_max = self.max_workers if max_workers is None else max_workers
+        if new_min < 0 or new_max < 1 or new_min > new_max:
+            raise ValueError(f"Invalid worker pool limits: min={new_min}, max={new_max}")
+        self.min_workers, self.max_workers = new_min, new_max
+        self.target_workers = max(new_min, min(self.target_workers, new_max))
+        self.last_decision = f"limits set to [{new_min}, {new_max}]"
+        logger.info(f"Worker pool: limits set to min={new_min}, max={new_max}; target now {self.target_workers}.")
+        await self._reconcile()
+
+    # --- Control loop ---
+
+    def decide_target(self, backlog: int = 0) -> Tuple[int, str]:
+        """Returns (new_target, reason) from the current metrics window and queue backlog. Pure decision, no side effects."""
+        target = self.target_workers
+        available_mb = self._memory_fn()
+        error_rate = self._window_error_rate("browser")
+        browser_samples = len(self._window("browser"))
+        window_median = self._window_median("browser")
+
+        if available_mb is not None and available_mb < self.min_available_memory_mb:
+            return target - 1, f"low memory ({available_mb:.0f} MB available)"
+        if browser_samples >= self.MIN_SAMPLES_FOR_DECISION and error_rate is not None and error_rate > self.max_error_rate:
+            return target // 2, f"Unicourt error rate {error_rate:.0%}"
+        if (browser_samples >= self.MIN_SAMPLES_FOR_DECISION and window_median is not None and self._latency_baseline
+                and window_median > self._latency_baseline * self.LATENCY_BACKOFF_FACTOR):
+            return target - 1, f"browser stage median {window_median:.1f}s vs baseline {self._latency_baseline:.1f}s"
+        if backlog > len(self._active_workers()):
+            return target + 1, "healthy with backlog"
+        return target, "steady"
+
+    def _update_latency_baseline(self) -> None:
+        window_median = self._window_median("browser")
+        error_rate = self._window_error_rate("browser")
+        if window_median is None or (error_rate is not None and error_rate > self.max_error_rate):
+            return
+        if self._latency_baseline is None:
+            self._latency_baseline = window_median
+        elif window_median <= self._latency_baseline * self.LATENCY_BACKOFF_FACTOR:
+            self._latency_baseline += self.BASELINE_SMOOTHING * (window_median - self._latency_baseline)
+
+    async def adjust_once(self) -> None:
+        backlog = await self._backlog_fn() if self._backlog_fn else 0
+        new_target, reason = self.decide_target(backlog)
+        new_target = max(self.min_workers, min(new_target, self.max_workers))
+        self._update_latency_baseline()
+        if new_target != self.target_workers:
+            logger.info(f"Worker pool: {self.target_workers} -> {new_target} workers ({reason}).")
+            self.last_decision = f"{self.target_workers} -> {new_target}: {reason}"
+            self.target_workers = new_target
+        await self._reconcile()
+
+    async def _control_loop(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.adjust_interval_seconds)
+                try:
+                    await self.adjust_once()
+                except Exception as e:
+                    logger.error(f"Worker pool: adjustment failed: {e}", exc_info=True)
+        except asyncio.CancelledError:
+            logger.info("Worker pool: control loop stopped.")
+
+    def estimate_completion_seconds(self, queue_position: int) -> Optional[float]:
+        """See the module-level estimate_completion_seconds."""
+        return estimate_completion_seconds(self.snapshot(), queue_position)
+
+    def snapshot(self) -> WorkerPoolSnapshot:
+        self._prune_finished()
+        active = self._active_workers()
+        return WorkerPoolSnapshot(
+            min_workers=self.min_workers,
+            max_workers=self.max_workers,
+            target_workers=self.target_workers,
+            running_workers=len(active),
+            draining_workers=len(self._workers) - len(active),
+            browser_stage_median_seconds=self._window_median("browser"),
+            browser_stage_baseline_seconds=self._latency_baseline,
+            browser_stage_error_rate=self._window_error_rate("browser"),
+            llm_stage_median_seconds=self._window_median("llm"),
+            available_memory_mb=self._memory_fn(),
+            last_decision=self.last_decision,
+        )
@@ -0,0 +1,118 @@
+# app/workers/runtime.py
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+from fastapi import FastAPI # For type hinting app state
+from app.core.config import AppSettings
+from app.workers.case_queue import PersistentCaseQueue
+from app.workers.case_worker import background_processor_worker
+from app.workers.llm_worker import llm_stage_worker
+from app.workers.pool_controller import WorkerPoolController, WorkerPoolSnapshot
+from app.workers.worker_process import read_worker_process_reports, combine_reported_pools
+from app.services.raster_pool import RasterPool
+from app.services.llm_cache import LLMExtractionCache
+from app.services.llm_http_client import create_llm_http_client
+from app.services.llm_rate_limiter import LLMRateLimiter
+from app.services.download_limiter import HostDownloadLimiter
+from app.services.wait_strategy import WaitStrategy
+from app.services.unicourt_handler import resource_block_totals
+
+logger = logging.getLogger(__name__)
+
+# Shared by the API process (in-process worker mode) and by each spawned worker process,
+# so both run the exact same worker stack on the same app.state layout.
+
+def init_worker_state(app: FastAPI, settings: AppSettings, queue_poll_interval_seconds: Optional[float] = None) -> None:
+    app.state.playwright_instance = None # Initialized in lifespan_manager / the worker process
+    app.state.browser_manager = None # Shared browser pool
+    app.state.active_processing_count = 0
+    app.state.processing_count_lock = asyncio.Lock()
+    app.state.case_processing_queue = PersistentCaseQueue(
+        lease_seconds=settings.QUEUE_LEASE_SECONDS,
+        poll_interval_seconds=queue_poll_interval_seconds or settings.QUEUE_POLL_INTERVAL_SECONDS,
+        aging_minutes_per_level=settings.QUEUE_PRIORITY_AGING_MINUTES,
+        deadline_urgent_minutes=settings.QUEUE_DEADLINE_URGENT_MINUTES
+    )
+    app.state.llm_stage_queue = asyncio.Queue(maxsize=settings.LLM_STAGE_QUEUE_MAXSIZE)
+    app.state.llm_stage_stop_event = asyncio.Event() # Set on shutdown; wakes LLM workers blocked on an empty stage queue
+    app.state.actively_processing_cases = set()
+    app.state.active_cases_lock = asyncio.Lock()
+    app.state.background_worker_tasks = []
+    app.state.raster_pool = None # Document rasterization processes, created with the workers
+    app.state.llm_http_client = None # Shared OpenRouter client, created with the workers
+    app.state.llm_rate_limiter = None # Shared OpenRouter request/token budget, created with the workers
+    app.state.download_limiter = None # Per-host document download limit shared by the browser workers
+    app.state.wait_strategy = None # Page-wait timings and adaptive timeouts shared by the browser workers
+    app.state.llm_extraction_cache = LLMExtractionCache(
+        ttl_hours=settings.LLM_CACHE_TTL_HOURS, max_entries=settings.LLM_CACHE_MAX_ENTRIES
+    ) if settings.LLM_CACHE_ENABLED else None
+    app.state.worker_pool_controller = None # Owns the browser workers, started once the service is ready
+    app.state.worker_process_supervisor = None # Only set in the API process when WORKER_PROCESSES > 0
+    app.state.worker_name_prefix = "" # Distinguishes lease owners across worker processes
+    app.state.service_ready = False
+    app.state.shutting_down = False
+
+
+async def start_in_process_workers(app: FastAPI, settings: AppSettings) -> None:
+    """Starts the adaptive browser worker pool and the LLM stage workers in the current event loop."""
+    app.state.raster_pool = RasterPool(max_workers=settings.RASTER_POOL_SIZE)
+    app.state.llm_http_client = create_llm_http_client(settings)
+    # The OpenRouter limits are account-wide; each worker process gets an equal share
+    process_share = max(1, settings.WORKER_PROCESSES)
+    app.state.llm_rate_limiter = LLMRateLimiter(
+        requests_per_minute=max(1, settings.LLM_REQUESTS_PER_MINUTE // process_share) if settings.LLM_REQUESTS_PER_MINUTE else 0,
+        tokens_per_minute=max(1, settings.LLM_INPUT_TOKENS_PER_MINUTE // process_share) if settings.LLM_INPUT_TOKENS_PER_MINUTE else 0,
+    )
+    app.state.download_limiter = HostDownloadLimiter(
+        settings.DOCUMENT_DOWNLOAD_HOST_CONCURRENCY, settings.DOCUMENT_DOWNLOAD_HOST_MIN_INTERVAL_SECONDS
+    )
+    app.state.wait_strategy = WaitStrategy(
+        adaptive=settings.WAIT_ADAPTIVE_TIMEOUTS_ENABLED, percentile=settings.WAIT_TIMEOUT_PERCENTILE,
+        headroom=settings.WAIT_TIMEOUT_HEADROOM, min_samples=settings.WAIT_MIN_SAMPLES,
+    )
+    app.state.worker_pool_controller = WorkerPoolController(
+        worker_factory=lambda worker_id, drain_event: background_processor_worker(app, worker_id, drain_event),
+        min_workers=settings.WORKER_POOL_MIN,
+        max_workers=max(settings.WORKER_POOL_MIN, settings.WORKER_POOL_MAX),
+        initial_workers=settings.MAX_CONCURRENT_TASKS,
+        adjust_interval_seconds=settings.WORKER_POOL_ADJUST_INTERVAL_SECONDS,
+        max_error_rate=settings.WORKER_POOL_MAX_ERROR_RATE,
+        min_available_memory_mb=settings.WORKER_POOL_MIN_AVAILABLE_MEMORY_MB,
+        backlog_fn=app.state.case_processing_queue.qsize,
+    )
+    await app.state.worker_pool_controller.start()
+    for i in range(settings.LLM_STAGE_WORKERS):
+        task = asyncio.create_task(llm_stage_worker(app, worker_id=i))
+        app.state.background_worker_tasks.append(task)
+    logger.info(f"Started {app.state.worker_pool_controller.target_workers} browser worker(s) and {settings.LLM_STAGE_WORKERS} LLM stage worker(s).")
+
+
+def collect_worker_metrics(app: FastAPI) -> Dict[str, Any]:
+    """This process's worker activity as shown in /service/status; worker processes publish it with their heartbeat."""
+    llm_rate_limiter = getattr(app.state, "llm_rate_limiter", None)
+    download_limiter = getattr(app.state, "download_limiter", None)
+    wait_strategy = getattr(app.state, "wait_strategy", None)
+    browser_manager = getattr(app.state, "browser_manager", None)
+    return {
+        "active_processing_tasks_count": getattr(app.state, "active_processing_count", 0),
+        "distinct_cases_actively_processing_count": len(getattr(app.state, "actively_processing_cases", ())),
+        "llm_stage_queue_size": app.state.llm_stage_queue.qsize() if getattr(app.state, "llm_stage_queue", None) else 0,
+        "browser_pool": browser_manager.stats() if browser_manager else {},
+        "llm_rate_limiter": llm_rate_limiter.stats() if llm_rate_limiter else {},
+        "document_downloads": download_limiter.stats() if download_limiter else {},
+        "resource_blocking": resource_block_totals(),
+        "page_waits": wait_strategy.stats() if wait_strategy else {},
+    }
+
+
+def worker_pool_snapshot(app: FastAPI, settings: AppSettings) -> Optional[WorkerPoolSnapshot]:
+    """
+    The pool running this service's cases: the in-process controller, or in multi-process mode the combined
+    heartbeats of the worker processes. None if neither is running (or no worker process has reported yet).
+    """
+    controller = getattr(app.state, "worker_pool_controller", None)
+    if controller is not None:
+        return controller.snapshot()
+    if settings.WORKER_PROCESSES > 0:
+        return combine_reported_pools(read_worker_process_reports(settings))
+    return None
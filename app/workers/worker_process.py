@@ -0,0 +1,214 @@
+# app/workers/worker_process.py
+import os
+import asyncio
+import logging
+import multiprocessing
+import signal
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import FastAPI
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from app.core.config import get_app_settings, AppSettings
+from app.db import crud
+from app.db.session import SessionLocal
+from app.workers.pool_controller import WorkerPoolSnapshot, combine_pool_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+def _run_db(fn, *args, session_factory: Optional[Callable[[], Session]] = None, **kwargs):
+    db = (session_factory or SessionLocal)()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+# --- Child side ---
+
+def run_worker_process(process_index: int) -> None:
+    """
+    Entry point of a spawned worker process. Runs its own event loop, Playwright driver, browser pool,
+    adaptive browser workers and LLM stage workers, and takes cases from the shared database queue.
+    """
+    settings = get_app_settings()
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL, logging.INFO),
+        format=f"%(asctime)s - [worker-process-{process_index}] %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    try:
+        asyncio.run(_worker_process_main(process_index, settings))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _wait_for_stop(stop_event: asyncio.Event) -> None:
+    """Returns on SIGTERM/SIGINT or when the API process that spawned us is gone."""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError): # Windows: rely on the parent check below
+            pass
+    parent = multiprocessing.parent_process()
+    while not stop_event.is_set():
+        if parent is not None and not parent.is_alive():
+            logger.warning("API process is gone. Stopping worker process.")
+            return
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=1.0)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _apply_pool_limits_override(app: FastAPI) -> None:
+    """Applies worker pool limits set through PUT /service/worker-pool in the API process."""
+    controller = app.state.worker_pool_controller
+    limits = await asyncio.to_thread(_run_db, crud.get_worker_pool_limits_override)
+    if controller is not None and limits is not None and limits != (controller.min_workers, controller.max_workers):
+        await controller.set_limits(min_workers=limits[0], max_workers=limits[1])
+
+
+async def _publish_heartbeats(app: FastAPI, process_index: int, settings: AppSettings) -> None:
+    """Reports this process's pool and worker metrics to the API process through the database until cancelled."""
+    from app.workers.runtime import collect_worker_metrics
+    while True:
+        try:
+            await _apply_pool_limits_override(app)
+            controller = app.state.worker_pool_controller
+            pool_snapshot = controller.snapshot().model_dump() if controller else None
+            await asyncio.to_thread(_run_db, crud.upsert_worker_process_heartbeat, process_index, os.getpid(),
+                                    pool_snapshot, collect_worker_metrics(app))
+        except Exception as e:
+            logger.warning(f"Worker process {process_index}: could not publish heartbeat: {e}")
+        await asyncio.sleep(settings.WORKER_PROCESS_HEARTBEAT_SECONDS)
+
+
+async def _worker_process_main(process_index: int, settings: AppSettings) -> None:
+    # Imported here so the API process does not load the worker stack just to spawn children
+    from app.core.lifespan import start_browser_runtime, stop_worker_runtime
+    from app.workers.runtime import init_worker_state, start_in_process_workers
+
+    app = FastAPI() # Only used as the app.state holder the worker functions expect
+    # Submissions happen in another process, so queue wakeups can't reach us; poll the table instead
+    init_worker_state(app, settings, queue_poll_interval_seconds=settings.WORKER_PROCESS_QUEUE_POLL_SECONDS)
+    app.state.worker_name_prefix = f"p{process_index}-"
+    app.state.settings = settings
+
+    stop_event = asyncio.Event()
+    heartbeat_task: Optional[asyncio.Task] = None
+    try:
+        # Stagger startup so the processes don't all log in to Unicourt at the same moment
+        await asyncio.sleep(process_index * 2)
+        if not await start_browser_runtime(app, settings):
+            logger.critical(f"Worker process {process_index}: startup failed. Exiting.")
+            return
+        app.state.service_ready = True
+        await start_in_process_workers(app, settings)
+        heartbeat_task = asyncio.create_task(_publish_heartbeats(app, process_index, settings))
+        logger.info(f"Worker process {process_index} (pid {os.getpid()}) running.")
+        await _wait_for_stop(stop_event)
+    finally:
+        if heartbeat_task:
+            heartbeat_task.cancel()
+            try:
+                await asyncio.to_thread(_run_db, crud.delete_worker_process_heartbeat, process_index)
+            except Exception as e:
+                logger.warning(f"Worker process {process_index}: could not remove heartbeat: {e}")
+        await stop_worker_runtime(app, settings)
+        logger.info(f"Worker process {process_index}: stopped.")
+
+
+# --- Parent (API process) side ---
+
+class WorkerProcessReport(BaseModel):
+    process_index: int
+    pid: int
+    updated_at: datetime
+    pool: Optional[WorkerPoolSnapshot] = None
+    metrics: Dict[str, Any] = {}
+
+
+def read_worker_process_reports(settings: AppSettings, session_factory: Optional[Callable[[], Session]] = None) -> List[WorkerProcessReport]:
+    """Current heartbeats; a process that missed three heartbeats in a row is treated as gone."""
+    updated_after = datetime.utcnow() - timedelta(seconds=settings.WORKER_PROCESS_HEARTBEAT_SECONDS * 3)
+    heartbeats = _run_db(crud.get_worker_process_heartbeats, updated_after, session_factory=session_factory)
+    return [
+        WorkerProcessReport(process_index=h.process_index, pid=h.pid, updated_at=h.updated_at,
+                            pool=WorkerPoolSnapshot(**h.pool_snapshot) if h.pool_snapshot else None, metrics=h.metrics or {})
+        for h in heartbeats
+    ]
+
+
+def combine_reported_pools(reports: List[WorkerProcessReport]) -> Optional[WorkerPoolSnapshot]:
+    return combine_pool_snapshots([report.pool for report in reports if report.pool is not None])
+
+
+def reset_worker_process_state(session_factory: Optional[Callable[[], Session]] = None) -> None:
+    """Clears reports and runtime pool limits left by a previous run; call before starting the processes."""
+    _run_db(crud.clear_worker_process_state, session_factory=session_factory)
+
+
+class WorkerProcessSupervisor:
+    """
+    Keeps WORKER_PROCESSES worker processes running for the API process. Processes coordinate only through
+    the database queue: a process that is stopped releases its leases on the way out; one that dies leaves them
+    behind, and other processes reclaim them once they expire. The supervisor starts a replacement either way.
+    """
+    RESTART_BACKOFF_SECONDS = 5.0
+
+    def __init__(self, process_count: int, shutdown_timeout_seconds: float):
+        self.process_count = process_count
+        self.shutdown_timeout_seconds = shutdown_timeout_seconds
+        self._mp_context = multiprocessing.get_context("spawn") # Fresh interpreter: no inherited event loop or Playwright state
+        self._processes: List[Optional[multiprocessing.process.BaseProcess]] = [None] * process_count
+        self._monitor_task: Optional[asyncio.Task] = None
+        self.restart_count = 0
+
+    def _start_process(self, process_index: int) -> None:
+        process = self._mp_context.Process(target=run_worker_process, args=(process_index,),
+                                           name=f"worker-process-{process_index}", daemon=False)
+        process.start()
+        self._processes[process_index] = process
+        logger.info(f"Started worker process {process_index} (pid {process.pid}).")
+
+    def start(self) -> None:
+        for process_index in range(self.process_count):
+            self._start_process(process_index)
+        self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def _monitor(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.RESTART_BACKOFF_SECONDS)
+                for process_index, process in enumerate(self._processes):
+                    if process is not None and not process.is_alive():
+                        logger.error(f"Worker process {process_index} (pid {process.pid}) exited with code {process.exitcode}. Restarting.")
+                        self.restart_count += 1
+                        self._start_process(process_index)
+        except asyncio.CancelledError:
+            pass
+
+    def alive_count(self) -> int:
+        return sum(1 for p in self._processes if p is not None and p.is_alive())
+
+    async def stop(self) -> None:
+        """Asks every process to stop (SIGTERM) and waits for them; kills the ones that don't exit in time."""
+        if self._monitor_task:
+            self._monitor_task.cancel()
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        deadline = asyncio.get_running_loop().time() + self.shutdown_timeout_seconds
+        for process_index, process in enumerate(self._processes):
+            if process is None:
+                continue
+            while process.is_alive() and asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(0.2)
+            if process.is_alive():
+                logger.warning(f"Worker process {process_index} did not stop in time. Killing it.")
+                process.kill()
+            process.join(timeout=1)
+        logger.info("All worker processes stopped.")